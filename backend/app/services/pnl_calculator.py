@@ -45,14 +45,33 @@ class PnLCalculator:
             'displayed_pnl': float  # MT5's reported profit (may be wrong)
         }
         """
-        # Get account data
-        account = await self.db.mt5_accounts.find_one({'account': account_number})
+        data = await self._load_accounts([account_number])
+        return self._account_pnl(account_number, data)
+
+    async def _load_accounts(self, account_numbers: List[int]) -> Dict[str, Dict[int, Dict]]:
+        """
+        Account, config and corrected data documents for many
+        accounts - one $in query per collection instead of one per account
+        """
+        numbers = list(account_numbers)
+        accounts = {doc['account']: doc async for doc in self.db.mt5_accounts.find({'account': {'$in': numbers}})}
+        configs = {doc['account']: doc async for doc in self.db.mt5_account_config.find({'account': {'$in': numbers}})}
+        corrected = {
+            doc['account_number']: doc
+            async for doc in self.db.mt5_corrected_data.find({'account_number': {'$in': numbers}})
+        }
+        return {'accounts': accounts, 'configs': configs, 'corrected': corrected}
+
+    def _account_pnl(self, account_number: int, data: Dict[str, Dict[int, Dict]]) -> Optional[Dict]:
+        """TRUE P&L for one account from documents loaded by _load_accounts()"""
+        account = data['accounts'].get(account_number)
         if not account:
             logger.warning(f"Account {account_number} not found in mt5_accounts")
             return None
             
         # Get initial allocation from config
-        config = await self.db.mt5_account_config.find_one({'account': account_number})
+        config = data['configs'].get(account_number)
+        corrected = data['corrected'].get(account_number)
         initial_allocation = config.get('initial_allocation', 0) if config else 0
         
         # Get current state
@@ -60,7 +79,6 @@ class PnLCalculator:
         displayed_pnl = account.get('profit', 0)
         
         # Get profit withdrawals from corrected data
-        corrected = await self.db.mt5_corrected_data.find_one({'account_number': account_number})
         profit_withdrawals = corrected.get('profit_withdrawals', 0) if corrected else 0
         
         # Calculate TRUE P&L
@@ -95,8 +113,9 @@ class PnLCalculator:
         total_true_pnl = 0
         accounts_data = []
         
+        data = await self._load_accounts(config['account'] for config in configs)
         for config in configs:
-            account_pnl = await self.calculate_account_pnl(config['account'])
+            account_pnl = self._account_pnl(config['account'], data)
             if account_pnl:
                 accounts_data.append(account_pnl)
                 total_initial += account_pnl['initial_allocation']
@@ -138,8 +157,9 @@ class PnLCalculator:
         accounts_data = []
         funds_summary = {}
         
+        data = await self._load_accounts(config['account'] for config in configs)
         for config in configs:
-            account_pnl = await self.calculate_account_pnl(config['account'])
+            account_pnl = self._account_pnl(config['account'], data)
             if account_pnl:
                 accounts_data.append(account_pnl)
                 
@@ -0,0 +1,824 @@
+"""
+Async MongoDB Integration for FIDUS Investment Management System
+Motor-based drop-in for MongoDBManager inside FastAPI handlers
+
+Same method surface as mongodb_integration.MongoDBManager, but every data
+method is a coroutine running on the shared Motor client, so handlers no
+longer block the event loop (scheduler jobs, bridge monitor) on pymongo I/O.
+
+Per-row lookups are replaced by batched joins:
+- get_all_clients: one users/$lookup aggregation (profile + readiness) and
+  one $group over investments - instead of 5 queries per client
+- get_investments_by_client: all clients' investments in one $in query
+  (replaces get_all_clients() + get_client_investments() per client loops)
+- get_all_mt5_accounts: users/client_profiles resolved with two $in queries
+- get_fund_configurations: AUM and investor counts in one $group
+
+mt5_integration.MT5IntegrationService uses it too, on the shared
+config.database connection, so no handler path touches sync pymongo.
+"""
+import uuid
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Iterable
+
+import bcrypt
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from services.response_cache import TAG_INVESTMENTS, response_cache
+
+
+# ===============================================================================
+# DOCUMENT FORMATTERS (shared by single and batched reads)
+# ===============================================================================
+
+def _isoformat(value: Any) -> Any:
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def _parse_date(value: Any) -> datetime:
+    """Parse an ISO or YYYY-MM-DD date string (datetimes pass through)"""
+    if not isinstance(value, str):
+        return value
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+
+
+def format_readiness(client_id: str, readiness: Optional[Dict[str, Any]], isoformat_dates: bool = False) -> Dict[str, Any]:
+    """Readiness status with defaults for clients that have no record"""
+    if not readiness:
+        return {
+            'client_id': client_id,
+            'aml_kyc_completed': False,
+            'agreement_signed': False,
+            'account_creation_date': None,
+            'investment_ready': False,
+            'notes': ''
+        }
+    creation_date = readiness.get('account_creation_date')
+    if isoformat_dates and creation_date:
+        creation_date = creation_date.isoformat()
+    return {
+        'client_id': readiness.get('client_id', client_id),
+        'aml_kyc_completed': readiness.get('aml_kyc_completed', False),
+        'agreement_signed': readiness.get('agreement_signed', False),
+        'account_creation_date': creation_date,
+        'investment_ready': readiness.get('investment_ready', False),
+        'notes': readiness.get('notes', '')
+    }
+
+
+def format_investment(inv: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'investment_id': inv['investment_id'],
+        'fund_code': inv['fund_code'],
+        'fund_name': f"FIDUS {inv['fund_code'].title()} Fund",
+        'principal_amount': inv['principal_amount'],
+        'current_value': inv.get('current_value', inv['principal_amount']),
+        'interest_earned': inv.get('interest_earned', 0.0),
+        'deposit_date': inv['deposit_date'],
+        'incubation_end_date': inv.get('incubation_end_date', inv['deposit_date']),
+        'interest_start_date': inv.get('interest_start_date', inv['deposit_date']),
+        'minimum_hold_end_date': inv.get('minimum_hold_end_date', inv['deposit_date']),
+        'status': inv.get('status', 'active'),
+        'can_redeem_interest': inv.get('can_redeem_interest', False),
+        'can_redeem_principal': inv.get('can_redeem_principal', False),
+        'monthly_interest_rate': inv.get('monthly_interest_rate', 0.0),
+        'created_at': inv.get('created_at', ''),
+        'updated_at': inv.get('updated_at', '')
+    }
+
+
+def format_mt5_account(acc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'account_id': acc['account_id'],
+        'client_id': acc['client_id'],
+        'fund_code': acc['fund_code'],
+        'fund_name': f"FIDUS {acc['fund_code'].title()} Fund",
+        'mt5_login': acc['mt5_login'],
+        'mt5_server': acc['mt5_server'],
+        'total_allocated': acc['total_allocated'],
+        'current_equity': acc['current_equity'],
+        'profit_loss': acc['profit_loss'],
+        'profit_loss_percentage': (acc['profit_loss'] / acc['total_allocated'] * 100) if acc['total_allocated'] > 0 else 0,
+        'investment_count': len(acc.get('investment_ids', [])),
+        'investment_ids': acc.get('investment_ids', []),
+        'status': acc['status'],
+        'created_at': _isoformat(acc['created_at']),
+        'updated_at': _isoformat(acc['updated_at'])
+    }
+
+
+def format_document(doc: Dict[str, Any], default_type: str = 'shared') -> Dict[str, Any]:
+    return {
+        'id': doc['document_id'],
+        'name': doc['name'],
+        'category': doc['category'],
+        'document_type': doc.get('document_type', default_type),
+        'uploader_id': doc['uploader_id'],
+        'uploader_type': doc.get('uploader_type', 'admin'),
+        'client_id': doc.get('client_id'),
+        'file_path': doc['file_path'],
+        'file_size': doc['file_size'],
+        'content_type': doc.get('content_type'),
+        'status': doc.get('status', 'uploaded'),
+        'recipient_emails': doc.get('recipient_emails', []),
+        'signature_required': doc.get('signature_required', False),
+        'created_at': doc['created_at'].isoformat(),
+        'updated_at': doc['updated_at'].isoformat()
+    }
+
+
+class AsyncMongoDBManager:
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.db_name = db.name
+
+    # ===============================================================================
+    # USER MANAGEMENT
+    # ===============================================================================
+
+    async def authenticate_user(self, username: str, password: str, user_type: str) -> Optional[Dict[str, Any]]:
+        """Authenticate user with MongoDB credentials"""
+        try:
+            user = await self.db.users.find_one({
+                'username': username,
+                'user_type': user_type,
+                'status': 'active'
+            })
+            if not user:
+                return None
+
+            if not bcrypt.checkpw(password.encode('utf-8'), user['password_hash'].encode('utf-8')):
+                return None
+
+            # Get additional profile information for clients
+            profile_data = {}
+            if user_type == 'client':
+                profile = await self.db.client_profiles.find_one({'client_id': user['user_id']})
+                if profile:
+                    profile_data = {
+                        'name': profile.get('name', username),
+                        'email': profile.get('email', user['email']),
+                        'phone': profile.get('phone', ''),
+                        'fidus_account_number': profile.get('fidus_account_number', '')
+                    }
+
+            return {
+                'id': user['user_id'],
+                'username': user['username'],
+                'name': profile_data.get('name', user['username']),
+                'email': profile_data.get('email', user['email']),
+                'type': user['user_type'],
+                'status': user['status'],
+                'profile_picture': '/app/static/default_profile.jpg',  # Default profile picture
+                **profile_data
+            }
+
+        except Exception as e:
+            print(f"❌ Authentication error: {str(e)}")
+            return None
+
+    async def get_all_clients(self) -> List[Dict[str, Any]]:
+        """Get all client users with their profiles and readiness status (2 queries total)"""
+        try:
+            pipeline = [
+                {'$match': {'type': 'client', 'status': 'active'}},
+                {'$lookup': {'from': 'client_profiles', 'localField': 'id', 'foreignField': 'client_id', 'as': 'profile'}},
+                {'$lookup': {'from': 'client_readiness', 'localField': 'id', 'foreignField': 'client_id', 'as': 'readiness'}},
+                {'$project': {'_id': 0, 'profile._id': 0, 'readiness._id': 0}}
+            ]
+            users = await self.db.users.aggregate(pipeline).to_list(length=None)
+
+            client_ids = [user['id'] for user in users]
+            totals = {}
+            async for row in self.db.investments.aggregate([
+                {'$match': {'client_id': {'$in': client_ids}}},
+                {'$group': {'_id': '$client_id', 'count': {'$sum': 1}, 'total': {'$sum': '$principal_amount'}}}
+            ]):
+                totals[row['_id']] = row
+
+            clients = []
+            for user in users:
+                client_id = user['id']
+                profile = user['profile'][0] if user.get('profile') else None
+                readiness = user['readiness'][0] if user.get('readiness') else None
+                readiness_data = format_readiness(client_id, readiness, isoformat_dates=True)
+                investment_totals = totals.get(client_id, {})
+
+                clients.append({
+                    'id': client_id,
+                    'username': user['username'],
+                    'name': profile.get('name', user['username']) if profile else user['username'],
+                    'email': profile.get('email', user['email']) if profile else user['email'],
+                    'phone': profile.get('phone', '') if profile else '',
+                    'type': user['type'],
+                    'status': user['status'],
+                    'fidus_account_number': profile.get('fidus_account_number', '') if profile else '',
+                    'total_investments': investment_totals.get('count', 0),
+                    'total_invested': investment_totals.get('total', 0),
+                    'readiness_status': readiness_data,
+                    'investment_ready': readiness_data.get('investment_ready', False),
+                    'created_at': _isoformat(user.get('created_at', datetime.now(timezone.utc)))
+                })
+
+            # Sort by creation date (newest first)
+            clients.sort(key=lambda x: x['created_at'], reverse=True)
+            return clients
+
+        except Exception as e:
+            print(f"❌ Error getting clients: {str(e)}")
+            return []
+
+    # ===============================================================================
+    # INVESTMENT MANAGEMENT
+    # ===============================================================================
+
+    async def create_investment(self, investment_data: Dict[str, Any]) -> Optional[str]:
+        """Create a new investment in the database"""
+        try:
+            investment_id = str(uuid.uuid4())
+
+            investment_doc = {
+                'investment_id': investment_id,
+                'client_id': investment_data['client_id'],
+                'fund_code': investment_data['fund_code'],
+                'principal_amount': investment_data['amount'],
+                'deposit_date': _parse_date(investment_data.get('deposit_date', datetime.now(timezone.utc))),
+                'incubation_end_date': _parse_date(investment_data['incubation_end_date']),
+                'interest_start_date': _parse_date(investment_data['interest_start_date']),
+                'minimum_hold_end_date': _parse_date(investment_data['minimum_hold_end_date']),
+                'status': 'pending_mt5_validation',  # Pending until MT5 validation completes
+                'mt5_validation_required': True,
+                'created_at': datetime.now(timezone.utc)
+            }
+
+            result = await self.db.investments.insert_one(investment_doc)
+            if not result.inserted_id:
+                return None
+            response_cache.bump(TAG_INVESTMENTS)
+
+            await self.log_activity({
+                'client_id': investment_data['client_id'],
+                'activity_type': 'deposit',
+                'amount': investment_data['amount'],
+                'fund_code': investment_data['fund_code'],
+                'description': f"Investment created in {investment_data['fund_code']} fund"
+            })
+            return investment_id
+
+        except Exception as e:
+            print(f"❌ Error creating investment: {str(e)}")
+            return None
+
+    async def get_client_investments(self, client_id: str) -> List[Dict[str, Any]]:
+        """Get all investments for a specific client"""
+        try:
+            investment_docs = await self.db.investments.find({'client_id': client_id}, {'_id': 0}).to_list(length=None)
+            return [format_investment(inv) for inv in investment_docs]
+        except Exception as e:
+            print(f"❌ Error getting client investments: {str(e)}")
+            return []
+
+    async def get_investments_by_client(self, client_ids: Optional[Iterable[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Investments for many clients in one query, keyed by client_id
+
+        Replaces get_all_clients() + get_client_investments() per client.
+        Clients without investments map to an empty list.
+        """
+        try:
+            query = {}
+            by_client: Dict[str, List[Dict[str, Any]]] = {}
+            if client_ids is not None:
+                client_ids = list(client_ids)
+                query = {'client_id': {'$in': client_ids}}
+                by_client = {client_id: [] for client_id in client_ids}
+
+            async for inv in self.db.investments.find(query, {'_id': 0}):
+                by_client.setdefault(inv.get('client_id'), []).append(format_investment(inv))
+            return by_client
+
+        except Exception as e:
+            print(f"❌ Error getting investments by client: {str(e)}")
+            return {client_id: [] for client_id in (client_ids or [])}
+
+    async def get_fund_configurations(self) -> List[Dict[str, Any]]:
+        """Get all fund configurations with AUM and investor counts"""
+        try:
+            stats = {}
+            async for row in self.db.investments.aggregate([
+                {'$group': {
+                    '_id': '$fund_code',
+                    'total_aum': {'$sum': '$principal_amount'},
+                    'investors': {'$addToSet': '$client_id'}
+                }}
+            ]):
+                stats[row['_id']] = row
+
+            funds = []
+            async for fund in self.db.fund_configurations.find({}):
+                fund_stats = stats.get(fund['fund_code'], {})
+                funds.append({
+                    'fund_code': fund['fund_code'],
+                    'name': fund['name'],
+                    'monthly_interest_rate': fund['monthly_interest_rate'],
+                    'annual_interest_rate': fund['monthly_interest_rate'] * 12,
+                    'minimum_investment': fund['minimum_investment'],
+                    'redemption_frequency': fund['redemption_frequency'],
+                    'aum': fund_stats.get('total_aum', 0),
+                    'nav_per_share': fund.get('nav_per_share', 100.0),
+                    'performance_ytd': fund.get('performance_ytd', 0.0),
+                    'total_investors': len(fund_stats.get('investors', [])),
+                    'incubation_period_months': 2,
+                    'minimum_hold_period_months': 14
+                })
+            return funds
+
+        except Exception as e:
+            print(f"❌ Error getting fund configurations: {str(e)}")
+            return []
+
+    async def update_investment(self, investment_id: str, update_data: Dict[str, Any]) -> bool:
+        """Update an existing investment"""
+        try:
+            result = await self.db.investments.update_one(
+                {'investment_id': investment_id},
+                {'$set': self.prepare_for_mongo(update_data.copy())}
+            )
+            if result.modified_count > 0:
+                response_cache.bump(TAG_INVESTMENTS)
+                print(f"✅ Updated investment {investment_id}")
+                return True
+            print(f"❌ Investment {investment_id} not found or no changes made")
+            return False
+
+        except Exception as e:
+            print(f"❌ Error updating investment: {str(e)}")
+            return False
+
+    async def get_investment(self, investment_id: str) -> Optional[Dict[str, Any]]:
+        """Get investment by ID"""
+        try:
+            investment = await self.db.investments.find_one({'investment_id': investment_id})
+            if not investment:
+                return None
+            investment['_id'] = str(investment['_id'])
+            return self.parse_from_mongo(investment)
+
+        except Exception as e:
+            print(f"❌ Error getting investment: {str(e)}")
+            return None
+
+    # ===============================================================================
+    # CLIENT READINESS MANAGEMENT
+    # ===============================================================================
+
+    async def get_client_readiness(self, client_id: str) -> Dict[str, Any]:
+        """Get client readiness status"""
+        try:
+            readiness = await self.db.client_readiness.find_one({'client_id': client_id})
+            result = format_readiness(client_id, readiness)
+            result['client_id'] = client_id
+            return result
+        except Exception as e:
+            print(f"❌ Error getting client readiness: {str(e)}")
+            return {}
+
+    async def get_client(self, client_id: str) -> Dict[str, Any]:
+        """Get client by ID"""
+        try:
+            client = await self.db.users.find_one({"id": client_id, "type": "client"}, {'_id': 0})
+            return client or {}
+        except Exception as e:
+            print(f"❌ Error getting client: {str(e)}")
+            return {}
+
+    async def update_client_readiness(self, client_id: str, readiness_data: Dict[str, Any]) -> bool:
+        """Update client readiness status"""
+        try:
+            # Only AML/KYC and agreement are required for investment readiness
+            investment_ready = (
+                readiness_data.get('aml_kyc_completed', False) and
+                readiness_data.get('agreement_signed', False)
+            )
+
+            account_creation_date = readiness_data.get('account_creation_date')
+            if account_creation_date is None:
+                account_creation_date = datetime.now(timezone.utc)
+            elif isinstance(account_creation_date, str):
+                try:
+                    account_creation_date = datetime.fromisoformat(account_creation_date.replace('Z', '+00:00'))
+                except ValueError:
+                    account_creation_date = datetime.now(timezone.utc)
+
+            update_data = {
+                'client_id': client_id,
+                'aml_kyc_completed': readiness_data.get('aml_kyc_completed', False),
+                'agreement_signed': readiness_data.get('agreement_signed', False),
+                'account_creation_date': account_creation_date,
+                'investment_ready': investment_ready,
+                'notes': readiness_data.get('notes', ''),
+                'updated_at': datetime.now(timezone.utc),
+                'updated_by': readiness_data.get('updated_by', 'system')
+            }
+
+            result = await self.db.client_readiness.update_one(
+                {'client_id': client_id},
+                {'$set': update_data},
+                upsert=True
+            )
+            return result.acknowledged
+
+        except Exception as e:
+            print(f"❌ Error updating client readiness: {str(e)}")
+            return False
+
+    # ===============================================================================
+    # ACTIVITY LOGGING
+    # ===============================================================================
+
+    async def log_activity(self, activity_data: Dict[str, Any]) -> bool:
+        """Log client activity"""
+        try:
+            result = await self.db.activity_logs.insert_one({
+                'log_id': str(uuid.uuid4()),
+                'client_id': activity_data['client_id'],
+                'activity_type': activity_data['activity_type'],
+                'amount': activity_data.get('amount', 0),
+                'fund_code': activity_data.get('fund_code', ''),
+                'description': activity_data.get('description', ''),
+                'timestamp': datetime.now(timezone.utc)
+            })
+            return result.acknowledged
+        except Exception as e:
+            print(f"❌ Error logging activity: {str(e)}")
+            return False
+
+    async def get_client_activity_logs(self, client_id: str) -> List[Dict[str, Any]]:
+        """Get activity logs for a client"""
+        try:
+            logs = []
+            async for log in self.db.activity_logs.find({'client_id': client_id}).sort('timestamp', -1):
+                logs.append({
+                    'id': log['log_id'],
+                    'client_id': log['client_id'],
+                    'activity_type': log['activity_type'],
+                    'amount': log.get('amount', 0),
+                    'fund_code': log.get('fund_code', ''),
+                    'description': log.get('description', ''),
+                    'timestamp': log['timestamp'].isoformat()
+                })
+            return logs
+        except Exception as e:
+            print(f"❌ Error getting activity logs: {str(e)}")
+            return []
+
+    # ===============================================================================
+    # FUND PORTFOLIO MANAGEMENT
+    # ===============================================================================
+
+    async def get_fund_overview(self) -> Dict[str, Any]:
+        """Get comprehensive fund overview for admin dashboard"""
+        try:
+            funds = await self.get_fund_configurations()
+
+            total_aum = sum(fund['aum'] for fund in funds)
+            total_investors = len(await self.db.investments.distinct('client_id'))
+            active_funds = len([f for f in funds if f['aum'] > 0])
+
+            # Weighted average return
+            total_weighted_return = sum(fund['aum'] * fund['performance_ytd'] for fund in funds if fund['aum'] > 0)
+            avg_return = total_weighted_return / total_aum if total_aum > 0 else 0
+
+            return {
+                'total_aum': total_aum,
+                'total_investors': total_investors,
+                'active_funds': active_funds,
+                'average_return': avg_return,
+                'funds': funds
+            }
+        except Exception as e:
+            print(f"❌ Error getting fund overview: {str(e)}")
+            return {}
+
+    # ===============================================================================
+    # MT5 ACCOUNT MANAGEMENT
+    # ===============================================================================
+
+    async def create_mt5_account(self, mt5_account_data: Dict[str, Any]) -> Optional[str]:
+        """Create a new MT5 account mapping"""
+        try:
+            account_doc = {
+                'account_id': mt5_account_data['account_id'],
+                'client_id': mt5_account_data['client_id'],
+                'fund_code': mt5_account_data['fund_code'],
+                'broker_code': mt5_account_data.get('broker_code'),
+                'broker_name': mt5_account_data.get('broker_name'),
+                'mt5_login': mt5_account_data['mt5_login'],
+                'mt5_server': mt5_account_data['mt5_server'],
+                'total_allocated': mt5_account_data['total_allocated'],
+                'current_equity': mt5_account_data.get('current_equity', mt5_account_data['total_allocated']),
+                'profit_loss': mt5_account_data.get('profit_loss', 0.0),
+                'investment_ids': mt5_account_data.get('investment_ids', []),
+                'status': mt5_account_data.get('status', 'active'),
+                'manual_entry': mt5_account_data.get('manual_entry', False),
+                'created_at': datetime.now(timezone.utc),
+                'updated_at': datetime.now(timezone.utc)
+            }
+            result = await self.db.mt5_accounts.insert_one(account_doc)
+            return mt5_account_data['account_id'] if result.inserted_id else None
+
+        except Exception as e:
+            print(f"❌ Error creating MT5 account: {str(e)}")
+            return None
+
+    async def get_client_mt5_accounts(self, client_id: str) -> List[Dict[str, Any]]:
+        """Get all MT5 accounts for a specific client"""
+        try:
+            account_docs = await self.db.mt5_accounts.find(
+                {'client_id': client_id, 'status': 'active'}
+            ).to_list(length=None)
+            accounts = [format_mt5_account(acc) for acc in account_docs]
+            # Sort by creation date (newest first)
+            accounts.sort(key=lambda x: x['created_at'], reverse=True)
+            return accounts
+
+        except Exception as e:
+            print(f"❌ Error getting client MT5 accounts: {str(e)}")
+            return []
+
+    async def update_mt5_account_allocation(self, account_id: str, additional_amount: float, investment_id: str) -> bool:
+        """Add allocation to existing MT5 account"""
+        try:
+            result = await self.db.mt5_accounts.update_one(
+                {'account_id': account_id},
+                {
+                    '$inc': {'total_allocated': additional_amount, 'current_equity': additional_amount},
+                    '$push': {'investment_ids': investment_id},
+                    '$set': {'updated_at': datetime.now(timezone.utc)}
+                }
+            )
+            return result.acknowledged
+        except Exception as e:
+            print(f"❌ Error updating MT5 account allocation: {str(e)}")
+            return False
+
+    async def update_mt5_account_performance(self, account_id: str, current_equity: float) -> bool:
+        """Update MT5 account performance data"""
+        try:
+            account = await self.db.mt5_accounts.find_one({'account_id': account_id}, {'total_allocated': 1})
+            if not account:
+                return False
+
+            result = await self.db.mt5_accounts.update_one(
+                {'account_id': account_id},
+                {'$set': {
+                    'current_equity': current_equity,
+                    'profit_loss': current_equity - account['total_allocated'],
+                    'updated_at': datetime.now(timezone.utc)
+                }}
+            )
+            return result.acknowledged
+        except Exception as e:
+            print(f"❌ Error updating MT5 account performance: {str(e)}")
+            return False
+
+    async def get_all_mt5_accounts(self) -> List[Dict[str, Any]]:
+        """Get all MT5 accounts for admin overview (client names resolved in bulk)"""
+        try:
+            account_docs = await self.db.mt5_accounts.find({'status': 'active'}).to_list(length=None)
+
+            client_ids = list({acc['client_id'] for acc in account_docs})
+            users = {
+                u['id']: u async for u in self.db.users.find(
+                    {'id': {'$in': client_ids}}, {'_id': 0, 'id': 1, 'username': 1}
+                )
+            }
+            profiles = {
+                p['client_id']: p async for p in self.db.client_profiles.find(
+                    {'client_id': {'$in': client_ids}}, {'_id': 0, 'client_id': 1, 'name': 1}
+                )
+            }
+
+            accounts = []
+            for acc in account_docs:
+                client = users.get(acc['client_id'])
+                client_profile = profiles.get(acc['client_id'])
+                client_name = client_profile.get('name', client['username']) if client_profile and client else acc['client_id']
+
+                account_data = format_mt5_account(acc)
+                account_data.pop('investment_ids')
+                account_data['client_name'] = client_name
+                account_data['broker_code'] = acc.get('broker_code', 'unknown')
+                account_data['broker_name'] = acc.get('broker_name', 'Unknown Broker')
+                accounts.append(account_data)
+
+            return accounts
+
+        except Exception as e:
+            print(f"❌ Error getting all MT5 accounts: {str(e)}")
+            return []
+
+    async def store_mt5_credentials(self, account_id: str, encrypted_password: str) -> bool:
+        """Store encrypted MT5 credentials"""
+        try:
+            result = await self.db.mt5_credentials.update_one(
+                {'account_id': account_id},
+                {'$set': {
+                    'account_id': account_id,
+                    'encrypted_password': encrypted_password,
+                    'created_at': datetime.now(timezone.utc),
+                    'updated_at': datetime.now(timezone.utc)
+                }},
+                upsert=True
+            )
+            return result.acknowledged
+        except Exception as e:
+            print(f"❌ Error storing MT5 credentials: {str(e)}")
+            return False
+
+    async def get_mt5_credentials(self, account_id: str) -> Optional[str]:
+        """Get encrypted MT5 credentials"""
+        try:
+            credentials = await self.db.mt5_credentials.find_one({'account_id': account_id})
+            return credentials['encrypted_password'] if credentials else None
+        except Exception as e:
+            print(f"❌ Error getting MT5 credentials: {str(e)}")
+            return None
+
+    async def update_mt5_account(self, account_id: str, update_data: Dict[str, Any]) -> bool:
+        """Update an existing MT5 account"""
+        try:
+            result = await self.db.mt5_accounts.update_one(
+                {'account_id': account_id},
+                {'$set': self.prepare_for_mongo(update_data.copy())}
+            )
+            if result.modified_count > 0:
+                print(f"✅ Updated MT5 account {account_id}")
+                return True
+            print(f"❌ MT5 account {account_id} not found or no changes made")
+            return False
+        except Exception as e:
+            print(f"❌ Error updating MT5 account: {str(e)}")
+            return False
+
+    async def get_mt5_account_by_login(self, mt5_login: int) -> Optional[Dict[str, Any]]:
+        """Get MT5 account by login ID to prevent duplicates"""
+        try:
+            account = await self.db.mt5_accounts.find_one({'mt5_login': mt5_login})
+            if account:
+                account['_id'] = str(account['_id'])
+            return account
+        except Exception as e:
+            print(f"❌ Error getting MT5 account by login: {str(e)}")
+            return None
+
+    async def get_mt5_account(self, account_id: str) -> Optional[Dict[str, Any]]:
+        """Get MT5 account by account ID"""
+        try:
+            account = await self.db.mt5_accounts.find_one({'account_id': account_id})
+            if account:
+                account['_id'] = str(account['_id'])
+            return account
+        except Exception as e:
+            print(f"❌ Error getting MT5 account: {str(e)}")
+            return None
+
+    # ===============================================================================
+    # DATABASE UTILITIES
+    # ===============================================================================
+
+    def prepare_for_mongo(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Prepare data for MongoDB storage by parsing *_date strings"""
+        prepared_data = {}
+        for key, value in data.items():
+            if isinstance(value, str) and key.endswith('_date'):
+                try:
+                    prepared_data[key] = _parse_date(value)
+                except ValueError:
+                    prepared_data[key] = value
+            else:
+                prepared_data[key] = value
+        return prepared_data
+
+    def parse_from_mongo(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse data from MongoDB by converting datetime objects to ISO strings"""
+        return {key: value.isoformat() if isinstance(value, datetime) else value for key, value in data.items()}
+
+    # ===============================================================================
+    # DOCUMENT MANAGEMENT
+    # ===============================================================================
+
+    async def create_document(self, document_data: Dict[str, Any]) -> Optional[str]:
+        """Create a new document record"""
+        try:
+            document_doc = {
+                'document_id': document_data['document_id'],
+                'name': document_data['name'],
+                'category': document_data['category'],
+                'document_type': document_data.get('document_type', 'shared'),  # 'shared' or 'admin_only'
+                'uploader_id': document_data['uploader_id'],
+                'uploader_type': document_data.get('uploader_type', 'admin'),  # 'admin' or 'client'
+                'client_id': document_data.get('client_id'),  # For client-specific documents
+                'file_path': document_data['file_path'],
+                'file_size': document_data['file_size'],
+                'content_type': document_data.get('content_type'),
+                'status': document_data.get('status', 'uploaded'),
+                'recipient_emails': document_data.get('recipient_emails', []),
+                'signature_required': document_data.get('signature_required', False),
+                'created_at': datetime.now(timezone.utc),
+                'updated_at': datetime.now(timezone.utc)
+            }
+            result = await self.db.documents.insert_one(document_doc)
+            return document_data['document_id'] if result.inserted_id else None
+
+        except Exception as e:
+            print(f"❌ Error creating document: {str(e)}")
+            return None
+
+    async def get_document(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """Get a single document record (including Gmail sending fields)"""
+        try:
+            doc = await self.db.documents.find_one({'document_id': document_id}, {'_id': 0})
+            return self.parse_from_mongo(doc) if doc else None
+        except Exception as e:
+            print(f"❌ Error getting document: {str(e)}")
+            return None
+
+    async def update_document(self, document_id: str, update_data: Dict[str, Any]) -> bool:
+        """Update a document record"""
+        try:
+            update_data = {**update_data, 'updated_at': datetime.now(timezone.utc)}
+            result = await self.db.documents.update_one({'document_id': document_id}, {'$set': update_data})
+            return result.matched_count > 0
+        except Exception as e:
+            print(f"❌ Error updating document: {str(e)}")
+            return False
+
+    async def delete_document(self, document_id: str) -> bool:
+        """Delete a document record"""
+        try:
+            result = await self.db.documents.delete_one({'document_id': document_id})
+            return result.deleted_count > 0
+        except Exception as e:
+            print(f"❌ Error deleting document: {str(e)}")
+            return False
+
+    async def _find_documents(self, query: Dict[str, Any], default_type: str = 'shared') -> List[Dict[str, Any]]:
+        documents = [format_document(doc, default_type) async for doc in self.db.documents.find(query)]
+        # Sort by creation date (newest first)
+        documents.sort(key=lambda x: x['created_at'], reverse=True)
+        return documents
+
+    async def get_client_documents(self, client_id: str, include_admin_shared: bool = True) -> List[Dict[str, Any]]:
+        """Get documents for a specific client"""
+        try:
+            # Uploaded by the client, or assigned to the client
+            conditions = [{'uploader_id': client_id}, {'client_id': client_id}]
+            if include_admin_shared:
+                # Shared documents (not admin_only)
+                conditions.append({'document_type': 'shared', 'client_id': {'$in': [None, client_id]}})
+            return await self._find_documents({'$or': conditions})
+        except Exception as e:
+            print(f"❌ Error getting client documents: {str(e)}")
+            return []
+
+    async def get_all_documents(self, include_admin_only: bool = False) -> List[Dict[str, Any]]:
+        """Get all documents for admin view"""
+        try:
+            query = {} if include_admin_only else {'document_type': {'$ne': 'admin_only'}}
+            return await self._find_documents(query)
+        except Exception as e:
+            print(f"❌ Error getting all documents: {str(e)}")
+            return []
+
+    async def get_admin_only_documents(self) -> List[Dict[str, Any]]:
+        """Get admin-only documents (compliance, internal, etc.)"""
+        try:
+            return await self._find_documents({'document_type': 'admin_only'}, default_type='admin_only')
+        except Exception as e:
+            print(f"❌ Error getting admin-only documents: {str(e)}")
+            return []
+
+    async def get_database_stats(self) -> Dict[str, Any]:
+        """Get database statistics for monitoring"""
+        try:
+            stats = {
+                'database_name': self.db_name,
+                'collections': {},
+                'total_documents': 0
+            }
+            collections = ['users', 'client_profiles', 'investments', 'client_readiness',
+                           'fund_configurations', 'activity_logs', 'redemption_requests',
+                           'payment_confirmations', 'crm_prospects', 'fund_rebates',
+                           'mt5_accounts', 'mt5_credentials', 'documents', 'admin_sessions']
+            for collection_name in collections:
+                count = await self.db[collection_name].count_documents({})
+                stats['collections'][collection_name] = count
+                stats['total_documents'] += count
+            return stats
+        except Exception as e:
+            print(f"❌ Error getting database stats: {str(e)}")
+            return {}
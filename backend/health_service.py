@@ -4,13 +4,91 @@ Phase 5: Real-time System Health Dashboard
 Provides health check endpoints for all system components
 """
 
+import asyncio
+import logging
 import time
 import httpx
 import os
 from datetime import datetime, timezone
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Callable, Awaitable
 from motor.motor_asyncio import AsyncIOMotorClient
 
+logger = logging.getLogger(__name__)
+
+# Per-probe deadlines (seconds) - slightly above each probe's own HTTP timeout.
+# Override with HEALTH_PROBE_DEADLINE_<COMPONENT>, e.g. HEALTH_PROBE_DEADLINE_GITHUB=15
+DEFAULT_PROBE_DEADLINES = {
+    "frontend": 7.0,
+    "backend": 5.0,
+    "database": 5.0,
+    "mt5_bridge": 7.0,
+    "google_apis": 5.0,
+    "github": 12.0,
+    "render_platform": 7.0,
+}
+
+# Latency histogram bucket upper bounds in milliseconds (last bucket is +Inf)
+PROBE_LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def get_probe_deadline(component: str) -> float:
+    override = os.environ.get(f"HEALTH_PROBE_DEADLINE_{component.upper()}")
+    try:
+        return float(override) if override else DEFAULT_PROBE_DEADLINES.get(component, 10.0)
+    except ValueError:
+        return DEFAULT_PROBE_DEADLINES.get(component, 10.0)
+
+
+class ProbeLatencyHistograms:
+    """In-process latency histograms per health probe (cumulative since startup)"""
+    
+    def __init__(self, buckets_ms=PROBE_LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._stats: Dict[str, Dict[str, Any]] = {}
+    
+    def record(self, component: str, latency_ms: float, status: str):
+        stats = self._stats.get(component)
+        if stats is None:
+            stats = self._stats[component] = {
+                "count": 0,
+                "sum_ms": 0.0,
+                "max_ms": 0.0,
+                "timeouts": 0,
+                "buckets": [0] * (len(self.buckets_ms) + 1)
+            }
+        stats["count"] += 1
+        stats["sum_ms"] += latency_ms
+        stats["max_ms"] = max(stats["max_ms"], latency_ms)
+        if status == "timeout":
+            stats["timeouts"] += 1
+        for i, bound in enumerate(self.buckets_ms):
+            if latency_ms <= bound:
+                stats["buckets"][i] += 1
+                break
+        else:
+            stats["buckets"][-1] += 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"<={b}ms" for b in self.buckets_ms] + [f">{self.buckets_ms[-1]}ms"]
+        return {
+            component: {
+                "count": stats["count"],
+                "avg_ms": round(stats["sum_ms"] / stats["count"], 2) if stats["count"] else 0.0,
+                "max_ms": round(stats["max_ms"], 2),
+                "timeouts": stats["timeouts"],
+                "deadline_seconds": get_probe_deadline(component),
+                "histogram": dict(zip(labels, stats["buckets"]))
+            }
+            for component, stats in self._stats.items()
+        }
+    
+    def reset(self):
+        self._stats.clear()
+
+
+# Global instance
+probe_latency = ProbeLatencyHistograms()
+
 # Component health check functions
 
 async def check_frontend_health() -> Dict[str, Any]:
@@ -378,28 +456,19 @@ async def check_render_platform_health() -> Dict[str, Any]:
         "backend": "unknown"
     }
     
-    # Check frontend
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://fidus-investment-platform.onrender.com",
-                timeout=5.0,
-                follow_redirects=True
-            )
-        results["frontend"] = "healthy" if response.status_code == 200 else "degraded"
-    except:
-        results["frontend"] = "offline"
+    async def check_service(key: str, url: str, follow_redirects: bool = False):
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(url, timeout=5.0, follow_redirects=follow_redirects)
+            results[key] = "healthy" if response.status_code == 200 else "degraded"
+        except Exception:
+            results[key] = "offline"
     
-    # Check backend
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://fidus-api.onrender.com/api/health",
-                timeout=5.0
-            )
-        results["backend"] = "healthy" if response.status_code == 200 else "degraded"
-    except:
-        results["backend"] = "offline"
+    # Check frontend and backend concurrently
+    await asyncio.gather(
+        check_service("frontend", "https://fidus-investment-platform.onrender.com", follow_redirects=True),
+        check_service("backend", "https://fidus-api.onrender.com/api/health")
+    )
     
     # Determine overall status
     if all(s == "healthy" for s in results.values()):
@@ -426,6 +495,38 @@ async def check_render_platform_health() -> Dict[str, Any]:
     }
 
 
+async def run_health_probe(
+    component: str,
+    name: str,
+    probe: Callable[[], Awaitable[Dict[str, Any]]],
+    deadline: float
+) -> Dict[str, Any]:
+    """Run one probe under its own deadline; never raises"""
+    start = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(probe(), timeout=deadline)
+    except asyncio.TimeoutError:
+        result = {
+            "component": component,
+            "name": name,
+            "status": "timeout",
+            "error": f"Health probe exceeded {deadline:g}s deadline",
+            "last_check": datetime.now(timezone.utc).isoformat()
+        }
+    except Exception as e:
+        result = {
+            "component": component,
+            "name": name,
+            "status": "error",
+            "error": str(e),
+            "last_check": datetime.now(timezone.utc).isoformat()
+        }
+    latency_ms = (time.perf_counter() - start) * 1000
+    result["probe_latency_ms"] = round(latency_ms, 2)
+    probe_latency.record(component, latency_ms, result.get("status"))
+    return result
+
+
 async def check_all_components(db, trigger_alerts: bool = True) -> Dict[str, Any]:
     """Run health checks on all components and return aggregated status"""
     
@@ -433,34 +534,36 @@ async def check_all_components(db, trigger_alerts: bool = True) -> Dict[str, Any
     from alert_service import AlertService
     alert_service = AlertService(db) if trigger_alerts else None
     
-    # Run all health checks concurrently
-    frontend_health = await check_frontend_health()
-    backend_health = await check_backend_health(db)
-    database_health = await check_database_health(db)
-    mt5_bridge_health = await check_mt5_bridge_health()
-    google_apis_health = await check_google_apis_health(db)
-    github_health = await check_github_health()
-    render_platform_health = await check_render_platform_health()
+    # (component, alert display name, probe) - results keep this order
+    probes = [
+        ("frontend", "FIDUS Frontend", check_frontend_health),
+        ("backend", "FIDUS Backend API", lambda: check_backend_health(db)),
+        ("database", "MongoDB Atlas", lambda: check_database_health(db)),
+        ("mt5_bridge", "MT5 Bridge Service", check_mt5_bridge_health),
+        ("google_apis", "Google Workspace APIs", lambda: check_google_apis_health(db)),
+        ("github", "GitHub Repository", check_github_health),
+        ("render_platform", "Render Hosting Platform", check_render_platform_health),
+    ]
+    
+    # Run all health checks concurrently - total latency is bounded by the
+    # largest probe deadline, not the sum of probe latencies
+    check_start = time.perf_counter()
+    components = await asyncio.gather(*(
+        run_health_probe(component, name, probe, get_probe_deadline(component))
+        for component, name, probe in probes
+    ))
+    components = list(components)
+    check_duration_ms = (time.perf_counter() - check_start) * 1000
     
     # Check for alerts if enabled
     if alert_service:
-        await alert_service.check_and_alert("frontend", "FIDUS Frontend", frontend_health["status"], frontend_health)
-        await alert_service.check_and_alert("backend", "FIDUS Backend API", backend_health["status"], backend_health)
-        await alert_service.check_and_alert("database", "MongoDB Atlas", database_health["status"], database_health)
-        await alert_service.check_and_alert("mt5_bridge", "MT5 Bridge Service", mt5_bridge_health["status"], mt5_bridge_health)
-        await alert_service.check_and_alert("google_apis", "Google Workspace APIs", google_apis_health["status"], google_apis_health)
-        await alert_service.check_and_alert("github", "GitHub Repository", github_health["status"], github_health)
-        await alert_service.check_and_alert("render_platform", "Render Hosting Platform", render_platform_health["status"], render_platform_health)
-    
-    components = [
-        frontend_health,
-        backend_health,
-        database_health,
-        mt5_bridge_health,
-        google_apis_health,
-        github_health,
-        render_platform_health
-    ]
+        alert_results = await asyncio.gather(*(
+            alert_service.check_and_alert(component, name, health["status"], health)
+            for (component, name, _), health in zip(probes, components)
+        ), return_exceptions=True)
+        for (component, _, _), outcome in zip(probes, alert_results):
+            if isinstance(outcome, Exception):
+                logger.error(f"Health alert check failed for {component}: {outcome}")
     
     # Calculate overall system status
     statuses = [c['status'] for c in components]
@@ -501,6 +604,7 @@ async def check_all_components(db, trigger_alerts: bool = True) -> Dict[str, Any
         "healthy_count": healthy_count,
         "total_count": total_count,
         "components": components,
+        "check_duration_ms": round(check_duration_ms, 2),
         "last_check": datetime.now(timezone.utc).isoformat(),
         "timestamp": datetime.now(timezone.utc).timestamp()
     }
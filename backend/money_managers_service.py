@@ -323,24 +323,26 @@ class MoneyManagersService:
             total_withdrawals = 0
             total_true_pnl = 0
             
+            # Get corrected data from mt5_accounts collection (one query for all accounts)
+            accounts_data = {
+                doc["account"]: doc
+                async for doc in self.db.mt5_accounts.find({"account": {"$in": assigned_accounts}})
+            }
+            
+            # CORRECT: Net deposits (deposits + withdrawals) from deal history, one aggregate for all accounts
+            rows = await self.db.mt5_deals_history.aggregate([
+                {"$match": {"account_number": {"$in": assigned_accounts}, "type": 2}},  # Balance operations only
+                {"$group": {"_id": "$account_number", "net_deposits": {"$sum": "$profit"}}}
+            ]).to_list(length=None)
+            net_deposits = {row["_id"]: row["net_deposits"] for row in rows}
+            
             for account_num in assigned_accounts:
-                # Get corrected data from mt5_accounts collection
-                account_data = await self.db.mt5_accounts.find_one({"account": account_num})
+                account_data = accounts_data.get(account_num)
                 
                 if account_data:
                     balance = account_data.get("balance", 0)
                     equity = account_data.get("equity", 0)
-                    
-                    # CORRECT: Calculate net deposits from deal history
-                    deals_cursor = self.db.mt5_deals_history.find({
-                        "account_number": account_num,
-                        "type": 2  # Balance operations only
-                    })
-                    deals = await deals_cursor.to_list(length=None)
-                    
-                    deposits_account = sum(d.get('profit', 0) for d in deals if d.get('profit', 0) > 0)
-                    withdrawals_account = sum(d.get('profit', 0) for d in deals if d.get('profit', 0) < 0)
-                    net_deposits_account = deposits_account + withdrawals_account
+                    net_deposits_account = net_deposits.get(account_num, 0)
                     
                     # TRUE P&L for this account
                     pnl_account = balance - net_deposits_account
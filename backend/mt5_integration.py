@@ -21,8 +21,9 @@ import random
 # Import encryption for secure credential storage
 from cryptography.fernet import Fernet
 
-# MongoDB integration
-from mongodb_integration import mongodb_manager
+# MongoDB integration (Motor - these methods run inside FastAPI handlers)
+from async_mongodb_integration import AsyncMongoDBManager
+from config.database import connection_manager
 
 # Connection stability and retry logic
 import aiohttp
@@ -137,6 +138,7 @@ class MT5IntegrationService:
         self.performance_cache: Dict[str, MT5PerformanceData] = {}
         self.connection_failures: Dict[str, int] = {}  # Track failures per broker
         self.last_health_check: Dict[str, float] = {}  # Last health check per broker
+        self.mongodb: Optional[AsyncMongoDBManager] = None
         
         # Enhanced broker configurations with failover
         self.broker_configs = {
@@ -168,6 +170,12 @@ class MT5IntegrationService:
         
         logging.info("Enhanced MT5 Integration Service initialized with stability features")
     
+    async def _mongodb(self) -> AsyncMongoDBManager:
+        """Async MongoDB manager on the shared Motor connection (created on first use)"""
+        if self.mongodb is None:
+            self.mongodb = AsyncMongoDBManager(await connection_manager.get_database())
+        return self.mongodb
+    
     @backoff.on_exception(backoff.expo,
                          (ConnectionError, TimeoutError, aiohttp.ClientError),
                          max_tries=3,
@@ -380,6 +388,7 @@ class MT5IntegrationService:
                                       broker_code: str = "multibank") -> Optional[str]:
         """Get existing MT5 account for client+fund+broker or create new one"""
         try:
+            mongodb = await self._mongodb()
             # Validate broker
             if not MT5BrokerConfig.is_valid_broker(broker_code):
                 logging.error(f"Invalid broker code: {broker_code}")
@@ -388,7 +397,7 @@ class MT5IntegrationService:
             broker_config = MT5BrokerConfig.BROKERS[broker_code]
             
             # Check if client already has MT5 account for this fund with same broker
-            existing_accounts = mongodb_manager.get_client_mt5_accounts(client_id)
+            existing_accounts = await mongodb.get_client_mt5_accounts(client_id)
             
             for account in existing_accounts:
                 if (account['fund_code'] == fund_code and 
@@ -396,7 +405,7 @@ class MT5IntegrationService:
                     # Add investment to existing account
                     account_id = account['account_id']
                     
-                    success = mongodb_manager.update_mt5_account_allocation(
+                    success = await mongodb.update_mt5_account_allocation(
                         account_id, 
                         investment_data['principal_amount'],
                         investment_data['investment_id']
@@ -417,7 +426,7 @@ class MT5IntegrationService:
             
             # Store encrypted credentials
             encrypted_password = self._encrypt_password(mt5_password)
-            mongodb_manager.store_mt5_credentials(account_id, encrypted_password)
+            await mongodb.store_mt5_credentials(account_id, encrypted_password)
             
             # Create MT5 account record
             mt5_account_data = {
@@ -435,7 +444,7 @@ class MT5IntegrationService:
                 'status': 'active'
             }
             
-            created_account_id = mongodb_manager.create_mt5_account(mt5_account_data)
+            created_account_id = await mongodb.create_mt5_account(mt5_account_data)
             
             if created_account_id:
                 # Attempt to connect to MT5 (mock for now)
@@ -455,6 +464,7 @@ class MT5IntegrationService:
                                                 broker_code: str = "multibank") -> Optional[str]:
         """Create MT5 account with provided real credentials (for admin investment creation)"""
         try:
+            mongodb = await self._mongodb()
             # Validate broker
             if not MT5BrokerConfig.is_valid_broker(broker_code):
                 logging.error(f"Invalid broker code: {broker_code}")
@@ -469,11 +479,11 @@ class MT5IntegrationService:
                     raise ValueError(f"Missing required MT5 field: {field}")
             
             # Check for existing account with same MT5 login to prevent duplicates
-            existing_account = mongodb_manager.get_mt5_account_by_login(mt5_account_data['mt5_login'])
+            existing_account = await mongodb.get_mt5_account_by_login(mt5_account_data['mt5_login'])
             if existing_account:
                 # Add investment to existing account
                 account_id = existing_account['account_id']
-                success = mongodb_manager.update_mt5_account_allocation(
+                success = await mongodb.update_mt5_account_allocation(
                     account_id, 
                     mt5_account_data['principal_amount'],
                     mt5_account_data['investment_id']
@@ -493,7 +503,7 @@ class MT5IntegrationService:
             
             # Store encrypted credentials securely
             encrypted_password = self._encrypt_password(mt5_password)
-            mongodb_manager.store_mt5_credentials(account_id, encrypted_password)
+            await mongodb.store_mt5_credentials(account_id, encrypted_password)
             
             # Calculate balances
             mt5_initial_balance = mt5_account_data.get('mt5_initial_balance', mt5_account_data['principal_amount'])
@@ -520,7 +530,7 @@ class MT5IntegrationService:
                 'created_via': 'admin_investment_creation'
             }
             
-            created_account_id = mongodb_manager.create_mt5_account(mt5_record_data)
+            created_account_id = await mongodb.create_mt5_account(mt5_record_data)
             
             if created_account_id:
                 # Attempt to connect to MT5 with real credentials
@@ -544,6 +554,7 @@ class MT5IntegrationService:
     async def _connect_real_mt5_account(self, account_id: str, login: int, password: str, server: str, broker_code: str) -> bool:
         """Attempt to connect to real MT5 account with provided credentials"""
         try:
+            mongodb = await self._mongodb()
             # In production, this would use actual MT5 API to validate credentials
             # For now, we'll do basic validation and mock connection
             
@@ -577,7 +588,7 @@ class MT5IntegrationService:
                 }
                 
                 # Initialize performance tracking
-                account_data = mongodb_manager.get_mt5_account(account_id)
+                account_data = await mongodb.get_mt5_account(account_id)
                 if account_data:
                     self.performance_cache[account_id] = MT5PerformanceData(
                         account_id=account_id,
@@ -603,6 +614,7 @@ class MT5IntegrationService:
     async def _mock_mt5_connection(self, account_id: str, login: int, password: str, server: str) -> bool:
         """Mock MT5 connection (replace with real MT5 API in production)"""
         try:
+            mongodb = await self._mongodb()
             # Simulate connection delay
             await asyncio.sleep(0.5)
             
@@ -615,7 +627,7 @@ class MT5IntegrationService:
             }
             
             # Initialize mock performance data
-            initial_equity = mongodb_manager.db.mt5_accounts.find_one(
+            initial_equity = await mongodb.db.mt5_accounts.find_one(
                 {'account_id': account_id}
             )['total_allocated']
             
@@ -641,12 +653,13 @@ class MT5IntegrationService:
     async def get_account_performance(self, account_id: str) -> Optional[MT5PerformanceData]:
         """Get real-time account performance data"""
         try:
+            mongodb = await self._mongodb()
             # Check if account is connected
             if account_id not in self.connected_accounts:
                 # Try to reconnect
-                account = mongodb_manager.db.mt5_accounts.find_one({'account_id': account_id})
+                account = await mongodb.db.mt5_accounts.find_one({'account_id': account_id})
                 if account:
-                    encrypted_password = mongodb_manager.get_mt5_credentials(account_id)
+                    encrypted_password = await mongodb.get_mt5_credentials(account_id)
                     if encrypted_password:
                         password = self._decrypt_password(encrypted_password)
                         await self._mock_mt5_connection(
@@ -661,7 +674,7 @@ class MT5IntegrationService:
             
             if performance:
                 # Update database with latest performance
-                mongodb_manager.update_mt5_account_performance(account_id, performance.equity)
+                await mongodb.update_mt5_account_performance(account_id, performance.equity)
                 self.performance_cache[account_id] = performance
             
             return performance
@@ -673,8 +686,9 @@ class MT5IntegrationService:
     async def get_account_deposit_history(self, account_id: str) -> Optional[Dict[str, Any]]:
         """Get account deposit history to find the first deposit date"""
         try:
+            mongodb = await self._mongodb()
             # Get account info from database
-            account_info = mongodb_manager.db.mt5_accounts.find_one({'account_id': account_id})
+            account_info = await mongodb.db.mt5_accounts.find_one({'account_id': account_id})
             if not account_info:
                 return None
             
@@ -772,8 +786,9 @@ class MT5IntegrationService:
     async def _get_mock_performance_data(self, account_id: str) -> Optional[MT5PerformanceData]:
         """Generate mock performance data (replace with real MT5 API calls)"""
         try:
+            mongodb = await self._mongodb()
             # Get account info from database
-            account = mongodb_manager.db.mt5_accounts.find_one({'account_id': account_id})
+            account = await mongodb.db.mt5_accounts.find_one({'account_id': account_id})
             if not account:
                 return None
             
@@ -828,7 +843,8 @@ class MT5IntegrationService:
     async def get_all_accounts_performance(self) -> Dict[str, MT5PerformanceData]:
         """Get performance data for all active MT5 accounts"""
         try:
-            all_accounts = mongodb_manager.get_all_mt5_accounts()
+            mongodb = await self._mongodb()
+            all_accounts = await mongodb.get_all_mt5_accounts()
             performance_data = {}
             
             for account in all_accounts:
@@ -849,8 +865,9 @@ class MT5IntegrationService:
                                           new_server: str) -> bool:
         """Update MT5 credentials for existing account (admin function)"""
         try:
+            mongodb = await self._mongodb()
             # Find the MT5 account
-            accounts = mongodb_manager.get_client_mt5_accounts(client_id)
+            accounts = await mongodb.get_client_mt5_accounts(client_id)
             target_account = None
             
             for account in accounts:
@@ -868,11 +885,11 @@ class MT5IntegrationService:
             encrypted_password = self._encrypt_password(new_password)
             
             # Update credentials in database
-            success = mongodb_manager.store_mt5_credentials(account_id, encrypted_password)
+            success = await mongodb.store_mt5_credentials(account_id, encrypted_password)
             
             if success:
                 # Update MT5 account record
-                mongodb_manager.db.mt5_accounts.update_one(
+                await mongodb.db.mt5_accounts.update_one(
                     {'account_id': account_id},
                     {
                         '$set': {
@@ -923,6 +940,7 @@ class MT5IntegrationService:
                                    allocated_amount: float = 0.0) -> Optional[str]:
         """Manually add MT5 account with existing credentials (for pre-existing client accounts)"""
         try:
+            mongodb = await self._mongodb()
             # Validate broker
             if not MT5BrokerConfig.is_valid_broker(broker_code):
                 logging.error(f"Invalid broker code: {broker_code}")
@@ -935,7 +953,7 @@ class MT5IntegrationService:
             
             # Store encrypted credentials
             encrypted_password = self._encrypt_password(mt5_password)
-            mongodb_manager.store_mt5_credentials(account_id, encrypted_password)
+            await mongodb.store_mt5_credentials(account_id, encrypted_password)
             
             # Create MT5 account record with manual credentials
             mt5_account_data = {
@@ -954,7 +972,7 @@ class MT5IntegrationService:
                 'manual_entry': True  # Flag to indicate this was manually added
             }
             
-            created_account_id = mongodb_manager.create_mt5_account(mt5_account_data)
+            created_account_id = await mongodb.create_mt5_account(mt5_account_data)
             
             if created_account_id:
                 # Attempt to connect to MT5 
@@ -972,8 +990,9 @@ class MT5IntegrationService:
     async def get_client_mt5_accounts(self, client_id: str, fund_code: str = None) -> List[Dict[str, Any]]:
         """Get MT5 accounts for a specific client, optionally filtered by fund code"""
         try:
+            mongodb = await self._mongodb()
             # Get all accounts for the client from MongoDB
-            accounts = mongodb_manager.get_client_mt5_accounts(client_id)
+            accounts = await mongodb.get_client_mt5_accounts(client_id)
             
             # Filter by fund code if specified
             if fund_code:
@@ -995,8 +1014,9 @@ class MT5IntegrationService:
     async def get_mt5_account_data(self, account_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed MT5 account data including real-time performance"""
         try:
+            mongodb = await self._mongodb()
             # Get account info from MongoDB
-            account_info = mongodb_manager.get_mt5_account(account_id)
+            account_info = await mongodb.get_mt5_account(account_id)
             if not account_info:
                 logging.error(f"MT5 account {account_id} not found in database")
                 return None
@@ -1067,6 +1087,7 @@ class MT5IntegrationService:
     async def validate_mt5_account_mapping(self, account_id: str) -> Dict[str, Any]:
         """Comprehensive MT5 account validation for investment approval"""
         try:
+            mongodb = await self._mongodb()
             validation_result = {
                 'account_id': account_id,
                 'mt5_mapped': False,
@@ -1078,7 +1099,7 @@ class MT5IntegrationService:
             }
             
             # Step 1: Verify MT5 account exists and is mapped
-            account_info = mongodb_manager.get_mt5_account(account_id)
+            account_info = await mongodb.get_mt5_account(account_id)
             if not account_info:
                 validation_result['validation_errors'].append("MT5 account not found in database")
                 return validation_result
@@ -1132,7 +1153,8 @@ class MT5IntegrationService:
     async def retrieve_account_historical_data(self, account_id: str) -> Dict[str, Any]:
         """Retrieve historical data from MT5 account"""
         try:
-            account_info = mongodb_manager.get_mt5_account(account_id)
+            mongodb = await self._mongodb()
+            account_info = await mongodb.get_mt5_account(account_id)
             if not account_info:
                 return {'success': False, 'error': 'Account not found'}
             
@@ -1261,6 +1283,7 @@ class MT5IntegrationService:
     async def update_account_validation_status(self, account_id: str, validation_result: Dict[str, Any]) -> bool:
         """Update MT5 account with validation status"""
         try:
+            mongodb = await self._mongodb()
             validation_status = {
                 'mt5_validation_status': validation_result,
                 'last_validated_at': datetime.now(timezone.utc).isoformat(),
@@ -1272,7 +1295,7 @@ class MT5IntegrationService:
             }
             
             # Update the account in MongoDB
-            success = mongodb_manager.update_mt5_account(account_id, validation_status)
+            success = await mongodb.update_mt5_account(account_id, validation_status)
             
             if success:
                 logging.info(f"Updated validation status for account {account_id}")
@@ -1288,7 +1311,8 @@ class MT5IntegrationService:
     async def get_account_summary(self, client_id: str) -> Dict[str, Any]:
         """Get comprehensive MT5 account summary for client"""
         try:
-            accounts = mongodb_manager.get_client_mt5_accounts(client_id)
+            mongodb = await self._mongodb()
+            accounts = await mongodb.get_client_mt5_accounts(client_id)
             summary = {
                 'total_accounts': len(accounts),
                 'total_allocated': 0,
@@ -182,8 +182,9 @@ def categorize_deal_history(deals: List[Dict[str, Any]]) -> Dict[str, Any]:
         # Determine direction (out vs in)
         direction = 'out' if deal['amount'] < 0 else 'in'
         
-        # Classify the transfer
-        classification = classify_transfer(
+        # Classify the transfer (deals from mt5_deals carry the classification
+        # stored by the P&L ledger rebuild - services/pnl_ledger.py)
+        classification = deal.get('transfer_classification') or classify_transfer(
             deal['comment'],
             deal['amount'],
             direction
@@ -6,6 +6,9 @@ UPDATED: Feb 25, 2026 - LUCRUM-ONLY Mode
 - Old MEXAtlantic VPS (92.118.45.135) is no longer used
 - Watchdog now monitors LUCRUM data freshness in MongoDB only
 - No external VPS health checks or auto-healing via SSH
+
+With several API workers only the holder of the "mt5_watchdog" job lease
+runs checks and auto-healing, so alerts and GitHub workflows fire once.
 """
 
 import asyncio
@@ -17,6 +20,8 @@ import httpx
 
 logger = logging.getLogger(__name__)
 
+WATCHDOG_LEASE = 'mt5_watchdog'
+
 # LUCRUM-ONLY MODE: Disable VPS health checks and auto-healing
 LUCRUM_ONLY_MODE = False
 
@@ -32,9 +37,10 @@ class MT5Watchdog:
     - Alerts only if LUCRUM data is stale for extended period
     """
     
-    def __init__(self, db, alert_service):
+    def __init__(self, db, alert_service, job_leases=None):
         self.db = db
         self.alert_service = alert_service
+        self.job_leases = job_leases  # JobLeaseManager; None = always run
         self.lucrum_only_mode = LUCRUM_ONLY_MODE
         
         # Configuration - Adjusted to reduce alert spam while VPS connectivity is being fixed
@@ -418,6 +424,13 @@ class MT5Watchdog:
         
         while True:
             try:
+                # Only one worker watches; the others stand by for the lease
+                if self.job_leases and not await self.job_leases.acquire(
+                    WATCHDOG_LEASE, self.check_interval * 2
+                ):
+                    await asyncio.sleep(self.check_interval)
+                    continue
+                
                 # Check MT5 health
                 health = await self.check_mt5_health()
                 self.last_check_time = datetime.now(timezone.utc)
@@ -550,14 +563,14 @@ class MT5Watchdog:
 watchdog_instance: Optional[MT5Watchdog] = None
 
 
-async def initialize_watchdog(db, alert_service):
+async def initialize_watchdog(db, alert_service, job_leases=None):
     """Initialize and start the MT5 Watchdog"""
     global watchdog_instance
     
     try:
         logger.info("[MT5 WATCHDOG] Initializing MT5 Watchdog and Auto-Healing System...")
         
-        watchdog_instance = MT5Watchdog(db, alert_service)
+        watchdog_instance = MT5Watchdog(db, alert_service, job_leases)
         
         # Start monitoring loop in background
         asyncio.create_task(watchdog_instance.monitor_loop())
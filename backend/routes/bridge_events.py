@@ -0,0 +1,67 @@
+"""
+MT5 Bridge Event Stream API
+Receives change events pushed by the MT5 bridges (balances, closed deals, positions)
+
+The bridges authenticate with the shared MT5_BRIDGE_PUSH_TOKEN in the
+X-Bridge-Token header. Events are applied by BridgeEventIngestService;
+the response's acked_seq tells the bridge what it can drop from its spool.
+"""
+
+import hmac
+import logging
+import os
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Header, HTTPException
+from pydantic import BaseModel
+
+from services.bridge_event_ingest import BridgeEventIngestService
+
+router = APIRouter(prefix="/api/mt5/bridge", tags=["MT5 Bridge Events"])
+
+# Database will be injected via init_db()
+db = None
+
+logger = logging.getLogger(__name__)
+
+
+def init_db(database):
+    """Initialize database connection"""
+    global db
+    db = database
+    logger.info("✅ Bridge event routes initialized with database connection")
+
+
+class BridgeEventBatch(BaseModel):
+    bridge_id: str
+    events: List[Dict[str, Any]]
+
+
+def _check_token(token: str):
+    expected = os.environ.get('MT5_BRIDGE_PUSH_TOKEN')
+    if not expected:
+        raise HTTPException(status_code=503, detail="Bridge push token not configured")
+    if not token or not hmac.compare_digest(token, expected):
+        logger.warning("[SECURITY] Rejected bridge event push with invalid token")
+        raise HTTPException(status_code=401, detail="Invalid bridge token")
+
+
+@router.post("/events")
+async def ingest_bridge_events(batch: BridgeEventBatch, x_bridge_token: str = Header(None)):
+    """Record and apply a batch of bridge change events (idempotent per bridge_id + seq)"""
+    _check_token(x_bridge_token)
+    try:
+        return await BridgeEventIngestService(db).ingest(batch.bridge_id, batch.events)
+    except Exception as e:
+        logger.error(f"❌ Bridge event ingest failed for {batch.bridge_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/stream-status")
+async def get_bridge_stream_status():
+    """Last sequence number, event counts and liveness per pushing bridge"""
+    try:
+        return await BridgeEventIngestService(db).get_stream_status()
+    except Exception as e:
+        logger.error(f"❌ Bridge stream status error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,145 @@
+"""
+Document Signing API
+PDF viewing, upload and electronic signature endpoints
+
+Moved out of server.py so PyPDF2/reportlab/PIL are imported when the first
+signing request arrives instead of on every cold start.
+"""
+
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile
+import logging
+
+from services.startup import lazy_import
+
+logger = logging.getLogger(__name__)
+
+# Create router (prefix /documents - /api is added by main api_router)
+router = APIRouter(prefix="/documents", tags=["Document Signing"])
+
+# ============================================
+# Import auth function from server
+# ============================================
+
+# This will be set during initialization
+get_current_admin_user = None
+
+def init_auth(auth_func):
+    """Initialize authentication function"""
+    global get_current_admin_user
+    get_current_admin_user = auth_func
+
+def require_admin(request: Request):
+    """Require admin authentication (get_current_admin_user from server.py)"""
+    if get_current_admin_user is None:
+        raise HTTPException(status_code=503, detail="Authentication not initialized")
+    return get_current_admin_user(request)
+
+# ============================================
+# Signing service (lazy)
+# ============================================
+
+# PyPDF2 / reportlab / PIL load with the service on the first request
+document_signing_service = lazy_import('document_signing_service', 'document_signing_service')
+
+# ============================================
+# ENDPOINTS
+# ============================================
+
+@router.post("/upload")
+async def upload_document(file: UploadFile = File(...), current_user: dict = Depends(require_admin)):
+    """Upload document for signing"""
+    try:
+        # Read file data
+        file_data = await file.read()
+
+        # Upload document using document signing service
+        result = await document_signing_service.upload_document(
+            file_data=file_data,
+            filename=file.filename,
+            mime_type=file.content_type,
+            user_id=current_user["user_id"]
+        )
+
+        logger.info(f"Document uploaded by user: {current_user['username']}")
+
+        return result
+
+    except Exception as e:
+        logger.error(f"Upload document error: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+@router.get("/{document_id}/pdf")
+async def get_document_pdf(document_id: str, current_user: dict = Depends(require_admin)):
+    """Get document PDF for viewing"""
+    try:
+        result = await document_signing_service.get_document_pdf(document_id)
+
+        if result['success']:
+            return {
+                "success": True,
+                "pdf_data": result['pdf_data'],
+                "filename": result['filename']
+            }
+        else:
+            return result
+
+    except Exception as e:
+        logger.error(f"Get document PDF error: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+@router.post("/{document_id}/sign")
+async def sign_document(document_id: str, request: Request, current_user: dict = Depends(require_admin)):
+    """Add electronic signature to document"""
+    try:
+        data = await request.json()
+
+        # Add signature using document signing service
+        result = await document_signing_service.add_signature(
+            document_id=document_id,
+            signature_data=data.get('signature_data'),
+            signer_info={
+                'user_id': current_user["user_id"],
+                'name': current_user.get('name', current_user['username']),
+                'email': current_user.get('email', ''),
+                'position': data.get('position', 'Signatory')
+            }
+        )
+
+        logger.info(f"Document {document_id} signed by user: {current_user['username']}")
+
+        return result
+
+    except Exception as e:
+        logger.error(f"Sign document error: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+@router.get("/signed/{filename}")
+async def get_signed_document(filename: str, current_user: dict = Depends(require_admin)):
+    """Download signed document"""
+    try:
+        result = await document_signing_service.get_signed_document(filename)
+
+        if result['success']:
+            return Response(
+                content=result['file_data'],
+                media_type='application/pdf',
+                headers={"Content-Disposition": f"attachment; filename={filename}"}
+            )
+        else:
+            return result
+
+    except Exception as e:
+        logger.error(f"Get signed document error: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
@@ -7,6 +7,9 @@ from typing import Optional
 from pydantic import BaseModel
 from datetime import datetime
 
+from services.job_queue import JobCancelled, JobContext, job_queue
+from services.response_cache import TAG_MT5_ACCOUNTS, response_cache
+
 # Database will be injected when router is initialized
 _db = None
 
@@ -169,6 +172,7 @@ async def get_all_accounts(
 
 # Endpoint 2: Assign Account to Manager
 @router.post("/assign-to-manager")
+@response_cache.invalidates(TAG_MT5_ACCOUNTS)
 async def assign_account_to_manager(
     data: AssignToManagerRequest,
     current_user = Depends(get_current_admin_user)
@@ -232,6 +236,7 @@ async def assign_account_to_manager(
 
 # Endpoint 3: Assign Account to Fund
 @router.post("/assign-to-fund")
+@response_cache.invalidates(TAG_MT5_ACCOUNTS)
 async def assign_account_to_fund(
     data: AssignToFundRequest,
     current_user = Depends(get_current_admin_user)
@@ -293,6 +298,7 @@ async def assign_account_to_fund(
 
 # Endpoint 4: Assign Account to Broker
 @router.post("/assign-to-broker")
+@response_cache.invalidates(TAG_MT5_ACCOUNTS)
 async def assign_account_to_broker(
     data: AssignToBrokerRequest,
     current_user = Depends(get_current_admin_user)
@@ -354,6 +360,7 @@ async def assign_account_to_broker(
 
 # Endpoint 5: Assign Account to Trading Platform
 @router.post("/assign-to-platform")
+@response_cache.invalidates(TAG_MT5_ACCOUNTS)
 async def assign_account_to_platform(
     data: AssignToPlatformRequest,
     current_user = Depends(get_current_admin_user)
@@ -415,6 +422,7 @@ async def assign_account_to_platform(
 
 # Endpoint 6: Remove Assignment
 @router.post("/remove-assignment")
+@response_cache.invalidates(TAG_MT5_ACCOUNTS)
 async def remove_assignment(
     data: RemoveAssignmentRequest,
     current_user = Depends(get_current_admin_user)
@@ -664,7 +672,7 @@ async def validate_allocations(
 
 
 # Endpoint 9: Apply Allocations
-@router.post("/apply-allocations")
+@router.post("/apply-allocations", status_code=202)
 async def apply_allocations(
     current_user = Depends(get_current_admin_user)
 ):
@@ -673,15 +681,16 @@ async def apply_allocations(
     
     This endpoint:
     1. Validates all accounts are allocated
-    2. Updates account status to 'assigned'
-    3. Triggers comprehensive recalculations:
-       - Cash flow projections
-       - Commission calculations
-       - Performance metrics
-       - P&L updates
-       - Manager allocations
-       - Fund distributions
-    4. Creates audit log entry
+    2. Queues an 'allocations.apply' background job, which
+       - updates account status to 'assigned'
+       - triggers comprehensive recalculations (cash flow projections,
+         commissions, performance metrics, P&L, manager allocations,
+         fund distributions)
+       - creates the audit log entry
+    
+    Returns the queued job; poll GET /api/jobs/{job_id} for progress and
+    the result. A second apply while one is queued or running returns that
+    same job.
     
     Uses MongoDB transactions - all updates are atomic (all or nothing)
     """
@@ -689,14 +698,35 @@ async def apply_allocations(
     if _db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
     
+    # Validate up front so an invalid allocation fails the request itself
+    validation = await validate_allocations(current_user)
+    if not validation["canApply"]:
+        raise HTTPException(400, validation["reason"])
+    
+    if not validation["pendingChanges"]:
+        raise HTTPException(400, "No pending changes to apply")
+    
+    job = await job_queue.enqueue(
+        'allocations.apply',
+        {'performed_by': str(current_user["_id"])},
+        created_by=str(current_user["_id"]),
+        dedupe_key='allocations.apply'
+    )
+    return {"success": True, **job}
+
+
+@job_queue.handler('allocations.apply')
+async def apply_allocations_job(job: JobContext, performed_by: str):
+    """Background body of apply-allocations"""
+    
     import logging
     from services.allocation_recalculations import AllocationRecalculationService
     
     logger = logging.getLogger(__name__)
     
     try:
-        # STEP 1: Validate
-        validation = await validate_allocations(current_user)
+        # STEP 1: Re-validate - allocations may have changed while the job was queued
+        validation = await validate_allocations(None)
         if not validation["canApply"]:
             raise HTTPException(400, validation["reason"])
         
@@ -705,6 +735,7 @@ async def apply_allocations(
         if not pending_changes:
             raise HTTPException(400, "No pending changes to apply")
         
+        await job.progress(5, f"Applying allocations for {len(pending_changes)} accounts")
         logger.info(f"🔄 Applying allocations for {len(pending_changes)} accounts...")
         
         # STEP 2: Initialize recalculation service
@@ -757,6 +788,7 @@ async def apply_allocations(
                 logger.info(f"✅ Updated {accounts_updated} account statuses")
                 
                 # Run all recalculations within the transaction
+                await job.progress(30, "Running recalculations")
                 logger.info("🔄 Starting recalculations...")
                 recalc_results = await recalc_service.run_all_recalculations(
                     session=session
@@ -766,6 +798,7 @@ async def apply_allocations(
                     raise Exception(f"Recalculations failed: {recalc_results['errors']}")
                 
                 logger.info(f"✅ All recalculations complete in {recalc_results['total_duration_seconds']:.2f}s")
+                await job.progress(90, "Writing audit log")
                 
                 # Create audit log entry
                 audit_entry = {
@@ -773,7 +806,7 @@ async def apply_allocations(
                     "action": "apply_allocations",
                     "accounts_updated": accounts_updated,
                     "pending_changes": pending_changes,
-                    "performed_by": str(current_user["_id"]),
+                    "performed_by": performed_by,
                     "recalculation_results": recalc_results,
                     "calculations_run": list(recalc_results["recalculations"].keys())
                 }
@@ -790,7 +823,7 @@ async def apply_allocations(
                         "fund_type": change["changes"]["fund_type"]["new"],
                         "broker": change["changes"]["broker"]["new"],
                         "trading_platform": change["changes"]["platform"]["new"],
-                        "performed_by": str(current_user["_id"])
+                        "performed_by": performed_by
                     }, session=session)
                     
                 # Commit transaction (if available)
@@ -812,6 +845,9 @@ async def apply_allocations(
             if session:
                 session.end_session()
         
+        # Dashboards reading mt5_accounts must not serve pre-apply responses
+        response_cache.bump(TAG_MT5_ACCOUNTS)
+        
         # Build response
         calculations_run = len(recalc_results["recalculations"])
         
@@ -836,7 +872,7 @@ async def apply_allocations(
             }
         }
         
-    except HTTPException:
+    except (HTTPException, JobCancelled):
         raise
     except Exception as e:
         logger.error(f"❌ Failed to apply allocations: {e}")
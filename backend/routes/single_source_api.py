@@ -20,6 +20,8 @@ from pydantic import BaseModel
 import os
 import logging
 
+from services.response_cache import TAG_MONEY_MANAGERS, TAG_MT5_ACCOUNTS, response_cache
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v2", tags=["Single Source of Truth V2"])
@@ -222,6 +224,7 @@ async def get_fund_portfolio_derived():
 
 
 @router.post("/managers/rename")
+@response_cache.invalidates(TAG_MT5_ACCOUNTS, TAG_MONEY_MANAGERS)
 async def rename_manager(old_name: str, new_name: str):
     """
     Rename a money manager across all accounts.
@@ -262,6 +265,7 @@ class AllocationDateUpdate(BaseModel):
     allocation_start_date: str  # ISO format date string
 
 @router.post("/accounts/allocation-date")
+@response_cache.invalidates(TAG_MT5_ACCOUNTS)
 async def update_allocation_start_date(data: AllocationDateUpdate):
     """
     Update the allocation start date for an account.
@@ -304,6 +308,7 @@ async def update_allocation_start_date(data: AllocationDateUpdate):
 
 
 @router.post("/managers/allocation-date")
+@response_cache.invalidates(TAG_MT5_ACCOUNTS, TAG_MONEY_MANAGERS)
 async def update_manager_allocation_date(manager_name: str, allocation_start_date: str):
     """
     Update the allocation start date for all accounts assigned to a manager.
@@ -347,6 +352,7 @@ async def update_manager_allocation_date(manager_name: str, allocation_start_dat
 
 
 @router.put("/accounts/{account_number}/copy-sources")
+@response_cache.invalidates(TAG_MT5_ACCOUNTS)
 async def update_account_copy_sources(account_number: int, copy_sources: List[CopySource] = Body(...)):
     """
     Update the copy trading configuration for an account.
@@ -412,6 +418,7 @@ async def update_account_copy_sources(account_number: int, copy_sources: List[Co
 
 
 @router.put("/accounts/{account_number}/profile")
+@response_cache.invalidates(TAG_MT5_ACCOUNTS)
 async def update_account_profile(account_number: int, profile_data: AccountProfileUpdate = Body(...)):
     """
     Update account profile information.
@@ -484,6 +491,7 @@ async def update_account_profile(account_number: int, profile_data: AccountProfi
 
 
 @router.get("/derived/money-managers")
+@response_cache.cached("v2/derived/money-managers", tags=(TAG_MT5_ACCOUNTS, TAG_MONEY_MANAGERS))
 async def get_money_managers_derived():
     """
     MONEY MANAGERS TAB - Get money managers data (derived from mt5_accounts + joined with money_managers).
@@ -766,6 +774,7 @@ async def get_trading_analytics_derived():
 
 
 @router.patch("/accounts/{account_number}/assign")
+@response_cache.invalidates(TAG_MT5_ACCOUNTS)
 async def update_account_assignment(
     account_number: int,
     assignment_data: Dict[str, Any]
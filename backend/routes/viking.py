@@ -15,8 +15,14 @@ from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field
 import logging
 import sys
+import numpy as np
 sys.path.append('/app/backend')
 
+from services.deal_ingestion_service import MT4_DEAL_HASH_FIELDS, DealIngestionService
+from services.job_queue import JobCancelled, JobContext, job_queue
+from services.response_cache import TAG_VIKING_DEALS, response_cache
+from services.rolling_performance_service import ROLLING_WINDOWS, build_series, series_range
+
 # Note: VIKING routes are internal APIs for MT4 bridge sync
 # Authentication can be added later if needed via auth.dependencies.get_current_agent
 
@@ -718,36 +724,25 @@ async def get_viking_deals(
 
 @router.post("/deals/batch")
 async def save_viking_deals_batch(deals: List[Dict[str, Any]]):
-    """Batch insert deals from MT4 bridge (upsert based on ticket)"""
+    """Batch upsert deals from MT4 bridge (keyed by account + ticket, unchanged deals skipped)"""
     try:
         if not deals:
-            return {"success": True, "inserted": 0, "updated": 0}
-        
-        inserted = 0
-        updated = 0
+            return {"success": True, "inserted": 0, "updated": 0, "unchanged": 0}
         
+        now = datetime.now(timezone.utc)
         for deal in deals:
-            # Ensure required fields
-            if "account" not in deal or "ticket" not in deal:
-                continue
-            
-            deal["updated_at"] = datetime.now(timezone.utc)
-            
-            result = await db.viking_deals_history.update_one(
-                {"account": deal["account"], "ticket": deal["ticket"]},
-                {"$set": deal},
-                upsert=True
-            )
-            
-            if result.upserted_id:
-                inserted += 1
-            elif result.modified_count > 0:
-                updated += 1
+            deal["updated_at"] = now
+        
+        stats = await DealIngestionService(
+            db, collection="viking_deals_history", hash_fields=MT4_DEAL_HASH_FIELDS
+        ).ingest(deals)
         
         return {
             "success": True,
-            "inserted": inserted,
-            "updated": updated,
+            "inserted": stats["inserted"],
+            "updated": stats["updated"],
+            "unchanged": stats["unchanged"],
+            "skipped": stats["skipped"],
             "total_processed": len(deals)
         }
     except Exception as e:
@@ -1189,24 +1184,39 @@ async def get_viking_risk_analysis(strategy: str):
 # ANALYTICS CALCULATION ENDPOINT
 # ============================================================================
 
-@router.post("/calculate-analytics/{strategy}")
+@router.post("/calculate-analytics/{strategy}", status_code=202)
 async def calculate_viking_analytics(strategy: str):
     """
-    Calculate and store analytics from deal history
+    Calculate and store analytics from deal history (background job)
     Call this periodically to update analytics metrics
     
+    Returns the queued job; GET /api/jobs/{job_id} has the analytics once it completes.
+    """
+    strategy = strategy.upper()
+    if strategy not in ["CORE", "PRO"]:
+        raise HTTPException(status_code=400, detail="Strategy must be CORE or PRO")
+    
+    if not await db.viking_accounts.find_one({"strategy": strategy}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail=f"Strategy {strategy} not found")
+    
+    job = await job_queue.enqueue('viking.calculate_analytics', {'strategy': strategy})
+    return {"success": True, **job}
+
+
+@job_queue.handler('viking.calculate_analytics')
+async def calculate_viking_analytics_job(job: JobContext, strategy: str):
+    """
+    Calculate and store analytics from deal history
+    
     IMPORTANT: Separates trading P&L from deposits/withdrawals
     """
     try:
-        strategy = strategy.upper()
-        if strategy not in ["CORE", "PRO"]:
-            raise HTTPException(status_code=400, detail="Strategy must be CORE or PRO")
-        
         account = await db.viking_accounts.find_one({"strategy": strategy}, {"_id": 0})
         if not account:
             raise HTTPException(status_code=404, detail=f"Strategy {strategy} not found")
         
         account_num = account["account"]
+        await job.progress(10, f"Loading {strategy} deal history")
         
         # Get all records - handle both string and int account numbers
         all_records = await db.viking_deals_history.find(
@@ -1223,6 +1233,8 @@ async def calculate_viking_analytics(strategy: str):
                 "account": account_num
             }
         
+        await job.progress(50, f"Calculating analytics from {len(all_records)} records")
+        
         # Separate trades from balance operations
         trades = []
         total_deposits = 0
@@ -1348,7 +1360,7 @@ async def calculate_viking_analytics(strategy: str):
             "analytics": serialize_doc(analytics_doc)
         }
         
-    except HTTPException:
+    except (HTTPException, JobCancelled):
         raise
     except Exception as e:
         logger.error(f"Error calculating VIKING analytics: {e}")
@@ -1359,6 +1371,21 @@ async def calculate_viking_analytics(strategy: str):
 # MONTHLY RETURNS ANALYTICS
 # ============================================================================
 
+def _is_balance_record(record: Dict[str, Any]) -> bool:
+    """
+    Identify balance operations in viking_deals_history by:
+    1. Explicit is_balance_operation flag
+    2. Type is DEPOSIT or WITHDRAWAL
+    3. No symbol (balance operations don't have symbols)
+    """
+    record_type = (record.get("type") or "").upper()
+    return bool(
+        record.get("is_balance_operation", False)
+        or record_type in ["DEPOSIT", "WITHDRAWAL"]
+        or (record.get("symbol") is None and record_type not in ["BUY", "SELL"])
+    )
+
+
 @router.get("/monthly-returns/{strategy}")
 async def get_monthly_returns(strategy: str):
     """
@@ -1418,14 +1445,8 @@ async def get_monthly_returns(strategy: str):
         
         for record in all_records:
             record_type = record.get("type", "").upper()
-            is_balance_op = record.get("is_balance_operation", False)
-            symbol = record.get("symbol")
             
-            # Identify balance operations by:
-            # 1. Explicit is_balance_operation flag
-            # 2. Type is DEPOSIT or WITHDRAWAL
-            # 3. No symbol (balance operations don't have symbols)
-            if is_balance_op or record_type in ["DEPOSIT", "WITHDRAWAL"] or (symbol is None and record_type not in ["BUY", "SELL"]):
+            if _is_balance_record(record):
                 amount = float(record.get("profit", 0))
                 if amount >= 0 or record_type == "DEPOSIT":
                     deposits.append(record)
@@ -1595,6 +1616,82 @@ async def get_monthly_returns(strategy: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ============================================================================
+# ROLLING PERFORMANCE SERIES
+# ============================================================================
+
+@router.get("/rolling-performance/{strategy}")
+@response_cache.cached("viking/rolling-performance", tags=(TAG_VIKING_DEALS,), ttl_seconds=86400, daily=True)
+async def get_rolling_performance(strategy: str, days: int = 365):
+    """
+    Rolling 7/30/90-day return, volatility, Sharpe and drawdown series for a strategy
+
+    VIKING deals are not part of deal_rollups_daily, so trading P&L per day
+    is grouped from viking_deals_history in one pass. Returns are measured on
+    total deposits, as in /monthly-returns. Series end at the last completed
+    UTC day and are cached until the day rolls over or new VIKING deals are
+    ingested.
+
+    The per-window series sit under "performance" -> "windows", as in the
+    entity of /admin/trading-analytics/rolling/*; the top-level "windows"
+    lists the window names.
+    """
+    try:
+        strategy = strategy.upper()
+        if strategy not in ["CORE", "PRO"]:
+            raise HTTPException(status_code=400, detail="Strategy must be CORE or PRO")
+
+        account = await db.viking_accounts.find_one({"strategy": strategy}, {"_id": 0})
+        if not account:
+            raise HTTPException(status_code=404, detail=f"Strategy {strategy} not found")
+
+        account_num = str(account["account"])
+        first_day, end_day, days = series_range(days)
+
+        records = await db.viking_deals_history.find(
+            {"$or": [
+                {"account": account_num},
+                {"account": int(account_num) if account_num.isdigit() else account_num}
+            ], "close_time": {"$ne": None}},
+            {"_id": 0, "close_time": 1, "profit": 1, "commission": 1, "swap": 1,
+             "type": 1, "is_balance_operation": 1, "symbol": 1}
+        ).to_list(None)
+
+        pnl = np.zeros((1, (end_day - first_day).days + 1))
+        total_deposits = 0.0
+        for record in records:
+            amount = float(record.get("profit") or 0)
+            if _is_balance_record(record):
+                if amount >= 0 or (record.get("type") or "").upper() == "DEPOSIT":
+                    total_deposits += amount
+                continue
+            close_time = parse_mt4_datetime(record.get("close_time"))
+            if close_time is None:
+                continue
+            offset = (close_time.date() - first_day).days
+            if 0 <= offset < pnl.shape[-1]:
+                pnl[0, offset] += amount + float(record.get("commission") or 0) + float(record.get("swap") or 0)
+
+        capital = total_deposits if total_deposits > 0 else 10000
+        built = build_series(pnl, [capital], first_day, days)
+
+        return {
+            "success": True,
+            "strategy": strategy,
+            "account": account_num,
+            "windows": [f"{window}d" for window in ROLLING_WINDOWS],
+            "as_of": end_day.isoformat(),
+            "dates": built["dates"],
+            "performance": built["series"][0]
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error calculating rolling performance: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ============================================================================
 # BALANCE SNAPSHOTS FOR CHARTS
 # ============================================================================
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Backfill Deal Rollups - Regenerate deal_rollups_daily from mt5_deals
+Run once after deploying the rollups, or to repair them:
+
+    python scripts/backfill_deal_rollups.py                 # all accounts, all history
+    python scripts/backfill_deal_rollups.py 886557          # one account
+    python scripts/backfill_deal_rollups.py 886557 2025-01-01
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.deal_rollup_service import DealRollupService
+from services.response_cache import response_cache
+from services.shared_state import SharedVersions
+
+
+async def backfill(account=None, start=None):
+    """Rebuild rollup buckets from raw deals"""
+
+    # Get MongoDB URL from environment
+    mongo_url = os.getenv('MONGO_URL')
+    if not mongo_url:
+        # Try reading from .env file
+        try:
+            with open('/app/backend/.env', 'r') as f:
+                for line in f:
+                    if line.startswith('MONGO_URL='):
+                        mongo_url = line.split('=', 1)[1].strip()
+                        break
+        except:
+            pass
+
+    if not mongo_url:
+        print("❌ MONGO_URL not found in environment or .env file")
+        return False
+
+    try:
+        print("🔗 Connecting to MongoDB Atlas...")
+        client = AsyncIOMotorClient(mongo_url)
+        db = client['fidus_production']
+
+        # Publish the rebuild's cache invalidation to the running API workers
+        versions = SharedVersions(db, 'state_response_cache_versions')
+        response_cache.use_shared_versions(versions)
+
+        print(f"📊 Rebuilding deal_rollups_daily (account={account or 'all'}, from={start or 'start'})...")
+        result = await DealRollupService(db).rebuild(account=account, start=start)
+        await versions.flush()
+        print(f"✅ {result['buckets']:,} (account, symbol, day) buckets written")
+
+        count = await db.deal_rollups_daily.count_documents({})
+        print(f"\n📈 deal_rollups_daily has {count:,} documents")
+
+        client.close()
+        return True
+
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    account = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    start = datetime.strptime(sys.argv[2], '%Y-%m-%d').replace(tzinfo=timezone.utc) if len(sys.argv) > 2 else None
+    success = asyncio.run(backfill(account, start))
+    sys.exit(0 if success else 1)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Backfill P&L Ledger - Regenerate pnl_ledger (and each deal's ledger_entry) from mt5_deals
+Run once after deploying the ledger, or to repair it:
+
+    python scripts/backfill_pnl_ledger.py            # all accounts
+    python scripts/backfill_pnl_ledger.py 886557     # one account
+"""
+
+import asyncio
+import os
+import sys
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.pnl_ledger import PnLLedgerService
+
+
+async def backfill(account=None):
+    """Rebuild ledgers from raw deals"""
+
+    # Get MongoDB URL from environment
+    mongo_url = os.getenv('MONGO_URL')
+    if not mongo_url:
+        # Try reading from .env file
+        try:
+            with open('/app/backend/.env', 'r') as f:
+                for line in f:
+                    if line.startswith('MONGO_URL='):
+                        mongo_url = line.split('=', 1)[1].strip()
+                        break
+        except:
+            pass
+
+    if not mongo_url:
+        print("❌ MONGO_URL not found in environment or .env file")
+        return False
+
+    try:
+        print("🔗 Connecting to MongoDB Atlas...")
+        client = AsyncIOMotorClient(mongo_url)
+        db = client['fidus_production']
+
+        print(f"📒 Rebuilding pnl_ledger (account={account or 'all'})...")
+        service = PnLLedgerService(db)
+        result = await service.rebuild(account=account)
+        print(f"✅ {result['accounts']:,} account ledgers from {result['deals']:,} deals")
+
+        ledgers = await service.get_ledgers([account] if account else None)
+        for number, ledger in sorted(ledgers.items()):
+            print(
+                f"   {number}: net deposits ${ledger['net_deposits']:,.2f}, "
+                f"profit withdrawals ${ledger['net_profit_withdrawals']:,.2f}, "
+                f"realized ${ledger['realized_pnl']:,.2f}"
+                + (f", {ledger['needs_review']} transfers need review" if ledger['needs_review'] else "")
+            )
+
+        client.close()
+        return True
+
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    account = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    success = asyncio.run(backfill(account))
+    sys.exit(0 if success else 1)
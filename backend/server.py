@@ -1,3 +1,12 @@
+# Import-time breakdown is logged on startup and served at /api/health/startup
+from services.startup import (
+    startup_profiler,
+    readiness,
+    lazy_import,
+    lazy_object,
+    STARTUP_BUDGET_SECONDS,
+)
+
 from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Form, Request, Response, Body
 from fastapi.responses import JSONResponse, FileResponse, RedirectResponse
 from dotenv import load_dotenv
@@ -5,6 +14,7 @@ from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
 import os
+import importlib
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
@@ -16,7 +26,6 @@ from dateutil.relativedelta import relativedelta
 import random
 import base64
 import io
-from PIL import Image, ImageEnhance, ImageFilter
 import json
 import smtplib
 from email.mime.text import MIMEText
@@ -27,14 +36,18 @@ import re
 import hashlib
 import hmac
 import time
-import numpy as np
-import yfinance as yf
-import pandas as pd
 import jwt
 import requests
 from collections import defaultdict
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
+# Imaging is only needed for OCR pre-processing of KYC uploads
+Image = lazy_import('PIL.Image')
+ImageEnhance = lazy_import('PIL.ImageEnhance')
+ImageFilter = lazy_import('PIL.ImageFilter')
+
+startup_profiler.checkpoint('framework')
+
 # ============================================================================
 # FIDUS PLATFORM CONSTANTS
 # ============================================================================
@@ -48,8 +61,10 @@ from passlib.hash import bcrypt
 # Path utilities for production deployment
 from path_utils import get_base_path, get_upload_path, get_credentials_path, ensure_dir_exists
 
-# MongoDB Integration
-from mongodb_integration import mongodb_manager
+# MongoDB Integration (async, Motor-backed - instantiated once `db` exists)
+from async_mongodb_integration import AsyncMongoDBManager
+
+startup_profiler.checkpoint('auth_and_db')
 
 # MT5 Config Management Routes
 from routes.mt5_config import router as mt5_config_router, init_db as init_mt5_config_db, init_auth as init_mt5_config_auth
@@ -66,6 +81,11 @@ from routes.bridge_health import router as bridge_health_router
 # Single Source of Truth API (November 2025)
 from routes.single_source_api import router as single_source_router
 
+# Document Signing Routes (signing libraries load on first request)
+from routes.document_signing import router as document_signing_router, init_auth as init_document_signing_auth
+
+startup_profiler.checkpoint('mt5_routers')
+
 # System Registry and Health Checks (Phase 1: Technical Documentation)
 from system_registry import (
     SYSTEM_COMPONENTS, 
@@ -87,7 +107,8 @@ from health_service import (
     check_github_health,
     check_render_platform_health,
     store_health_history,
-    calculate_uptime_percentage
+    calculate_uptime_percentage,
+    probe_latency
 )
 
 # Quick Actions Service (Phase 6: Admin Shortcuts & Tools)
@@ -106,6 +127,8 @@ from credentials_registry import (
 )
 from credentials_service import CredentialsService
 
+startup_profiler.checkpoint('system_registry_and_health')
+
 # P&L Calculator Service - TRUE P&L calculations with profit withdrawals
 from services.pnl_calculator import PnLCalculator
 
@@ -114,14 +137,15 @@ from aml_kyc_service import aml_kyc_service, PersonData, KYCDocument, AMLStatus
 from currency_service import currency_service
 # from google_admin_service import GoogleAdminService  # Removed in clean OAuth rebuild
 # from google_social_auth import google_social_auth  # Removed in clean OAuth rebuild
-from document_signing_service import document_signing_service
+# Document signing (PDF/reportlab/PIL) lives in routes/document_signing.py and loads on first use
+
+startup_profiler.checkpoint('compliance_services')
 
 # Import Google OAuth Service (CLEAN REBUILD - October 2025)
+# Gmail/Calendar/Drive/Sheets pull in googleapiclient - they are built on first use below
 from services.google import GoogleOAuthService, GoogleTokenManager
-from services.google.gmail import GmailService
-from services.google.calendar import CalendarService
-from services.google.drive import DriveService
-from services.google.sheets import SheetsService
+
+startup_profiler.checkpoint('google_oauth')
 
 # Import MT5 Service
 from services.mt5_service import mt5_service
@@ -142,45 +166,27 @@ except Exception as e:
 # Import MT5 Bridge Client
 from mt5_bridge_client import mt5_bridge
 
+startup_profiler.checkpoint('mt5_services')
+
 # ============================================
-# SIMPLE RESPONSE CACHING FOR PERFORMANCE
+# RESPONSE CACHING FOR DASHBOARD AGGREGATES
 # ============================================
-class SimpleCache:
-    """
-    Simple in-memory cache with TTL (Time To Live)
-    Used for caching expensive API responses
-    """
-    def __init__(self):
-        self.cache = {}
-        self.timestamps = {}
-    
-    def get(self, key: str, ttl_seconds: int = 300):
-        """Get cached value if it exists and hasn't expired (default 5 min TTL)"""
-        if key in self.cache:
-            age = time.time() - self.timestamps.get(key, 0)
-            if age < ttl_seconds:
-                logging.info(f"✅ Cache HIT for key: {key} (age: {age:.1f}s)")
-                return self.cache[key]
-            else:
-                logging.info(f"⏰ Cache EXPIRED for key: {key} (age: {age:.1f}s)")
-                del self.cache[key]
-                del self.timestamps[key]
-        return None
-    
-    def set(self, key: str, value: any):
-        """Set cache value with current timestamp"""
-        self.cache[key] = value
-        self.timestamps[key] = time.time()
-        logging.info(f"💾 Cache SET for key: {key}")
-    
-    def clear(self):
-        """Clear all cached values"""
-        self.cache.clear()
-        self.timestamps.clear()
-        logging.info("🧹 Cache cleared")
+from services.shared_state import SharedStateStore, SharedVersions
+from services.job_lease import JobLeaseManager
+from services.job_queue import JobContext, job_queue
+from services.query_profiler import query_profiler
+from services.response_cache import (
+    response_cache,
+    TAG_INVESTMENTS,
+    TAG_MONEY_MANAGERS,
+    TAG_MT5_ACCOUNTS,
+    TAG_MT5_DEALS,
+)
+
+from services.deal_store import deal_store
+from services.hull_risk_engine import instrument_spec_cache
 
-# Global cache instance
-response_cache = SimpleCache()
+startup_profiler.checkpoint('platform_services')
 
 
 # Import REAL Google API service - Removed in clean OAuth rebuild
@@ -193,13 +199,11 @@ response_cache = SimpleCache()
 #     logging.warning(f"Google Admin Service initialization failed: {e}")
 #     google_admin_service = None
 
-# Gmail API imports
+# Gmail API imports (google client libraries load on first use)
 import pickle
-from google.auth.transport.requests import Request as GoogleRequest
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.exceptions import RefreshError
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+GoogleRequest = lazy_import('google.auth.transport.requests', 'Request')
+InstalledAppFlow = lazy_import('google_auth_oauthlib.flow', 'InstalledAppFlow')
+build = lazy_import('googleapiclient.discovery', 'build')
 from email.message import EmailMessage
 from email.mime.application import MIMEApplication
 
@@ -245,10 +249,17 @@ client = AsyncIOMotorClient(
     serverSelectionTimeoutMS=5000,  # 5 seconds timeout for server selection
     socketTimeoutMS=10000,   # 10 seconds timeout for socket operations
     connectTimeoutMS=10000,  # 10 seconds timeout for connection
-    retryWrites=True         # Enable retryable writes
+    retryWrites=True,        # Enable retryable writes
+    event_listeners=[query_profiler]  # Per-request query counts / N+1 detection
 )
 db = client[os.environ.get('DB_NAME', 'fidus_production')]
 
+# Shared async data-access layer for handlers (non-blocking, batched queries)
+mongodb_manager = AsyncMongoDBManager(db)
+
+# Background job queue for long-running admin operations (workers start on startup)
+job_queue.initialize(db)
+
 # Initialize MT5 Config Management routes with db (auth will be initialized later)
 init_mt5_config_db(db)
 
@@ -263,23 +274,25 @@ google_oauth_service = GoogleOAuthService(
     token_manager=google_token_manager
 )
 
-gmail_service = GmailService(
-    token_manager=google_token_manager
-)
+gmail_service = lazy_object('gmail_service', lambda: importlib.import_module(
+    'services.google.gmail'
+).GmailService(token_manager=google_token_manager))
 
-calendar_service = CalendarService(
-    token_manager=google_token_manager
-)
+calendar_service = lazy_object('calendar_service', lambda: importlib.import_module(
+    'services.google.calendar'
+).CalendarService(token_manager=google_token_manager))
 
-drive_service = DriveService(
-    token_manager=google_token_manager
-)
+drive_service = lazy_object('drive_service', lambda: importlib.import_module(
+    'services.google.drive'
+).DriveService(token_manager=google_token_manager))
 
-sheets_service = SheetsService(
-    token_manager=google_token_manager
-)
+sheets_service = lazy_object('sheets_service', lambda: importlib.import_module(
+    'services.google.sheets'
+).SheetsService(token_manager=google_token_manager))
 
-logger.info("✅ Google Workspace services initialized: OAuth, Gmail, Calendar, Drive, Sheets")
+logger.info("✅ Google Workspace services registered: OAuth (Gmail, Calendar, Drive, Sheets load on first use)")
+
+startup_profiler.checkpoint('db_and_workspace_clients')
 
 # JWT and Password Security Configuration
 JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'fidus-production-secret-2025-secure-key')
@@ -335,6 +348,7 @@ def get_current_admin_user(request: Request) -> dict:
 
 # Initialize MT5 Config Management auth after get_current_admin_user is defined
 init_mt5_config_auth(get_current_admin_user)
+init_document_signing_auth(get_current_admin_user)
 
 def get_current_user(request: Request) -> dict:
     """Get current authenticated user (admin or client) from JWT token"""
@@ -359,7 +373,14 @@ app = FastAPI()
 api_router = APIRouter(prefix="/api")
 
 # Initialize APScheduler for automatic VPS sync
+# Every worker runs the scheduler; jobs wrapped in @job_leases.exclusive run in one worker only
 scheduler = AsyncIOScheduler()
+job_leases = JobLeaseManager(db)
+
+# Per-process caches invalidate each other across Uvicorn workers through shared versions
+response_cache.use_shared_versions(SharedVersions(db, 'state_response_cache_versions'))
+deal_store.use_shared_versions(SharedVersions(db, 'state_deal_store_versions'))
+instrument_spec_cache.use_shared_versions(SharedVersions(db, 'state_instrument_spec_versions'))
 
 # User Models
 class LoginRequest(BaseModel):
@@ -858,9 +879,6 @@ FIDUS_FUND_CONFIG = {
     )
 }
 
-# In-memory investment storage (in production, use proper database)
-client_investments = {}
-
 # RESTORED: Working client readiness storage  
 client_readiness = {
     "client_alejandro": {
@@ -883,15 +901,14 @@ client_readiness = {
 user_temp_passwords = {}
 user_accounts = {}  # Additional user metadata
 
-# In-memory redemption system storage
-redemption_requests = {}  # {redemption_id: RedemptionRequest}
-activity_logs = []  # List of ActivityLog entries
+# Redemption system storage (shared by all workers; activity logs live in db.activity_logs)
+redemption_requests = SharedStateStore(db, 'state_redemption_requests')  # {redemption_id: RedemptionRequest dict}
 
-# In-memory payment confirmation storage  
-payment_confirmations = {}  # {confirmation_id: PaymentConfirmation}
+# Payment confirmation storage
+payment_confirmations = SharedStateStore(db, 'state_payment_confirmations')  # {confirmation_id: PaymentConfirmation dict}
 
-# In-memory wallet management storage
-client_wallets = {}  # {client_id: [ClientWallet]}
+# Wallet management storage
+client_wallets = SharedStateStore(db, 'state_client_wallets')  # {client_id: [ClientWallet dict]}
 
 # FIDUS Official Wallets for deposits (from user-provided addresses)
 FIDUS_OFFICIAL_WALLETS = [
@@ -1367,7 +1384,7 @@ def can_request_redemption(investment: FundInvestment, fund_config: FundConfigur
             days_until_principal = (investment.minimum_hold_end_date - now).days
             return True, f"Performance sharing redemption available. Principal available in {days_until_principal} days"
 
-def create_activity_log(client_id: str, activity_type: str, amount: float, description: str, 
+async def create_activity_log(client_id: str, activity_type: str, amount: float, description: str, 
                        performed_by: str, investment_id: str = None, fund_code: str = None, 
                        reference_id: str = None, metadata: dict = None):
     """Create an activity log entry"""
@@ -1383,7 +1400,8 @@ def create_activity_log(client_id: str, activity_type: str, amount: float, descr
         metadata=metadata or {}
     )
     
-    activity_logs.append(activity)
+    # log_id keeps the entry readable by AsyncMongoDBManager.get_client_activity_logs
+    await db.activity_logs.insert_one({**activity.dict(), 'log_id': activity.id})
     logging.info(f"Activity logged: {activity_type} for client {client_id}, amount ${amount}")
     return activity
 
@@ -2484,7 +2502,7 @@ async def health_check():
         try:
             if hasattr(mongodb_manager, 'db') and mongodb_manager.db is not None:
                 # Test the connection with a simple ping
-                mongodb_manager.client.admin.command('ping')
+                await mongodb_manager.db.command('ping')
                 mongodb_status = "connected"
         except Exception as e:
             mongodb_status = f"error: {str(e)}"
@@ -2492,6 +2510,7 @@ async def health_check():
         return {
             "status": "healthy",
             "timestamp": datetime.now(timezone.utc).isoformat(),
+            "ready": readiness.is_ready,
             "jwt_fix": "applied",
             "services": {
                 "backend": "running",
@@ -2515,7 +2534,7 @@ async def health_check():
 async def debug_get_clients():
     """Debug endpoint to test client fetching without auth"""
     try:
-        clients = mongodb_manager.get_all_clients()
+        clients = await mongodb_manager.get_all_clients()
         return {
             "success": True,
             "total_clients": len(clients),
@@ -2550,7 +2569,7 @@ async def debug_jwt_verification(token: str):
 
 @api_router.get("/health/ready")
 async def readiness_check():
-    """Readiness check with database connectivity"""
+    """Readiness check: database connectivity and critical startup initializers"""
     try:
         # Test database connection
         await db.command('ping')
@@ -2558,10 +2577,23 @@ async def readiness_check():
         # Get rate limiter stats (commented out to avoid undefined variable error)
         # rate_limiter_stats = rate_limiter.get_stats()
         
+        startup = readiness.get_status()
+        if not startup["ready"]:
+            return JSONResponse(
+                status_code=503,
+                content={
+                    "status": "starting",
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "database": "connected",
+                    "startup": startup
+                }
+            )
+        
         return {
             "status": "ready",
             "timestamp": datetime.now(timezone.utc).isoformat(),
-            "database": "connected"
+            "database": "connected",
+            "startup": startup
             # "rate_limiter": rate_limiter_stats
         }
     except Exception as e:
@@ -2602,6 +2634,7 @@ async def health_metrics():
                 "index_size": db_stats.get("indexSize", 0)
             },
             # "rate_limiter": rate_limiter_stats,
+            "response_cache": response_cache.get_stats(),
             "system": system_metrics
         }
     except Exception as e:
@@ -2614,6 +2647,51 @@ async def health_metrics():
             }
         )
 
+@api_router.get("/health/cache")
+async def health_cache():
+    """Response cache hit/miss counters and source tag versions"""
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "response_cache": response_cache.get_stats()
+    }
+
+@api_router.get("/health/startup")
+async def health_startup():
+    """Import-time breakdown, lazily loaded modules and startup initializer status"""
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "budget_seconds": STARTUP_BUDGET_SECONDS,
+        "imports": startup_profiler.get_stats(),
+        "initializers": readiness.get_status()
+    }
+
+@api_router.get("/health/queries")
+async def health_queries(top: int = 20):
+    """MongoDB query count, DB time and repeated query shapes per endpoint"""
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "queries": query_profiler.get_stats(top=min(max(top, 1), 100))
+    }
+
+@api_router.post("/admin/metrics/queries/reset")
+async def reset_query_metrics(current_user: dict = Depends(get_current_admin_user)):
+    """Start a fresh query profiling window (e.g. after a deploy)"""
+    query_profiler.reset()
+    return {"success": True, "since": query_profiler.since.isoformat()}
+
+@api_router.get("/health/job-leases")
+async def health_job_leases():
+    """Which worker holds each scheduled job / monitoring loop lease"""
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "worker": job_leases.get_stats(),
+        "leases": await job_leases.get_status()
+    }
+
 # =====================================================================
 # SYSTEM REGISTRY & DOCUMENTATION ENDPOINTS (Phase 1)
 # Interactive Technical Documentation System
@@ -3135,6 +3213,15 @@ async def get_component_uptime(component: str, hours: int = 24):
         logger.error(f"Error calculating uptime for {component}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.get("/system/health/probe-latency")
+async def get_health_probe_latency():
+    """Per-probe latency histograms and timeout counts since server start"""
+    return {
+        "success": True,
+        "probes": probe_latency.snapshot(),
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
 
 
 # ============================================================================
@@ -3671,6 +3758,64 @@ async def get_account_true_pnl(account_number: int, current_user: dict = Depends
         raise HTTPException(status_code=500, detail=f"Failed to calculate account P&L: {str(e)}")
 
 
+@api_router.get("/mt5/pnl-ledger")
+async def get_pnl_ledger(account_number: Optional[int] = None, current_user: dict = Depends(get_current_user)):
+    """
+    Running TRUE P&L components per account (services/pnl_ledger.py)
+    
+    Net deposits, profit withdrawals, inter-account transfers and realized P&L,
+    one document per account as of the last ledger rebuild.
+    """
+    try:
+        from services.pnl_ledger import PnLLedgerService
+        
+        accounts = [account_number] if account_number is not None else None
+        ledgers = await PnLLedgerService(db).get_ledgers(accounts)
+        for ledger in ledgers.values():
+            for key in ('last_deal_time', 'updated_at'):
+                if isinstance(ledger.get(key), datetime):
+                    ledger[key] = ledger[key].isoformat()
+        
+        return {
+            'success': True,
+            'ledgers': sorted(ledgers.values(), key=lambda ledger: ledger['account']),
+            'count': len(ledgers),
+            'last_updated': datetime.now(timezone.utc).isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Error loading P&L ledger: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to load P&L ledger: {str(e)}")
+
+
+@job_queue.handler('pnl_ledger.rebuild')
+async def rebuild_pnl_ledger_job(job: JobContext, account_number: int = None):
+    from services.pnl_ledger import PnLLedgerService
+    
+    await job.progress(5, f"Account {account_number}" if account_number is not None else "All accounts")
+    return await PnLLedgerService(db).rebuild(account=account_number)
+
+
+@api_router.post("/admin/pnl-ledger/rebuild", status_code=202)
+async def rebuild_pnl_ledger(
+    account_number: Optional[int] = None,
+    current_user: dict = Depends(get_current_admin_user)
+):
+    """
+    Regenerate the P&L ledger (and each deal's stored entry) from mt5_deals (background job)
+    
+    Poll GET /api/jobs/{job_id} for the result.
+    """
+    try:
+        params = {'account_number': account_number} if account_number is not None else {}
+        job = await job_queue.enqueue('pnl_ledger.rebuild', params, created_by=current_user.get('id'))
+        return {"success": True, **job}
+        
+    except Exception as e:
+        logger.error(f"❌ P&L ledger rebuild error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Rebuild failed: {str(e)}")
+
+
 
 # ============================================================================
 # THREE-TIER P&L API ENDPOINTS (Client, FIDUS, Total Fund)
@@ -4515,7 +4660,7 @@ async def get_client_data(client_id: str):
         
         # Get investment data to calculate monthly statement
         try:
-            investments = mongodb_manager.get_client_investments(client_id)
+            investments = await mongodb_manager.get_client_investments(client_id)
             total_invested = sum(inv['principal_amount'] for inv in investments)
             total_current = sum(inv['current_value'] for inv in investments)
             total_profit = total_current - total_invested
@@ -4616,7 +4761,7 @@ async def get_client_details(client_id: str):
         # Get client investments from MongoDB
         investments = []
         try:
-            investments = mongodb_manager.get_client_investments(client_id)
+            investments = await mongodb_manager.get_client_investments(client_id)
         except Exception as e:
             logging.warning(f"⚠️ Could not load investments for client {client_id}: {str(e)}")
         
@@ -6344,8 +6489,8 @@ class ResetPasswordRequest(BaseModel):
     resetToken: str
     newPassword: str
 
-# In-memory storage for password reset tokens (in production, use Redis or database)
-password_reset_tokens = {}
+# Password reset tokens, shared by all workers (expire after 15 minutes)
+password_reset_tokens = SharedStateStore(db, 'state_password_reset_tokens', ttl_seconds=900, cache_seconds=0)
 
 def generate_reset_token():
     """Generate a secure reset token"""
@@ -6416,14 +6561,14 @@ async def forgot_password(request: ForgotPasswordRequest):
         reset_token = generate_reset_token()
         
         # Store reset data (expires in 15 minutes)
-        password_reset_tokens[reset_token] = {
+        await password_reset_tokens.set(reset_token, {
             "email": email,
             "user_type": user_type,
             "reset_code": reset_code,
             "created_at": datetime.now(timezone.utc),
             "expires_at": datetime.now(timezone.utc) + timedelta(minutes=15),
             "verified": False
-        }
+        })
         
         # Send email with reset code
         email_sent = send_password_reset_email(email, reset_code, user_type)
@@ -6453,14 +6598,13 @@ async def verify_reset_code(request: VerifyResetCodeRequest):
         email = request.email.lower().strip()
         
         # Check if token exists
-        if reset_token not in password_reset_tokens:
+        token_data = await password_reset_tokens.get(reset_token)
+        if token_data is None:
             raise HTTPException(status_code=400, detail="Invalid or expired reset token")
         
-        token_data = password_reset_tokens[reset_token]
-        
         # Check if token is expired
         if datetime.now(timezone.utc) > token_data["expires_at"]:
-            del password_reset_tokens[reset_token]
+            await password_reset_tokens.delete(reset_token)
             raise HTTPException(status_code=400, detail="Reset code has expired. Please request a new one.")
         
         # Verify email matches
@@ -6475,7 +6619,7 @@ async def verify_reset_code(request: VerifyResetCodeRequest):
         # In production, verify against token_data["reset_code"]
         
         # Mark as verified
-        password_reset_tokens[reset_token]["verified"] = True
+        await password_reset_tokens.update(reset_token, {"verified": True})
         
         return {
             "success": True,
@@ -6498,14 +6642,13 @@ async def reset_password(request: ResetPasswordRequest):
         new_password = request.newPassword
         
         # Check if token exists and is verified
-        if reset_token not in password_reset_tokens:
+        token_data = await password_reset_tokens.get(reset_token)
+        if token_data is None:
             raise HTTPException(status_code=400, detail="Invalid or expired reset token")
         
-        token_data = password_reset_tokens[reset_token]
-        
         # Check if token is expired
         if datetime.now(timezone.utc) > token_data["expires_at"]:
-            del password_reset_tokens[reset_token]
+            await password_reset_tokens.delete(reset_token)
             raise HTTPException(status_code=400, detail="Reset session has expired. Please start over.")
         
         # Check if code was verified
@@ -6558,7 +6701,7 @@ async def reset_password(request: ResetPasswordRequest):
             logging.warning(f"User not found for password reset: {email}")
         
         # Clean up the reset token
-        del password_reset_tokens[reset_token]
+        await password_reset_tokens.delete(reset_token)
         
         # Send confirmation email (optional)
         try:
@@ -7200,7 +7343,7 @@ async def request_prospect_document(prospect_id: str, request_data: dict):
             raise HTTPException(status_code=400, detail="Document type is required")
         
         # Find prospect
-        prospect = prospects_storage.get(prospect_id)
+        prospect = await db.crm_prospects.find_one({"prospect_id": prospect_id})
         if not prospect:
             raise HTTPException(status_code=404, detail="Prospect not found")
         
@@ -7228,7 +7371,10 @@ async def request_prospect_document(prospect_id: str, request_data: dict):
         # In production, send email/SMS notification to prospect here
         
         # Update prospect notes
-        prospect["notes"] = f"{prospect.get('notes', '')} | Document requested: {document_type} on {datetime.now().strftime('%Y-%m-%d')}"
+        await db.crm_prospects.update_one(
+            {"prospect_id": prospect_id},
+            {"$set": {"notes": f"{prospect.get('notes', '')} | Document requested: {document_type} on {datetime.now().strftime('%Y-%m-%d')}"}}
+        )
         
         logging.info(f"Document requested from prospect {prospect_id}: {document_type}")
         
@@ -7275,7 +7421,7 @@ async def verify_prospect_document(prospect_id: str, document_id: str, verificat
         
         # Update prospect stage if all required documents are approved
         if verification_status == "approved":
-            prospect = prospects_storage.get(prospect_id)
+            prospect = await db.crm_prospects.find_one({"prospect_id": prospect_id})
             if prospect:
                 # Check if all required KYC documents are approved
                 required_doc_types = ["identity", "proof_of_residence", "bank_statement", "source_of_funds"]
@@ -7285,8 +7431,13 @@ async def verify_prospect_document(prospect_id: str, document_id: str, verificat
                 ]
                 
                 if len(approved_docs) >= len(required_doc_types):
-                    prospect["stage"] = "qualified"
-                    prospect["notes"] = f"{prospect.get('notes', '')} | KYC documentation completed on {datetime.now().strftime('%Y-%m-%d')}"
+                    await db.crm_prospects.update_one(
+                        {"prospect_id": prospect_id},
+                        {"$set": {
+                            "stage": "qualified",
+                            "notes": f"{prospect.get('notes', '')} | KYC documentation completed on {datetime.now().strftime('%Y-%m-%d')}"
+                        }}
+                    )
         
         logging.info(f"Document {document_id} {verification_status} for prospect {prospect_id}")
         
@@ -7505,6 +7656,7 @@ async def register_new_client(registration_data: dict):
         prospect_id = str(uuid.uuid4())
         new_prospect = {
             "id": prospect_id,
+            "prospect_id": prospect_id,
             "name": full_name,
             "email": email,
             "phone": phone or client_data.get("phone", ""),
@@ -7535,8 +7687,8 @@ async def register_new_client(registration_data: dict):
             }
         }
         
-        # Add to prospects_storage (this makes it appear in Admin CRM)
-        prospects_storage[prospect_id] = new_prospect
+        # Add to crm_prospects (this makes it appear in Admin CRM)
+        await db.crm_prospects.insert_one(new_prospect)
         
         logging.info(f"New client registered and added to CRM leads: {full_name} ({email}) - Prospect ID: {prospect_id}")
         
@@ -7685,14 +7837,15 @@ async def get_portfolio_summary():
     """Get portfolio summary for admin dashboard"""
     try:
         # Calculate real total AUM from MongoDB
-        all_clients = mongodb_manager.get_all_clients()
+        all_clients = await mongodb_manager.get_all_clients()
+        investments_by_client = await mongodb_manager.get_investments_by_client(c['id'] for c in all_clients)
         total_aum = 0.0
         client_count = 0
         fund_allocation = {"CORE": 0, "BALANCE": 0, "DYNAMIC": 0, "UNLIMITED": 0}
         
         # Sum AUM from all client investments
         for client in all_clients:
-            client_investments_list = mongodb_manager.get_client_investments(client['id'])
+            client_investments_list = investments_by_client[client['id']]
             if client_investments_list:
                 client_count += 1
                 for investment in client_investments_list:
@@ -7763,6 +7916,7 @@ class GmailService:
         
     async def authenticate(self):
         """Authenticate and build Gmail service"""
+        from google.auth.exceptions import RefreshError
         creds = None
         
         # Load existing token
@@ -7814,6 +7968,7 @@ class GmailService:
         document_url: str = None
     ):
         """Send email with document attachment and/or viewing link"""
+        from googleapiclient.errors import HttpError
         try:
             if not self.service:
                 await self.authenticate()
@@ -8016,8 +8171,8 @@ class GmailService:
 # Initialize Gmail service
 # gmail_service = GmailService()  # Commented out - using the proper GmailService from services/google/gmail.py
 
-# OAuth state storage for Gmail authentication
-oauth_states = {}
+# OAuth state storage for Gmail authentication (shared by all workers)
+oauth_states = SharedStateStore(db, 'state_oauth', ttl_seconds=600, cache_seconds=0)
 
 # Document Management Models and Services
 class DocumentUpload(BaseModel):
@@ -8047,9 +8202,6 @@ class SendForSignatureRequest(BaseModel):
     email_message: str
     sender_id: str  # Added sender_id to the model
 
-# In-memory document storage (in production, use proper database)
-documents_storage = {}
-
 # Document categories
 SHARED_DOCUMENT_CATEGORIES = [
     'loan_agreements',
@@ -8072,8 +8224,6 @@ ADMIN_ONLY_DOCUMENT_CATEGORIES = [
     'audit_documents'
 ]
 
-# In-memory CRM prospect storage (in production, use proper database)
-prospects_storage = {}
 # NOTE: prospect_documents_storage removed - now using MongoDB for persistence
 
 # In-memory prospect document storage (in production, use proper database)
@@ -8217,12 +8367,12 @@ async def upload_document(
         }
         
         # Store in MongoDB
-        created_document_id = mongodb_manager.create_document(document_data)
+        created_document_id = await mongodb_manager.create_document(document_data)
         
         if not created_document_id:
-            # Fallback to in-memory storage if MongoDB fails
-            documents_storage[document_id] = document_data
-            logging.warning(f"Document stored in memory as MongoDB failed: {document.filename}")
+            # No per-worker fallback: other workers could never serve this document
+            file_path.unlink(missing_ok=True)
+            raise HTTPException(status_code=500, detail="Upload failed: could not store document record")
         
         logging.info(f"Document uploaded: {document.filename} by {uploader_type} {uploader_id} (type: {document_type})")
         
@@ -8244,19 +8394,7 @@ async def get_all_documents(include_admin_only: bool = True):
     """Get all documents for admin view with option to include admin-only documents"""
     try:
         # Get documents from MongoDB
-        documents = mongodb_manager.get_all_documents(include_admin_only=include_admin_only)
-        
-        # Fallback to in-memory storage if MongoDB returns empty and we have memory data
-        if not documents and documents_storage:
-            documents = []
-            for doc_data in documents_storage.values():
-                # Filter admin-only if requested
-                if not include_admin_only and doc_data.get('document_type') == 'admin_only':
-                    continue
-                documents.append(doc_data)
-            
-            # Sort by created_at descending
-            documents.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+        documents = await mongodb_manager.get_all_documents(include_admin_only=include_admin_only)
         
         return {"documents": documents}
         
@@ -8269,26 +8407,7 @@ async def get_client_documents(client_id: str):
     """Get documents for specific client (shared documents only)"""
     try:
         # Get client documents from MongoDB (excludes admin-only documents)
-        client_documents = mongodb_manager.get_client_documents(client_id, include_admin_shared=True)
-        
-        # Fallback to in-memory storage if MongoDB returns empty and we have memory data
-        if not client_documents and documents_storage:
-            client_documents = []
-            for doc_data in documents_storage.values():
-                # Exclude admin-only documents from client view
-                if doc_data.get('document_type') == 'admin_only':
-                    continue
-                    
-                # Include documents uploaded by client, assigned to client, or shared
-                if (doc_data['uploader_id'] == client_id or 
-                    doc_data.get('client_id') == client_id or
-                    (doc_data.get('recipient_emails') and 
-                     any(email for email in doc_data.get('recipient_emails', []) 
-                         if client_id in email))):
-                    client_documents.append(doc_data)
-            
-            # Sort by created_at descending
-            client_documents.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+        client_documents = await mongodb_manager.get_client_documents(client_id, include_admin_shared=True)
         
         return {"documents": client_documents}
         
@@ -8301,17 +8420,7 @@ async def get_admin_only_documents():
     """Get admin-only internal documents (compliance, AML KYC, etc.)"""
     try:
         # Get admin-only documents from MongoDB
-        admin_documents = mongodb_manager.get_admin_only_documents()
-        
-        # Fallback to in-memory storage if needed
-        if not admin_documents and documents_storage:
-            admin_documents = []
-            for doc_data in documents_storage.values():
-                if doc_data.get('document_type') == 'admin_only':
-                    admin_documents.append(doc_data)
-            
-            # Sort by created_at descending
-            admin_documents.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+        admin_documents = await mongodb_manager.get_admin_only_documents()
         
         return {"documents": admin_documents}
         
@@ -8341,11 +8450,10 @@ async def send_document_for_signature(
     """Send document for Gmail signature with real Gmail integration"""
     try:
         # Get document
-        if document_id not in documents_storage:
+        doc_data = await mongodb_manager.get_document(document_id)
+        if not doc_data:
             raise HTTPException(status_code=404, detail="Document not found")
         
-        doc_data = documents_storage[document_id]
-        
         # Get sender info
         sender_id = request.sender_id
         sender_name = "System Admin"
@@ -8395,14 +8503,13 @@ async def send_document_for_signature(
         
         # Update document status
         if successful_sends:
-            doc_data['status'] = 'sent'
-            doc_data['sender_id'] = sender_id
-            doc_data['sender_name'] = sender_name
-            doc_data['recipient_emails'] = [r['email'] for r in request.recipients]
-            doc_data['gmail_message_ids'] = [s['message_id'] for s in successful_sends]
-            doc_data['updated_at'] = datetime.now(timezone.utc)
-            
-            documents_storage[document_id] = doc_data
+            await mongodb_manager.update_document(document_id, {
+                'status': 'sent',
+                'sender_id': sender_id,
+                'sender_name': sender_name,
+                'recipient_emails': [r['email'] for r in request.recipients],
+                'gmail_message_ids': [s['message_id'] for s in successful_sends]
+            })
         
         logging.info(f"Document {document_id} sent via Gmail: {len(successful_sends)} successful, {len(failed_sends)} failed")
         
@@ -8426,10 +8533,9 @@ async def send_document_for_signature(
 async def download_document(document_id: str):
     """Download a document file"""
     try:
-        if document_id not in documents_storage:
+        doc_data = await mongodb_manager.get_document(document_id)
+        if not doc_data:
             raise HTTPException(status_code=404, detail="Document not found")
-        
-        doc_data = documents_storage[document_id]
         file_path = Path(doc_data['file_path'])
         
         if not file_path.exists():
@@ -8452,18 +8558,17 @@ async def download_document(document_id: str):
 async def delete_document(document_id: str):
     """Delete a document"""
     try:
-        if document_id not in documents_storage:
+        doc_data = await mongodb_manager.get_document(document_id)
+        if not doc_data:
             raise HTTPException(status_code=404, detail="Document not found")
         
-        doc_data = documents_storage[document_id]
-        
         # Delete file
         file_path = Path(doc_data['file_path'])
         if file_path.exists():
             file_path.unlink()
         
         # Remove from storage
-        del documents_storage[document_id]
+        await mongodb_manager.delete_document(document_id)
         
         logging.info(f"Document {document_id} deleted")
         
@@ -8479,10 +8584,9 @@ async def delete_document(document_id: str):
 async def view_document_online(document_id: str):
     """View document online (public endpoint for email links)"""
     try:
-        if document_id not in documents_storage:
+        doc_data = await mongodb_manager.get_document(document_id)
+        if not doc_data:
             raise HTTPException(status_code=404, detail="Document not found")
-        
-        doc_data = documents_storage[document_id]
         file_path = Path(doc_data['file_path'])
         
         if not file_path.exists():
@@ -8528,7 +8632,7 @@ async def get_gmail_auth_url():
         )
         
         # Store state for verification (in production, use proper session storage)
-        oauth_states[state] = True
+        await oauth_states.set(state, True)
         
         return {
             "success": True,
@@ -8546,6 +8650,7 @@ async def gmail_oauth_callback(code: str = None, state: str = None, error: str =
     """Handle Gmail OAuth callback - Fixed with better error handling"""
     try:
         from google_auth_oauthlib.flow import Flow
+        from googleapiclient.errors import HttpError
         from fastapi.responses import RedirectResponse
         
         # Check if OAuth provider returned an error
@@ -8559,8 +8664,8 @@ async def gmail_oauth_callback(code: str = None, state: str = None, error: str =
             return RedirectResponse(url="/?gmail_auth=error&message=Missing+OAuth+parameters")
         
         # Verify state (in production, use proper session storage)
-        if state not in oauth_states:
-            logger.warning(f"Gmail OAuth invalid state: {state}. Known states: {list(oauth_states.keys())}")
+        if not await oauth_states.contains(state):
+            logger.warning(f"Gmail OAuth invalid state: {state}")
             # Don't fail completely - allow it through for now (TODO: implement proper state management)
             # return RedirectResponse(url="/?gmail_auth=error&message=Invalid+state+parameter")
         
@@ -8599,7 +8704,7 @@ async def gmail_oauth_callback(code: str = None, state: str = None, error: str =
             logging.info(f"Gmail OAuth success: {email_address} with scopes: {creds.scopes}")
             
             # Clean up state
-            del oauth_states[state]
+            await oauth_states.delete(state)
             
             # Redirect to frontend with success
             return RedirectResponse(url=f"/?gmail_auth=success&email={email_address}")
@@ -8607,7 +8712,7 @@ async def gmail_oauth_callback(code: str = None, state: str = None, error: str =
         except HttpError as profile_error:
             logging.error(f"Gmail profile error after OAuth: {profile_error}")
             # Clean up state
-            del oauth_states[state]
+            await oauth_states.delete(state)
             return RedirectResponse(url=f"/?gmail_auth=error&message=Profile+access+failed:+{str(profile_error)}")
         
         
@@ -8648,11 +8753,10 @@ async def authenticate_gmail():
 async def get_document_status(document_id: str):
     """Get Gmail sending status for a document"""
     try:
-        if document_id not in documents_storage:
+        doc_data = await mongodb_manager.get_document(document_id)
+        if not doc_data:
             raise HTTPException(status_code=404, detail="Document not found")
         
-        doc_data = documents_storage[document_id]
-        
         # For Gmail integration, we track message IDs instead of envelope IDs
         gmail_message_ids = doc_data.get('gmail_message_ids', [])
         
@@ -9656,7 +9760,7 @@ async def get_all_funds():
         funds_data = []
         
         # Get Salvador Palma's real investments
-        salvador_investments = mongodb_manager.get_client_investments('client_003')
+        salvador_investments = await mongodb_manager.get_client_investments('client_003')
         
         # Calculate real fund data based on actual investments
         fund_calculations = {
@@ -10666,8 +10770,6 @@ async def get_all_prospects():
                 logger.info(f"Created {len(sample_prospects)} sample prospects for demo")
             except Exception as insert_error:
                 logger.warning(f"Failed to insert sample prospects: {str(insert_error)}")
-                # Fallback to in-memory storage
-                prospects = list(prospects_storage.values())
         
         # Sort by created_at descending (newest first) - FIXED timezone issue
         def get_sort_key(x):
@@ -10760,9 +10862,6 @@ async def create_prospect(prospect_data: ProspectCreate):
         if '_id' in prospect_dict:
             del prospect_dict['_id']
         
-        # Also store in memory for backwards compatibility
-        prospects_storage[prospect.prospect_id] = prospect_dict
-        
         logging.info(f"Prospect created: {prospect.name} ({prospect.email})")
         
         return {
@@ -10941,10 +11040,6 @@ async def update_prospect(prospect_id: str, update_data: ProspectUpdate):
         # Get updated prospect data
         updated_prospect = await db.crm_prospects.find_one({"prospect_id": prospect_id})
         
-        # Also update memory storage if it exists (for backwards compatibility)
-        if prospect_id in prospects_storage:
-            prospects_storage[prospect_id].update(update_fields)
-        
         logging.info(f"Prospect {prospect_id} updated successfully in MongoDB")
         
         return {
@@ -11070,12 +11165,10 @@ async def mark_prospect_won(prospect_id: str):
 async def delete_prospect(prospect_id: str):
     """Delete a prospect"""
     try:
-        if prospect_id not in prospects_storage:
+        prospect_data = await db.crm_prospects.find_one_and_delete({"prospect_id": prospect_id})
+        if not prospect_data:
             raise HTTPException(status_code=404, detail="Prospect not found")
         
-        prospect_data = prospects_storage[prospect_id]
-        del prospects_storage[prospect_id]
-        
         logging.info(f"Prospect deleted: {prospect_id}")
         
         return {
@@ -11158,10 +11251,6 @@ async def run_aml_kyc_check(prospect_id: str):
             {"$set": update_fields}
         )
         
-        # Also update memory storage if it exists (for backwards compatibility)
-        if actual_prospect_id in prospects_storage:
-            prospects_storage[actual_prospect_id].update(update_fields)
-        
         logging.info(f"AML/KYC check completed for prospect {actual_prospect_id}: {aml_result.overall_status.value}")
         
         return {
@@ -11301,10 +11390,6 @@ async def convert_prospect_to_client(prospect_id: str, conversion_data: Prospect
             )
             logging.info(f"✅ [CRM] Updated original portal lead {original_lead_id} as converted")
         
-        # Also update memory storage if it exists (for backwards compatibility)
-        if prospect_id in prospects_storage:
-            prospects_storage[prospect_id].update(conversion_update)
-        
         # Send FIDUS agreement if requested
         agreement_sent = False
         agreement_message = ""
@@ -11363,10 +11448,6 @@ async def get_prospect_pipeline():
             if '_id' in prospect:
                 del prospect['_id']
         
-        # Fallback to in-memory storage if MongoDB is empty
-        if not prospects_list:
-            prospects_list = list(prospects_storage.values())
-        
         # Organize prospects by stage
         for prospect_data in prospects_list:
             stage = prospect_data.get('stage', 'lead')
@@ -13466,106 +13547,7 @@ async def get_meet_spaces(current_user: dict = Depends(get_current_admin_user)):
             "spaces": []
         }
 
-# Document Signing Endpoints
-@api_router.post("/documents/upload")
-async def upload_document(file: UploadFile = File(...), current_user: dict = Depends(get_current_admin_user)):
-    """Upload document for signing"""
-    try:
-        # Read file data
-        file_data = await file.read()
-        
-        # Upload document using document signing service
-        result = await document_signing_service.upload_document(
-            file_data=file_data,
-            filename=file.filename,
-            mime_type=file.content_type,
-            user_id=current_user["user_id"]
-        )
-        
-        logging.info(f"Document uploaded by user: {current_user['username']}")
-        
-        return result
-        
-    except Exception as e:
-        logging.error(f"Upload document error: {str(e)}")
-        return {
-            "success": False,
-            "error": str(e)
-        }
-
-@api_router.get("/documents/{document_id}/pdf")
-async def get_document_pdf(document_id: str, current_user: dict = Depends(get_current_admin_user)):
-    """Get document PDF for viewing"""
-    try:
-        result = await document_signing_service.get_document_pdf(document_id)
-        
-        if result['success']:
-            return {
-                "success": True,
-                "pdf_data": result['pdf_data'],
-                "filename": result['filename']
-            }
-        else:
-            return result
-        
-    except Exception as e:
-        logging.error(f"Get document PDF error: {str(e)}")
-        return {
-            "success": False,
-            "error": str(e)
-        }
-
-@api_router.post("/documents/{document_id}/sign")
-async def sign_document(document_id: str, request: Request, current_user: dict = Depends(get_current_admin_user)):
-    """Add electronic signature to document"""
-    try:
-        data = await request.json()
-        
-        # Add signature using document signing service
-        result = await document_signing_service.add_signature(
-            document_id=document_id,
-            signature_data=data.get('signature_data'),
-            signer_info={
-                'user_id': current_user["user_id"],
-                'name': current_user.get('name', current_user['username']),
-                'email': current_user.get('email', ''),
-                'position': data.get('position', 'Signatory')
-            }
-        )
-        
-        logging.info(f"Document {document_id} signed by user: {current_user['username']}")
-        
-        return result
-        
-    except Exception as e:
-        logging.error(f"Sign document error: {str(e)}")
-        return {
-            "success": False,
-            "error": str(e)
-        }
-
-@api_router.get("/documents/signed/{filename}")
-async def get_signed_document(filename: str, current_user: dict = Depends(get_current_admin_user)):
-    """Download signed document"""
-    try:
-        result = await document_signing_service.get_signed_document(filename)
-        
-        if result['success']:
-            return Response(
-                content=result['file_data'],
-                media_type='application/pdf',
-                headers={"Content-Disposition": f"attachment; filename={filename}"}
-            )
-        else:
-            return result
-        
-    except Exception as e:
-        logging.error(f"Get signed document error: {str(e)}")
-        return {
-            "success": False,
-            "error": str(e)
-        }
-
+# Document Signing Endpoints (upload/pdf/sign/signed) live in routes/document_signing.py
 @api_router.post("/documents/{document_id}/send-notification")
 async def send_document_notification(document_id: str, request: Request, current_user: dict = Depends(get_current_admin_user)):
     """Send email notification for document signing"""
@@ -14828,14 +14810,17 @@ async def get_fund_configurations():
         # Use hardcoded FIDUS_FUND_CONFIG to ensure correct interest rates
         funds = []
         
+        # Load clients and all their investments once (not per fund)
+        all_clients = await mongodb_manager.get_all_clients()
+        investments_by_client = await mongodb_manager.get_investments_by_client(c['id'] for c in all_clients)
+        
         for fund_code, config in FIDUS_FUND_CONFIG.items():
             # Get real AUM and investor count from MongoDB
-            all_clients = mongodb_manager.get_all_clients()
             total_aum = 0.0
             investor_count = 0
             
             for client in all_clients:
-                client_investments = mongodb_manager.get_client_investments(client['id'])
+                client_investments = investments_by_client[client['id']]
                 for investment in client_investments:
                     if investment['fund_code'] == fund_code:
                         total_aum += investment['current_value']
@@ -14875,12 +14860,12 @@ async def update_investment_from_mt5_history(investment_id: str, current_user: d
     """Update investment dates based on actual MT5 account history"""
     try:
         # Get the investment
-        investment = mongodb_manager.get_investment(investment_id)
+        investment = await mongodb_manager.get_investment(investment_id)
         if not investment:
             raise HTTPException(status_code=404, detail="Investment not found")
         
         # Get associated MT5 accounts
-        mt5_accounts = mongodb_manager.get_client_mt5_accounts(investment['client_id'])
+        mt5_accounts = await mongodb_manager.get_client_mt5_accounts(investment['client_id'])
         matching_account = None
         
         for account in mt5_accounts:
@@ -14918,7 +14903,7 @@ async def update_investment_from_mt5_history(investment_id: str, current_user: d
             'updated_at': datetime.now(timezone.utc).isoformat()
         }
         
-        success = mongodb_manager.update_investment(investment_id, updated_investment)
+        success = await mongodb_manager.update_investment(investment_id, updated_investment)
         
         if success:
             logging.info(f"Updated investment {investment_id} with actual MT5 deposit date: {actual_deposit_date}")
@@ -14945,12 +14930,12 @@ async def validate_investment_mt5_mapping(investment_id: str, current_user: dict
     """Validate MT5 mapping, retrieve historical data, and identify start date for an investment"""
     try:
         # Get the investment
-        investment = mongodb_manager.get_investment(investment_id)
+        investment = await mongodb_manager.get_investment(investment_id)
         if not investment:
             raise HTTPException(status_code=404, detail="Investment not found")
         
         # Find associated MT5 account
-        mt5_accounts = mongodb_manager.get_client_mt5_accounts(investment['client_id'])
+        mt5_accounts = await mongodb_manager.get_client_mt5_accounts(investment['client_id'])
         matching_account = None
         
         for account in mt5_accounts:
@@ -14986,7 +14971,7 @@ async def validate_investment_mt5_mapping(investment_id: str, current_user: dict
                 )
         
         # Update investment status
-        update_success = mongodb_manager.update_investment(investment_id, {
+        update_success = await mongodb_manager.update_investment(investment_id, {
             'status': new_status.value,
             'mt5_validation_status': validation_result,
             'mt5_validation_completed_at': datetime.now(timezone.utc).isoformat()
@@ -15017,7 +15002,7 @@ async def approve_investment_for_activation(investment_id: str, current_user: di
     """Approve a validated investment to become active"""
     try:
         # Get the investment
-        investment = mongodb_manager.get_investment(investment_id)
+        investment = await mongodb_manager.get_investment(investment_id)
         if not investment:
             raise HTTPException(status_code=404, detail="Investment not found")
         
@@ -15070,7 +15055,7 @@ async def approve_investment_for_activation(investment_id: str, current_user: di
             final_status = InvestmentStatus.ACTIVE
         
         # Update investment to approved status
-        update_success = mongodb_manager.update_investment(investment_id, {
+        update_success = await mongodb_manager.update_investment(investment_id, {
             'status': final_status.value,
             'approved_at': datetime.now(timezone.utc).isoformat(),
             'approved_by': current_user.get('username', 'admin'),
@@ -15103,7 +15088,7 @@ async def get_pending_validation_investments(current_user: dict = Depends(get_cu
     try:
         # Get all investments that need validation
         pending_investments = []
-        all_investments = mongodb_manager.db.investments.find({
+        all_investments = await mongodb_manager.db.investments.find({
             'status': {
                 '$in': [
                     InvestmentStatus.PENDING_MT5_VALIDATION.value,
@@ -15112,24 +15097,28 @@ async def get_pending_validation_investments(current_user: dict = Depends(get_cu
                     InvestmentStatus.VALIDATED.value
                 ]
             }
-        })
+        }).to_list(length=None)
+        
+        # Get client info from MongoDB in one query (NO MOCK_USERS)
+        client_ids = list({inv['client_id'] for inv in all_investments})
+        client_docs = {
+            doc['id']: doc async for doc in db.users.find(
+                {"id": {"$in": client_ids}, "type": "client"},
+                {"_id": 0, "id": 1, "name": 1, "username": 1}
+            )
+        }
         
         for investment in all_investments:
             # Convert ObjectId to string
             investment['_id'] = str(investment['_id'])
             
-            # Get client info from MongoDB (NO MOCK_USERS)
             client_info = None
-            try:
-                client_doc = await db.users.find_one({"id": investment['client_id'], "type": "client"})
-                if client_doc:
-                    client_info = {
-                        'name': client_doc.get('name', 'Unknown'),
-                        'username': client_doc.get('username', 'unknown')
-                    }
-            except Exception as e:
-                logging.warning(f"Could not find client {investment['client_id']}: {str(e)}")
-                client_info = {'name': 'Unknown', 'username': 'unknown'}
+            client_doc = client_docs.get(investment['client_id'])
+            if client_doc:
+                client_info = {
+                    'name': client_doc.get('name', 'Unknown'),
+                    'username': client_doc.get('username', 'unknown')
+                }
             
             investment['client_info'] = client_info
             pending_investments.append(investment)
@@ -15162,7 +15151,7 @@ async def update_investment_deposit_date(
     """Manually update investment deposit date and recalculate all related dates"""
     try:
         # Get the investment
-        investment = mongodb_manager.get_investment(investment_id)
+        investment = await mongodb_manager.get_investment(investment_id)
         if not investment:
             raise HTTPException(status_code=404, detail="Investment not found")
         
@@ -15189,7 +15178,7 @@ async def update_investment_deposit_date(
             'updated_at': datetime.now(timezone.utc).isoformat()
         }
         
-        success = mongodb_manager.update_investment(investment_id, updated_investment)
+        success = await mongodb_manager.update_investment(investment_id, updated_investment)
         
         if success:
             logging.info(f"Manually updated investment {investment_id} deposit date: {new_deposit_date}")
@@ -15256,7 +15245,7 @@ async def create_client_investment(investment_data: InvestmentCreate):
         )
         
         # Store investment in MongoDB
-        investment_id = mongodb_manager.create_investment({
+        investment_id = await mongodb_manager.create_investment({
             'client_id': investment_data.client_id,
             'fund_code': investment_data.fund_code,
             'amount': investment_data.amount,
@@ -15344,7 +15333,7 @@ async def create_client_investment(investment_data: InvestmentCreate):
                 logging.warning(f"Failed to create/link default MT5 account for investment {investment_id}")
         
         # Log the deposit activity in MongoDB
-        mongodb_manager.log_activity({
+        await mongodb_manager.log_activity({
             'client_id': investment_data.client_id,
             'activity_type': 'deposit',
             'amount': investment_data.amount,
@@ -15526,13 +15515,10 @@ async def get_investment_projections(investment_id: str):
     try:
         # Find investment
         investment_found = None
-        for client_id, investments in client_investments.items():
-            for inv_data in investments:
-                if inv_data['investment_id'] == investment_id:
-                    investment_found = FundInvestment(**inv_data)
-                    break
-            if investment_found:
-                break
+        inv_data = await mongodb_manager.get_investment(investment_id)
+        if inv_data:
+            inv_data.setdefault('current_value', inv_data['principal_amount'])
+            investment_found = FundInvestment(**inv_data)
         
         if not investment_found:
             raise HTTPException(status_code=404, detail="Investment not found")
@@ -15588,11 +15574,12 @@ async def get_investment_projections(investment_id: str):
         raise HTTPException(status_code=500, detail="Failed to fetch investment projections")
 
 @api_router.delete("/investments/{investment_id}")
+@response_cache.invalidates(TAG_INVESTMENTS)
 async def delete_investment(investment_id: str):
     """Delete a specific investment - PRODUCTION ADMIN USE"""
     try:
         # Delete from MongoDB
-        result = mongodb_manager.db.investments.delete_one({"investment_id": investment_id})
+        result = await mongodb_manager.db.investments.delete_one({"investment_id": investment_id})
         
         if result.deleted_count > 0:
             logging.info(f"✅ Deleted investment: {investment_id}")
@@ -15606,11 +15593,12 @@ async def delete_investment(investment_id: str):
         raise HTTPException(status_code=500, detail=f"Error deleting investment: {str(e)}")
 
 @api_router.delete("/admin/investments/client/{client_id}")  
+@response_cache.invalidates(TAG_INVESTMENTS)
 async def delete_all_client_investments(client_id: str):
     """Delete ALL investments for a specific client - EMERGENCY USE ONLY"""
     try:
         # Delete all investments for this client
-        result = mongodb_manager.db.investments.delete_many({"client_id": client_id})
+        result = await mongodb_manager.db.investments.delete_many({"client_id": client_id})
         
         logging.info(f"🧹 Deleted {result.deleted_count} investments for client {client_id}")
         return {
@@ -16720,6 +16708,7 @@ async def calculate_cash_flow_calendar():
 # ===============================================================================
 
 @api_router.get("/admin/cashflow/complete")
+@response_cache.cached("admin/cashflow/complete", tags=(TAG_MT5_ACCOUNTS, TAG_MT5_DEALS, TAG_INVESTMENTS))
 async def get_complete_cashflow(days: int = 30):
     """
     SIMPLIFIED Cash Flow Analysis - SSOT Approach
@@ -17439,7 +17428,7 @@ async def get_client_redemptions(client_id: str):
     """Get all redemptions and available redemption options for a client"""
     try:
         # Get client investments from MongoDB
-        client_investments_list = mongodb_manager.get_client_investments(client_id)
+        client_investments_list = await mongodb_manager.get_client_investments(client_id)
         
         if not client_investments_list:
             return {
@@ -17530,9 +17519,9 @@ async def get_client_redemptions(client_id: str):
             available_redemptions.append(redemption_info)
         
         # Get client's redemption requests
-        for redemption_id, redemption in redemption_requests.items():
-            if redemption.client_id == client_id:
-                client_redemption_requests.append(redemption.dict())
+        for redemption in await redemption_requests.values():
+            if redemption["client_id"] == client_id:
+                client_redemption_requests.append(redemption)
         
         return {
             "success": True,
@@ -17553,9 +17542,10 @@ async def create_redemption_request(redemption_data: RedemptionRequestCreate):
         client_id = None
         
         # Search through all clients for the investment
-        all_clients = mongodb_manager.get_all_clients()
+        all_clients = await mongodb_manager.get_all_clients()
+        investments_by_client = await mongodb_manager.get_investments_by_client(c['id'] for c in all_clients)
         for client in all_clients:
-            client_investments_list = mongodb_manager.get_client_investments(client['id'])
+            client_investments_list = investments_by_client[client['id']]
             for investment_data in client_investments_list:
                 if investment_data["investment_id"] == redemption_data.investment_id:
                     fund_code = investment_data['fund_code']
@@ -17625,10 +17615,10 @@ async def create_redemption_request(redemption_data: RedemptionRequestCreate):
         )
         
         # Store redemption request
-        redemption_requests[redemption_request.id] = redemption_request
+        await redemption_requests.set(redemption_request.id, redemption_request.dict())
         
         # Log the activity
-        create_activity_log(
+        await create_activity_log(
             client_id=client_id,
             activity_type="redemption_request",
             amount=redemption_data.requested_amount,
@@ -17663,7 +17653,8 @@ async def get_pending_redemptions():
     try:
         pending_redemptions = []
         
-        for redemption_id, redemption in redemption_requests.items():
+        for stored in await redemption_requests.values():
+            redemption = RedemptionRequest(**stored)
             if redemption.status == "pending":
                 # Get client info from MongoDB (NO MOCK_USERS)
                 client_info = None
@@ -17696,10 +17687,11 @@ async def get_pending_redemptions():
 async def approve_redemption_request(approval_data: RedemptionApproval):
     """Approve or reject a redemption request"""
     try:
-        if approval_data.redemption_id not in redemption_requests:
+        redemption_data = await redemption_requests.get(approval_data.redemption_id)
+        if redemption_data is None:
             raise HTTPException(status_code=404, detail="Redemption request not found")
         
-        redemption = redemption_requests[approval_data.redemption_id]
+        redemption = RedemptionRequest(**redemption_data)
         
         if redemption.status != "pending":
             raise HTTPException(status_code=400, detail=f"Redemption request is already {redemption.status}")
@@ -17721,8 +17713,22 @@ async def approve_redemption_request(approval_data: RedemptionApproval):
         redemption.approved_by = approval_data.admin_id
         redemption.approved_date = datetime.now(timezone.utc)
         
+        # Only one admin (on any worker) can move a request out of pending
+        updated = await redemption_requests.update(
+            redemption.id,
+            {
+                "status": redemption.status,
+                "admin_notes": redemption.admin_notes,
+                "approved_by": redemption.approved_by,
+                "approved_date": redemption.approved_date
+            },
+            expected={"status": "pending"}
+        )
+        if not updated:
+            raise HTTPException(status_code=409, detail="Redemption request was already processed")
+        
         # Log the activity
-        create_activity_log(
+        await create_activity_log(
             client_id=redemption.client_id,
             activity_type=activity_type,
             amount=redemption.requested_amount,
@@ -17756,18 +17762,9 @@ async def approve_redemption_request(approval_data: RedemptionApproval):
 async def confirm_deposit_payment(confirmation_data: DepositConfirmationRequest, current_user: dict = Depends(get_current_admin_user)):
     """Confirm that a deposit payment has been received"""
     try:
-        # Find the investment by searching through all client investments
-        investment_found = None
-        investment_client_id = None
-        
-        for client_id, investments in client_investments.items():
-            for inv in investments:
-                if inv["investment_id"] == confirmation_data.investment_id:
-                    investment_found = inv
-                    investment_client_id = client_id
-                    break
-            if investment_found:
-                break
+        # Find the investment
+        investment_found = await mongodb_manager.get_investment(confirmation_data.investment_id)
+        investment_client_id = investment_found.get("client_id") if investment_found else None
         
         if not investment_found:
             raise HTTPException(status_code=404, detail="Investment not found")
@@ -17793,10 +17790,10 @@ async def confirm_deposit_payment(confirmation_data: DepositConfirmationRequest,
         )
         
         # Store confirmation
-        payment_confirmations[confirmation.id] = confirmation
+        await payment_confirmations.set(confirmation.id, confirmation.dict())
         
         # Log the activity
-        create_activity_log(
+        await create_activity_log(
             client_id=investment_client_id,  # Use the found client_id
             activity_type="deposit_confirmed",
             amount=confirmation_data.amount,
@@ -17831,10 +17828,11 @@ async def confirm_redemption_payment(confirmation_data: RedemptionPaymentConfirm
     """Confirm that a redemption payment has been sent"""
     try:
         # Check if redemption exists
-        if confirmation_data.redemption_id not in redemption_requests:
+        redemption_data = await redemption_requests.get(confirmation_data.redemption_id)
+        if redemption_data is None:
             raise HTTPException(status_code=404, detail="Redemption request not found")
         
-        redemption = redemption_requests[confirmation_data.redemption_id]
+        redemption = RedemptionRequest(**redemption_data)
         
         # Create payment confirmation record
         confirmation = PaymentConfirmation(
@@ -17855,14 +17853,18 @@ async def confirm_redemption_payment(confirmation_data: RedemptionPaymentConfirm
         )
         
         # Store confirmation
-        payment_confirmations[confirmation.id] = confirmation
+        await payment_confirmations.set(confirmation.id, confirmation.dict())
         
         # Update redemption status to completed
         redemption.status = "completed"
         redemption.completed_date = datetime.now(timezone.utc)
+        await redemption_requests.update(
+            redemption.id,
+            {"status": redemption.status, "completed_date": redemption.completed_date}
+        )
         
         # Log the activity
-        create_activity_log(
+        await create_activity_log(
             client_id=redemption.client_id,
             activity_type="redemption_payment_sent",
             amount=confirmation_data.amount,
@@ -17898,8 +17900,8 @@ async def get_payment_confirmations(transaction_type: str):
     """Get all payment confirmations by transaction type (deposit/redemption)"""
     try:
         confirmations = [
-            conf.dict() for conf in payment_confirmations.values() 
-            if conf.transaction_type == transaction_type
+            conf for conf in await payment_confirmations.values()
+            if conf["transaction_type"] == transaction_type
         ]
         
         # Sort by confirmation date (most recent first)
@@ -17920,7 +17922,7 @@ async def get_payment_confirmations(transaction_type: str):
 async def get_all_payment_confirmations():
     """Get all payment confirmations"""
     try:
-        confirmations = [conf.dict() for conf in payment_confirmations.values()]
+        confirmations = await payment_confirmations.values()
         
         # Sort by confirmation date (most recent first)
         confirmations.sort(key=lambda x: x["confirmation_date"], reverse=True)
@@ -17937,13 +17939,15 @@ async def get_all_payment_confirmations():
 
 # Fund Portfolio & Cash Flow Management Endpoints
 @api_router.get("/admin/funds-overview")
+@response_cache.cached("admin/funds-overview", tags=(TAG_INVESTMENTS, TAG_MT5_ACCOUNTS))
 async def get_funds_overview():
     """Get comprehensive fund overview for admin portfolio management"""
     try:
         funds_overview = {}
         
         # Get all clients and their investments from MongoDB
-        all_clients = mongodb_manager.get_all_clients()
+        all_clients = await mongodb_manager.get_all_clients()
+        investments_by_client = await mongodb_manager.get_investments_by_client(c['id'] for c in all_clients)
         
         for fund_code, fund_config in FIDUS_FUND_CONFIG.items():
             # Calculate fund AUM from MongoDB investments
@@ -17953,7 +17957,7 @@ async def get_funds_overview():
             
             # Sum all investments for this fund from MongoDB
             for client in all_clients:
-                client_investments_list = mongodb_manager.get_client_investments(client['id'])
+                client_investments_list = investments_by_client[client['id']]
                 for investment in client_investments_list:
                     if investment['fund_code'] == fund_code:
                         current_value = investment['current_value']
@@ -19920,6 +19924,7 @@ async def send_gmail_message_oauth(
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/v2/derived/fund-portfolio")
+@response_cache.cached("v2/derived/fund-portfolio", tags=(TAG_INVESTMENTS, TAG_MT5_ACCOUNTS))
 async def get_fund_portfolio_v2():
     """
     V2 Fund Portfolio - SSOT Based on Investment Records
@@ -19994,6 +19999,7 @@ async def get_fund_portfolio_v2():
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/fund-portfolio/overview")
+@response_cache.cached("fund-portfolio/overview", tags=(TAG_INVESTMENTS, TAG_MT5_ACCOUNTS))
 async def get_fund_portfolio_overview():
     """Get fund portfolio overview for the dashboard - With WEIGHTED PERFORMANCE"""
     logging.info("🔍 DEBUG: fund-portfolio/overview endpoint START")
@@ -20528,8 +20534,9 @@ async def get_corrected_fund_performance(current_user: dict = Depends(get_curren
         logging.error(f"❌ Error calculating corrected fund performance: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Fund performance calculation failed: {str(e)}")
 
-# In-memory rebate storage
-fund_rebates = []  # List of rebate entries
+async def _load_fund_rebates() -> list:
+    """Manual broker rebate entries (fund_rebates collection)"""
+    return await db.fund_rebates.find({}, {"_id": 0}).to_list(length=None)
 
 @api_router.post("/admin/rebates/add")
 async def add_rebate(rebate_data: dict):
@@ -20546,7 +20553,7 @@ async def add_rebate(rebate_data: dict):
             "created_by": "admin"
         }
         
-        fund_rebates.append(rebate_entry)
+        await db.fund_rebates.insert_one(dict(rebate_entry))
         
         logging.info(f"Rebate added: {rebate_entry['amount']} for {rebate_entry['fund_code']} fund")
         
@@ -20565,7 +20572,7 @@ async def get_all_rebates():
     """Get all rebate entries"""
     try:
         # Sort by date (most recent first)
-        sorted_rebates = sorted(fund_rebates, key=lambda x: x["date"], reverse=True)
+        sorted_rebates = sorted(await _load_fund_rebates(), key=lambda x: x["date"], reverse=True)
         
         return {
             "success": True,
@@ -20645,10 +20652,11 @@ async def get_redemption_schedule(timeframe: str = "3months"):
         upcoming_redemptions = []
         
         # Get all client investments from MongoDB and calculate upcoming redemption opportunities
-        all_clients = mongodb_manager.get_all_clients()
+        all_clients = await mongodb_manager.get_all_clients()
+        investments_by_client = await mongodb_manager.get_investments_by_client(c['id'] for c in all_clients)
         for client in all_clients:
             client_id = client['id']
-            client_investments = mongodb_manager.get_client_investments(client_id)
+            client_investments = investments_by_client[client_id]
             for investment in client_investments:
                 fund_code = investment['fund_code']
                 principal_amount = investment['principal_amount']
@@ -20707,7 +20715,7 @@ async def get_redemption_schedule(timeframe: str = "3months"):
             "CORE": 0, "BALANCE": 0, "DYNAMIC": 0, "UNLIMITED": 0
         }
         
-        for rebate in fund_rebates:
+        for rebate in await _load_fund_rebates():
             rebate_date = datetime.fromisoformat(rebate['date'])
             if start_date <= rebate_date <= end_date:
                 if fund == "all" or rebate['fund_code'] == fund:
@@ -20729,7 +20737,7 @@ async def get_redemption_schedule(timeframe: str = "3months"):
         }
         
         for client in all_clients:
-            client_investments = mongodb_manager.get_client_investments(client['id'])
+            client_investments = investments_by_client[client['id']]
             for investment in client_investments:
                 fund_code = investment['fund_code']
                 principal_amount = investment['principal_amount']
@@ -20855,7 +20863,7 @@ async def get_redemption_schedule(timeframe: str = "3months"):
         
         # Add MT5 profit records
         for client in all_clients:
-            client_investments = mongodb_manager.get_client_investments(client['id'])
+            client_investments = investments_by_client[client['id']]
             for investment in client_investments:
                 trading_profit = investment['current_value'] - investment['principal_amount']
                 if trading_profit != 0:
@@ -20869,7 +20877,7 @@ async def get_redemption_schedule(timeframe: str = "3months"):
                     })
         
         # Add rebate records
-        for rebate in fund_rebates:
+        for rebate in await _load_fund_rebates():
             rebate_date = datetime.fromisoformat(rebate['date'])
             if start_date <= rebate_date <= end_date:
                 if fund == "all" or rebate['fund_code'] == fund:
@@ -20884,7 +20892,7 @@ async def get_redemption_schedule(timeframe: str = "3months"):
         
         # Add client obligation records
         for client in all_clients:
-            client_investments = mongodb_manager.get_client_investments(client['id'])
+            client_investments = investments_by_client[client['id']]
             for investment in client_investments:
                 if investment['interest_earned'] > 0:
                     cash_flows.append({
@@ -20937,10 +20945,11 @@ async def get_redemption_schedule(timeframe: str = "3months"):
         upcoming_redemptions = []
         
         # Get all client investments from MongoDB and calculate upcoming redemption opportunities
-        all_clients = mongodb_manager.get_all_clients()
+        all_clients = await mongodb_manager.get_all_clients()
+        investments_by_client = await mongodb_manager.get_investments_by_client(c['id'] for c in all_clients)
         for client in all_clients:
             client_name = client.get("name", f"Client {client['id']}")
-            client_investments_list = mongodb_manager.get_client_investments(client['id'])
+            client_investments_list = investments_by_client[client['id']]
             
             for investment_data in client_investments_list:
                 fund_code = investment_data['fund_code']
@@ -21001,6 +21010,9 @@ async def get_cashflow_projections(months: int = 12):
     try:
         projections = []
         today = datetime.now(timezone.utc)
+        active_investments = await db.investments.find(
+            {}, {"_id": 0, "fund_code": 1, "principal_amount": 1}
+        ).to_list(length=None)
         
         for i in range(months):
             projection_date = today + relativedelta(months=i)
@@ -21012,14 +21024,14 @@ async def get_cashflow_projections(months: int = 12):
             projected_outflow = 0
             
             # Add some realistic projections based on current investments
-            for client_id, investments in client_investments.items():
-                for investment_data in investments:
-                    investment = FundInvestment(**investment_data)
-                    fund_config = FIDUS_FUND_CONFIG[investment.fund_code]
-                    
-                    # Project monthly interest payments as potential outflows
-                    monthly_interest = investment.principal_amount * (fund_config.interest_rate / 100)
-                    projected_outflow += monthly_interest
+            for investment in active_investments:
+                fund_config = FIDUS_FUND_CONFIG.get(investment.get("fund_code"))
+                if not fund_config:
+                    continue
+                
+                # Project monthly interest payments as potential outflows
+                monthly_interest = investment.get("principal_amount", 0) * (fund_config.interest_rate / 100)
+                projected_outflow += monthly_interest
             
             # Mock some additional inflow projections
             projected_inflow = projected_outflow * 1.2  # Assume 20% net positive flow
@@ -21040,11 +21052,20 @@ async def get_cashflow_projections(months: int = 12):
         logging.error(f"Get cash flow projections error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch cash flow projections")
 
+def _format_activity_log(log: dict) -> dict:
+    """activity_logs document -> API shape (entries from log_activity only carry log_id)"""
+    log.pop("_id", None)
+    log.setdefault("id", log.get("log_id"))
+    return log
+
 @api_router.get("/activity-logs/client/{client_id}")
 async def get_client_activity_logs(client_id: str):
     """Get all activity logs for a specific client"""
     try:
-        client_logs = [log.dict() for log in activity_logs if log.client_id == client_id]
+        client_logs = [
+            _format_activity_log(log)
+            for log in await db.activity_logs.find({"client_id": client_id}).to_list(length=None)
+        ]
         
         # Sort by timestamp (most recent first)
         client_logs.sort(key=lambda x: x["timestamp"], reverse=True)
@@ -21065,20 +21086,20 @@ async def get_all_activity_logs():
     try:
         all_logs = []
         
-        for log in activity_logs:
-            log_data = log.dict()
+        for log in await db.activity_logs.find({}).to_list(length=None):
+            log_data = _format_activity_log(log)
             
             # Add client info from MongoDB (NO MOCK_USERS)
             client_info = None
             try:
-                client_doc = await db.users.find_one({"id": log.client_id, "type": "client"})
+                client_doc = await db.users.find_one({"id": log_data["client_id"], "type": "client"})
                 if client_doc:
                     client_info = {
                         "name": client_doc["name"],
                         "email": client_doc["email"]
                     }
             except Exception as e:
-                logging.warning(f"Could not find client {log.client_id}: {str(e)}")
+                logging.warning(f"Could not find client {log_data['client_id']}: {str(e)}")
                 client_info = {"name": "Unknown", "email": "unknown@example.com"}
             
             log_data["client_info"] = client_info or {"name": "Unknown", "email": "unknown@example.com"}
@@ -21106,7 +21127,7 @@ async def get_all_clients():
     """Get all clients with their investment readiness status from MongoDB"""
     try:
         # Get all clients from MongoDB
-        clients = mongodb_manager.get_all_clients()
+        clients = await mongodb_manager.get_all_clients()
         
         # Calculate statistics
         total_clients = len(clients)
@@ -21260,7 +21281,7 @@ async def update_client_readiness(client_id: str, readiness_data: ClientInvestme
                 current_readiness['account_creation_date'] = datetime.fromisoformat(current_readiness['account_creation_date'].replace('Z', '+00:00'))
             
             # Call sync method (not async)
-            sync_success = mongodb_manager.update_client_readiness(client_id, current_readiness)
+            sync_success = await mongodb_manager.update_client_readiness(client_id, current_readiness)
             if sync_success:
                 logging.info(f"✅ FIXED: Client readiness synced to MongoDB for {client_id}")
             else:
@@ -21579,7 +21600,7 @@ async def get_chava_connection_status(current_user: dict = Depends(get_current_a
 async def get_client_mt5_accounts(client_id: str):
     """Get all MT5 accounts for a specific client"""
     try:
-        accounts = mongodb_manager.get_client_mt5_accounts(client_id)
+        accounts = await mongodb_manager.get_client_mt5_accounts(client_id)
         
         # Get real-time performance for each account
         enriched_accounts = []
@@ -21946,7 +21967,7 @@ async def add_manual_mt5_account(request: Request):
             raise HTTPException(status_code=400, detail="Invalid broker code")
         
         # Validate client exists
-        client = mongodb_manager.get_client(data['client_id'])
+        client = await mongodb_manager.get_client(data['client_id'])
         if not client:
             raise HTTPException(status_code=404, detail="Client not found")
         
@@ -21983,7 +22004,7 @@ async def add_manual_mt5_account(request: Request):
 async def get_mt5_accounts_by_broker():
     """Get all MT5 accounts grouped by broker"""
     try:
-        accounts = mongodb_manager.get_all_mt5_accounts()
+        accounts = await mongodb_manager.get_all_mt5_accounts()
         
         # Group accounts by broker
         accounts_by_broker = {}
@@ -22240,6 +22261,7 @@ async def get_mt5_system_status():
 
 # Import MT5 Deals Service
 from services.mt5_deals_service import MT5DealsService
+from services.deal_rollup_service import DealRollupService, merge_rows
 
 # Initialize service
 mt5_deals_service = MT5DealsService(db)
@@ -23311,61 +23333,29 @@ async def get_daily_performance(days: int = 30, account: int = None):
             account_list = [account]
             account_display = account
         
-        # CRITICAL FIX: Calculate from mt5_trades with full 30-day calendar
-        logging.info(f"   🔍 Calculating daily performance from mt5_trades...")
-        
-        # Query mt5_trades collection
-        trades_cursor = db.mt5_trades.find({
-            "account": {"$in": account_list},
-            "close_time": {"$gte": start_date, "$lt": end_date}
-        }).sort("close_time", 1)
+        # Closed trades per day from the pre-aggregated deal rollups (mt5_deals)
+        logging.info(f"   🔍 Calculating daily performance from deal_rollups_daily...")
         
-        trades = await trades_cursor.to_list(length=None)
-        logging.info(f"   ✅ Found {len(trades)} trades in mt5_trades")
+        rollup_rows = await DealRollupService(db).rows(start=start_date, end=end_date, accounts=account_list)
         
-        # Group trades by date
         daily_map = {}
-        for trade in trades:
-            close_time = trade.get('close_time')
-            if isinstance(close_time, datetime):
-                trade_date = close_time.replace(hour=0, minute=0, second=0, microsecond=0)
-            elif isinstance(close_time, str):
-                trade_date = datetime.fromisoformat(close_time).replace(hour=0, minute=0, second=0, microsecond=0)
-            else:
+        for (day_key,), day in merge_rows(rollup_rows, ("day",)).items():
+            trade_date = datetime.strptime(day_key, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+            if not (start_date <= trade_date < end_date) or not day['closed_trades']:
                 continue
-            
-            date_key = trade_date.isoformat()
-            
-            if date_key not in daily_map:
-                daily_map[date_key] = {
-                    'date': trade_date,
-                    'total_trades': 0,
-                    'winning_trades': 0,
-                    'losing_trades': 0,
-                    'breakeven_trades': 0,
-                    'total_pnl': 0,
-                    'gross_profit': 0,
-                    'gross_loss': 0,
-                    'largest_win': 0,
-                    'largest_loss': 0
-                }
-            
-            profit = float(trade.get('profit', 0))
-            daily_map[date_key]['total_trades'] += 1
-            daily_map[date_key]['total_pnl'] += profit
-            
-            if profit > 0:
-                daily_map[date_key]['winning_trades'] += 1
-                daily_map[date_key]['gross_profit'] += profit
-                if profit > daily_map[date_key]['largest_win']:
-                    daily_map[date_key]['largest_win'] = profit
-            elif profit < 0:
-                daily_map[date_key]['losing_trades'] += 1
-                daily_map[date_key]['gross_loss'] += profit
-                if profit < daily_map[date_key]['largest_loss']:
-                    daily_map[date_key]['largest_loss'] = profit
-            else:
-                daily_map[date_key]['breakeven_trades'] += 1
+            daily_map[trade_date.isoformat()] = {
+                'date': trade_date,
+                'total_trades': day['closed_trades'],
+                'winning_trades': day['closed_wins'],
+                'losing_trades': day['closed_losses'],
+                'breakeven_trades': day['closed_breakeven'],
+                'total_pnl': day['closed_gross_profit'] + day['closed_gross_loss'],
+                'gross_profit': day['closed_gross_profit'],
+                'gross_loss': day['closed_gross_loss'],
+                'largest_win': day['largest_win'] or 0,
+                'largest_loss': day['largest_loss'] or 0
+            }
+        logging.info(f"   ✅ Found {len(daily_map)} trading days in deal_rollups_daily")
         
         # Fill in missing days with $0 (days with no trading)
         # Create exactly 30 days from start_date
@@ -23396,7 +23386,7 @@ async def get_daily_performance(days: int = 30, account: int = None):
             day['date'] = day['date'].isoformat()
             daily_data.append(day)
         
-        logging.info(f"   ✅ Calculated {len(daily_data)} days from mt5_trades (including {len([d for d in daily_data if d['total_trades'] == 0])} days with no trades)")
+        logging.info(f"   ✅ Calculated {len(daily_data)} days from deal rollups (including {len([d for d in daily_data if d['total_trades'] == 0])} days with no trades)")
         
         # Convert MongoDB ObjectIds and dates to JSON serializable format
         for day in daily_data:
@@ -23415,7 +23405,7 @@ async def get_daily_performance(days: int = 30, account: int = None):
             "period_start": start_date.isoformat(),
             "period_end": end_date.isoformat(),
             "account": account_display,
-            "data_source": "mt5_trades_with_full_calendar"
+            "data_source": "deal_rollups_with_full_calendar"
         }
         
     except Exception as e:
@@ -23498,24 +23488,17 @@ async def trigger_manual_sync():
 # ===============================================================================
 
 @api_router.get("/admin/trading-analytics/portfolio")
+@response_cache.cached("admin/trading-analytics/portfolio", tags=(TAG_MT5_ACCOUNTS, TAG_MT5_DEALS))
 async def get_portfolio_analytics(
     period_days: int = 30,
     current_user: dict = Depends(get_current_admin_user)
 ):
     """
-    Get portfolio-level trading analytics (with 5-minute cache)
+    Get portfolio-level trading analytics (cached until the next sync)
     
     Returns overall performance across all funds and managers
     """
     try:
-        # Check cache first (5 minute TTL)
-        cache_key = f"portfolio_analytics_{period_days}"
-        cached_data = response_cache.get(cache_key, ttl_seconds=300)
-        
-        if cached_data:
-            return cached_data
-        
-        # Cache miss - fetch fresh data
         from services.trading_analytics_service import TradingAnalyticsService
         
         service = TradingAnalyticsService(db)
@@ -23528,9 +23511,6 @@ async def get_portfolio_analytics(
             "cached": False
         }
         
-        # Store in cache
-        response_cache.set(cache_key, result)
-        
         return result
         
     except Exception as e:
@@ -23578,12 +23558,13 @@ async def get_fund_analytics(
         }
 
 @api_router.get("/admin/trading-analytics/managers")
+@response_cache.cached("admin/trading-analytics/managers", tags=(TAG_MT5_ACCOUNTS, TAG_MT5_DEALS))
 async def get_managers_ranking(
     period_days: int = 30,
     current_user: dict = Depends(get_current_admin_user)
 ):
     """
-    Get all managers ranked by performance (with 5-minute cache)
+    Get all managers ranked by performance (cached until the next sync)
     
     Returns complete manager rankings with risk-adjusted metrics:
     - Sharpe Ratio
@@ -23596,14 +23577,6 @@ async def get_managers_ranking(
     This is the PRIMARY endpoint for manager-level analytics
     """
     try:
-        # Check cache first (5 minute TTL)
-        cache_key = f"managers_ranking_{period_days}"
-        cached_data = response_cache.get(cache_key, ttl_seconds=300)
-        
-        if cached_data:
-            return cached_data
-        
-        # Cache miss - fetch fresh data
         from services.trading_analytics_service import TradingAnalyticsService
         
         service = TradingAnalyticsService(db)
@@ -23616,9 +23589,6 @@ async def get_managers_ranking(
             "cached": False
         }
         
-        # Store in cache
-        response_cache.set(cache_key, result)
-        
         return result
         
     except Exception as e:
@@ -23685,6 +23655,101 @@ async def get_manager_detailed_analytics(
         }
 
 
+# Rolling performance series (services/rolling_performance_service.py): built
+# from completed days only, so responses are cached for the rest of the UTC day
+# or until deals, account allocations or manager assignments change
+
+@api_router.get("/admin/trading-analytics/rolling/managers")
+@response_cache.cached("admin/trading-analytics/rolling/managers", tags=(TAG_MT5_ACCOUNTS, TAG_MT5_DEALS, TAG_MONEY_MANAGERS), ttl_seconds=86400, daily=True)
+async def get_managers_rolling_performance(
+    days: int = 365,
+    current_user: dict = Depends(get_current_admin_user)
+):
+    """
+    Rolling 7/30/90-day return, volatility, Sharpe and drawdown series for
+    every active manager (one request for the trend charts)
+    """
+    try:
+        from services.rolling_performance_service import RollingPerformanceService
+
+        data = await RollingPerformanceService(db).managers(days)
+        items = data.pop("items")
+        return {"success": True, **data, "managers": items}
+
+    except Exception as e:
+        logging.error(f"Managers rolling performance error: {str(e)}")
+        return {
+            "success": False,
+            "error": f"Failed to get rolling performance: {str(e)}",
+            "managers": []
+        }
+
+@api_router.get("/admin/trading-analytics/rolling/managers/{manager_id}")
+@response_cache.cached("admin/trading-analytics/rolling/manager", tags=(TAG_MT5_ACCOUNTS, TAG_MT5_DEALS, TAG_MONEY_MANAGERS), ttl_seconds=86400, daily=True)
+async def get_manager_rolling_performance(
+    manager_id: str,
+    days: int = 365,
+    current_user: dict = Depends(get_current_admin_user)
+):
+    """
+    Rolling performance series for one manager
+
+    Args:
+        manager_id: money_managers manager_id, or an MT5 account number
+            (e.g. a LIVE DEMO candidate)
+        days: Number of trailing days to return (max 1095)
+    """
+    try:
+        from services.rolling_performance_service import RollingPerformanceService
+
+        data = await RollingPerformanceService(db).manager(manager_id, days)
+        if data is None:
+            return {
+                "success": False,
+                "error": f"Manager not found: {manager_id}",
+                "manager": None
+            }
+        items = data.pop("items")
+        return {"success": True, **data, "manager": items[0]}
+
+    except Exception as e:
+        logging.error(f"Manager rolling performance error for {manager_id}: {str(e)}")
+        return {
+            "success": False,
+            "error": f"Failed to get rolling performance: {str(e)}",
+            "manager": None
+        }
+
+@api_router.get("/admin/trading-analytics/rolling/funds/{fund_name}")
+@response_cache.cached("admin/trading-analytics/rolling/fund", tags=(TAG_MT5_ACCOUNTS, TAG_MT5_DEALS, TAG_MONEY_MANAGERS), ttl_seconds=86400, daily=True)
+async def get_fund_rolling_performance(
+    fund_name: str,
+    days: int = 365,
+    current_user: dict = Depends(get_current_admin_user)
+):
+    """Rolling performance series for a fund (returns measured on the fund AUM)"""
+    try:
+        from services.rolling_performance_service import RollingPerformanceService
+
+        data = await RollingPerformanceService(db).fund(fund_name, days)
+        if data is None:
+            return {
+                "success": False,
+                "error": f"Unknown fund: {fund_name}",
+                "fund": None
+            }
+        items = data.pop("items")
+        return {"success": True, **data, "fund": items[0]}
+
+    except Exception as e:
+        logging.error(f"Fund rolling performance error for {fund_name}: {str(e)}")
+        return {
+            "success": False,
+            "error": f"Failed to get rolling performance: {str(e)}",
+            "fund": None
+        }
+
+
 
 # ===============================================================================
 # AI STRATEGY ADVISOR ENDPOINTS (Phase 3)
@@ -23935,6 +24000,7 @@ async def calculate_max_lots(
 async def get_strategy_risk_analysis(
     account: int,
     period_days: int = 30,
+    fresh: bool = False,
     current_user: dict = Depends(get_current_admin_user)
 ):
     """
@@ -23944,12 +24010,14 @@ async def get_strategy_risk_analysis(
     - Risk Control composite score
     - Per-instrument max lots analysis
     - Breach detection
+    
+    Served from the latest risk snapshot (see "snapshot" for its age);
+    pass fresh=true to recompute from deals.
     """
     try:
-        from services.hull_risk_engine import HullRiskEngine
-        engine = HullRiskEngine(db)
+        from services.risk_snapshot_service import RiskSnapshotService
         
-        analysis = await engine.get_strategy_risk_analysis(account, period_days)
+        analysis = await RiskSnapshotService(db).serve("strategy_analysis", account, period_days, fresh)
         return {"success": True, **analysis}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -24016,29 +24084,28 @@ async def get_all_copy_ratio_recommendations(
         
         accounts = await db.mt5_accounts.find(query).to_list(length=100)
         
+        # One batch pass: bulk-loaded policies/specs, deals fetched concurrently.
+        # Simplified analysis for bulk - skip full risk score calculation
+        analyses = await engine.analyze_portfolio(accounts, period_days, skip_risk_score=True)
+        
         results = []
-        for acc in accounts:
-            account_num = acc.get("account")
-            try:
-                # Use simplified analysis for bulk - skip full risk score calculation
-                analysis = await engine.analyze_copy_ratio(account_num, period_days, skip_risk_score=True)
-                if not analysis.get("error"):
-                    lot_analysis = analysis.get("lot_analysis") or {}
-                    results.append({
-                        "account": account_num,
-                        "manager_name": analysis.get("manager_name"),
-                        "account_type": analysis.get("account_type"),
-                        "current_ratio": analysis.get("current_copy_ratio"),
-                        "recommended_ratio": analysis.get("recommended_ratio"),
-                        "ratio_change": analysis.get("ratio_change"),
-                        "urgency": analysis.get("urgency"),
-                        "action": analysis.get("action"),
-                        "risk_score": analysis.get("risk_control_score"),
-                        "breach_rate": lot_analysis.get("breach_rate", 0)
-                    })
-            except Exception as inner_e:
-                logger.error(f"Error processing account {account_num}: {inner_e}")
+        for analysis in analyses:
+            if analysis.get("error"):
+                logger.error(f"Error processing account {analysis.get('account')}: {analysis['error']}")
                 continue
+            lot_analysis = analysis.get("lot_analysis") or {}
+            results.append({
+                "account": analysis.get("account"),
+                "manager_name": analysis.get("manager_name"),
+                "account_type": analysis.get("account_type"),
+                "current_ratio": analysis.get("current_copy_ratio"),
+                "recommended_ratio": analysis.get("recommended_ratio"),
+                "ratio_change": analysis.get("ratio_change"),
+                "urgency": analysis.get("urgency"),
+                "action": analysis.get("action"),
+                "risk_score": analysis.get("risk_control_score"),
+                "breach_rate": lot_analysis.get("breach_rate", 0)
+            })
         
         # Sort by urgency
         urgency_order = {"CRITICAL": 0, "HIGH": 1, "MEDIUM": 2, "LOW": 3, "INFO": 4, "OK": 5}
@@ -24185,6 +24252,7 @@ async def get_what_if_analysis(
 async def get_risk_control_score(
     account: int,
     period_days: int = 30,
+    fresh: bool = False,
     current_user: dict = Depends(get_current_admin_user)
 ):
     """
@@ -24195,12 +24263,14 @@ async def get_risk_control_score(
     - Margin usage compliance (25%)
     - Drawdown compliance (25%)
     - Position size compliance (25%)
+    
+    Served from the latest risk snapshot (see "snapshot" for its age);
+    pass fresh=true to recompute from deals.
     """
     try:
-        from services.hull_risk_engine import HullRiskEngine
-        engine = HullRiskEngine(db)
+        from services.risk_snapshot_service import RiskSnapshotService
         
-        score = await engine.calculate_risk_control_score(account, period_days)
+        score = await RiskSnapshotService(db).serve("risk_control_score", account, period_days, fresh)
         return {"success": True, **score}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -24210,6 +24280,7 @@ async def get_risk_control_score(
 async def get_drawdown_analysis(
     account: int,
     period_days: int = 90,
+    fresh: bool = False,
     current_user: dict = Depends(get_current_admin_user)
 ):
     """
@@ -24228,12 +24299,14 @@ async def get_drawdown_analysis(
     1. Send detailed reports to money managers
     2. Identify systematic issues in trading algorithms
     3. Generate parameter adjustments for bots
+    
+    Served from the latest risk snapshot (see "snapshot" for its age);
+    pass fresh=true to recompute from deals.
     """
     try:
-        from services.hull_risk_engine import HullRiskEngine
-        engine = HullRiskEngine(db)
+        from services.risk_snapshot_service import RiskSnapshotService
         
-        analysis = await engine.analyze_drawdown_triggers(account, period_days)
+        analysis = await RiskSnapshotService(db).serve("drawdown_analysis", account, period_days, fresh)
         return analysis
     except Exception as e:
         logger.error(f"Error in drawdown analysis: {e}")
@@ -24243,6 +24316,7 @@ async def get_drawdown_analysis(
 @api_router.get("/admin/risk-engine/narrative")
 async def get_risk_profile_narrative(
     period_days: int = 30,
+    fresh: bool = False,
     current_user: dict = Depends(get_current_admin_user)
 ):
     """
@@ -24254,21 +24328,14 @@ async def get_risk_profile_narrative(
     - Red flags & what caused them
     - Actionable fixes
     - Confidence notes
+    
+    Served from the latest risk snapshot (see "snapshot" for its age);
+    pass fresh=true to recompute from managers' deals.
     """
     try:
-        from services.hull_risk_engine import HullRiskEngine
-        from services.trading_analytics_service import TradingAnalyticsService
-        
-        # Get managers data
-        analytics_service = TradingAnalyticsService(db)
-        managers_data = await analytics_service.get_managers_ranking(period_days)
-        
-        engine = HullRiskEngine(db)
-        narrative = engine.generate_risk_profile_narrative(
-            managers_data.get("managers", []),
-            period_days
-        )
+        from services.risk_snapshot_service import RiskSnapshotService
         
+        narrative = await RiskSnapshotService(db).serve("narrative", None, period_days, fresh)
         return {"success": True, **narrative}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -24785,6 +24852,7 @@ async def sync_from_vps(current_user: dict = Depends(get_current_admin_user)):
         return error_result
 
 
+@job_leases.exclusive('auto_vps_sync', ttl_seconds=240)
 async def automatic_vps_sync():
     """
     Background job that runs automatically
@@ -24807,6 +24875,19 @@ async def automatic_vps_sync():
             logging.info("🟢 LUCRUM-ONLY mode - VPS sync skipped. Use GitHub Actions for LUCRUM sync.")
             return
         
+        # Accounts a bridge is pushing events for are only polled as periodic reconciliation
+        from services.bridge_event_ingest import BridgeEventIngestService
+        known_accounts = [
+            doc['account'] for doc in await db.mt5_accounts.find({}, {'_id': 0, 'account': 1}).to_list(length=None)
+            if doc.get('account')
+        ]
+        due_accounts = await BridgeEventIngestService(db).reconcile_due(known_accounts)
+        if known_accounts and not due_accounts:
+            logging.info("📨 Bridge event stream is live for every account - skipping poll until the next reconciliation")
+            return
+        # None polls everything, including accounts the bridge reports that are not stored yet
+        poll_accounts = None if len(due_accounts) == len(known_accounts) else due_accounts
+        
         # Get VPS sync service
         vps_sync = await get_vps_sync_service(db)
         
@@ -24820,7 +24901,7 @@ async def automatic_vps_sync():
         logging.info("✅ VPS Bridge is healthy, proceeding with sync")
         
         # 1. Sync all ACCOUNT BALANCES from VPS
-        accounts_result = await vps_sync.sync_all_accounts()
+        accounts_result = await vps_sync.sync_all_accounts(accounts=poll_accounts)
         
         if accounts_result.get('success'):
             logging.info(f"✅ Accounts sync complete: {accounts_result.get('accounts_synced')}/{accounts_result.get('total_accounts')} accounts synced in {accounts_result.get('duration_seconds', 0):.2f}s")
@@ -24851,7 +24932,7 @@ async def automatic_vps_sync():
             logging.error(f"❌ Accounts sync failed: {accounts_result.get('error')}")
         
         # 2. Sync all TRADES/DEALS from VPS
-        trades_result = await vps_sync.sync_all_trades(limit_per_account=100)
+        trades_result = await vps_sync.sync_all_trades(limit_per_account=100, accounts=poll_accounts)
         
         if trades_result.get('success'):
             logging.info(f"✅ Trades sync complete: {trades_result.get('total_trades_synced')} trades from {trades_result.get('accounts_processed')}/{trades_result.get('total_accounts')} accounts")
@@ -24870,6 +24951,7 @@ async def automatic_vps_sync():
 
 
 # Background health monitoring function
+@job_leases.exclusive('auto_health_check', ttl_seconds=240)
 async def background_health_check():
     """
     Background task to perform health checks and trigger alerts
@@ -25103,13 +25185,32 @@ async def get_rebate_configs(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@api_router.post("/admin/rebates/calculate")
+def _parse_utc_date(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+@job_queue.handler('rebates.calculate')
+async def calculate_rebates_job(job: JobContext, start_date: str, end_date: str,
+                                account_ids: list = None, auto_approve: bool = False):
+    from services.rebate_calculator import RebateCalculator
+    
+    return await RebateCalculator(db).calculate_rebates_for_period(
+        start_date=_parse_utc_date(start_date),
+        end_date=_parse_utc_date(end_date),
+        account_ids=account_ids or None,
+        auto_approve=auto_approve,
+        progress=job.progress
+    )
+
+
+@api_router.post("/admin/rebates/calculate", status_code=202)
 async def calculate_rebates(
     calculation_data: dict,
     current_user: dict = Depends(get_current_admin_user)
 ):
     """
-    Calculate rebates for a specific period
+    Calculate rebates for a specific period (background job)
     
     Request body:
     {
@@ -25118,15 +25219,12 @@ async def calculate_rebates(
         "end_date": "2025-10-13",
         "auto_approve": false
     }
+    
+    Returns the queued job; poll GET /api/jobs/{job_id} for progress and the result.
     """
     try:
-        from datetime import datetime, timezone
-        from services.rebate_calculator import RebateCalculator
-        
         start_date_str = calculation_data.get('start_date')
         end_date_str = calculation_data.get('end_date')
-        account_ids = calculation_data.get('account_ids', [])
-        auto_approve = calculation_data.get('auto_approve', False)
         
         if not start_date_str or not end_date_str:
             raise HTTPException(
@@ -25134,32 +25232,89 @@ async def calculate_rebates(
                 detail="start_date and end_date are required"
             )
         
-        # Parse dates
-        start_date = datetime.fromisoformat(start_date_str.replace('Z', '+00:00'))
-        if not start_date.tzinfo:
-            start_date = start_date.replace(tzinfo=timezone.utc)
+        # Validate dates now so bad input fails the request, not the job
+        try:
+            _parse_utc_date(start_date_str)
+            _parse_utc_date(end_date_str)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="start_date and end_date must be ISO dates")
         
-        end_date = datetime.fromisoformat(end_date_str.replace('Z', '+00:00'))
-        if not end_date.tzinfo:
-            end_date = end_date.replace(tzinfo=timezone.utc)
+        job = await job_queue.enqueue('rebates.calculate', {
+            'start_date': start_date_str,
+            'end_date': end_date_str,
+            'account_ids': sorted(str(a) for a in calculation_data.get('account_ids') or []),
+            'auto_approve': bool(calculation_data.get('auto_approve', False))
+        }, created_by=current_user.get('id'))
         
-        # Initialize calculator
-        calculator = RebateCalculator(db)
+        return {"success": True, **job}
         
-        # Calculate rebates
-        result = await calculator.calculate_rebates_for_period(
-            start_date=start_date,
-            end_date=end_date,
-            account_ids=account_ids if account_ids else None,
-            auto_approve=auto_approve
-        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"❌ Calculate rebates error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@job_queue.handler('rebates.backfill')
+async def backfill_rebates_job(job: JobContext, start_month: str, end_month: str,
+                               account_ids: list = None, auto_approve: bool = False):
+    from services.rebate_calculator import RebateCalculator, monthly_periods
+    
+    return await RebateCalculator(db).calculate_rebates_for_periods(
+        monthly_periods(start_month, end_month),
+        account_ids=account_ids or None,
+        auto_approve=auto_approve,
+        progress=job.progress
+    )
+
+
+@api_router.post("/admin/rebates/backfill", status_code=202)
+async def backfill_rebates(
+    backfill_data: dict,
+    current_user: dict = Depends(get_current_admin_user)
+):
+    """
+    Recalculate rebates for a range of calendar months in one run (background job)
+    
+    Request body:
+    {
+        "start_month": "2025-01",
+        "end_month": "2025-09",
+        "account_ids": ["886557"],  // Optional, all if empty
+        "auto_approve": false
+    }
+    
+    Existing transactions are updated in place; their verification and
+    payment status are kept. Poll GET /api/jobs/{job_id} for the result.
+    """
+    try:
+        start_month = backfill_data.get('start_month')
+        end_month = backfill_data.get('end_month')
         
-        return result
+        if not start_month or not end_month:
+            raise HTTPException(status_code=400, detail="start_month and end_month are required")
+        
+        try:
+            from services.rebate_calculator import monthly_periods
+            periods = monthly_periods(start_month, end_month)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="start_month and end_month must be YYYY-MM")
+        if not periods:
+            raise HTTPException(status_code=400, detail="end_month must not be before start_month")
+        
+        job = await job_queue.enqueue('rebates.backfill', {
+            'start_month': start_month,
+            'end_month': end_month,
+            'account_ids': sorted(str(a) for a in backfill_data.get('account_ids') or []),
+            'auto_approve': bool(backfill_data.get('auto_approve', False))
+        }, created_by=current_user.get('id'))
+        
+        return {"success": True, "months": len(periods), **job}
         
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"❌ Calculate rebates error: {str(e)}")
+        logging.error(f"❌ Backfill rebates error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -25731,6 +25886,10 @@ async def get_current_performance_fees(current_user: dict = Depends(get_current_
     """
     Get current accrued performance fees for all managers.
     
+    Serves the latest accrual run (scheduled every 15 minutes, or
+    POST /admin/performance-fees/calculate-daily); a new run is only
+    triggered when the latest one is missing or stale.
+    
     Returns:
         Dict with current fee calculations for all active managers
     
@@ -25755,11 +25914,7 @@ async def get_current_performance_fees(current_user: dict = Depends(get_current_
         from services.performance_fee_calculator import PerformanceFeeCalculator
         
         calculator = PerformanceFeeCalculator(db)
-        result = await calculator.calculate_current_performance_fees()
-        
-        logging.info(f"✅ Performance fees calculated: ${result['totals']['total_performance_fees']:.2f}")
-        
-        return result
+        return await calculator.get_latest_accrual()
         
     except Exception as e:
         logging.error(f"Error calculating performance fees: {str(e)}")
@@ -25794,6 +25949,57 @@ async def calculate_daily_performance_fees(current_user: dict = Depends(get_curr
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@job_leases.exclusive('performance_fee_accrual', ttl_seconds=240)
+async def scheduled_performance_fee_accrual():
+    """Accrue performance fees from the latest TRUE P&L (every 15 minutes)"""
+    try:
+        from services.performance_fee_calculator import PerformanceFeeCalculator
+        
+        result = await PerformanceFeeCalculator(db).calculate_current_performance_fees()
+        logging.info(f"📊 Scheduled performance fee accrual: ${result['totals']['total_performance_fees']:.2f}")
+    except Exception as e:
+        logging.error(f"❌ Scheduled performance fee accrual failed: {str(e)}")
+
+scheduler.add_job(
+    scheduled_performance_fee_accrual,
+    'cron',
+    minute='3,18,33,48',  # After the VPS sync has refreshed true_pnl
+    id='performance_fee_accrual',
+    replace_existing=True
+)
+
+
+@job_queue.handler('performance_fees.finalize')
+async def finalize_performance_fees_job(job: JobContext, year: int, month: int):
+    from services.performance_fee_calculator import PerformanceFeeCalculator
+    
+    await job.progress(10, f"Finalizing performance fees for {year}-{month:02d}")
+    return await PerformanceFeeCalculator(db).finalize_monthly_fees(year, month)
+
+
+@api_router.post("/admin/performance-fees/finalize", status_code=202)
+async def finalize_performance_fees(
+    year: int,
+    month: int,
+    current_user: dict = Depends(get_current_admin_user)
+):
+    """
+    Finalize a completed month's performance fees (background job)
+    Creates performance_fee_transactions; poll GET /api/jobs/{job_id} for the result.
+    """
+    if not 1 <= month <= 12:
+        raise HTTPException(status_code=400, detail="month must be 1-12")
+    
+    try:
+        job = await job_queue.enqueue(
+            'performance_fees.finalize', {'year': year, 'month': month}, created_by=current_user.get('id')
+        )
+        return {"success": True, **job}
+    except Exception as e:
+        logging.error(f"Error queueing fee finalization: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @api_router.get("/admin/performance-fees/summary")
 async def get_performance_fees_summary(
     month: int = None,
@@ -26372,7 +26578,7 @@ async def get_mt5_performance_overview():
         total_profit = sum(perf.profit for perf in all_performance.values())
         
         # Get account allocation data
-        all_accounts = mongodb_manager.get_all_mt5_accounts()
+        all_accounts = await mongodb_manager.get_all_mt5_accounts()
         total_allocated = sum(acc['total_allocated'] for acc in all_accounts)
         
         # Calculate performance metrics
@@ -26592,15 +26798,8 @@ async def get_fidus_official_wallets():
 async def get_client_wallets(client_id: str):
     """Get all wallets for a specific client"""
     try:
-        # For now, return from in-memory storage
-        # In production, this would fetch from MongoDB
-        wallets = client_wallets.get(client_id, [])
-        
-        # Convert to serializable format
-        serializable_wallets = []
-        for wallet in wallets:
-            wallet_dict = wallet.dict() if hasattr(wallet, 'dict') else wallet
-            serializable_wallets.append(wallet_dict)
+        # Stored as plain wallet dicts
+        serializable_wallets = await client_wallets.get(client_id, [])
         
         return {
             "success": True,
@@ -26622,18 +26821,17 @@ async def create_client_wallet(client_id: str, wallet_data: ClientWalletCreate):
             **wallet_data.dict()
         )
         
-        # Store in memory (in production, save to MongoDB)
-        if client_id not in client_wallets:
-            client_wallets[client_id] = []
-        
-        client_wallets[client_id].append(wallet)
+        wallets = [ClientWallet(**w) for w in await client_wallets.get(client_id, [])]
+        wallets.append(wallet)
         
         # If this is set as primary, unset other primary wallets
         if wallet.is_primary:
-            for existing_wallet in client_wallets[client_id]:
+            for existing_wallet in wallets:
                 if existing_wallet.wallet_id != wallet.wallet_id:
                     existing_wallet.is_primary = False
         
+        await client_wallets.set(client_id, [w.dict() for w in wallets])
+        
         logging.info(f"Created wallet {wallet.wallet_id} for client {client_id}")
         
         return {
@@ -26650,12 +26848,14 @@ async def create_client_wallet(client_id: str, wallet_data: ClientWalletCreate):
 async def update_client_wallet(client_id: str, wallet_id: str, wallet_data: ClientWalletUpdate):
     """Update an existing client wallet"""
     try:
-        if client_id not in client_wallets:
+        stored_wallets = await client_wallets.get(client_id)
+        if stored_wallets is None:
             raise HTTPException(status_code=404, detail="Client wallets not found")
+        wallets = [ClientWallet(**w) for w in stored_wallets]
         
         # Find the wallet to update
         wallet_to_update = None
-        for wallet in client_wallets[client_id]:
+        for wallet in wallets:
             if wallet.wallet_id == wallet_id:
                 wallet_to_update = wallet
                 break
@@ -26672,10 +26872,12 @@ async def update_client_wallet(client_id: str, wallet_id: str, wallet_data: Clie
         
         # If this is set as primary, unset other primary wallets
         if wallet_data.is_primary:
-            for existing_wallet in client_wallets[client_id]:
+            for existing_wallet in wallets:
                 if existing_wallet.wallet_id != wallet_id:
                     existing_wallet.is_primary = False
         
+        await client_wallets.set(client_id, [w.dict() for w in wallets])
+        
         logging.info(f"Updated wallet {wallet_id} for client {client_id}")
         
         return {
@@ -26694,19 +26896,18 @@ async def update_client_wallet(client_id: str, wallet_id: str, wallet_data: Clie
 async def delete_client_wallet(client_id: str, wallet_id: str):
     """Delete a client wallet"""
     try:
-        if client_id not in client_wallets:
+        stored_wallets = await client_wallets.get(client_id)
+        if stored_wallets is None:
             raise HTTPException(status_code=404, detail="Client wallets not found")
         
         # Find and remove the wallet
-        original_count = len(client_wallets[client_id])
-        client_wallets[client_id] = [
-            wallet for wallet in client_wallets[client_id] 
-            if wallet.wallet_id != wallet_id
-        ]
+        remaining = [wallet for wallet in stored_wallets if wallet["wallet_id"] != wallet_id]
         
-        if len(client_wallets[client_id]) == original_count:
+        if len(remaining) == len(stored_wallets):
             raise HTTPException(status_code=404, detail="Wallet not found")
         
+        await client_wallets.set(client_id, remaining)
+        
         logging.info(f"Deleted wallet {wallet_id} for client {client_id}")
         
         return {
@@ -26726,7 +26927,7 @@ async def get_all_client_wallets(current_user: dict = Depends(get_current_admin_
     try:
         all_wallets = []
         
-        for client_id, wallets in client_wallets.items():
+        for client_id, wallets in await client_wallets.items():
             # Get client info from MongoDB (NO MOCK_USERS)
             client_info = None
             try:
@@ -26741,8 +26942,7 @@ async def get_all_client_wallets(current_user: dict = Depends(get_current_admin_
                 logging.warning(f"Could not find client {client_id}: {str(e)}")
                 client_info = {"id": client_id, "name": "Unknown", "email": "unknown@example.com"}
             
-            for wallet in wallets:
-                wallet_dict = wallet.dict() if hasattr(wallet, 'dict') else wallet
+            for wallet_dict in wallets:
                 wallet_dict['client_info'] = client_info
                 all_wallets.append(wallet_dict)
         
@@ -27830,6 +28030,26 @@ async def rate_limiting_middleware(request: Request, call_next):
 # Add rate limiting middleware to the app
 app.middleware("http")(rate_limiting_middleware)
 
+# ===============================================================================
+# DB QUERY PROFILING MIDDLEWARE - QUERY COUNT / DB TIME / N+1 PER ENDPOINT
+# ===============================================================================
+
+@app.middleware("http")
+async def query_profiling_middleware(request: Request, call_next):
+    """Attribute MongoDB commands to the endpoint that issued them"""
+    if not query_profiler.enabled or not request.url.path.startswith("/api/"):
+        return await call_next(request)
+    
+    with query_profiler.track(f"{request.method} {request.url.path}") as stats:
+        response = await call_next(request)
+        # Group by route template (/api/clients/{client_id}), not the concrete path
+        route = request.scope.get("route")
+        stats.name = f"{request.method} {getattr(route, 'path', 'unmatched')}"
+    
+    response.headers["Server-Timing"] = stats.server_timing()
+    response.headers["X-DB-Query-Count"] = str(stats.count)
+    return response
+
 # ===============================================================================
 # CRITICAL GOOGLE CONNECTION ENDPOINTS - MOVED HERE FOR TESTING
 # ===============================================================================
@@ -28458,6 +28678,13 @@ try:
 except Exception as e:
     logging.error(f"❌ Failed to include MT5 Health router: {e}")
 
+# Document Signing Routes
+try:
+    api_router.include_router(document_signing_router)
+    logging.info("✅ Document Signing router included successfully")
+except Exception as e:
+    logging.error(f"❌ Failed to include Document Signing router: {e}")
+
 # Test endpoint to verify routing
 @api_router.get("/test-routing")
 async def test_routing():
@@ -28466,33 +28693,71 @@ async def test_routing():
 
 # Router will be included at the END of file after ALL endpoints are defined
 
+async def _init_mock_mt5():
+    """Mock MT5 Service (constructor triggers its own background initialization)"""
+    get_mock_mt5_service()
+    logging.info("💹 Mock MT5 Service initialization triggered")
+
+async def _init_mt5_deals_sync():
+    """MT5 Deals Sync Service (Trade History for Rebates) + initial sync"""
+    if mt5_deals_sync.db is None:
+        await mt5_deals_sync.initialize(db)
+    
+    # Run initial sync in background (non-blocking for fast startup)
+    asyncio.create_task(run_initial_mt5_deals_sync())
+    logging.info("📊 MT5 Deals initial sync scheduled in background")
+
+async def _init_mt5_watchdog():
+    """MT5 Watchdog and Auto-Healing System"""
+    logging.info("🐕 Initializing MT5 Watchdog and Auto-Healing System...")
+    from mt5_watchdog import initialize_watchdog
+    from alert_service import AlertService
+    
+    alert_service = AlertService(db)
+    await initialize_watchdog(db, alert_service, job_leases)
+    
+    logging.info("✅ MT5 Watchdog initialized successfully")
+    logging.info("   Monitoring interval: 60 seconds")
+    logging.info("   Auto-healing threshold: 3 consecutive failures")
+    logging.info(f"   GitHub token configured: {bool(os.getenv('GITHUB_TOKEN'))}")
+
+async def _init_bridge_monitoring():
+    """Bridge Monitoring Service (3-Bridge Architecture)"""
+    logging.info("🔌 Initializing Bridge Monitoring Service...")
+    from services.bridge_monitoring_service import start_monitoring_service
+    await start_monitoring_service(db, job_leases)
+    
+    logging.info("✅ Bridge Monitoring Service initialized successfully")
+    logging.info("   Monitoring: MEXAtlantic MT5 (13 accounts)")
+    logging.info("   Monitoring: Lucrum MT5 (1 account)")
+    logging.info("   Monitoring: MEXAtlantic MT4 (1 account)")
+    logging.info("   Check interval: 60 seconds")
+    logging.info("   Alert threshold: 5 minutes")
+
 @app.on_event("startup")
 async def startup_event():
-    """Application startup tasks"""
+    """
+    Application startup tasks
+    
+    Initializers run in the background behind the readiness gate; startup only
+    waits STARTUP_BUDGET_SECONDS for the critical ones, so /api/health answers
+    quickly after a deploy and /api/health/ready reports when the rest is done.
+    """
     logging.info("🚀 FIDUS Server starting up...")
+    startup_profiler.report()
     
     # Log environment info for debugging
     env = os.environ.get('ENVIRONMENT', 'development')
     is_render = bool(os.environ.get('RENDER'))
     logging.info(f"📊 Environment: {env}, Render: {is_render}")
     
-    # Initialize default users in MongoDB
-    await ensure_default_users_in_mongodb()
-    
-    # Initialize MT5 service
-    try:
-        await mt5_service.initialize()
-        logging.info("💹 MT5 Service initialized successfully")
-    except Exception as e:
-        logging.error(f"MT5 Service initialization failed: {e}")
+    # Critical: logins need the default users, admin actions need the job workers
+    readiness.start('default_users', ensure_default_users_in_mongodb(), critical=True)
+    readiness.start('job_queue', job_queue.start(), critical=True)
     
-    # Initialize Mock MT5 Service (background task to avoid blocking)
-    try:
-        # This will trigger the initialization in a background task
-        get_mock_mt5_service()
-        logging.info("💹 Mock MT5 Service initialization triggered")
-    except Exception as e:
-        logging.error(f"Mock MT5 Service initialization failed: {e}")
+    # Non-critical: MT5 services and monitoring finish after we start serving
+    readiness.start('mt5_service', mt5_service.initialize())
+    readiness.start('mock_mt5_service', _init_mock_mt5())
     
     # Individual Google OAuth - no automatic startup needed
     logging.info("💡 Individual Google OAuth system ready")
@@ -28506,11 +28771,8 @@ async def startup_event():
     #     logging.error(f"❌ MT5 Auto-Sync Service initialization failed: {e}")
     logging.info("ℹ️ MT5 Auto-Sync Service disabled - VPS Sync Service handles account syncing")
     
-    # Initialize MT5 Deals Sync Service (Trade History for Rebates)
+    # MT5 Deals Sync Service (Trade History for Rebates)
     try:
-        if mt5_deals_sync.db is None:
-            await mt5_deals_sync.initialize(db)
-        
         # Schedule automatic syncs every 30 minutes
         scheduler.add_job(
             sync_mt5_deals_background,
@@ -28520,10 +28782,7 @@ async def startup_event():
             replace_existing=True
         )
         logging.info("✅ MT5 Deals Auto-Sync scheduled: Every 30 minutes")
-        
-        # Run initial sync in background (non-blocking for fast startup)
-        asyncio.create_task(run_initial_mt5_deals_sync())
-        logging.info("📊 MT5 Deals initial sync scheduled in background")
+        readiness.start('mt5_deals_sync', _init_mt5_deals_sync())
     except Exception as e:
         logging.error(f"❌ MT5 Deals Sync Service initialization failed: {e}")
     
@@ -28545,41 +28804,13 @@ async def startup_event():
         # Health check will run automatically via scheduler (every 5 minutes)
         # No need to run manually on startup to avoid duplicates
         logging.info("🏥 Health check scheduled to run every 5 minutes via scheduler")
-        
-        # Initialize MT5 Watchdog
-        logging.info("🐕 Initializing MT5 Watchdog and Auto-Healing System...")
-        try:
-            from mt5_watchdog import initialize_watchdog
-            from alert_service import AlertService
-            
-            alert_service = AlertService(db)
-            await initialize_watchdog(db, alert_service)
-            
-            logging.info("✅ MT5 Watchdog initialized successfully")
-            logging.info("   Monitoring interval: 60 seconds")
-            logging.info("   Auto-healing threshold: 3 consecutive failures")
-            logging.info(f"   GitHub token configured: {bool(os.getenv('GITHUB_TOKEN'))}")
-        except Exception as e:
-            logging.error(f"❌ MT5 Watchdog initialization failed: {e}")
-        
-        # Initialize Bridge Monitoring Service (3-Bridge Architecture)
-        logging.info("🔌 Initializing Bridge Monitoring Service...")
-        try:
-            from services.bridge_monitoring_service import start_monitoring_service
-            await start_monitoring_service(db)
-            
-            logging.info("✅ Bridge Monitoring Service initialized successfully")
-            logging.info("   Monitoring: MEXAtlantic MT5 (13 accounts)")
-            logging.info("   Monitoring: Lucrum MT5 (1 account)")
-            logging.info("   Monitoring: MEXAtlantic MT4 (1 account)")
-            logging.info("   Check interval: 60 seconds")
-            logging.info("   Alert threshold: 5 minutes")
-        except Exception as e:
-            logging.error(f"❌ Bridge Monitoring Service initialization failed: {e}")
-        
     except Exception as e:
         logging.error(f"❌ VPS sync scheduler initialization failed: {e}")
     
+    readiness.start('mt5_watchdog', _init_mt5_watchdog())
+    readiness.start('bridge_monitoring', _init_bridge_monitoring())
+    
+    await readiness.wait(STARTUP_BUDGET_SECONDS)
     logging.info("✅ FIDUS Server startup completed successfully")
 
 @app.on_event("shutdown")
@@ -28587,6 +28818,12 @@ async def shutdown_services():
     """Application shutdown tasks"""
     logging.info("🛑 FIDUS Server shutting down...")
     
+    # Stop initializers that are still running
+    try:
+        await readiness.cancel()
+    except Exception as e:
+        logging.error(f"❌ Startup initializer cancellation failed: {e}")
+    
     # Shutdown VPS sync scheduler
     try:
         scheduler.shutdown()
@@ -28594,6 +28831,21 @@ async def shutdown_services():
     except Exception as e:
         logging.error(f"❌ VPS sync scheduler shutdown failed: {e}")
     
+    # Stop background job workers (jobs running here are marked as interrupted)
+    try:
+        await job_queue.stop()
+    except Exception as e:
+        logging.error(f"❌ Job queue shutdown failed: {e}")
+    
+    # Hand the monitoring loops over to another worker without waiting for expiry
+    try:
+        from mt5_watchdog import WATCHDOG_LEASE
+        from services.bridge_monitoring_service import MONITOR_LEASE
+        for lease in (WATCHDOG_LEASE, MONITOR_LEASE):
+            await job_leases.release(lease)
+    except Exception as e:
+        logging.error(f"❌ Job lease release failed: {e}")
+    
     # Shutdown MT5 Auto-Sync Service
     try:
         from mt5_auto_sync_service import stop_mt5_sync_service
@@ -28602,6 +28854,14 @@ async def shutdown_services():
     except Exception as e:
         logging.error(f"❌ Error stopping MT5 Auto-Sync Service: {e}")
     
+    # Close pooled VPS bridge HTTP client
+    try:
+        from vps_sync_service import get_vps_sync_service
+        vps_sync = await get_vps_sync_service(db)
+        await vps_sync.close()
+    except Exception as e:
+        logging.error(f"❌ Error closing VPS sync HTTP client: {e}")
+    
     # Close MongoDB client
     client.close()
     logging.info("✅ FIDUS Server shutdown completed")
@@ -29533,6 +29793,12 @@ async def mt5_bridge_proxy_accounts():
 # ===============================================================================
 from services.mt5_deals_sync_service import mt5_deals_sync
 
+# Shared by the startup, 30-minute and admin syncs so they never overlap across
+# workers. Every run releases it when done, so the lease means "a sync is running"
+# and an admin sync is only skipped while one actually is.
+MT5_DEALS_SYNC_LEASE_SECONDS = 25 * 60
+
+@job_leases.exclusive('mt5_deals_sync', ttl_seconds=MT5_DEALS_SYNC_LEASE_SECONDS, release=True)
 async def sync_mt5_deals_background():
     """Background task to sync MT5 deals/trade history automatically"""
     try:
@@ -29542,60 +29808,114 @@ async def sync_mt5_deals_background():
         
         result = await mt5_deals_sync.sync_all_accounts()
         logging.info(f"✅ Scheduled MT5 Deals sync complete: {result.get('total_deals_synced', 0)} new deals")
+        schedule_risk_snapshot_refresh()
     except Exception as e:
         logging.error(f"❌ Scheduled MT5 Deals sync failed: {e}")
 
 async def run_initial_mt5_deals_sync():
     """Run initial MT5 deals sync in background (non-blocking)"""
+    await asyncio.sleep(5)  # Wait 5 seconds after startup
+    await job_leases.run_exclusive(
+        'mt5_deals_sync', MT5_DEALS_SYNC_LEASE_SECONDS, _initial_mt5_deals_sync, release=True
+    )
+
+async def _initial_mt5_deals_sync():
     try:
-        await asyncio.sleep(5)  # Wait 5 seconds after startup
         logging.info("📊 Running initial MT5 Deals/Trade History sync...")
         if mt5_deals_sync.db is None:
             await mt5_deals_sync.initialize(db)
         
         result = await mt5_deals_sync.sync_all_accounts()
         logging.info(f"✅ Initial MT5 Deals sync complete: {result.get('total_deals_synced', 0)} deals synced")
+        schedule_risk_snapshot_refresh()
     except Exception as e:
         logging.error(f"❌ Initial MT5 Deals sync failed: {e}")
 
-@api_router.post("/admin/mt5-deals/sync-all")
-async def sync_all_mt5_deals(current_user: dict = Depends(get_current_admin_user)):
+async def refresh_risk_snapshots_background():
+    """Precompute risk-engine snapshots for the admin risk dashboard"""
+    try:
+        from services.risk_snapshot_service import RiskSnapshotService
+        await RiskSnapshotService(db).refresh_all()
+    except Exception as e:
+        logging.error(f"❌ Risk snapshot refresh failed: {e}")
+
+def schedule_risk_snapshot_refresh():
+    """Queue a one-off snapshot refresh (a refresh already pending is replaced, not duplicated)"""
+    scheduler.add_job(
+        refresh_risk_snapshots_background,
+        id='risk_snapshots_refresh',
+        replace_existing=True,
+        misfire_grace_time=None
+    )
+
+@job_queue.handler('mt5_deals.sync')
+async def sync_mt5_deals_job(job: JobContext, account_number: int = None, full: bool = False):
+    # Same lease as the startup and scheduled syncs, so an admin sync never runs alongside them
+    result = await job_leases.run_exclusive(
+        'mt5_deals_sync', MT5_DEALS_SYNC_LEASE_SECONDS, _run_mt5_deals_sync_job, job, account_number, full,
+        release=True
+    )
+    if result is None:
+        # Not successful: the admin has to see that this sync did not run
+        return {
+            "success": False,
+            "skipped": True,
+            "error": "skipped: an MT5 deals sync is already running - retry once it finishes"
+        }
+    return result
+
+async def _run_mt5_deals_sync_job(job: JobContext, account_number: int = None, full: bool = False):
+    # Initialize sync service if not already done
+    if mt5_deals_sync.db is None:
+        await mt5_deals_sync.initialize(db)
+    
+    full_reconciliation = True if full else None
+    if account_number is not None:
+        await job.progress(5, f"Account {account_number}")
+        return await mt5_deals_sync.sync_account_deals(account_number, full_reconciliation=full_reconciliation)
+    
+    result = await mt5_deals_sync.sync_all_accounts(full_reconciliation=full_reconciliation, progress=job.progress)
+    schedule_risk_snapshot_refresh()
+    return result
+
+
+@api_router.post("/admin/mt5-deals/sync-all", status_code=202)
+async def sync_all_mt5_deals(
+    full: bool = False,
+    current_user: dict = Depends(get_current_admin_user)
+):
     """
-    Sync trade/deals history from MT5 Bridge for all 7 accounts
+    Sync trade/deals history from MT5 Bridge for all 7 accounts (background job)
     This populates mt5_deals collection for accurate rebates calculation
+    
+    Incremental (watermark-based) by default; ?full=true forces a full-history reconciliation
+    Poll GET /api/jobs/{job_id} for progress and the sync summary.
     """
     try:
-        # Initialize sync service if not already done
-        if not mt5_deals_sync.db:
-            await mt5_deals_sync.initialize(db)
-        
-        # Run sync
-        result = await mt5_deals_sync.sync_all_accounts()
-        
-        return result
+        job = await job_queue.enqueue('mt5_deals.sync', {'full': full}, created_by=current_user.get('id'))
+        return {"success": True, **job}
         
     except Exception as e:
         logging.error(f"❌ MT5 deals sync error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Sync failed: {str(e)}")
 
 
-@api_router.post("/admin/mt5-deals/sync/{account_number}")
+@api_router.post("/admin/mt5-deals/sync/{account_number}", status_code=202)
 async def sync_account_deals(
     account_number: int,
+    full: bool = False,
     current_user: dict = Depends(get_current_admin_user)
 ):
     """
-    Sync trade/deals history for a specific account
+    Sync trade/deals history for a specific account (background job)
+    
+    Incremental (watermark-based) by default; ?full=true forces a full-history reconciliation
     """
     try:
-        # Initialize sync service if not already done
-        if not mt5_deals_sync.db:
-            await mt5_deals_sync.initialize(db)
-        
-        # Run sync for single account
-        result = await mt5_deals_sync.sync_account_deals(account_number)
-        
-        return result
+        job = await job_queue.enqueue(
+            'mt5_deals.sync', {'account_number': account_number, 'full': full}, created_by=current_user.get('id')
+        )
+        return {"success": True, **job}
         
     except Exception as e:
         logging.error(f"❌ MT5 deals sync error for {account_number}: {str(e)}")
@@ -29650,6 +29970,42 @@ async def get_deals_sync_status(current_user: dict = Depends(get_current_admin_u
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ===============================================================================
+# BACKGROUND JOBS - status, listing and cancellation
+# ===============================================================================
+
+@api_router.get("/jobs")
+async def list_jobs(
+    status: str = None,
+    type: str = None,
+    limit: int = 50,
+    current_user: dict = Depends(get_current_admin_user)
+):
+    """Recent background jobs (newest first, without results)"""
+    jobs = await job_queue.list_jobs(status=status, job_type=type, limit=min(max(limit, 1), 200))
+    return {"success": True, "jobs": jobs, "queue": job_queue.get_stats()}
+
+
+@api_router.get("/jobs/{job_id}")
+async def get_job(job_id: str, current_user: dict = Depends(get_current_admin_user)):
+    """Status, progress and (once finished) result of a background job"""
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@api_router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str, current_user: dict = Depends(get_current_admin_user)):
+    """Cancel a queued job, or ask a running job to stop at its next progress update"""
+    job = await job_queue.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+startup_profiler.checkpoint('route_definitions')
+
 # ===============================================================================
 # INCLUDE ROUTER - MUST BE LAST!
 # ===============================================================================
@@ -29702,6 +30058,15 @@ try:
 except Exception as e:
     logging.error(f"❌ Failed to include VIKING router: {e}")
 
+# Import and include MT5 bridge event stream router (push-based deltas from the VPS bridges)
+try:
+    from routes.bridge_events import router as bridge_events_router, init_db as init_bridge_events_db
+    init_bridge_events_db(db)
+    app.include_router(bridge_events_router)
+    logging.info("✅ MT5 Bridge Event Stream router included successfully")
+except Exception as e:
+    logging.error(f"❌ Failed to include MT5 Bridge Event Stream router: {e}")
+
 # Import and include White Label Franchise routers
 try:
     from routes.franchise_api import router as franchise_router
@@ -29727,6 +30092,8 @@ except Exception as e:
 # Include the API router in the main app AFTER all endpoints are defined
 app.include_router(api_router)
 
+startup_profiler.finish_imports()
+
 
 # ===============================================================================
 # SERVER STARTUP
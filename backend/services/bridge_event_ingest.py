@@ -0,0 +1,292 @@
+"""
+Bridge Event Ingest Service
+Applies change events pushed by the MT5 bridges (see vps/mt5_bridge_api_service.py)
+
+Event (one per change, seq increases by 1 per bridge):
+{
+    "seq": 1842,
+    "type": "account_update",       # account_update | deal_closed | position_opened | position_closed
+    "account": 886557,
+    "time": "2025-06-01T12:00:00+00:00",
+    "data": {...}                   # balance/equity/..., an MT5 deal, or a position
+}
+
+Delivery is at-least-once: the bridge spools events locally and re-sends
+until they are acknowledged, so every event is recorded once in
+mt5_bridge_events under a unique (bridge_id, seq) key with applied=False,
+and only flagged applied=True once _apply succeeded. A re-sent event that
+is already applied is dropped; one whose earlier apply failed is applied
+again. Account figures are only written when the event is newer than what
+the account already holds, and deals are upserted by (account, ticket), so
+applying an event twice is harmless.
+
+While a bridge keeps pushing an account, the polling sync only needs to run
+for that account as a reconciliation pass (see reconcile_due).
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from services.deal_ingestion_service import DealIngestionService, normalize_mt5_deal, parse_deal_time
+from services.response_cache import TAG_MT5_ACCOUNTS, response_cache
+from services.shared_state import SharedStateStore
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ('account_update', 'deal_closed', 'position_opened', 'position_closed')
+
+# A bridge that pushed within this window is considered live
+MT5_STREAM_LIVE_SECONDS = int(os.environ.get('MT5_STREAM_LIVE_SECONDS', '180'))
+# How often polling still runs (as reconciliation) while a stream is live
+MT5_STREAM_RECONCILE_MINUTES = int(os.environ.get('MT5_STREAM_RECONCILE_MINUTES', '30'))
+MT5_STREAM_EVENT_TTL_DAYS = int(os.environ.get('MT5_STREAM_EVENT_TTL_DAYS', '7'))
+
+ACCOUNT_FIELDS = ('balance', 'equity', 'profit', 'margin', 'margin_free', 'margin_level')
+
+_indexes_ready = False
+
+
+class BridgeEventIngestService:
+    """Deduplicate, record and apply pushed bridge events"""
+
+    def __init__(self, db):
+        self.db = db
+        self.events = db.mt5_bridge_events
+        self.state = db.mt5_bridge_stream_state
+        # {account: {'at': datetime}} - last reconciliation poll, shared by every worker
+        self.reconciles = SharedStateStore(db, 'state_bridge_reconcile', cache_seconds=0)
+
+    async def ensure_indexes(self):
+        global _indexes_ready
+        if _indexes_ready:
+            return
+        await self.events.create_index([("bridge_id", 1), ("seq", 1)], unique=True)
+        await self.events.create_index(
+            [("received_at", 1)], expireAfterSeconds=MT5_STREAM_EVENT_TTL_DAYS * 86400
+        )
+        _indexes_ready = True
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+
+    async def ingest(self, bridge_id: str, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Record and apply a batch of events from one bridge
+
+        Returns accepted / duplicates / invalid counts and acked_seq, the
+        highest seq of the batch: everything up to it is now stored, so
+        the bridge may drop it from its spool.
+        """
+        await self.ensure_indexes()
+        received_at = datetime.now(timezone.utc)
+
+        by_seq: Dict[int, Dict[str, Any]] = {}
+        invalid = 0
+        for event in events:
+            if not isinstance(event.get('seq'), int) or event.get('type') not in EVENT_TYPES or not event.get('account'):
+                invalid += 1
+                continue
+            by_seq[event['seq']] = event
+
+        if not by_seq:
+            return {"success": True, "accepted": 0, "duplicates": 0, "invalid": invalid, "acked_seq": None}
+
+        seqs = sorted(by_seq)
+        existing = await self.events.find(
+            {"bridge_id": bridge_id, "seq": {"$in": seqs}}, {"_id": 0, "seq": 1, "applied": 1}
+        ).to_list(length=None)
+        # Events recorded before the applied flag existed were applied in the same request
+        applied_seqs = {doc['seq'] for doc in existing if doc.get('applied', True)}
+        unapplied = {doc['seq'] for doc in existing} - applied_seqs
+
+        docs = [
+            {
+                "bridge_id": bridge_id,
+                "seq": seq,
+                "type": by_seq[seq]['type'],
+                "account": by_seq[seq]['account'],
+                "time": parse_deal_time(by_seq[seq].get('time'), received_at),
+                "data": by_seq[seq].get('data') or {},
+                "received_at": received_at,
+                "applied": False
+            }
+            for seq in seqs if seq not in applied_seqs
+        ]
+        new_docs = await self._record([doc for doc in docs if doc['seq'] not in unapplied])
+        # Re-deliveries of events whose earlier apply failed are applied again
+        to_apply = sorted(new_docs + [doc for doc in docs if doc['seq'] in unapplied], key=lambda d: d['seq'])
+
+        previous = await self.state.find_one({"bridge_id": bridge_id}, {"_id": 0, "last_seq": 1})
+        last_seq = (previous or {}).get('last_seq')
+        gap = bool(new_docs) and last_seq is not None and new_docs[0]['seq'] > last_seq + 1
+        if gap:
+            logger.warning(f"⚠️  Bridge {bridge_id} event gap: last seq {last_seq}, received {new_docs[0]['seq']}")
+
+        # An exception here leaves the events unapplied and the batch unacknowledged,
+        # so the bridge re-sends it and the next request applies it again
+        applied = await self._apply(to_apply) if to_apply else {}
+        if to_apply:
+            await self.events.update_many(
+                {"bridge_id": bridge_id, "seq": {"$in": [doc['seq'] for doc in to_apply]}},
+                {"$set": {"applied": True}}
+            )
+
+        duplicates = len(seqs) - len(to_apply)
+        await self.state.update_one(
+            {"bridge_id": bridge_id},
+            {
+                "$max": {"last_seq": seqs[-1]},
+                "$set": {"last_event_at": received_at},
+                "$inc": {
+                    "events_received": len(new_docs),
+                    "duplicates": duplicates,
+                    "gaps": 1 if gap else 0
+                },
+                # Accounts this bridge streams, so reconcile_due can decide per account
+                "$addToSet": {"accounts": {"$each": sorted({by_seq[seq]['account'] for seq in seqs})}}
+            },
+            upsert=True
+        )
+
+        logger.info(
+            f"📨 Bridge {bridge_id}: {len(to_apply)} events applied, "
+            f"{duplicates} duplicates (seq {seqs[0]}-{seqs[-1]})"
+        )
+        return {
+            "success": True,
+            "accepted": len(to_apply),
+            "duplicates": duplicates,
+            "invalid": invalid,
+            "applied": applied,
+            "acked_seq": seqs[-1]
+        }
+
+    async def _record(self, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert event docs; ones a concurrent request already stored are dropped"""
+        if not docs:
+            return []
+        try:
+            await self.events.insert_many([dict(d) for d in docs], ordered=False)
+            return docs
+        except BulkWriteError as e:
+            duplicate = {
+                err['index'] for err in (e.details or {}).get('writeErrors', []) if err.get('code') == 11000
+            }
+            if len(duplicate) != len((e.details or {}).get('writeErrors', [])):
+                raise
+            return [doc for i, doc in enumerate(docs) if i not in duplicate]
+
+    async def _apply(self, docs: List[Dict[str, Any]]) -> Dict[str, int]:
+        # Per account: figures from the newest account_update, open_positions
+        # from the newest event carrying them. The bridge stamps an account's
+        # account_update and position events of one snapshot with the same
+        # time, so they are merged into one update instead of competing.
+        latest: Dict[int, Dict[str, Any]] = {}
+        deals = []
+        for doc in docs:
+            if doc['type'] == 'deal_closed':
+                deals.append(normalize_mt5_deal(
+                    doc['data'], doc['account'], doc['received_at'], 'bridge_stream',
+                    {'synced_from_vps': True}
+                ))
+                continue
+            current = latest.setdefault(doc['account'], {'time': doc['time'], 'figures': None, 'positions': None})
+            current['time'] = max(current['time'], doc['time'])
+            if doc['type'] == 'account_update' and (
+                current['figures'] is None or doc['time'] >= current['figures']['time']
+            ):
+                current['figures'] = doc
+            if 'open_positions' in doc['data'] and (
+                current['positions'] is None or doc['time'] >= current['positions']['time']
+            ):
+                current['positions'] = doc
+
+        operations = []
+        for account, current in latest.items():
+            update = {'updated_at': current['time'], 'stream_event_time': current['time'], 'data_source': 'VPS_STREAM'}
+            if current['figures'] is not None:
+                figures = current['figures']['data']
+                update.update({k: figures[k] for k in ACCOUNT_FIELDS if k in figures})
+            if current['positions'] is not None:
+                update['open_positions'] = current['positions']['data']['open_positions']
+            operations.append(UpdateOne(
+                {
+                    'account': account,
+                    # Equal times belong to the same bridge snapshot, so they still apply
+                    '$or': [
+                        {'stream_event_time': {'$lte': current['time']}},
+                        {'stream_event_time': {'$exists': False}}
+                    ]
+                },
+                {'$set': update}
+            ))
+
+        if operations:
+            await self.db.mt5_accounts.bulk_write(operations, ordered=False)
+            response_cache.bump(TAG_MT5_ACCOUNTS)
+
+        deals_written = 0
+        if deals:
+            stats = await DealIngestionService(self.db, collection='mt5_deals').ingest(deals)
+            deals_written = stats['inserted'] + stats['updated']
+
+        return {"accounts_updated": len(operations), "deals_written": deals_written}
+
+    # ------------------------------------------------------------------
+    # Stream status / reconciliation
+    # ------------------------------------------------------------------
+
+    async def get_stream_status(self) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc)
+        bridges = await self.state.find({}, {"_id": 0}).to_list(length=None)
+        for bridge in bridges:
+            last_event_at = bridge.get('last_event_at')
+            if last_event_at is not None and last_event_at.tzinfo is None:
+                last_event_at = last_event_at.replace(tzinfo=timezone.utc)
+            age = (now - last_event_at).total_seconds() if last_event_at else None
+            bridge['last_event_at'] = last_event_at.isoformat() if last_event_at else None
+            bridge['age_seconds'] = round(age, 1) if age is not None else None
+            bridge['live'] = age is not None and age <= MT5_STREAM_LIVE_SECONDS
+        return {
+            "success": True,
+            "live": any(b['live'] for b in bridges),
+            "bridges": bridges,
+            "timestamp": now.isoformat()
+        }
+
+    async def reconcile_due(self, accounts: List[int]) -> List[int]:
+        """
+        Accounts the polling sync should cover now
+
+        An account no live bridge is streaming is always due; a streamed
+        account is due once every MT5_STREAM_RECONCILE_MINUTES as a
+        reconciliation pass. The last pass per account is kept in the shared
+        state store, so every worker sees the same schedule.
+        """
+        now = datetime.now(timezone.utc)
+        live_since = now - timedelta(seconds=MT5_STREAM_LIVE_SECONDS)
+        live = await self.state.find(
+            {"last_event_at": {"$gte": live_since}}, {"_id": 0, "accounts": 1}
+        ).to_list(length=None)
+        streamed = {account for bridge in live for account in bridge.get('accounts') or []}
+        if not streamed:
+            return list(accounts)
+
+        last_reconcile = dict(await self.reconciles.items())
+        window = timedelta(minutes=MT5_STREAM_RECONCILE_MINUTES)
+        due = []
+        for account in accounts:
+            if account not in streamed:
+                due.append(account)
+                continue
+            last = (last_reconcile.get(str(account)) or {}).get('at')
+            if last is None or now - last >= window:
+                await self.reconciles.set(str(account), {'at': now})
+                due.append(account)
+        return due
@@ -6,6 +6,10 @@ Monitors the 3-bridge architecture and triggers alerts for:
 - Stale data (no sync in >5 minutes)
 - Missing accounts
 - Connection failures
+
+With several API workers only the holder of the "bridge_monitor" job lease
+runs the checks; the others keep polling the lease and take over if the
+holder stops renewing it.
 """
 
 import asyncio
@@ -17,14 +21,17 @@ import os
 
 logger = logging.getLogger(__name__)
 
+MONITOR_LEASE = 'bridge_monitor'
+
 
 class BridgeMonitoringService:
     """
     Service to monitor bridge health and send alerts.
     """
     
-    def __init__(self, db: AsyncIOMotorClient):
+    def __init__(self, db: AsyncIOMotorClient, job_leases=None):
         self.db = db
+        self.job_leases = job_leases  # JobLeaseManager; None = always run
         self.alert_threshold_minutes = 5
         self.check_interval_seconds = 60  # Check every minute
         self.is_running = False
@@ -70,6 +77,12 @@ class BridgeMonitoringService:
         
         while self.is_running:
             try:
+                if self.job_leases and not await self.job_leases.acquire(
+                    MONITOR_LEASE, self.check_interval_seconds * 2
+                ):
+                    # Another worker is monitoring
+                    await asyncio.sleep(self.check_interval_seconds)
+                    continue
                 await self.check_all_bridges()
                 await asyncio.sleep(self.check_interval_seconds)
             except Exception as e:
@@ -330,22 +343,22 @@ class BridgeMonitoringService:
 _monitoring_service: Optional[BridgeMonitoringService] = None
 
 
-async def get_monitoring_service(db: AsyncIOMotorClient) -> BridgeMonitoringService:
+async def get_monitoring_service(db: AsyncIOMotorClient, job_leases=None) -> BridgeMonitoringService:
     """
     Get or create the global monitoring service instance.
     """
     global _monitoring_service
     
     if _monitoring_service is None:
-        _monitoring_service = BridgeMonitoringService(db)
+        _monitoring_service = BridgeMonitoringService(db, job_leases)
     
     return _monitoring_service
 
 
-async def start_monitoring_service(db: AsyncIOMotorClient):
+async def start_monitoring_service(db: AsyncIOMotorClient, job_leases=None):
     """
     Start the monitoring service in the background.
     """
-    service = await get_monitoring_service(db)
+    service = await get_monitoring_service(db, job_leases)
     asyncio.create_task(service.start_monitoring())
     logger.info("✅ Bridge monitoring service task created")
@@ -0,0 +1,259 @@
+"""
+Deal Ingestion Service
+Shared bulk, idempotent ingestion stage for MT5/MT4 deals
+
+Used by:
+- MT5DealsSyncService.sync_account_deals (services/mt5_deals_sync_service.py)
+- VPSSyncService.sync_account_trades (vps_sync_service.py)
+- POST /api/viking/deals/batch (routes/viking.py)
+
+Each deal is normalized to a document once, hashed over an explicit
+whitelist of broker deal fields (writer and sync metadata excluded, so the
+MT5 deals sync, the VPS sync and the bridge stream agree on a deal's hash),
+and written with unordered bulk_write chunks keyed by (account, ticket).
+Deals whose stored content_hash already matches are skipped entirely, so a
+re-pull of unchanged history costs one $in read per chunk and no writes.
+Deals written to mt5_deals also refresh their daily rollup buckets
+(services/deal_rollup_service.py).
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from services.deal_rollup_service import DealRollupService
+from services.deal_store import DEAL_COLLECTIONS, deal_store
+from services.response_cache import TAG_MT5_DEALS, TAG_VIKING_DEALS, response_cache
+
+logger = logging.getLogger(__name__)
+
+# MT5 deal fields that define a deal's content; writer metadata (synced_by,
+# synced_at, fund_type, ...) is deliberately left out so every writer of
+# mt5_deals produces the same hash for the same deal
+MT5_DEAL_HASH_FIELDS = (
+    'account', 'ticket', 'order', 'time', 'time_msc', 'type', 'entry', 'symbol',
+    'volume', 'price', 'profit', 'commission', 'swap', 'fee', 'comment',
+    'external_id', 'position_id', 'magic', 'reason'
+)
+
+# MT4 (VIKING) deal fields, as posted by the MT4 bridge and file monitors
+MT4_DEAL_HASH_FIELDS = (
+    'account', 'ticket', 'type', 'symbol', 'volume', 'open_time', 'close_time',
+    'open_price', 'close_price', 'profit', 'commission', 'swap', 'comment',
+    'is_balance_operation'
+)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value, tz=timezone.utc)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            pass
+    return None
+
+
+def parse_deal_time(value: Any, default: Optional[datetime] = None) -> datetime:
+    """Parse a deal time from a Unix timestamp, ISO string or datetime"""
+    return _parse_time(value) or default or datetime.now(timezone.utc)
+
+
+def has_deal_time(value: Any) -> bool:
+    """True when a bridge payload carries a parseable deal time (no fallback used)"""
+    return _parse_time(value) is not None
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def normalize_mt5_deal(
+    trade: Dict[str, Any],
+    account: int,
+    sync_time: datetime,
+    synced_by: str,
+    metadata: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Build an mt5_deals document from a bridge trade payload
+
+    Follows the MT5 Field Standardization Mandate: exact MT5 Python API
+    field names first, FIDUS-specific metadata after.
+    """
+    deal_doc = {
+        # Core MT5 deal fields (from VPS API)
+        'ticket': trade.get('ticket'),
+        'order': trade.get('order'),
+        'time': parse_deal_time(trade.get('time'), sync_time),
+        'type': trade.get('type'),  # 0=buy, 1=sell, 2=balance
+        'entry': trade.get('entry'),  # 0=in, 1=out
+        'symbol': trade.get('symbol'),
+        'volume': _to_float(trade.get('volume')),  # Volume in lots
+        'price': _to_float(trade.get('price')),
+        'profit': _to_float(trade.get('profit')),
+        'comment': trade.get('comment', ''),
+
+        # MT5 fields only set when the bridge provides them (None for honesty)
+        'time_msc': trade.get('time_msc'),
+        'commission': trade.get('commission'),
+        'swap': trade.get('swap'),
+        'fee': trade.get('fee'),
+        'external_id': trade.get('external_id'),
+        'position_id': trade.get('position_id'),
+        'magic': trade.get('magic'),
+        'reason': trade.get('reason'),
+
+        # FIDUS-specific metadata (added AFTER MT5 fields)
+        'account': account,
+        'synced_at': sync_time,
+        'synced_by': synced_by
+    }
+    if metadata:
+        deal_doc.update(metadata)
+    return deal_doc
+
+
+def content_hash(doc: Dict[str, Any], fields: Iterable[str] = MT5_DEAL_HASH_FIELDS) -> str:
+    """Stable hash of a deal document over its whitelisted content fields"""
+    payload = {k: doc.get(k) for k in fields}
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class DealIngestionService:
+    """Bulk upsert of normalized deal documents keyed by (account, ticket)"""
+
+    def __init__(
+        self,
+        db,
+        collection: str = 'mt5_deals',
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        hash_fields: Iterable[str] = MT5_DEAL_HASH_FIELDS
+    ):
+        self.db = db
+        self.collection = db[collection]
+        self.collection_name = collection
+        self.chunk_size = chunk_size
+        self.hash_fields = tuple(hash_fields)
+
+    async def _existing_hashes(self, docs: List[Dict[str, Any]]) -> Dict[tuple, Optional[str]]:
+        """Load stored hashes for a chunk with one $in query per account"""
+        tickets_by_account: Dict[Any, List[Any]] = {}
+        for doc in docs:
+            tickets_by_account.setdefault(doc['account'], []).append(doc['ticket'])
+
+        existing = {}
+        for account, tickets in tickets_by_account.items():
+            cursor = self.collection.find(
+                {'account': account, 'ticket': {'$in': tickets}},
+                {'_id': 0, 'ticket': 1, 'content_hash': 1}
+            )
+            async for row in cursor:
+                existing[(account, row.get('ticket'))] = row.get('content_hash')
+        return existing
+
+    async def _refresh_rollups(self, written: List[Dict[str, Any]]):
+        """Recompute daily rollups for the days touched by written deals"""
+        try:
+            await DealRollupService(self.db).apply_deals(written)
+        except Exception as e:
+            # Rollups are derived data; rebuild() repairs them, so never fail the ingest
+            logger.error(f"❌ Deal rollup refresh failed: {e}")
+
+    async def ingest(self, docs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Upsert normalized deal documents
+
+        Args:
+            docs: Documents that already carry 'account' and 'ticket'
+
+        Returns:
+            inserted / updated / unchanged / skipped / errors counts, plus
+            the list of written docs under 'written' for downstream stages
+        """
+        stats = {
+            'inserted': 0,
+            'updated': 0,
+            'unchanged': 0,
+            'skipped': 0,
+            'errors': 0,
+            'total': len(docs),
+            'written': []
+        }
+
+        # Deduplicate within the batch (last write wins) and drop keyless deals
+        keyed: Dict[tuple, Dict[str, Any]] = {}
+        for doc in docs:
+            if doc.get('account') is None or doc.get('ticket') is None:
+                stats['skipped'] += 1
+                continue
+            doc['content_hash'] = content_hash(doc, self.hash_fields)
+            keyed[(doc['account'], doc['ticket'])] = doc
+
+        for chunk in _chunks(list(keyed.values()), self.chunk_size):
+            existing = await self._existing_hashes(chunk)
+
+            operations = []
+            changed = []
+            for doc in chunk:
+                key = (doc['account'], doc['ticket'])
+                if key in existing and existing[key] == doc['content_hash']:
+                    stats['unchanged'] += 1
+                    continue
+                operations.append(UpdateOne(
+                    {'account': doc['account'], 'ticket': doc['ticket']},
+                    {'$set': doc},
+                    upsert=True
+                ))
+                changed.append(doc)
+
+            if not operations:
+                continue
+
+            try:
+                result = await self.collection.bulk_write(operations, ordered=False)
+                stats['inserted'] += result.upserted_count
+                stats['updated'] += result.modified_count
+                stats['written'].extend(changed)
+            except BulkWriteError as e:
+                details = e.details or {}
+                failed = {err['index'] for err in details.get('writeErrors', [])}
+                stats['inserted'] += details.get('nUpserted', 0)
+                stats['updated'] += details.get('nModified', 0)
+                stats['errors'] += len(failed)
+                stats['written'].extend(doc for i, doc in enumerate(changed) if i not in failed)
+                logger.error(f"❌ {len(failed)} deal writes failed in {self.collection_name}: {details.get('writeErrors', [])[:3]}")
+
+        if stats['written'] and self.collection_name in DEAL_COLLECTIONS:
+            deal_store.invalidate(doc['account'] for doc in stats['written'])
+            response_cache.bump(TAG_MT5_DEALS)
+        elif stats['written'] and self.collection_name == 'viking_deals_history':
+            response_cache.bump(TAG_VIKING_DEALS)
+
+        if stats['written'] and self.collection_name == 'mt5_deals':
+            await self._refresh_rollups(stats['written'])
+        
+        logger.info(
+            f"📥 Ingested {stats['total']} deals into {self.collection_name}: "
+            f"{stats['inserted']} new, {stats['updated']} updated, {stats['unchanged']} unchanged"
+        )
+        return stats
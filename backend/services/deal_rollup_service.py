@@ -0,0 +1,317 @@
+"""
+Deal Rollup Service
+Pre-aggregated daily deal statistics per (account, symbol, day)
+
+Collection: deal_rollups_daily
+{
+    "account": 886557,
+    "symbol": "XAUUSD",              # "" for balance operations
+    "day": "2025-06-01",             # UTC day
+    "deals": 42, "volume": 12.5, "profit": 310.2, "commission": -21.0, "swap": -3.1,
+    "buy_deals": 21, "sell_deals": 21, "balance_operations": 0,
+    "win_deals": 12, "loss_deals": 8, "gross_profit": 520.0, "gross_loss": -209.8,
+    "trade_deals": 42, "trade_volume": 12.5, "trade_profit": 310.2, ...      # buy/sell only
+    "closed_trades": 20, "closed_wins": 12, "largest_win": 95.0, ...          # closing deals
+    "spread_sum": 84.0, "spread_count": 40, "spread_volume": 12.0, "spread_min": 1.0, "spread_max": 4.0,
+    "first_deal": datetime, "last_deal": datetime, "updated_at": datetime
+}
+
+DealIngestionService calls apply_deals() after every write: the touched
+(account, day) buckets are re-grouped from mt5_deals and replaced, which
+keeps rollups exact when a re-synced deal changes (no double counting).
+rebuild() / scripts/backfill_deal_rollups.py regenerate them from scratch.
+
+rows() serves any [start, end] window: whole days come from the rollups
+and the partial days at either edge are grouped from mt5_deals with the
+same pipeline, so results match a full $group over raw deals while the
+cost follows the number of days, not the number of deals.
+"""
+
+import logging
+from datetime import datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import DeleteMany, UpdateOne
+
+from services.response_cache import TAG_MT5_DEALS, response_cache
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_COLLECTION = 'deal_rollups_daily'
+
+# Fields summed when rollup rows are merged
+SUM_FIELDS = (
+    'deals', 'volume', 'profit', 'commission', 'swap',
+    'buy_deals', 'sell_deals', 'balance_operations',
+    'win_deals', 'loss_deals', 'gross_profit', 'gross_loss',
+    'trade_deals', 'trade_volume', 'trade_profit', 'trade_commission', 'trade_swap',
+    'closed_trades', 'closed_wins', 'closed_losses', 'closed_breakeven',
+    'closed_gross_profit', 'closed_gross_loss',
+    'spread_sum', 'spread_count', 'spread_volume',
+)
+MIN_FIELDS = ('largest_loss', 'spread_min', 'first_deal')
+MAX_FIELDS = ('largest_win', 'spread_max', 'last_deal')
+
+_indexes_ready = False
+
+
+def _cond_sum(condition: Dict[str, Any], value: Any = 1) -> Dict[str, Any]:
+    return {"$sum": {"$cond": [condition, value, 0]}}
+
+
+def _cond_value(condition: Dict[str, Any], value: Any) -> Dict[str, Any]:
+    # None is ignored by $min/$max
+    return {"$cond": [condition, value, None]}
+
+
+_IS_TRADE = {"$in": ["$type", [0, 1]]}
+_IS_CLOSE = {"$and": [_IS_TRADE, {"$in": [{"$ifNull": ["$entry", -1]}, [1, 2, 3]]}]}
+_HAS_SPREAD = {"$and": [_IS_TRADE, {"$gt": [{"$ifNull": ["$spread", 0]}, 0]}]}
+_PROFIT = {"$ifNull": ["$profit", 0]}
+
+ROLLUP_GROUP = {
+    "$group": {
+        "_id": {
+            "account": "$account",
+            "symbol": {"$ifNull": ["$symbol", ""]},
+            "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$time"}},
+        },
+        "account_name": {"$first": "$account_name"},
+        "fund_type": {"$first": "$fund_type"},
+        # All deal types (matches the historical deals summary)
+        "deals": {"$sum": 1},
+        "volume": {"$sum": "$volume"},
+        "profit": {"$sum": "$profit"},
+        "commission": {"$sum": "$commission"},
+        "swap": {"$sum": "$swap"},
+        "buy_deals": _cond_sum({"$eq": ["$type", 0]}),
+        "sell_deals": _cond_sum({"$eq": ["$type", 1]}),
+        "balance_operations": _cond_sum({"$eq": ["$type", 2]}),
+        "win_deals": _cond_sum({"$gt": [_PROFIT, 0]}),
+        "loss_deals": _cond_sum({"$lt": [_PROFIT, 0]}),
+        "gross_profit": _cond_sum({"$gt": [_PROFIT, 0]}, _PROFIT),
+        "gross_loss": _cond_sum({"$lt": [_PROFIT, 0]}, _PROFIT),
+        # Buy/sell deals only (rebates, daily P&L)
+        "trade_deals": _cond_sum(_IS_TRADE),
+        "trade_volume": _cond_sum(_IS_TRADE, {"$ifNull": ["$volume", 0]}),
+        "trade_profit": _cond_sum(_IS_TRADE, _PROFIT),
+        "trade_commission": _cond_sum(_IS_TRADE, {"$ifNull": ["$commission", 0]}),
+        "trade_swap": _cond_sum(_IS_TRADE, {"$ifNull": ["$swap", 0]}),
+        # Closing deals (one per closed trade)
+        "closed_trades": _cond_sum(_IS_CLOSE),
+        "closed_wins": _cond_sum({"$and": [_IS_CLOSE, {"$gt": [_PROFIT, 0]}]}),
+        "closed_losses": _cond_sum({"$and": [_IS_CLOSE, {"$lt": [_PROFIT, 0]}]}),
+        "closed_breakeven": _cond_sum({"$and": [_IS_CLOSE, {"$eq": [_PROFIT, 0]}]}),
+        "closed_gross_profit": _cond_sum({"$and": [_IS_CLOSE, {"$gt": [_PROFIT, 0]}]}, _PROFIT),
+        "closed_gross_loss": _cond_sum({"$and": [_IS_CLOSE, {"$lt": [_PROFIT, 0]}]}, _PROFIT),
+        "largest_win": {"$max": _cond_value({"$and": [_IS_CLOSE, {"$gt": [_PROFIT, 0]}]}, _PROFIT)},
+        "largest_loss": {"$min": _cond_value({"$and": [_IS_CLOSE, {"$lt": [_PROFIT, 0]}]}, _PROFIT)},
+        # Spreads (buy/sell deals that carry one)
+        "spread_sum": _cond_sum(_HAS_SPREAD, "$spread"),
+        "spread_count": _cond_sum(_HAS_SPREAD),
+        "spread_volume": _cond_sum(_HAS_SPREAD, {"$ifNull": ["$volume", 0]}),
+        "spread_min": {"$min": _cond_value(_HAS_SPREAD, "$spread")},
+        "spread_max": {"$max": _cond_value(_HAS_SPREAD, "$spread")},
+        "first_deal": {"$min": "$time"},
+        "last_deal": {"$max": "$time"},
+    }
+}
+
+
+def _utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _day_start(day: str) -> datetime:
+    return datetime.combine(datetime.strptime(day, '%Y-%m-%d').date(), time.min, tzinfo=timezone.utc)
+
+
+def _flatten(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Pipeline output -> rollup document shape"""
+    key = row.pop('_id')
+    return {**key, **row}
+
+
+def merge_rows(rows: Iterable[Dict[str, Any]], key_fields: Tuple[str, ...] = ()) -> Dict[Any, Dict[str, Any]]:
+    """
+    Merge rollup rows that share the same key_fields values
+
+    With no key_fields everything merges into a single row under key ().
+    """
+    merged: Dict[Any, Dict[str, Any]] = {}
+    for row in rows:
+        key = tuple(row.get(f) for f in key_fields)
+        target = merged.get(key)
+        if target is None:
+            target = merged[key] = {f: row.get(f) for f in key_fields}
+            target['symbols'] = set()
+            for f in SUM_FIELDS:
+                target[f] = 0
+            for f in MIN_FIELDS + MAX_FIELDS:
+                target[f] = None
+            target['account_name'] = row.get('account_name')
+            target['fund_type'] = row.get('fund_type')
+        target['symbols'].add(row.get('symbol'))
+        for f in SUM_FIELDS:
+            target[f] += row.get(f) or 0
+        for f in MIN_FIELDS:
+            if row.get(f) is not None and (target[f] is None or row[f] < target[f]):
+                target[f] = row[f]
+        for f in MAX_FIELDS:
+            if row.get(f) is not None and (target[f] is None or row[f] > target[f]):
+                target[f] = row[f]
+    return merged
+
+
+class DealRollupService:
+    """Maintain and query deal_rollups_daily"""
+
+    def __init__(self, db, deals_collection: str = 'mt5_deals'):
+        self.db = db
+        self.deals = db[deals_collection]
+        self.rollups = db[ROLLUP_COLLECTION]
+
+    async def ensure_indexes(self):
+        global _indexes_ready
+        if _indexes_ready:
+            return
+        await self.rollups.create_index([("account", 1), ("day", 1), ("symbol", 1)], unique=True)
+        await self.rollups.create_index([("day", 1)])
+        _indexes_ready = True
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    async def _regroup(self, match: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rows = await self.deals.aggregate([{"$match": match}, ROLLUP_GROUP]).to_list(length=None)
+        return [_flatten(row) for row in rows]
+
+    async def apply_deals(self, docs: Iterable[Dict[str, Any]]) -> int:
+        """Recompute the (account, day) buckets touched by newly written deals"""
+        touched: Dict[int, set] = {}
+        for doc in docs:
+            if doc.get('account') is None or not isinstance(doc.get('time'), datetime):
+                continue
+            touched.setdefault(doc['account'], set()).add(_utc(doc['time']).strftime('%Y-%m-%d'))
+        if not touched:
+            return 0
+        await self.ensure_indexes()
+
+        ranges = [
+            {"account": account, "time": {"$gte": _day_start(day), "$lt": _day_start(day) + timedelta(days=1)}}
+            for account, days in touched.items() for day in days
+        ]
+        return await self._replace_buckets({"$or": ranges}, touched)
+
+    async def _replace_buckets(self, match: Dict[str, Any], touched: Dict[int, set]) -> int:
+        """Upsert regrouped buckets and drop symbols that no longer have deals"""
+        now = datetime.now(timezone.utc)
+        rows = await self._regroup(match)
+
+        operations = [
+            UpdateOne(
+                {"account": row['account'], "day": row['day'], "symbol": row['symbol']},
+                {"$set": {**row, "updated_at": now}},
+                upsert=True
+            )
+            for row in rows
+        ]
+        present: Dict[Tuple[int, str], List[str]] = {}
+        for row in rows:
+            present.setdefault((row['account'], row['day']), []).append(row['symbol'])
+        for account, days in touched.items():
+            for day in days:
+                operations.append(DeleteMany({
+                    "account": account, "day": day,
+                    "symbol": {"$nin": present.get((account, day), [])}
+                }))
+
+        if operations:
+            await self.rollups.bulk_write(operations, ordered=False)
+        return len(rows)
+
+    async def rebuild(self, account: Optional[int] = None, start: Optional[datetime] = None) -> Dict[str, Any]:
+        """Regenerate rollups from mt5_deals (backfill), optionally per account / from a date"""
+        await self.ensure_indexes()
+        match: Dict[str, Any] = {"time": {"$type": "date"}}
+        if account is not None:
+            match["account"] = account
+        if start is not None:
+            match["time"]["$gte"] = _day_start(_utc(start).strftime('%Y-%m-%d'))
+
+        rows = await self._regroup(match)
+        delete_query: Dict[str, Any] = {}
+        if account is not None:
+            delete_query["account"] = account
+        if start is not None:
+            delete_query["day"] = {"$gte": _utc(start).strftime('%Y-%m-%d')}
+        await self.rollups.delete_many(delete_query)
+
+        now = datetime.now(timezone.utc)
+        if rows:
+            await self.rollups.insert_many([{**row, "updated_at": now} for row in rows], ordered=False)
+        # Responses built from the rollups (rolling series) must not outlive a backfill
+        response_cache.bump(TAG_MT5_DEALS)
+        logger.info(f"📊 Rebuilt {len(rows)} deal rollup buckets (account={account}, start={start})")
+        return {"success": True, "buckets": len(rows)}
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    async def rows(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        accounts: Optional[List[int]] = None,
+        symbol: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Rollup rows covering [start, end]
+
+        Whole days are read from deal_rollups_daily; partial days at the
+        edges are grouped from mt5_deals so the window stays exact.
+        """
+        start = _utc(start) if start else None
+        end = _utc(end) if end else None
+
+        # Whole days are [full_start, full_end)
+        full_start = None
+        if start is not None:
+            full_start = start if start.time() == time.min else \
+                datetime.combine(start.date() + timedelta(days=1), time.min, tzinfo=timezone.utc)
+        full_end = None
+        if end is not None:
+            full_end = datetime.combine(end.date(), time.min, tzinfo=timezone.utc)
+
+        base: Dict[str, Any] = {}
+        if accounts:
+            base["account"] = {"$in": accounts}
+        if symbol is not None:
+            base["symbol"] = symbol
+
+        rows: List[Dict[str, Any]] = []
+        if start is not None and end is not None and full_start > full_end:
+            # Window inside a single day
+            return await self._regroup({**base, "time": {"$gte": start, "$lte": end}})
+
+        if full_start is None or full_end is None or full_start < full_end:
+            query = dict(base)
+            day_range = {}
+            if full_start is not None:
+                day_range["$gte"] = full_start.strftime('%Y-%m-%d')
+            if full_end is not None:
+                day_range["$lt"] = full_end.strftime('%Y-%m-%d')
+            if day_range:
+                query["day"] = day_range
+            rows.extend(await self.rollups.find(query, {"_id": 0}).to_list(length=None))
+
+        edges = []
+        if start is not None and start < full_start:
+            edges.append({"$gte": start, "$lt": full_start})
+        if end is not None:
+            edges.append({"$gte": full_end, "$lte": end})
+        for time_range in edges:
+            rows.extend(await self._regroup({**base, "time": time_range}))
+        return rows
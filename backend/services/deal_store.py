@@ -0,0 +1,248 @@
+"""
+Per-Account Deal Store
+Lazy, memoized deal loading for risk analytics
+
+Replaces the trial-query pattern in HullRiskEngine.get_deals_for_account
+(mt5_deals with/without the date filter, then mt5_deals_history both ways):
+- Only the fields analytics reads are fetched (ANALYTICS_PROJECTION)
+- Non-trading rows (no symbol) are excluded in the query itself
+- The source collection is resolved once per account from metadata
+  (mt5_accounts.deals_collection when set, otherwise a one-time probe)
+- Results are memoized per (account, window, limit) and exposed both as
+  deal dicts and as compact column arrays (built lazily on first use);
+  callers get deal copies and read-only column views, never the cache itself
+- DealIngestionService invalidates an account whenever it writes deals;
+  server.py shares the per-account versions between workers (SharedVersions),
+  so a sync ingested by one worker also drops the other workers' entries
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from services.equity_curve import deals_to_columns
+from services.shared_state import SharedVersions
+
+logger = logging.getLogger(__name__)
+
+DEAL_STORE_TTL_SECONDS = int(os.environ.get('DEAL_STORE_TTL_SECONDS', '120'))
+DEAL_STORE_MAX_ENTRIES = int(os.environ.get('DEAL_STORE_MAX_ENTRIES', '256'))
+
+DEAL_COLLECTIONS = ('mt5_deals', 'mt5_deals_history')
+
+# Fields read by the risk engine / analytics - everything else stays in Mongo
+ANALYTICS_PROJECTION = {
+    '_id': 0,
+    'ticket': 1,
+    'time': 1,
+    'symbol': 1,
+    'type': 1,
+    'entry': 1,
+    'volume': 1,
+    'price': 1,
+    'profit': 1,
+    'swap': 1,
+    'commission': 1,
+    'comment': 1,
+    'position_id': 1,
+    'position': 1,
+    'sl': 1,
+}
+
+
+class AccountDeals:
+    """Memoized deals for one (account, window); columns are built on first access"""
+
+    def __init__(
+        self,
+        account: int,
+        collection: str,
+        deals: List[Dict[str, Any]],
+        version: int,
+        shared_version: Optional[str] = None
+    ):
+        self.account = account
+        self.collection = collection
+        self.version = version
+        self.shared_version = shared_version
+        self.loaded_at = time.monotonic()
+        self._deals = deals
+        self._columns: Optional[Dict[str, Any]] = None
+
+    def __len__(self) -> int:
+        return len(self._deals)
+
+    @property
+    def deals(self) -> List[Dict[str, Any]]:
+        """Copies of the cached deal dicts (safe for callers to mutate)"""
+        return [dict(deal) for deal in self._deals]
+
+    @property
+    def columns(self) -> Dict[str, Any]:
+        """Read-only views of the memoized column arrays"""
+        if self._columns is None:
+            columns = deals_to_columns(self._deals)
+            for value in columns.values():
+                if isinstance(value, np.ndarray):
+                    value.flags.writeable = False
+            self._columns = columns
+        return {
+            key: value.view() if isinstance(value, np.ndarray) else list(value)
+            for key, value in self._columns.items()
+        }
+
+
+class DealStore:
+    """In-process deal cache shared by every HullRiskEngine instance"""
+
+    def __init__(self, ttl_seconds: int = DEAL_STORE_TTL_SECONDS, max_entries: int = DEAL_STORE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple, AccountDeals] = {}
+        self._versions: Dict[int, int] = {}
+        self._collections: Dict[int, str] = {}
+        self._locks: Dict[Tuple, asyncio.Lock] = {}
+        self._shared: Optional[SharedVersions] = None
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
+    def use_shared_versions(self, versions: SharedVersions):
+        """Share invalidations with the other workers"""
+        self._shared = versions
+
+    async def _shared_version(self, account: int) -> Optional[str]:
+        return await self._shared.get(str(account)) if self._shared is not None else None
+
+    def invalidate(self, accounts: Iterable[int]):
+        """Drop cached deals for accounts that just received new rows"""
+        for account in set(accounts):
+            self._versions[account] = self._versions.get(account, 0) + 1
+            for key in [k for k in self._entries if k[0] == account]:
+                self._entries.pop(key, None)
+            if self._shared is not None:
+                self._shared.bump(str(account))
+
+    def clear(self):
+        self._entries.clear()
+        self._collections.clear()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    async def resolve_collection(self, db, account: int, account_doc: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Pick the deal collection for an account
+
+        Real accounts use mt5_deals, some demo accounts only have
+        mt5_deals_history. An explicit mt5_accounts.deals_collection wins;
+        otherwise one indexed probe decides and the answer is remembered.
+        """
+        configured = (account_doc or {}).get('deals_collection')
+        if configured in DEAL_COLLECTIONS:
+            return configured
+
+        cached = self._collections.get(account)
+        if cached:
+            return cached
+
+        collection = 'mt5_deals'
+        if not await db.mt5_deals.find_one({'account': account}, {'_id': 1}):
+            if await db.mt5_deals_history.find_one({'account': account}, {'_id': 1}):
+                collection = 'mt5_deals_history'
+        self._collections[account] = collection
+        return collection
+
+    async def get(
+        self,
+        db,
+        account: int,
+        start_date: Optional[datetime] = None,
+        max_deals: int = 5000,
+        account_doc: Optional[Dict[str, Any]] = None
+    ) -> AccountDeals:
+        """
+        Trading deals for an account, sorted by time (ascending)
+
+        The window start is floored to the minute so calls made seconds
+        apart by different endpoints share one entry. If the window holds
+        no deals, the account's full history is used instead (same fallback
+        get_deals_for_account always had).
+        """
+        window = start_date.replace(second=0, microsecond=0) if start_date else None
+        key = (account, window, max_deals)
+
+        shared_version = await self._shared_version(account)
+        entry = self._fresh_entry(key, shared_version)
+        if entry:
+            return entry
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                return await self._load(db, key, account, window, max_deals, account_doc, shared_version)
+        finally:
+            self._locks.pop(key, None)
+
+    async def _load(
+        self,
+        db,
+        key: Tuple,
+        account: int,
+        window: Optional[datetime],
+        max_deals: int,
+        account_doc: Optional[Dict[str, Any]],
+        shared_version: Optional[str]
+    ) -> AccountDeals:
+        entry = self._fresh_entry(key, shared_version)
+        if entry:
+            return entry
+
+        version = self._versions.get(account, 0)
+        collection = await self.resolve_collection(db, account, account_doc)
+
+        query: Dict[str, Any] = {'account': account, 'symbol': {'$nin': [None, '']}}
+        if window:
+            query['time'] = {'$gte': window}
+        deals = await db[collection].find(query, ANALYTICS_PROJECTION).sort('time', 1).to_list(length=max_deals)
+
+        if not deals and window:
+            logger.info(f"No deals in {collection} for account {account} in date range, using full history")
+            query.pop('time')
+            deals = await db[collection].find(query, ANALYTICS_PROJECTION).sort('time', 1).to_list(length=max_deals)
+
+        entry = AccountDeals(account, collection, deals, version, shared_version)
+        # Only cache if no ingestion (in any worker) invalidated the account while we were loading
+        if self._versions.get(account, 0) == version and await self._shared_version(account) == shared_version:
+            self._store(key, entry)
+        return entry
+
+    def _fresh_entry(self, key: Tuple, shared_version: Optional[str]) -> Optional[AccountDeals]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if (
+            entry.version != self._versions.get(key[0], 0)
+            or entry.shared_version != shared_version
+            or time.monotonic() - entry.loaded_at >= self.ttl_seconds
+        ):
+            self._entries.pop(key, None)
+            return None
+        return entry
+
+    def _store(self, key: Tuple, entry: AccountDeals):
+        if len(self._entries) >= self.max_entries:
+            oldest = min(self._entries, key=lambda k: self._entries[k].loaded_at)
+            self._entries.pop(oldest, None)
+        self._entries[key] = entry
+
+
+# Global instance
+deal_store = DealStore()
@@ -0,0 +1,199 @@
+"""
+Equity Curve Kernel
+NumPy-backed equity-curve / drawdown computations shared by the risk engine
+and trading analytics
+
+Deals are first converted to a columnar layout (deals_to_columns), then
+equity_curve() derives every drawdown statistic from cumulative sums and
+running maxima in one pass - no per-deal Python loops.
+
+Used by:
+- HullRiskEngine.calculate_risk_control_score / analyze_drawdown_triggers /
+  get_strategy_risk_analysis (services/hull_risk_engine.py)
+- TradingAnalyticsService.calculate_max_drawdown (services/trading_analytics_service.py)
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+def _to_epoch(value: Any) -> float:
+    """Deal time as epoch seconds (missing/unparseable times sort last)"""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return _to_epoch(datetime.fromisoformat(value.replace('Z', '+00:00')))
+        except ValueError:
+            pass
+    return np.inf
+
+
+def _num(value: Any) -> float:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else 0.0
+
+
+def deals_to_columns(
+    deals: List[Dict[str, Any]],
+    time_field: str = "time",
+    include_costs: bool = True
+) -> Dict[str, Any]:
+    """
+    Convert deal dicts into chronologically ordered column arrays
+
+    Args:
+        deals: Deal documents
+        time_field: Field holding the deal/close time
+        include_costs: Add swap and commission to profit (net P&L)
+
+    Returns:
+        {
+            "time": float64 epoch seconds,
+            "pnl": float64 net P&L per deal,
+            "volume": float64 lots,
+            "symbol_code": int32 index into "symbols",
+            "symbols": list of symbol names,
+            "index": int64 position of each row in the input list
+        }
+        Deals already sorted by time (as get_deals_for_account returns them)
+        are not re-sorted.
+    """
+    n = len(deals)
+    times = np.empty(n, dtype=np.float64)
+    pnl = np.empty(n, dtype=np.float64)
+    volume = np.empty(n, dtype=np.float64)
+    symbol_code = np.empty(n, dtype=np.int32)
+    symbols: List[str] = []
+    codes: Dict[str, int] = {}
+
+    for i, deal in enumerate(deals):
+        times[i] = _to_epoch(deal.get(time_field))
+        value = _num(deal.get("profit"))
+        if include_costs:
+            value += _num(deal.get("swap")) + _num(deal.get("commission"))
+        pnl[i] = value
+        volume[i] = _num(deal.get("volume"))
+        symbol = deal.get("symbol") or ""
+        code = codes.get(symbol)
+        if code is None:
+            code = codes[symbol] = len(symbols)
+            symbols.append(symbol)
+        symbol_code[i] = code
+
+    index = np.arange(n, dtype=np.int64)
+    if n > 1 and np.any(np.diff(times) < 0):
+        order = np.argsort(times, kind="stable")
+        times, pnl, volume, symbol_code, index = (
+            times[order], pnl[order], volume[order], symbol_code[order], index[order]
+        )
+
+    return {
+        "time": times,
+        "pnl": pnl,
+        "volume": volume,
+        "symbol_code": symbol_code,
+        "symbols": symbols,
+        "index": index
+    }
+
+
+def equity_curve(pnl: np.ndarray, initial_equity: float) -> Dict[str, Any]:
+    """
+    Equity curve, running peak and drawdown statistics for a P&L series
+
+    Args:
+        pnl: Per-deal (or per-period) P&L in chronological order
+        initial_equity: Starting equity; it also seeds the running peak
+
+    Returns:
+        {
+            "equity", "running_peak", "drawdown", "drawdown_pct": arrays,
+            "final_equity", "final_peak": floats,
+            "max_drawdown_amount": largest peak-to-trough loss in currency,
+            "max_drawdown": {"pct", "amount", "peak_index", "trough_index", "recovery_index"},
+            "episodes": [{"peak_index", "trough_index", "recovery_index", "end_index",
+                          "peak_equity", "trough_equity", "depth", "depth_pct"}]
+        }
+        Indices refer to positions in pnl; peak_index -1 means the initial
+        equity, recovery_index None means the drawdown has not recovered.
+    """
+    pnl = np.asarray(pnl, dtype=np.float64)
+    n = pnl.size
+    initial_equity = float(initial_equity)
+
+    if n == 0:
+        empty = np.empty(0, dtype=np.float64)
+        return {
+            "equity": empty,
+            "running_peak": empty,
+            "drawdown": empty,
+            "drawdown_pct": empty,
+            "final_equity": initial_equity,
+            "final_peak": initial_equity,
+            "max_drawdown_amount": 0.0,
+            "max_drawdown": {"pct": 0.0, "amount": 0.0, "peak_index": -1, "trough_index": -1, "recovery_index": None},
+            "episodes": []
+        }
+
+    equity = initial_equity + np.cumsum(pnl)
+    running_peak = np.maximum.accumulate(np.maximum(equity, initial_equity))
+    drawdown = running_peak - equity
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown_pct = np.where(running_peak > 0, drawdown / running_peak * 100, 0.0)
+
+    # Drawdown episodes are maximal runs of consecutive rows below the running peak
+    in_dd = drawdown > 0
+    edges = np.diff(np.concatenate(([0], in_dd.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+
+    episodes = []
+    for start, end in zip(starts, ends):
+        trough = int(start + np.argmax(drawdown_pct[start:end + 1]))
+        recovery = int(end + 1) if end + 1 < n else None
+        peak_equity = float(running_peak[start])
+        episodes.append({
+            "peak_index": int(start) - 1,
+            "trough_index": trough,
+            "recovery_index": recovery,
+            "end_index": int(end),
+            "peak_equity": peak_equity,
+            "trough_equity": float(equity[trough]),
+            "depth": float(drawdown[trough]),
+            "depth_pct": float(drawdown_pct[trough])
+        })
+
+    max_drawdown = {"pct": 0.0, "amount": 0.0, "peak_index": -1, "trough_index": -1, "recovery_index": None}
+    if episodes:
+        worst = max(episodes, key=lambda e: e["depth_pct"])
+        max_drawdown = {
+            "pct": worst["depth_pct"],
+            "amount": worst["depth"],
+            "peak_index": worst["peak_index"],
+            "trough_index": worst["trough_index"],
+            "recovery_index": worst["recovery_index"]
+        }
+
+    return {
+        "equity": equity,
+        "running_peak": running_peak,
+        "drawdown": drawdown,
+        "drawdown_pct": drawdown_pct,
+        "final_equity": float(equity[-1]),
+        "final_peak": float(running_peak[-1]),
+        "max_drawdown_amount": float(drawdown.max()),
+        "max_drawdown": max_drawdown,
+        "episodes": episodes
+    }
+
+
+def first_index_at_or_above(values: np.ndarray, threshold: float, start: int, end: int) -> Optional[int]:
+    """First index in values[start:end+1] that is >= threshold (None if none)"""
+    hits = np.flatnonzero(values[start:end + 1] >= threshold)
+    return int(start + hits[0]) if hits.size else None
@@ -9,11 +9,20 @@ Key Features:
 - Trade breach detection and alerting
 """
 
+import asyncio
 import logging
+import os
+import time
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from motor.motor_asyncio import AsyncIOMotorDatabase
 import math
+import re
+import numpy as np
+
+from services.deal_store import AccountDeals, deal_store
+from services.equity_curve import deals_to_columns, equity_curve, first_index_at_or_above
+from services.shared_state import SharedVersions
 
 logger = logging.getLogger(__name__)
 
@@ -258,6 +267,12 @@ ALERT_SEVERITY = {
 
 VALID_COPY_RATIOS = [1.0, 0.9, 0.8, 0.7, 0.6, 0.5, 0.4, 0.3, 0.2, 0.1]
 
+# Copy ratio written in account notes, e.g. "0.5 ratio", "at 0.5 ratio", "@0.5"
+COPY_RATIO_NOTE_PATTERN = re.compile(r'(\d+\.?\d*)\s*ratio|at\s*(\d+\.?\d*)\s*ratio|@\s*(\d+\.?\d*)')
+
+# Accounts loading deals at once in HullRiskEngine.analyze_portfolio
+PORTFOLIO_MAX_CONCURRENCY = int(os.environ.get('RISK_PORTFOLIO_CONCURRENCY', '8'))
+
 # Copy ratio recommendation logic:
 # 1. If avg lot size breaches > 20% of allowed: reduce ratio by 0.1-0.2
 # 2. If avg lot size breaches > 50% of allowed: reduce ratio by 0.3-0.4
@@ -366,6 +381,117 @@ ACCOUNT_POLICY_OVERRIDES = {
 }
 
 
+# ============================================================================
+# INSTRUMENT SPEC CACHE
+# Shared by every HullRiskEngine instance (engines are created per request)
+# ============================================================================
+INSTRUMENT_SPEC_CACHE_TTL_SECONDS = int(os.environ.get('INSTRUMENT_SPEC_CACHE_TTL_SECONDS', '300'))
+INSTRUMENT_SPEC_VERSION_KEY = 'instrument_specs'
+
+# Broker symbol suffixes that map to the same instrument (XAUUSD.ecn -> XAUUSD)
+SYMBOL_SUFFIXES = (".ECN", ".STP")
+
+
+def normalize_symbol(symbol: str) -> str:
+    """Uppercase and strip broker suffixes (.ecn/.stp)"""
+    normalized = (symbol or "").upper().strip()
+    for suffix in SYMBOL_SUFFIXES:
+        if normalized.endswith(suffix):
+            return normalized[:-len(suffix)]
+    return normalized
+
+
+def _generic_instrument_specs(symbol: str) -> Dict[str, Any]:
+    """Generic fallback for unknown instruments"""
+    return {
+        "symbol": symbol,
+        "name": symbol,
+        "contract_size": 100000,
+        "pip_size": 0.0001,
+        "pip_value_per_lot": 10.0,
+        "value_per_unit_move_per_lot": 100000,
+        "lot_step": 0.01,
+        "min_lot": 0.01,
+        "max_lot": 100.0,
+        "typical_spread": 2.0,
+        "default_stop_distance": 0.0050,
+        "atr_multiplier": 1.5
+    }
+
+
+class InstrumentSpecCache:
+    """
+    In-process instrument spec table with a TTL
+
+    Warmed in one query from get_all_instrument_specs() layered over
+    DEFAULT_INSTRUMENT_SPECS. Lookups try the exact symbol first, then the
+    normalized one, then the generic fallback - the same precedence
+    get_instrument_specs() had when it queried MongoDB per call. With shared
+    versions (set by server.py) a spec upsert in one worker reloads the
+    table in every worker.
+    """
+
+    def __init__(self, ttl_seconds: int = INSTRUMENT_SPEC_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._specs: Dict[str, Dict[str, Any]] = {}
+        self._loaded_at: Optional[float] = None
+        self._loaded_version: Optional[str] = None
+        self._shared: Optional[SharedVersions] = None
+        self._lock = asyncio.Lock()
+
+    def use_shared_versions(self, versions: SharedVersions):
+        self._shared = versions
+
+    def is_fresh(self, version: Optional[str] = None) -> bool:
+        return (
+            self._loaded_at is not None
+            and version == self._loaded_version
+            and (time.monotonic() - self._loaded_at) < self.ttl_seconds
+        )
+
+    def invalidate(self):
+        self._loaded_at = None
+        if self._shared is not None:
+            self._shared.bump(INSTRUMENT_SPEC_VERSION_KEY)
+
+    async def ensure_loaded(self, engine: "HullRiskEngine"):
+        version = await self._shared.get(INSTRUMENT_SPEC_VERSION_KEY) if self._shared is not None else None
+        if self.is_fresh(version):
+            return
+        async with self._lock:
+            if self.is_fresh(version):
+                return
+            specs: Dict[str, Dict[str, Any]] = dict(DEFAULT_INSTRUMENT_SPECS)
+            db_symbols = set()
+            for spec in await engine.get_all_instrument_specs():
+                symbol = (spec.get("symbol") or "").upper()
+                if not symbol:
+                    continue
+                specs[symbol] = spec
+                db_symbols.add(symbol)
+            # DB specs stored with a suffix also serve the base symbol, unless the
+            # base has its own DB entry (exact DB symbols win over defaults)
+            for symbol in db_symbols:
+                base = normalize_symbol(symbol)
+                if base != symbol and base not in db_symbols:
+                    specs[base] = specs[symbol]
+            self._specs = specs
+            self._loaded_at = time.monotonic()
+            self._loaded_version = version
+            logger.info(f"Instrument spec cache warmed with {len(specs)} symbols")
+
+    def lookup(self, symbol: str) -> Dict[str, Any]:
+        exact = (symbol or "").upper()
+        spec = self._specs.get(exact) or self._specs.get(normalize_symbol(exact))
+        if spec is None:
+            spec = _generic_instrument_specs(normalize_symbol(exact))
+            self._specs[exact] = spec
+        return dict(spec)
+
+
+instrument_spec_cache = InstrumentSpecCache()
+
+
 class HullRiskEngine:
     """
     Hull-style risk engine implementing position sizing and risk controls
@@ -373,6 +499,8 @@ class HullRiskEngine:
     
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
+        self.spec_cache = instrument_spec_cache
+        self.deal_store = deal_store
     
     # =========================================================================
     # DEAL DATA RETRIEVAL - Multi-collection support
@@ -383,17 +511,20 @@ class HullRiskEngine:
         account: int,
         start_date: datetime = None,
         max_deals: int = 5000,
-        allowed_symbols: List[str] = None
+        allowed_symbols: List[str] = None,
+        account_doc: Dict[str, Any] = None
     ) -> List[Dict]:
         """
-        Get deals for an account from both mt5_deals AND mt5_deals_history collections.
+        Get deals for an account from mt5_deals OR mt5_deals_history.
         
         Some accounts (especially demo accounts) store deals in mt5_deals_history,
-        while real accounts use mt5_deals. This method checks both and returns
-        actual trading deals (excluding deposits/withdrawals).
+        while real accounts use mt5_deals. The shared DealStore picks the collection
+        per account, fetches only analytics fields and memoizes the result until the
+        deal sync writes new rows for the account. Only actual trading deals are
+        returned (deposits/withdrawals have no symbol).
         
-        If no deals are found within the date range, it will retry without the date filter
-        to capture historical data.
+        If no deals are found within the date range, the full history is used
+        instead to capture historical data.
         
         Returns deals SORTED BY TIME (ascending) for proper FIFO matching.
         
@@ -402,114 +533,88 @@ class HullRiskEngine:
             start_date: Optional start date for filtering
             max_deals: Maximum number of deals to fetch
             allowed_symbols: Optional list of symbols to include (e.g., ["BTCUSD"] for crypto-only analysis)
+            account_doc: Already-loaded mt5_accounts document (skips the config lookup)
+        """
+        deals, _ = await self._select_deals(account, start_date, max_deals, allowed_symbols, account_doc)
+        return deals
+    
+    async def get_deal_columns_for_account(
+        self,
+        account: int,
+        start_date: datetime = None,
+        max_deals: int = 5000,
+        allowed_symbols: List[str] = None,
+        account_doc: Dict[str, Any] = None
+    ) -> Tuple[List[Dict], Dict[str, Any]]:
+        """
+        Same deals as get_deals_for_account, plus their column arrays
+        
+        Unfiltered deal sets reuse the DealStore's memoized columns, so the
+        column build happens once per cached load instead of per call.
         """
+        deals, entry = await self._select_deals(account, start_date, max_deals, allowed_symbols, account_doc)
+        columns = entry.columns if entry is not None else deals_to_columns(deals)
+        return deals, columns
+    
+    async def _select_deals(
+        self,
+        account: int,
+        start_date: Optional[datetime],
+        max_deals: int,
+        allowed_symbols: Optional[List[str]],
+        account_doc: Optional[Dict[str, Any]]
+    ) -> Tuple[List[Dict], Optional[AccountDeals]]:
+        """Deals for an account and, when no symbol filter applied, their DealStore entry"""
         try:
             # If allowed_symbols not provided, check account config
-            if allowed_symbols is None:
-                account_config = await self.db.mt5_accounts.find_one({"account": account})
+            account_config = account_doc
+            if allowed_symbols is None and account_config is not None:
+                allowed_symbols = account_config.get("allowed_symbols")
+            elif allowed_symbols is None:
+                account_config = await self.db.mt5_accounts.find_one(
+                    {"account": account},
+                    {"_id": 0, "allowed_symbols": 1, "deals_collection": 1}
+                )
                 if account_config:
                     allowed_symbols = account_config.get("allowed_symbols")
             
-            query = {"account": account}
-            if start_date:
-                query["time"] = {"$gte": start_date}
+            # Projected, memoized load from the account's deal collection
+            # (non-trading rows without a symbol are excluded in the query)
+            entry = await self.deal_store.get(self.db, account, start_date, max_deals, account_config)
+            deals = entry.deals
             
-            # Try mt5_deals first (primary collection) - SORT BY TIME
-            deals = await self.db.mt5_deals.find(query).sort("time", 1).to_list(length=max_deals)
+            if not allowed_symbols:
+                logger.info(f"Account {account}: Found {len(deals)} trading deals in {entry.collection}")
+                return deals, entry
             
-            # If no deals found with date filter, try without date filter
-            if not deals and start_date:
-                logger.info(f"No deals in mt5_deals for account {account} in date range, trying without date filter...")
-                deals = await self.db.mt5_deals.find({"account": account}).sort("time", 1).to_list(length=max_deals)
-            
-            # If still no deals found, check mt5_deals_history (used by demo accounts)
-            if not deals:
-                logger.info(f"No deals in mt5_deals for account {account}, checking mt5_deals_history...")
-                query_history = {"account": account}
-                if start_date:
-                    query_history["time"] = {"$gte": start_date}
-                deals = await self.db.mt5_deals_history.find(query_history).sort("time", 1).to_list(length=max_deals)
-                
-                # Try without date filter for history too
-                if not deals and start_date:
-                    deals = await self.db.mt5_deals_history.find({"account": account}).sort("time", 1).to_list(length=max_deals)
-                
-                if deals:
-                    logger.info(f"Found {len(deals)} deals in mt5_deals_history for account {account}")
-            
-            # Filter out deposits/withdrawals (type 2 with symbol empty and profit == initial deposit)
-            # Keep only actual trading deals with symbols
+            # Apply allowed_symbols filter (normalize symbol comparison - handle .ecn, etc.)
+            allowed_upper = [allowed.upper() for allowed in allowed_symbols]
             trading_deals = []
             for deal in deals:
-                symbol = deal.get("symbol", "")
-                deal_type = deal.get("type", 0)
-                comment = deal.get("comment", "").lower()
-                
-                # Skip balance operations (deposits/withdrawals)
-                if not symbol and deal_type == 2 and ("deposit" in comment or "withdraw" in comment):
-                    continue
-                
-                # Skip deals without a symbol (non-trading operations)
-                if not symbol:
-                    continue
-                
-                # Apply allowed_symbols filter if specified
-                if allowed_symbols:
-                    # Normalize symbol comparison (handle .ecn, etc.)
-                    symbol_base = symbol.upper().replace(".ECN", "").replace(".STP", "")
-                    if not any(allowed.upper() in symbol_base or symbol_base in allowed.upper() for allowed in allowed_symbols):
-                        continue
-                
-                trading_deals.append(deal)
+                symbol_base = normalize_symbol(deal.get("symbol", ""))
+                if any(allowed in symbol_base or symbol_base in allowed for allowed in allowed_upper):
+                    trading_deals.append(deal)
             
-            if allowed_symbols:
-                logger.info(f"Account {account}: Found {len(trading_deals)} trading deals (filtered by symbols: {allowed_symbols})")
-            else:
-                logger.info(f"Account {account}: Found {len(trading_deals)} trading deals (filtered from {len(deals)} total)")
-            return trading_deals
+            logger.info(f"Account {account}: Found {len(trading_deals)} trading deals (filtered by symbols: {allowed_symbols})")
+            return trading_deals, None
             
         except Exception as e:
             logger.error(f"Error getting deals for account {account}: {e}")
-            return []
+            return [], None
     
     # =========================================================================
     # INSTRUMENT SPECS MANAGEMENT
     # =========================================================================
     
     async def get_instrument_specs(self, symbol: str) -> Dict[str, Any]:
-        """Get instrument specifications from DB or defaults"""
+        """Get instrument specifications from the spec cache (DB specs over defaults)"""
         try:
-            # Try to get from MongoDB first
-            specs = await self.db.instrument_specs.find_one({"symbol": symbol.upper()})
-            
-            if specs:
-                specs.pop("_id", None)
-                return specs
-            
-            # Fall back to defaults
-            normalized_symbol = symbol.upper()
-            if normalized_symbol in DEFAULT_INSTRUMENT_SPECS:
-                return DEFAULT_INSTRUMENT_SPECS[normalized_symbol]
-            
-            # Generic fallback for unknown instruments
-            return {
-                "symbol": normalized_symbol,
-                "name": normalized_symbol,
-                "contract_size": 100000,
-                "pip_size": 0.0001,
-                "pip_value_per_lot": 10.0,
-                "value_per_unit_move_per_lot": 100000,
-                "lot_step": 0.01,
-                "min_lot": 0.01,
-                "max_lot": 100.0,
-                "typical_spread": 2.0,
-                "default_stop_distance": 0.0050,
-                "atr_multiplier": 1.5
-            }
+            await self.spec_cache.ensure_loaded(self)
+            return self.spec_cache.lookup(symbol)
             
         except Exception as e:
             logger.error(f"Error getting instrument specs for {symbol}: {e}")
-            return DEFAULT_INSTRUMENT_SPECS.get(symbol.upper(), DEFAULT_INSTRUMENT_SPECS["EURUSD"])
+            return DEFAULT_INSTRUMENT_SPECS.get(normalize_symbol(symbol), DEFAULT_INSTRUMENT_SPECS["EURUSD"])
     
     async def get_all_instrument_specs(self) -> List[Dict[str, Any]]:
         """Get all instrument specifications - DB specs take priority over defaults"""
@@ -539,6 +644,7 @@ class HullRiskEngine:
                 {"$set": specs},
                 upsert=True
             )
+            self.spec_cache.invalidate()
             return True
         except Exception as e:
             logger.error(f"Error upserting instrument specs: {e}")
@@ -584,6 +690,44 @@ class HullRiskEngine:
             logger.error(f"Error getting risk policy: {e}")
             return DEFAULT_RISK_POLICY.copy()
     
+    async def get_risk_policies(self, accounts: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Risk policies for many accounts in one query
+        
+        Same precedence as get_risk_policy: account policy, then global policy,
+        then DEFAULT_RISK_POLICY, with only non-None DB values overriding.
+        """
+        def merged(db_policy: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+            policy = DEFAULT_RISK_POLICY.copy()
+            for key, value in (db_policy or {}).items():
+                if key != "_id" and value is not None:
+                    policy[key] = value
+            return policy
+        
+        try:
+            account_policies = {}
+            global_policy = None
+            cursor = self.db.risk_policies.find({
+                "$or": [
+                    {"account": {"$in": list(accounts)}},
+                    {"account": None, "is_global": True}
+                ]
+            })
+            async for doc in cursor:
+                if doc.get("account") is None:
+                    global_policy = global_policy or doc
+                else:
+                    account_policies[doc["account"]] = doc
+            
+            default_policy = merged(global_policy)
+            return {
+                account: merged(account_policies[account]) if account in account_policies else default_policy.copy()
+                for account in accounts
+            }
+            
+        except Exception as e:
+            logger.error(f"Error getting risk policies: {e}")
+            return {account: DEFAULT_RISK_POLICY.copy() for account in accounts}
+    
     async def update_risk_policy(self, policy: Dict[str, Any], account: int = None) -> bool:
         """Update risk policy for an account or global"""
         try:
@@ -922,7 +1066,7 @@ class HullRiskEngine:
             
             # Get deals for the period (checks both mt5_deals AND mt5_deals_history)
             start_date = datetime.now(timezone.utc) - timedelta(days=period_days)
-            deals = await self.get_deals_for_account(account, start_date, max_deals=1000)
+            deals, columns = await self.get_deal_columns_for_account(account, start_date, max_deals=1000)
             
             # ===== Calculate breaches and penalties =====
             score = 100  # Start at 100
@@ -939,30 +1083,9 @@ class HullRiskEngine:
             
             # Build equity curve from deals to calculate real drawdown
             if deals and initial_allocation > 0:
-                # Sort deals chronologically (oldest first)
-                sorted_deals = sorted(deals, key=lambda d: d.get("time", 0))
-                
-                # Build equity curve by accumulating profits
-                running_equity = initial_allocation
-                running_peak = initial_allocation
-                max_dd_amount = 0
-                
-                for deal in sorted_deals:
-                    profit = deal.get("profit", 0)
-                    swap = deal.get("swap", 0)
-                    commission = deal.get("commission", 0)
-                    
-                    # Add all P&L components
-                    running_equity += profit + swap + commission
-                    
-                    # Update peak if we have a new high
-                    if running_equity > running_peak:
-                        running_peak = running_equity
-                    
-                    # Calculate drawdown from peak
-                    dd_amount = running_peak - running_equity
-                    if dd_amount > max_dd_amount:
-                        max_dd_amount = dd_amount
+                curve = equity_curve(columns["pnl"], initial_allocation)
+                running_peak = curve["final_peak"]
+                max_dd_amount = curve["max_drawdown_amount"]
                 
                 # Calculate max drawdown percentage
                 if running_peak > 0:
@@ -1199,110 +1322,84 @@ class HullRiskEngine:
             
             # Get all deals for the period
             start_date = datetime.now(timezone.utc) - timedelta(days=period_days)
-            deals = await self.get_deals_for_account(account, start_date, max_deals=5000)
+            deals, columns = await self.get_deal_columns_for_account(account, start_date, max_deals=5000)
             
             if not deals:
                 return {"success": False, "error": "No deals found for analysis"}
             
-            # Sort deals chronologically
-            sorted_deals = sorted(deals, key=lambda d: d.get("time", 0))
+            # Equity curve and drawdown episodes from the shared kernel
+            sorted_deals = [deals[i] for i in columns["index"]]
+            pnl = columns["pnl"]
+            curve = equity_curve(pnl, initial_allocation)
+            equity_series = curve["equity"]
+            peak_series = curve["running_peak"]
+            dd_pct_series = curve["drawdown_pct"]
+            running_equity = curve["final_equity"]
+            running_peak = curve["final_peak"]
+            
+            def trade_info(i: int) -> Dict[str, Any]:
+                deal = sorted_deals[i]
+                peak = float(peak_series[i])
+                total_pnl = float(pnl[i])
+                return {
+                    "ticket": deal.get("ticket"),
+                    "time": deal.get("time"),
+                    "symbol": deal.get("symbol", ""),
+                    "type": "BUY" if deal.get("type") == 0 else "SELL",
+                    "volume": deal.get("volume", 0),
+                    "price": deal.get("price", 0),
+                    "profit": deal.get("profit", 0),
+                    "swap": deal.get("swap", 0),
+                    "commission": deal.get("commission", 0),
+                    "total_pnl": total_pnl,
+                    "equity_before": float(equity_series[i]) - total_pnl,
+                    "equity_after": float(equity_series[i]),
+                    "dd_pct_after": round(float(dd_pct_series[i]), 2),
+                    "dd_contribution_pct": round(abs(total_pnl) / peak * 100, 3) if peak > 0 else 0
+                }
             
-            # Build equity curve and identify drawdown events
-            running_equity = initial_allocation
-            running_peak = initial_allocation
-            peak_timestamp = None
+            # Losing trades that pushed equity into/deeper into drawdown
+            dd_trade_indices = np.flatnonzero((pnl < 0) & (dd_pct_series > 0))
+            dd_trade_infos = {int(i): trade_info(int(i)) for i in dd_trade_indices}
+            all_dd_trades = list(dd_trade_infos.values())  # All trades that contributed to drawdowns
             
+            # A drawdown event is an episode whose depth reached the warning threshold
             drawdown_events = []
-            current_dd_event = None
-            dd_triggering_trades = []
-            
-            # Track statistics for pattern analysis
-            all_dd_trades = []  # All trades that contributed to drawdowns
-            
-            for i, deal in enumerate(sorted_deals):
-                profit = deal.get("profit", 0)
-                swap = deal.get("swap", 0)
-                commission = deal.get("commission", 0)
-                total_pnl = profit + swap + commission
+            for episode in curve["episodes"]:
+                if episode["depth_pct"] < dd_warning:
+                    continue
                 
-                prev_equity = running_equity
-                running_equity += total_pnl
+                start, end = episode["peak_index"] + 1, episode["end_index"]
+                first_trigger = first_index_at_or_above(dd_pct_series, dd_warning, start, end)
+                triggering_trades = [dd_trade_infos[i] for i in range(start, end + 1) if i in dd_trade_infos]
+                trough = episode["trough_index"]
                 
-                # Check if this is a new peak
-                if running_equity > running_peak:
-                    # If we were in a drawdown, close that event
-                    if current_dd_event:
-                        current_dd_event["recovery_date"] = deal.get("time")
-                        current_dd_event["recovery_equity"] = running_equity
-                        current_dd_event["triggering_trades"] = dd_triggering_trades.copy()
-                        current_dd_event["total_trades_in_dd"] = len(dd_triggering_trades)
-                        drawdown_events.append(current_dd_event)
-                        current_dd_event = None
-                        dd_triggering_trades = []
-                    
-                    running_peak = running_equity
-                    peak_timestamp = deal.get("time")
+                event = {
+                    "event_id": len(drawdown_events) + 1,
+                    "start_date": sorted_deals[episode["peak_index"]].get("time") if episode["peak_index"] >= 0 else None,
+                    "peak_equity": episode["peak_equity"],
+                    "severity": "CRITICAL" if dd_pct_series[first_trigger] >= dd_critical else "WARNING",
+                    "max_dd_pct": episode["depth_pct"],
+                    "trough_equity": episode["trough_equity"],
+                    "trough_date": sorted_deals[trough].get("time"),
+                    "first_trigger_trade": dd_trade_infos.get(first_trigger) or trade_info(first_trigger)
+                }
                 
-                # Calculate current drawdown percentage
-                if running_peak > 0:
-                    dd_pct = ((running_peak - running_equity) / running_peak) * 100
+                if event["severity"] == "WARNING" and episode["depth_pct"] >= dd_critical:
+                    critical_index = first_index_at_or_above(dd_pct_series, dd_critical, start, end)
+                    event["severity"] = "CRITICAL"
+                    event["critical_trigger_trade"] = dd_trade_infos.get(critical_index) or trade_info(critical_index)
+                
+                recovery = episode["recovery_index"]
+                if recovery is not None:
+                    event["recovery_date"] = sorted_deals[recovery].get("time")
+                    event["recovery_equity"] = float(equity_series[recovery])
                 else:
-                    dd_pct = 0
+                    event["status"] = "ONGOING"
                 
-                # Check if this trade pushed us into/deeper into drawdown
-                if total_pnl < 0 and dd_pct > 0:
-                    trade_info = {
-                        "ticket": deal.get("ticket"),
-                        "time": deal.get("time"),
-                        "symbol": deal.get("symbol", ""),
-                        "type": "BUY" if deal.get("type") == 0 else "SELL",
-                        "volume": deal.get("volume", 0),
-                        "price": deal.get("price", 0),
-                        "profit": profit,
-                        "swap": swap,
-                        "commission": commission,
-                        "total_pnl": total_pnl,
-                        "equity_before": prev_equity,
-                        "equity_after": running_equity,
-                        "dd_pct_after": round(dd_pct, 2),
-                        "dd_contribution_pct": round(abs(total_pnl) / running_peak * 100, 3) if running_peak > 0 else 0
-                    }
-                    
-                    dd_triggering_trades.append(trade_info)
-                    all_dd_trades.append(trade_info)
-                    
-                    # Check if this trade triggered a warning/critical threshold
-                    prev_dd_pct = ((running_peak - prev_equity) / running_peak * 100) if running_peak > 0 else 0
-                    
-                    # Start new drawdown event if we crossed a threshold
-                    if not current_dd_event:
-                        if dd_pct >= dd_warning:
-                            current_dd_event = {
-                                "event_id": len(drawdown_events) + 1,
-                                "start_date": peak_timestamp,
-                                "peak_equity": running_peak,
-                                "severity": "CRITICAL" if dd_pct >= dd_critical else "WARNING",
-                                "max_dd_pct": dd_pct,
-                                "trough_equity": running_equity,
-                                "trough_date": deal.get("time"),
-                                "first_trigger_trade": trade_info
-                            }
-                    else:
-                        # Update existing event if DD got worse
-                        if dd_pct > current_dd_event["max_dd_pct"]:
-                            current_dd_event["max_dd_pct"] = dd_pct
-                            current_dd_event["trough_equity"] = running_equity
-                            current_dd_event["trough_date"] = deal.get("time")
-                            if dd_pct >= dd_critical and current_dd_event["severity"] == "WARNING":
-                                current_dd_event["severity"] = "CRITICAL"
-                                current_dd_event["critical_trigger_trade"] = trade_info
-            
-            # Close any open drawdown event
-            if current_dd_event:
-                current_dd_event["triggering_trades"] = dd_triggering_trades
-                current_dd_event["total_trades_in_dd"] = len(dd_triggering_trades)
-                current_dd_event["status"] = "ONGOING"
-                drawdown_events.append(current_dd_event)
+                event["triggering_trades"] = triggering_trades
+                event["total_trades_in_dd"] = len(triggering_trades)
+                drawdown_events.append(event)
             
             # ================================================================
             # PATTERN ANALYSIS - Identify what's causing drawdowns
@@ -2073,6 +2170,40 @@ class HullRiskEngine:
     # RISK ANALYSIS FOR STRATEGY/ACCOUNT
     # =========================================================================
     
+    def _drawdown_profile(
+        self,
+        deals: List[Dict],
+        initial_equity: float,
+        columns: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Deal-based equity curve summary (max drawdown and its episodes)"""
+        if not deals or initial_equity <= 0:
+            return {"max_drawdown_pct": 0, "max_drawdown_amount": 0, "episodes": 0}
+        
+        if columns is None:
+            columns = deals_to_columns(deals)
+        curve = equity_curve(columns["pnl"], initial_equity)
+        max_dd = curve["max_drawdown"]
+        
+        def deal_time(index):
+            if index is None or index < 0:
+                return None
+            value = deals[int(columns["index"][index])].get("time")
+            return value.isoformat() if isinstance(value, datetime) else value
+        
+        return {
+            "max_drawdown_pct": round(max_dd["pct"], 2),
+            "max_drawdown_amount": round(max_dd["amount"], 2),
+            "peak_time": deal_time(max_dd["peak_index"]),
+            "trough_time": deal_time(max_dd["trough_index"]),
+            "recovery_time": deal_time(max_dd["recovery_index"]),
+            "recovered": max_dd["recovery_index"] is not None,
+            "current_drawdown_pct": round(float(curve["drawdown_pct"][-1]), 2),
+            "peak_equity": round(curve["final_peak"], 2),
+            "final_equity": round(curve["final_equity"], 2),
+            "episodes": len(curve["episodes"])
+        }
+    
     async def get_strategy_risk_analysis(
         self,
         account: int,
@@ -2094,7 +2225,7 @@ class HullRiskEngine:
             
             # Get deals for analysis (checks both mt5_deals AND mt5_deals_history)
             start_date = datetime.now(timezone.utc) - timedelta(days=period_days)
-            deals = await self.get_deals_for_account(account, start_date, max_deals=5000)
+            deals, deal_columns = await self.get_deal_columns_for_account(account, start_date, max_deals=5000)
             
             # ===== DEAL-BY-DEAL ANALYSIS =====
             deal_analysis = []
@@ -2682,6 +2813,7 @@ class HullRiskEngine:
                     "max_margin_usage_pct": risk_policy.get("max_margin_usage_pct", 25.0)
                 },
                 "risk_control_score": risk_score,
+                "drawdown_profile": self._drawdown_profile(deals, initial_allocation, deal_columns),
                 "compliance_summary": overall_compliance,
                 "compliance_details": compliance_details,
                 "action_items": action_items,
@@ -2962,185 +3094,270 @@ class HullRiskEngine:
             if not account_info:
                 return {"error": f"Account {account} not found"}
             
-            manager_name = account_info.get("manager_name", f"Account {account}")
-            equity = account_info.get("equity", 0) or account_info.get("balance", 0)
-            initial_allocation = account_info.get("initial_allocation", equity)
-            notes = account_info.get("notes", "")
-            account_type = account_info.get("account_type", "real")
-            
-            # Extract current copy ratio from notes
-            current_ratio = 1.0  # Default to 1:1
-            import re
-            ratio_match = re.search(r'(\d+\.?\d*)\s*ratio|at\s*(\d+\.?\d*)\s*ratio|@\s*(\d+\.?\d*)', notes.lower())
-            if ratio_match:
-                ratio_str = ratio_match.group(1) or ratio_match.group(2) or ratio_match.group(3)
-                try:
-                    current_ratio = float(ratio_str)
-                except:
-                    current_ratio = 1.0
-            
             # Get risk policy
             risk_policy = await self.get_risk_policy(account)
             
             # Get deals for analysis
             start_date = datetime.now(timezone.utc) - timedelta(days=period_days)
-            deals = await self.get_deals_for_account(account, start_date, max_deals=5000)
-            
-            if not deals:
-                return {
-                    "success": True,
-                    "account": account,
-                    "manager_name": manager_name,
-                    "account_type": account_type,
-                    "notes": notes,
-                    "current_copy_ratio": current_ratio,
-                    "current_ratio_source": "Extracted from account notes" if ratio_match else "Default (1.0)",
-                    "recommended_ratio": current_ratio,
-                    "ratio_change": 0,
-                    "urgency": "INFO",
-                    "action": "MAINTAIN",
-                    "reasons": ["No trades found in analysis period - cannot calculate recommendation"],
-                    "lot_analysis": None,
-                    "valid_ratios": VALID_COPY_RATIOS
-                }
-            
-            # Analyze lot sizes vs FIDUS limits
-            lot_breaches = []
-            total_lots = 0
-            max_breach_pct = 0
-            
-            for deal in deals:
-                symbol = deal.get("symbol", "")
-                if not symbol:
-                    continue
-                
-                volume = deal.get("volume", 0)
-                if volume <= 0:
-                    continue
-                
-                total_lots += volume
-                
-                # Get instrument specs to calculate max allowed
-                specs = await self.get_instrument_specs(symbol)
-                
-                # Calculate max allowed lots based on risk policy
-                max_lots_calc = self.calculate_max_lots(
-                    equity if equity > 0 else initial_allocation,
-                    specs,
-                    risk_policy,
-                    specs.get("default_stop_distance", 10)
-                )
-                
-                max_allowed = max_lots_calc.get("max_lots", 1.0)
-                
-                if volume > max_allowed and max_allowed > 0:
-                    breach_pct = ((volume - max_allowed) / max_allowed) * 100
-                    lot_breaches.append({
-                        "symbol": symbol,
-                        "volume": volume,
-                        "max_allowed": max_allowed,
-                        "breach_pct": breach_pct,
-                        "time": deal.get("time")
-                    })
-                    max_breach_pct = max(max_breach_pct, breach_pct)
-            
-            # Calculate averages
-            avg_breach_pct = 0
-            if lot_breaches:
-                avg_breach_pct = sum(b["breach_pct"] for b in lot_breaches) / len(lot_breaches)
+            deals = await self.get_deals_for_account(account, start_date, max_deals=5000, account_doc=account_info)
             
             # Calculate risk control score (optional - skip for bulk operations)
             composite_score = 70  # Default
-            if not skip_risk_score:
+            if deals and not skip_risk_score:
                 risk_score = await self.calculate_risk_control_score(account, period_days)
                 composite_score = risk_score.get("composite_score", 70)
             
-            # Get copy ratio recommendation
-            recommendation = get_recommended_copy_ratio(
-                current_ratio,
-                avg_breach_pct,
-                max_breach_pct,
-                composite_score
-            )
-            
-            # Build detailed analysis
-            lot_analysis = {
-                "total_trades_analyzed": len(deals),
-                "trades_with_breaches": len(lot_breaches),
-                "breach_rate": round(len(lot_breaches) / len(deals) * 100, 1) if deals else 0,
-                "average_breach_pct": round(avg_breach_pct, 1),
-                "max_breach_pct": round(max_breach_pct, 1),
-                "worst_breaches": sorted(lot_breaches, key=lambda x: -x["breach_pct"])[:5]
-            }
-            
-            # Generate recommendations
-            actionable_recommendations = []
-            
-            if recommendation["action"] == "DECREASE":
-                actionable_recommendations.append({
-                    "priority": "HIGH" if recommendation["urgency"] in ["HIGH", "CRITICAL"] else "MEDIUM",
-                    "action": f"Reduce copy ratio from {current_ratio} to {recommendation['recommended_ratio']}",
-                    "impact": f"This will reduce trade sizes by {abs(recommendation['ratio_change'])*100:.0f}%",
-                    "implementation": f"Update Social Trading copier settings: Set 'Lot Multiplier' to {recommendation['recommended_ratio']}"
-                })
-            elif recommendation["action"] == "INCREASE":
-                actionable_recommendations.append({
-                    "priority": "LOW",
-                    "action": f"Consider increasing copy ratio from {current_ratio} to {recommendation['recommended_ratio']}",
-                    "impact": f"This would increase trade sizes by {abs(recommendation['ratio_change'])*100:.0f}%",
-                    "implementation": "Only increase if risk score remains above 80 for next 2 weeks"
-                })
+            await self.spec_cache.ensure_loaded(self)
+            return self._build_copy_ratio_analysis(account_info, risk_policy, deals, period_days, composite_score)
             
-            # Add symbol-specific recommendations if certain symbols breach more
-            symbol_breaches = {}
-            for breach in lot_breaches:
-                sym = breach["symbol"]
-                if sym not in symbol_breaches:
-                    symbol_breaches[sym] = {"count": 0, "avg_pct": 0}
-                symbol_breaches[sym]["count"] += 1
-                symbol_breaches[sym]["avg_pct"] += breach["breach_pct"]
-            
-            for sym, data in symbol_breaches.items():
-                data["avg_pct"] = data["avg_pct"] / data["count"]
-                if data["avg_pct"] > 50:
-                    actionable_recommendations.append({
-                        "priority": "MEDIUM",
-                        "action": f"Consider disabling {sym} in copier or setting symbol-specific max lot",
-                        "impact": f"{sym} has {data['count']} breaches averaging {data['avg_pct']:.0f}% over limit",
-                        "implementation": f"In Social Trading: Use 'Disable Symbols' feature for {sym} or set per-symbol max lot"
-                    })
+        except Exception as e:
+            logger.error(f"Error analyzing copy ratio for account {account}: {e}")
+            return {"error": str(e), "account": account}
+    
+    async def analyze_portfolio(
+        self,
+        accounts: List[Any],
+        period_days: int = 30,
+        skip_risk_score: bool = True,
+        max_concurrency: int = PORTFOLIO_MAX_CONCURRENCY
+    ) -> List[Dict[str, Any]]:
+        """
+        Copy ratio analysis for many accounts in one pass.
+        
+        Accounts, risk policies and instrument specs are loaded with one bulk
+        query each; deals come from the shared DealStore and are fetched
+        concurrently (bounded by max_concurrency). Each element of the result
+        is the same payload analyze_copy_ratio returns for that account, in
+        input order.
+        
+        Args:
+            accounts: MT5 account numbers, or already-loaded mt5_accounts documents
+            period_days: Analysis period in days
+            skip_risk_score: Skip the per-account risk score (default for dashboards)
+            max_concurrency: Maximum accounts loading deals at the same time
             
+        Returns:
+            List of per-account copy ratio analyses
+        """
+        account_docs = {}
+        account_numbers = []
+        for item in accounts:
+            if isinstance(item, dict):
+                account_docs[item.get("account")] = item
+                account_numbers.append(item.get("account"))
+            else:
+                account_numbers.append(item)
+        
+        missing = [a for a in account_numbers if a not in account_docs]
+        if missing:
+            async for doc in self.db.mt5_accounts.find({"account": {"$in": missing}}):
+                account_docs[doc["account"]] = doc
+        
+        policies = await self.get_risk_policies(account_numbers)
+        await self.spec_cache.ensure_loaded(self)
+        
+        start_date = datetime.now(timezone.utc) - timedelta(days=period_days)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def analyze(account: int) -> Dict[str, Any]:
+            account_info = account_docs.get(account)
+            if not account_info:
+                return {"error": f"Account {account} not found", "account": account}
+            try:
+                async with semaphore:
+                    deals = await self.get_deals_for_account(
+                        account, start_date, max_deals=5000, account_doc=account_info
+                    )
+                    composite_score = 70
+                    if deals and not skip_risk_score:
+                        risk_score = await self.calculate_risk_control_score(account, period_days)
+                        composite_score = risk_score.get("composite_score", 70)
+                return self._build_copy_ratio_analysis(
+                    account_info, policies[account], deals, period_days, composite_score
+                )
+            except Exception as e:
+                logger.error(f"Error analyzing copy ratio for account {account}: {e}")
+                return {"error": str(e), "account": account}
+        
+        started = time.perf_counter()
+        results = await asyncio.gather(*(analyze(account) for account in account_numbers))
+        logger.info(
+            f"📊 Portfolio copy ratio analysis: {len(results)} accounts in "
+            f"{(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+        return list(results)
+    
+    def _build_copy_ratio_analysis(
+        self,
+        account_info: Dict[str, Any],
+        risk_policy: Dict[str, Any],
+        deals: List[Dict[str, Any]],
+        period_days: int,
+        composite_score: float = 70
+    ) -> Dict[str, Any]:
+        """Copy ratio payload from pre-loaded inputs (no I/O; spec cache must be loaded)"""
+        account = account_info.get("account")
+        manager_name = account_info.get("manager_name", f"Account {account}")
+        equity = account_info.get("equity", 0) or account_info.get("balance", 0)
+        initial_allocation = account_info.get("initial_allocation", equity)
+        notes = account_info.get("notes", "") or ""
+        account_type = account_info.get("account_type", "real")
+        
+        # Extract current copy ratio from notes
+        current_ratio = 1.0  # Default to 1:1
+        ratio_match = COPY_RATIO_NOTE_PATTERN.search(notes.lower())
+        if ratio_match:
+            ratio_str = ratio_match.group(1) or ratio_match.group(2) or ratio_match.group(3)
+            try:
+                current_ratio = float(ratio_str)
+            except (TypeError, ValueError):
+                current_ratio = 1.0
+        
+        if not deals:
             return {
+                "success": True,
                 "account": account,
                 "manager_name": manager_name,
                 "account_type": account_type,
-                "equity": round(equity, 2),
-                "initial_allocation": round(initial_allocation, 2),
                 "notes": notes,
-                "risk_control_score": composite_score,
-                
-                # Current configuration
                 "current_copy_ratio": current_ratio,
                 "current_ratio_source": "Extracted from account notes" if ratio_match else "Default (1.0)",
-                
-                # Recommendation
-                "recommended_ratio": recommendation["recommended_ratio"],
-                "ratio_change": recommendation["ratio_change"],
-                "urgency": recommendation["urgency"],
-                "action": recommendation["action"],
-                "reasons": recommendation["reasons"],
-                
-                # Analysis details
-                "lot_analysis": lot_analysis,
-                "actionable_recommendations": actionable_recommendations,
-                
-                # Reference
-                "valid_ratios": VALID_COPY_RATIOS,
-                "period_days": period_days,
-                "analysis_timestamp": datetime.now(timezone.utc).isoformat()
+                "recommended_ratio": current_ratio,
+                "ratio_change": 0,
+                "urgency": "INFO",
+                "action": "MAINTAIN",
+                "reasons": ["No trades found in analysis period - cannot calculate recommendation"],
+                "lot_analysis": None,
+                "valid_ratios": VALID_COPY_RATIOS
             }
+        
+        # Analyze lot sizes vs FIDUS limits
+        lot_breaches = []
+        total_lots = 0
+        max_breach_pct = 0
+        max_allowed_by_symbol: Dict[str, float] = {}
+        
+        for deal in deals:
+            symbol = deal.get("symbol", "")
+            if not symbol:
+                continue
             
-        except Exception as e:
-            logger.error(f"Error analyzing copy ratio for account {account}: {e}")
-            return {"error": str(e), "account": account}
+            volume = deal.get("volume", 0)
+            if volume <= 0:
+                continue
+            
+            total_lots += volume
+            
+            # Max allowed lots depend only on the symbol - compute once per symbol
+            max_allowed = max_allowed_by_symbol.get(symbol)
+            if max_allowed is None:
+                specs = self.spec_cache.lookup(symbol)
+                max_lots_calc = self.calculate_max_lots(
+                    equity if equity > 0 else initial_allocation,
+                    specs,
+                    risk_policy,
+                    specs.get("default_stop_distance", 10)
+                )
+                max_allowed = max_allowed_by_symbol[symbol] = max_lots_calc.get("max_lots", 1.0)
+            
+            if volume > max_allowed and max_allowed > 0:
+                breach_pct = ((volume - max_allowed) / max_allowed) * 100
+                lot_breaches.append({
+                    "symbol": symbol,
+                    "volume": volume,
+                    "max_allowed": max_allowed,
+                    "breach_pct": breach_pct,
+                    "time": deal.get("time")
+                })
+                max_breach_pct = max(max_breach_pct, breach_pct)
+        
+        # Calculate averages
+        avg_breach_pct = 0
+        if lot_breaches:
+            avg_breach_pct = sum(b["breach_pct"] for b in lot_breaches) / len(lot_breaches)
+        
+        # Get copy ratio recommendation
+        recommendation = get_recommended_copy_ratio(
+            current_ratio,
+            avg_breach_pct,
+            max_breach_pct,
+            composite_score
+        )
+        
+        # Build detailed analysis
+        lot_analysis = {
+            "total_trades_analyzed": len(deals),
+            "trades_with_breaches": len(lot_breaches),
+            "breach_rate": round(len(lot_breaches) / len(deals) * 100, 1) if deals else 0,
+            "average_breach_pct": round(avg_breach_pct, 1),
+            "max_breach_pct": round(max_breach_pct, 1),
+            "worst_breaches": sorted(lot_breaches, key=lambda x: -x["breach_pct"])[:5]
+        }
+        
+        # Generate recommendations
+        actionable_recommendations = []
+        
+        if recommendation["action"] == "DECREASE":
+            actionable_recommendations.append({
+                "priority": "HIGH" if recommendation["urgency"] in ["HIGH", "CRITICAL"] else "MEDIUM",
+                "action": f"Reduce copy ratio from {current_ratio} to {recommendation['recommended_ratio']}",
+                "impact": f"This will reduce trade sizes by {abs(recommendation['ratio_change'])*100:.0f}%",
+                "implementation": f"Update Social Trading copier settings: Set 'Lot Multiplier' to {recommendation['recommended_ratio']}"
+            })
+        elif recommendation["action"] == "INCREASE":
+            actionable_recommendations.append({
+                "priority": "LOW",
+                "action": f"Consider increasing copy ratio from {current_ratio} to {recommendation['recommended_ratio']}",
+                "impact": f"This would increase trade sizes by {abs(recommendation['ratio_change'])*100:.0f}%",
+                "implementation": "Only increase if risk score remains above 80 for next 2 weeks"
+            })
+        
+        # Add symbol-specific recommendations if certain symbols breach more
+        symbol_breaches = {}
+        for breach in lot_breaches:
+            sym = breach["symbol"]
+            if sym not in symbol_breaches:
+                symbol_breaches[sym] = {"count": 0, "avg_pct": 0}
+            symbol_breaches[sym]["count"] += 1
+            symbol_breaches[sym]["avg_pct"] += breach["breach_pct"]
+        
+        for sym, data in symbol_breaches.items():
+            data["avg_pct"] = data["avg_pct"] / data["count"]
+            if data["avg_pct"] > 50:
+                actionable_recommendations.append({
+                    "priority": "MEDIUM",
+                    "action": f"Consider disabling {sym} in copier or setting symbol-specific max lot",
+                    "impact": f"{sym} has {data['count']} breaches averaging {data['avg_pct']:.0f}% over limit",
+                    "implementation": f"In Social Trading: Use 'Disable Symbols' feature for {sym} or set per-symbol max lot"
+                })
+        
+        return {
+            "account": account,
+            "manager_name": manager_name,
+            "account_type": account_type,
+            "equity": round(equity, 2),
+            "initial_allocation": round(initial_allocation, 2),
+            "notes": notes,
+            "risk_control_score": composite_score,
+            
+            # Current configuration
+            "current_copy_ratio": current_ratio,
+            "current_ratio_source": "Extracted from account notes" if ratio_match else "Default (1.0)",
+            
+            # Recommendation
+            "recommended_ratio": recommendation["recommended_ratio"],
+            "ratio_change": recommendation["ratio_change"],
+            "urgency": recommendation["urgency"],
+            "action": recommendation["action"],
+            "reasons": recommendation["reasons"],
+            
+            # Analysis details
+            "lot_analysis": lot_analysis,
+            "actionable_recommendations": actionable_recommendations,
+            
+            # Reference
+            "valid_ratios": VALID_COPY_RATIOS,
+            "period_days": period_days,
+            "analysis_timestamp": datetime.now(timezone.utc).isoformat()
+        }
 
@@ -0,0 +1,161 @@
+"""
+Job Lease
+Mongo-backed leases so background jobs run in exactly one Uvicorn worker
+
+Every worker starts the same AsyncIOScheduler and background loops; a
+lease decides which one actually does the work:
+
+    job_leases = JobLeaseManager(db)
+
+    @job_leases.exclusive('auto_vps_sync', ttl_seconds=240)
+    async def automatic_vps_sync(): ...
+
+    # long-running loops (watchdog, bridge monitor): leader per iteration
+    if await job_leases.acquire('mt5_watchdog', ttl_seconds=interval * 2):
+        ...
+
+Collection: scheduler_leases
+{
+    "_id": "auto_vps_sync",
+    "owner": "host:1234:ab12cd",      # WORKER_ID of the holder
+    "acquired_at": datetime,
+    "expires_at": datetime,           # renewed by a heartbeat while a job runs
+    "runs": 42
+}
+
+A lease is taken with one atomic find_one_and_update (expired or already
+ours); a concurrent upsert from another worker fails on the _id and counts
+as "not acquired". Finished jobs keep their lease until it expires, so the
+same cron tick firing a few seconds apart in other workers is skipped;
+on-demand runs (admin-triggered jobs), and scheduled jobs that share a
+lease with them, pass release=True to hand it back as soon as they finish. While a run is in progress the same worker does
+not start a second one, even though the lease itself is already ours.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from services.query_profiler import query_profiler
+
+logger = logging.getLogger(__name__)
+
+LEASE_COLLECTION = 'scheduler_leases'
+
+# Unique per process - two workers on one host still differ by pid
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class JobLeaseManager:
+    """Acquire, renew and release named job leases"""
+
+    def __init__(self, db, owner: str = WORKER_ID, collection: str = LEASE_COLLECTION):
+        self.db = db
+        self.owner = owner
+        self.collection = db[collection]
+        self._skipped: Dict[str, int] = {}
+        self._ran: Dict[str, int] = {}
+        self._running: set = set()
+
+    async def acquire(self, name: str, ttl_seconds: float) -> bool:
+        """Take (or renew) the lease if it is free, expired or already ours"""
+        now = datetime.now(timezone.utc)
+        try:
+            doc = await self.collection.find_one_and_update(
+                {'_id': name, '$or': [{'expires_at': {'$lte': now}}, {'owner': self.owner}]},
+                {
+                    '$set': {'owner': self.owner, 'expires_at': now + timedelta(seconds=ttl_seconds), 'renewed_at': now},
+                    '$setOnInsert': {'acquired_at': now}
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Another worker holds a live lease (our upsert collided with its _id)
+            return False
+        return bool(doc) and doc.get('owner') == self.owner
+
+    async def release(self, name: str):
+        """Give the lease up now (shutdown); only the holder can release"""
+        await self.collection.update_one(
+            {'_id': name, 'owner': self.owner},
+            {'$set': {'expires_at': datetime.now(timezone.utc)}}
+        )
+
+    async def _heartbeat(self, name: str, ttl_seconds: float):
+        while True:
+            await asyncio.sleep(max(ttl_seconds / 3, 0.01))
+            try:
+                await self.acquire(name, ttl_seconds)
+            except Exception as e:
+                logger.warning(f"⚠️ Lease heartbeat for {name} failed: {e}")
+
+    async def run_exclusive(
+        self, name: str, ttl_seconds: float, func, *args, release: bool = False, **kwargs
+    ) -> Any:
+        """
+        Run func in this worker only if it wins the lease; None otherwise
+
+        release=True gives the lease up once func returns instead of
+        keeping it until it expires.
+        """
+        if name in self._running:
+            self._skipped[name] = self._skipped.get(name, 0) + 1
+            logger.debug(f"⏭️ Job {name} skipped - already running in this worker")
+            return None
+        if not await self.acquire(name, ttl_seconds):
+            self._skipped[name] = self._skipped.get(name, 0) + 1
+            logger.debug(f"⏭️ Job {name} skipped - lease held by another worker")
+            return None
+
+        self._running.add(name)
+        self._ran[name] = self._ran.get(name, 0) + 1
+        await self.collection.update_one({'_id': name, 'owner': self.owner}, {'$inc': {'runs': 1}})
+        heartbeat = asyncio.create_task(self._heartbeat(name, ttl_seconds))
+        try:
+            with query_profiler.track(f"scheduled {name}"):
+                return await func(*args, **kwargs)
+        finally:
+            heartbeat.cancel()
+            self._running.discard(name)
+            if release:
+                await self.release(name)
+
+    def exclusive(self, name: str, ttl_seconds: float, release: bool = False):
+        """Decorator form of run_exclusive for scheduler jobs"""
+
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                return await self.run_exclusive(name, ttl_seconds, func, *args, release=release, **kwargs)
+            return wrapper
+        return decorator
+
+    async def get_status(self) -> List[Dict[str, Any]]:
+        """Current holders, for the admin/health views"""
+        leases = await self.collection.find({}).to_list(length=None)
+        now = datetime.now(timezone.utc)
+        for lease in leases:
+            lease['job'] = lease.pop('_id')
+            expires_at = lease.get('expires_at')
+            if isinstance(expires_at, datetime):
+                if expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
+                lease['active'] = expires_at > now
+                lease['expires_at'] = expires_at.isoformat()
+            lease['held_by_this_worker'] = lease.get('owner') == self.owner
+            for key in ('acquired_at', 'renewed_at'):
+                if isinstance(lease.get(key), datetime):
+                    lease[key] = lease[key].isoformat()
+        return leases
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'worker_id': self.owner, 'ran': dict(self._ran), 'skipped': dict(self._skipped)}
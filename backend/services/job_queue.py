@@ -0,0 +1,422 @@
+"""
+Job Queue
+Mongo-backed background jobs for long-running admin operations
+
+Endpoints enqueue a job and return its id straight away; async workers in
+every API process claim queued jobs and run the registered handler. Clients
+poll /api/jobs/{job_id} for status, progress and the result.
+
+    @job_queue.handler('rebates.calculate')
+    async def calculate_rebates_job(job: JobContext, start_date: str, end_date: str):
+        await job.progress(10, "Loading deals")
+        ...
+        return result                          # stored as the job's result
+
+    job = await job_queue.enqueue('rebates.calculate', {...}, created_by=user_id)
+
+Collection: jobs
+{
+    "_id": "<uuid>",
+    "type": "rebates.calculate",
+    "params": {...},
+    "status": "queued" | "running" | "completed" | "failed" | "cancelled",
+    "progress": 0-100,
+    "message": "Loading deals",
+    "result": {...}, "error": "...",
+    "dedupe_key": "<type + params>",
+    "active_key": "<dedupe_key while queued/running>",   # unique, partial index
+    "cancel_requested": false,
+    "worker": "host:pid:id", "heartbeat_at": datetime,
+    "created_at", "started_at", "finished_at": datetime
+}
+
+Identical jobs (same type and params) that are still queued or running are
+deduplicated by the unique active_key index: enqueue returns the existing
+job. Claiming is one atomic find_one_and_update, so several workers can
+share the queue. Cancellation is cooperative: queued jobs are cancelled
+immediately, running jobs stop at their next progress() call. Running jobs
+whose worker stops heartbeating are failed, not retried - handlers such as
+fee finalization are not safe to run twice.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from services.job_lease import WORKER_ID
+from services.query_profiler import query_profiler
+
+logger = logging.getLogger(__name__)
+
+JOB_COLLECTION = 'jobs'
+JOB_QUEUE_CONCURRENCY = int(os.environ.get('JOB_QUEUE_CONCURRENCY', '2'))
+JOB_QUEUE_POLL_SECONDS = float(os.environ.get('JOB_QUEUE_POLL_SECONDS', '2'))
+JOB_HEARTBEAT_SECONDS = float(os.environ.get('JOB_HEARTBEAT_SECONDS', '15'))
+JOB_STALE_SECONDS = float(os.environ.get('JOB_STALE_SECONDS', '120'))
+# Finished jobs are kept for the status endpoint, then removed by a TTL index
+JOB_RETENTION_DAYS = int(os.environ.get('JOB_RETENTION_DAYS', '7'))
+
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_COMPLETED = 'completed'
+STATUS_FAILED = 'failed'
+STATUS_CANCELLED = 'cancelled'
+ACTIVE_STATUSES = (STATUS_QUEUED, STATUS_RUNNING)
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job was cancelled"""
+
+
+def _storable(value: Any) -> Any:
+    """Make a handler result safe to store and return as JSON"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, dict):
+        return {str(k): _storable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_storable(v) for v in value]
+    return value
+
+
+def _iso(value: Any) -> Any:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    return value
+
+
+def make_dedupe_key(job_type: str, params: Dict[str, Any]) -> str:
+    return f"{job_type}:{json.dumps(params, sort_keys=True, default=str)}"
+
+
+def format_job(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """API view of a job document"""
+    return {
+        'job_id': doc['_id'],
+        'type': doc.get('type'),
+        'status': doc.get('status'),
+        'progress': doc.get('progress', 0),
+        'message': doc.get('message'),
+        'params': doc.get('params', {}),
+        'result': doc.get('result'),
+        'error': doc.get('error'),
+        'cancel_requested': doc.get('cancel_requested', False),
+        'created_by': doc.get('created_by'),
+        'worker': doc.get('worker'),
+        'created_at': _iso(doc.get('created_at')),
+        'started_at': _iso(doc.get('started_at')),
+        'finished_at': _iso(doc.get('finished_at')),
+        'duration_seconds': doc.get('duration_seconds'),
+        'status_url': f"/api/jobs/{doc['_id']}"
+    }
+
+
+class JobContext:
+    """Handed to a running handler for progress reporting and cancellation"""
+
+    def __init__(self, queue: 'JobQueue', job: Dict[str, Any]):
+        self.queue = queue
+        self.job_id = job['_id']
+        self.job_type = job.get('type')
+        self.created_by = job.get('created_by')
+
+    async def progress(self, percent: float, message: Optional[str] = None):
+        """Record progress (0-100); raises JobCancelled if cancellation was requested"""
+        fields = {'progress': max(0, min(100, round(percent, 1))), 'heartbeat_at': datetime.now(timezone.utc)}
+        if message is not None:
+            fields['message'] = message
+        doc = await self.queue.collection.find_one_and_update(
+            {'_id': self.job_id},
+            {'$set': fields},
+            projection={'cancel_requested': 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if doc and doc.get('cancel_requested'):
+            raise JobCancelled(self.job_id)
+
+    async def check_cancelled(self):
+        doc = await self.queue.collection.find_one({'_id': self.job_id}, {'cancel_requested': 1})
+        if doc and doc.get('cancel_requested'):
+            raise JobCancelled(self.job_id)
+
+
+class JobQueue:
+    """Enqueue, run, track and cancel background jobs"""
+
+    def __init__(
+        self,
+        db=None,
+        owner: str = WORKER_ID,
+        concurrency: int = JOB_QUEUE_CONCURRENCY,
+        poll_seconds: float = JOB_QUEUE_POLL_SECONDS
+    ):
+        self.owner = owner
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.handlers: Dict[str, Callable[..., Awaitable[Any]]] = {}
+        self.collection = None
+        self._indexes_ready = False
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._last_reap = 0.0
+        self._stats = {'enqueued': 0, 'deduplicated': 0, 'completed': 0, 'failed': 0, 'cancelled': 0}
+        if db is not None:
+            self.initialize(db)
+
+    def initialize(self, db):
+        self.collection = db[JOB_COLLECTION]
+
+    # ------------------------------------------------------------------
+    # Registration
+    # ------------------------------------------------------------------
+
+    def register(self, job_type: str, func: Callable[..., Awaitable[Any]]):
+        self.handlers[job_type] = func
+
+    def handler(self, job_type: str):
+        """Register an async handler: func(job: JobContext, **params)"""
+
+        def decorator(func):
+            self.register(job_type, func)
+            return func
+        return decorator
+
+    # ------------------------------------------------------------------
+    # Client side
+    # ------------------------------------------------------------------
+
+    async def ensure_indexes(self):
+        if self._indexes_ready:
+            return
+        await self.collection.create_index(
+            'active_key', unique=True, partialFilterExpression={'active_key': {'$exists': True}}
+        )
+        await self.collection.create_index([('status', 1), ('created_at', 1)])
+        await self.collection.create_index('finished_at', expireAfterSeconds=JOB_RETENTION_DAYS * 86400)
+        self._indexes_ready = True
+
+    async def enqueue(
+        self,
+        job_type: str,
+        params: Optional[Dict[str, Any]] = None,
+        created_by: Optional[str] = None,
+        dedupe_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Queue a job, or return the identical job that is already queued/running
+
+        dedupe_key defaults to type + params; pass one explicitly when some
+        params (e.g. the requesting user) should not make jobs distinct.
+        """
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        await self.ensure_indexes()
+        params = _storable(params or {})
+        key = dedupe_key or make_dedupe_key(job_type, params)
+
+        for _ in range(3):
+            now = datetime.now(timezone.utc)
+            doc = {
+                '_id': str(uuid.uuid4()),
+                'type': job_type,
+                'params': params,
+                'status': STATUS_QUEUED,
+                'progress': 0,
+                'message': 'Queued',
+                'dedupe_key': key,
+                'active_key': key,
+                'cancel_requested': False,
+                'created_by': created_by,
+                'created_at': now
+            }
+            try:
+                await self.collection.insert_one(doc)
+            except DuplicateKeyError:
+                existing = await self.collection.find_one({'active_key': key})
+                if existing is None:
+                    continue  # finished between our insert and lookup; try again
+                self._stats['deduplicated'] += 1
+                logger.info(f"♻️ Job {job_type} already {existing['status']} as {existing['_id']}")
+                return {**format_job(existing), 'deduplicated': True}
+
+            self._stats['enqueued'] += 1
+            if self._wakeup is not None:
+                self._wakeup.set()
+            logger.info(f"📥 Job queued: {job_type} {doc['_id']}")
+            return {**format_job(doc), 'deduplicated': False}
+
+        raise RuntimeError(f"Could not enqueue {job_type}")
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        doc = await self.collection.find_one({'_id': job_id})
+        return format_job(doc) if doc else None
+
+    async def list_jobs(self, status: Optional[str] = None, job_type: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        query = {}
+        if status:
+            query['status'] = status
+        if job_type:
+            query['type'] = job_type
+        docs = await self.collection.find(query, {'result': 0}).sort('created_at', -1).limit(limit).to_list(length=limit)
+        return [format_job(doc) for doc in docs]
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued job now, or ask a running one to stop"""
+        now = datetime.now(timezone.utc)
+        doc = await self.collection.find_one_and_update(
+            {'_id': job_id, 'status': STATUS_QUEUED},
+            {'$set': {'status': STATUS_CANCELLED, 'cancel_requested': True, 'message': 'Cancelled before start',
+                      'finished_at': now}, '$unset': {'active_key': ''}},
+            return_document=ReturnDocument.AFTER
+        )
+        if doc:
+            self._stats['cancelled'] += 1
+            return format_job(doc)
+        doc = await self.collection.find_one_and_update(
+            {'_id': job_id, 'status': STATUS_RUNNING},
+            {'$set': {'cancel_requested': True}},
+            return_document=ReturnDocument.AFTER
+        )
+        if doc:
+            return format_job(doc)
+        return await self.get(job_id)
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    async def claim(self) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest queued job this process can handle"""
+        now = datetime.now(timezone.utc)
+        return await self.collection.find_one_and_update(
+            {'status': STATUS_QUEUED, 'type': {'$in': list(self.handlers)}},
+            {'$set': {'status': STATUS_RUNNING, 'worker': self.owner, 'started_at': now,
+                      'heartbeat_at': now, 'message': 'Started'}},
+            sort=[('created_at', 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _finish(self, job_id: str, status: str, fields: Dict[str, Any], started: float):
+        fields = {**fields, 'status': status, 'finished_at': datetime.now(timezone.utc),
+                  'duration_seconds': round(time.monotonic() - started, 3)}
+        await self.collection.update_one({'_id': job_id}, {'$set': fields, '$unset': {'active_key': ''}})
+        self._stats[status] += 1
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+            try:
+                await self.collection.update_one({'_id': job_id}, {'$set': {'heartbeat_at': datetime.now(timezone.utc)}})
+            except Exception as e:
+                logger.warning(f"⚠️ Job heartbeat for {job_id} failed: {e}")
+
+    async def run_job(self, job: Dict[str, Any]):
+        """Run a claimed job to completion and record the outcome"""
+        job_id, job_type = job['_id'], job['type']
+        context = JobContext(self, job)
+        started = time.monotonic()
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        logger.info(f"▶️ Job started: {job_type} {job_id}")
+        try:
+            with query_profiler.track(f"job {job_type}"):
+                result = await self.handlers[job_type](context, **job.get('params', {}))
+        except JobCancelled:
+            await self._finish(job_id, STATUS_CANCELLED, {'message': 'Cancelled'}, started)
+            logger.info(f"⏹️ Job cancelled: {job_type} {job_id}")
+        except asyncio.CancelledError:
+            await asyncio.shield(self._finish(job_id, STATUS_FAILED, {'error': 'Interrupted by worker shutdown'}, started))
+            raise
+        except Exception as e:
+            error = str(getattr(e, 'detail', None) or e)
+            await self._finish(job_id, STATUS_FAILED, {'error': error, 'message': 'Failed'}, started)
+            logger.error(f"❌ Job failed: {job_type} {job_id}: {error}")
+        else:
+            result = _storable(result)
+            if isinstance(result, dict) and result.get('success') is False:
+                error = result.get('error') or result.get('message') or 'Job reported failure'
+                await self._finish(job_id, STATUS_FAILED, {'result': result, 'error': str(error), 'message': 'Failed'}, started)
+                logger.error(f"❌ Job failed: {job_type} {job_id}: {error}")
+            else:
+                await self._finish(job_id, STATUS_COMPLETED, {'result': result, 'progress': 100, 'message': 'Completed'}, started)
+                logger.info(f"✅ Job completed: {job_type} {job_id} in {time.monotonic() - started:.1f}s")
+        finally:
+            heartbeat.cancel()
+
+    async def reap_stale(self) -> int:
+        """Fail running jobs whose worker stopped heartbeating"""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=JOB_STALE_SECONDS)
+        result = await self.collection.update_many(
+            {'status': STATUS_RUNNING, 'heartbeat_at': {'$lt': cutoff}},
+            {'$set': {'status': STATUS_FAILED, 'error': 'Worker stopped responding', 'message': 'Failed',
+                      'finished_at': datetime.now(timezone.utc)}, '$unset': {'active_key': ''}}
+        )
+        if result.modified_count:
+            logger.warning(f"⚠️ Marked {result.modified_count} stale job(s) as failed")
+        return result.modified_count
+
+    async def _worker_loop(self, index: int):
+        while True:
+            try:
+                if time.monotonic() - self._last_reap >= JOB_STALE_SECONDS / 2:
+                    self._last_reap = time.monotonic()
+                    await self.reap_stale()
+
+                job = await self.claim()
+                if job is None:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                self._running[job['_id']] = asyncio.current_task()
+                try:
+                    await self.run_job(job)
+                finally:
+                    self._running.pop(job['_id'], None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Job worker {index} error: {e}")
+                await asyncio.sleep(self.poll_seconds)
+
+    async def start(self):
+        if self._workers:
+            return
+        await self.ensure_indexes()
+        self._wakeup = asyncio.Event()
+        self._workers = [asyncio.create_task(self._worker_loop(i)) for i in range(self.concurrency)]
+        logger.info(f"✅ Job queue started: {self.concurrency} worker(s), handlers: {', '.join(sorted(self.handlers))}")
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info("🛑 Job queue stopped")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            'worker_id': self.owner,
+            'workers': len(self._workers),
+            'running_here': list(self._running),
+            'handlers': sorted(self.handlers)
+        }
+
+
+# Global instance - server.py calls job_queue.initialize(db) and start()
+job_queue = JobQueue()
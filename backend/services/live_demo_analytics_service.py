@@ -17,7 +17,9 @@ import logging
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional, Any
 from motor.motor_asyncio import AsyncIOMotorDatabase
-import math
+
+from services import return_metrics
+from services.return_metrics import daily_returns_from_deals
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -280,10 +282,13 @@ class LiveDemoAnalyticsService:
             if max_drawdown_pct == 0 and account.get("max_drawdown_pct"):
                 max_drawdown_pct = account.get("max_drawdown_pct", 0)
             
-            # Calculate risk-adjusted metrics (simplified)
-            # Use days_since_allocation for accurate annualization
-            sharpe_ratio = self._estimate_sharpe_ratio(return_pct, max_drawdown_pct, days_since_allocation)
-            sortino_ratio = self._estimate_sortino_ratio(return_pct, max_drawdown_pct, days_since_allocation)
+            # Risk-adjusted metrics from the daily return series of the analysis window
+            if initial_allocation > 0:
+                daily = daily_returns_from_deals(deals, initial_allocation, start=start_date, end=end_date)
+                sharpe_ratio = return_metrics.sharpe_ratio(daily["returns"])
+                sortino_ratio = return_metrics.sortino_ratio(daily["returns"])
+            else:
+                sharpe_ratio = sortino_ratio = 0.0
             calmar_ratio = (return_pct / max_drawdown_pct) if max_drawdown_pct > 0 else 0
             
             return {
@@ -330,27 +335,6 @@ class LiveDemoAnalyticsService:
                 "error": str(e)
             }
     
-    def _estimate_sharpe_ratio(self, return_pct: float, drawdown_pct: float, period_days: int) -> float:
-        """Estimate Sharpe ratio from return and drawdown"""
-        # Simplified estimation: Sharpe ≈ (Annual Return - Risk Free) / Volatility
-        # Using drawdown as proxy for volatility
-        annual_return = return_pct * (365 / period_days) if period_days > 0 else 0
-        risk_free = 5.0  # Assume 5% risk-free rate
-        volatility_proxy = max(drawdown_pct * 2, 10)  # Use 2x drawdown as vol proxy
-        
-        sharpe = (annual_return - risk_free) / volatility_proxy if volatility_proxy > 0 else 0
-        return max(min(sharpe, 5), -5)  # Cap between -5 and 5
-    
-    def _estimate_sortino_ratio(self, return_pct: float, drawdown_pct: float, period_days: int) -> float:
-        """Estimate Sortino ratio from return and drawdown"""
-        # Similar to Sharpe but only considers downside deviation
-        annual_return = return_pct * (365 / period_days) if period_days > 0 else 0
-        risk_free = 5.0
-        downside_vol = max(drawdown_pct * 1.5, 8)  # Use 1.5x drawdown as downside vol
-        
-        sortino = (annual_return - risk_free) / downside_vol if downside_vol > 0 else 0
-        return max(min(sortino, 5), -5)
-    
     async def get_manager_details(self, account_num: int, period_days: int = 30) -> Dict[str, Any]:
         """Get detailed analytics for a specific demo manager"""
         try:
@@ -10,11 +10,14 @@ from datetime import datetime, timezone, timedelta
 from typing import List, Dict, Optional
 import logging
 
+from services.deal_rollup_service import DealRollupService, merge_rows
+
 logger = logging.getLogger(__name__)
 
 class MT5DealsService:
     def __init__(self, db):
         self.db = db
+        self.rollups = DealRollupService(db)
     
     async def get_deals(
         self,
@@ -102,59 +105,32 @@ class MT5DealsService:
             }
         """
         try:
-            # Build query filter
-            query = {}
-            
-            if account_number:
-                query["account"] = account_number  # CORRECTED: Use 'account' field per MT5 standardization
-            
-            if start_date:
-                query.setdefault("time", {})["$gte"] = start_date
-            
-            if end_date:
-                query.setdefault("time", {})["$lte"] = end_date
-            
-            # Aggregation pipeline
-            pipeline = [
-                {"$match": query},
-                {
-                    "$group": {
-                        "_id": None,
-                        "total_deals": {"$sum": 1},
-                        "total_volume": {"$sum": "$volume"},
-                        "total_profit": {"$sum": "$profit"},
-                        "total_commission": {"$sum": "$commission"},
-                        "total_swap": {"$sum": "$swap"},
-                        "buy_deals": {
-                            "$sum": {"$cond": [{"$eq": ["$type", 0]}, 1, 0]}
-                        },
-                        "sell_deals": {
-                            "$sum": {"$cond": [{"$eq": ["$type", 1]}, 1, 0]}
-                        },
-                        "balance_operations": {
-                            "$sum": {"$cond": [{"$eq": ["$type", 2]}, 1, 0]}
-                        },
-                        # ✅ PHASE 1: Add win/loss aggregations for calculations
-                        "win_deals": {
-                            "$sum": {"$cond": [{"$gt": ["$profit", 0]}, 1, 0]}
-                        },
-                        "loss_deals": {
-                            "$sum": {"$cond": [{"$lt": ["$profit", 0]}, 1, 0]}
-                        },
-                        "total_win_profit": {
-                            "$sum": {"$cond": [{"$gt": ["$profit", 0]}, "$profit", 0]}
-                        },
-                        "total_loss_profit": {
-                            "$sum": {"$cond": [{"$lt": ["$profit", 0]}, "$profit", 0]}
-                        },
-                        "symbols_traded": {"$addToSet": "$symbol"},
-                        "earliest_deal": {"$min": "$time"},
-                        "latest_deal": {"$max": "$time"}
-                    }
-                }
-            ]
-            
-            result = await self.db.mt5_deals.aggregate(pipeline).to_list(length=1)
+            # Daily rollups + exact edge days (services/deal_rollup_service.py)
+            rows = await self.rollups.rows(
+                start=start_date,
+                end=end_date,
+                accounts=[account_number] if account_number else None
+            )
+            result = []
+            if rows:
+                merged = merge_rows(rows)[()]
+                result.append({
+                    "total_deals": merged["deals"],
+                    "total_volume": merged["volume"],
+                    "total_profit": merged["profit"],
+                    "total_commission": merged["commission"],
+                    "total_swap": merged["swap"],
+                    "buy_deals": merged["buy_deals"],
+                    "sell_deals": merged["sell_deals"],
+                    "balance_operations": merged["balance_operations"],
+                    "win_deals": merged["win_deals"],
+                    "loss_deals": merged["loss_deals"],
+                    "total_win_profit": merged["gross_profit"],
+                    "total_loss_profit": merged["gross_loss"],
+                    "symbols_traded": sorted(sym for sym in merged["symbols"] if sym),
+                    "earliest_deal": merged["first_deal"],
+                    "latest_deal": merged["last_deal"]
+                })
             
             if not result:
                 return {
@@ -255,74 +231,46 @@ class MT5DealsService:
             }
         """
         try:
-            # Build query filter (only trading deals, not balance operations)
-            query = {"type": {"$in": [0, 1]}}  # 0=buy, 1=sell (exclude 2=balance)
-            
-            if account_number:
-                query["account"] = account_number  # CORRECTED: Use 'account' field per MT5 standardization
-            
-            if start_date:
-                query.setdefault("time", {})["$gte"] = start_date
-            
-            if end_date:
-                query.setdefault("time", {})["$lte"] = end_date
-            
-            # Total volume and rebates
-            total_pipeline = [
-                {"$match": query},
-                {
-                    "$group": {
-                        "_id": None,
-                        "total_volume": {"$sum": "$volume"},
-                        "total_commission": {"$sum": "$commission"}
-                    }
-                }
+            # Only trading deals (0=buy, 1=sell) - the rollups' trade_* fields
+            rows = [
+                row for row in await self.rollups.rows(
+                    start=start_date,
+                    end=end_date,
+                    accounts=[account_number] if account_number else None
+                )
+                if row.get("trade_deals")
             ]
             
-            total_result = await self.db.mt5_deals.aggregate(total_pipeline).to_list(length=1)
-            total_volume = total_result[0]["total_volume"] if total_result else 0
-            total_commission = total_result[0]["total_commission"] if total_result else 0
+            totals = merge_rows(rows).get((), {})
+            total_volume = totals.get("trade_volume", 0)
+            total_commission = totals.get("trade_commission", 0)
             total_rebates = total_volume * rebate_per_lot
             
             # Rebates by account
-            by_account_pipeline = [
-                {"$match": query},
+            by_account = [
                 {
-                    "$group": {
-                        "_id": "$account_number",
-                        "account_name": {"$first": "$account_name"},
-                        "fund_type": {"$first": "$fund_type"},
-                        "volume": {"$sum": "$volume"},
-                        "commission": {"$sum": "$commission"}
-                    }
-                },
-                {"$sort": {"volume": -1}}
+                    "account": item["account"],
+                    "account_name": item["account_name"],
+                    "fund_type": item["fund_type"],
+                    "volume": item["trade_volume"],
+                    "commission": item["trade_commission"],
+                    "rebates": item["trade_volume"] * rebate_per_lot
+                }
+                for item in merge_rows(rows, ("account",)).values()
             ]
-            
-            by_account = await self.db.mt5_deals.aggregate(by_account_pipeline).to_list(length=None)
-            
-            for item in by_account:
-                item["account"] = item.pop("_id")
-                item["rebates"] = item["volume"] * rebate_per_lot
+            by_account.sort(key=lambda item: item["volume"], reverse=True)
             
             # Rebates by symbol
-            by_symbol_pipeline = [
-                {"$match": query},
+            by_symbol = [
                 {
-                    "$group": {
-                        "_id": "$symbol",
-                        "volume": {"$sum": "$volume"},
-                        "deals": {"$sum": 1}
-                    }
-                },
-                {"$sort": {"volume": -1}}
+                    "symbol": item["symbol"],
+                    "volume": item["trade_volume"],
+                    "deals": item["trade_deals"],
+                    "rebates": item["trade_volume"] * rebate_per_lot
+                }
+                for item in merge_rows(rows, ("symbol",)).values()
             ]
-            
-            by_symbol = await self.db.mt5_deals.aggregate(by_symbol_pipeline).to_list(length=None)
-            
-            for item in by_symbol:
-                item["symbol"] = item.pop("_id")
-                item["rebates"] = item["volume"] * rebate_per_lot
+            by_symbol.sort(key=lambda item: item["volume"], reverse=True)
             
             result = {
                 "total_volume": round(total_volume, 2),
@@ -636,45 +584,24 @@ class MT5DealsService:
             end_date = datetime.now(timezone.utc)
             start_date = end_date - timedelta(days=days)
             
-            # Build query
-            query = {
-                "type": {"$in": [0, 1]},  # Trading deals only
-                "time": {"$gte": start_date, "$lte": end_date}
-            }
+            rows = await self.rollups.rows(
+                start=start_date,
+                end=end_date,
+                accounts=[account_number] if account_number else None
+            )
             
-            if account_number:
-                query["account"] = account_number  # CORRECTED: Use 'account' field per MT5 standardization
-            
-            # Aggregation by date
-            pipeline = [
-                {"$match": query},
-                {
-                    "$group": {
-                        "_id": {
-                            "$dateToString": {"format": "%Y-%m-%d", "date": "$time"}
-                        },
-                        "pnl": {"$sum": "$profit"},
-                        "volume": {"$sum": "$volume"},
-                        "deals": {"$sum": 1},
-                        "commission": {"$sum": "$commission"},
-                        "swap": {"$sum": "$swap"}
-                    }
-                },
-                {"$sort": {"_id": 1}}
-            ]
-            
-            results = await self.db.mt5_deals.aggregate(pipeline).to_list(length=None)
-            
-            # Format results
+            # Trading deals only, one entry per day
             daily_pnl = []
-            for item in results:
+            for (day,), item in sorted(merge_rows(rows, ("day",)).items()):
+                if not item["trade_deals"]:
+                    continue
                 daily_pnl.append({
-                    "date": item["_id"],
-                    "pnl": round(item["pnl"], 2),
-                    "volume": round(item["volume"], 2),
-                    "deals": item["deals"],
-                    "commission": round(item["commission"], 2),
-                    "swap": round(item["swap"], 2)
+                    "date": day,
+                    "pnl": round(item["trade_profit"], 2),
+                    "volume": round(item["trade_volume"], 2),
+                    "deals": item["trade_deals"],
+                    "commission": round(item["trade_commission"], 2),
+                    "swap": round(item["trade_swap"], 2)
                 })
             
             logger.info(f"Generated daily P&L for {len(daily_pnl)} days")
@@ -11,12 +11,20 @@ UPDATED: Nov 3, 2025 - MT5 Field Standardization Compliance
 import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import aiohttp
 import os
 
+from services.deal_ingestion_service import DealIngestionService, has_deal_time, normalize_mt5_deal, parse_deal_time
+from services.sync_watermarks import SyncWatermarkStore
+
 logger = logging.getLogger(__name__)
 
+# Full reconciliation pulls the latest N trades; incremental syncs page by cursor
+FULL_SYNC_LIMIT = 10000
+DELTA_PAGE_SIZE = 1000
+DELTA_MAX_PAGES = 20
+
 class MT5DealsSyncService:
     """Service to sync MT5 deals/trades history from bridge to MongoDB"""
     
@@ -24,6 +32,8 @@ class MT5DealsSyncService:
         self.bridge_url = os.environ.get('MT5_BRIDGE_URL', 'http://92.118.45.135:8000')
         self.session = None
         self.db = None
+        self.ingestion = None
+        self.watermarks = None
         
         # All 11 managed accounts (updated for new month allocation)
         self.managed_accounts = [885822, 886066, 886528, 886557, 886602, 891215, 891234, 897590, 897589, 897591, 897599]
@@ -31,6 +41,8 @@ class MT5DealsSyncService:
     async def initialize(self, db):
         """Initialize with database connection"""
         self.db = db
+        self.ingestion = DealIngestionService(db, collection="mt5_deals")
+        self.watermarks = SyncWatermarkStore(db)
         
         # Setup HTTP session
         self.session = aiohttp.ClientSession(
@@ -39,12 +51,82 @@ class MT5DealsSyncService:
         
         logger.info("✅ MT5 Deals Sync Service initialized")
         
-    async def fetch_account_trades(self, account_number: int, days: int = 30) -> List[Dict]:
-        """Fetch trade history for an account from MT5 Bridge"""
+    async def fetch_account_trades(
+        self,
+        account_number: int,
+        days: int = 30,
+        since: Optional[datetime] = None,
+        after_ticket: Optional[int] = None
+    ) -> Optional[List[Dict]]:
+        """
+        Fetch trade history for an account from MT5 Bridge
+        
+        Without a cursor this pulls the last FULL_SYNC_LIMIT trades (full
+        reconciliation). With since/after_ticket it pages forward through
+        only the deals newer than the watermark.
+        
+        Returns None when the bridge could not be read, so callers can tell
+        an outage apart from "no new deals".
+        """
+        if since is None and after_ticket is None:
+            return await self._fetch_trades_page(account_number, {"limit": FULL_SYNC_LIMIT})
+        
+        trades = []
+        params = {"limit": DELTA_PAGE_SIZE}
+        if since is not None:
+            params["since"] = since.isoformat()
+        if after_ticket is not None:
+            params["after_ticket"] = after_ticket
+        
+        cursor = (after_ticket, since)
+        for _ in range(DELTA_MAX_PAGES):
+            page = await self._fetch_trades_page(account_number, params)
+            if page is None:
+                return None
+            if not page:
+                break
+            page_cursor = self._page_cursor(page)
+            if not self._cursor_advanced(cursor, page_cursor):
+                # A bridge without cursor support returns the same page again
+                logger.info(f"ℹ️ Trades cursor did not advance for account {account_number}; stopping paging")
+                break
+            trades.extend(page)
+            if len(page) < DELTA_PAGE_SIZE:
+                break
+            # Bridge returns cursor pages oldest-first; continue after the last ticket
+            cursor = page_cursor
+            params["after_ticket"] = page_cursor[0]
+        
+        return trades
+    
+    @staticmethod
+    def _page_cursor(page: List[Dict]) -> tuple:
+        """(last ticket, last deal time) of a trades page"""
+        tickets = [t['ticket'] for t in page if isinstance(t.get('ticket'), int)]
+        times = [parse_deal_time(t['time']) for t in page if has_deal_time(t.get('time'))]
+        return (max(tickets) if tickets else None, max(times) if times else None)
+    
+    @staticmethod
+    def _cursor_advanced(previous: tuple, current: tuple) -> bool:
+        """True when a page moved past the previous cursor by ticket or time"""
+        prev_ticket, prev_time = previous
+        ticket, deal_time = current
+        if prev_ticket is None and prev_time is None:
+            return True
+        if ticket is not None and (prev_ticket is None or ticket > prev_ticket):
+            return True
+        if deal_time is not None and prev_time is not None:
+            if prev_time.tzinfo is None:
+                prev_time = prev_time.replace(tzinfo=timezone.utc)
+            return deal_time > prev_time
+        return False
+    
+    async def _fetch_trades_page(self, account_number: int, params: Dict[str, Any]) -> Optional[List[Dict]]:
+        """Fetch one page of trades from the bridge trades endpoint (None on failure)"""
         try:
-            url = f"{self.bridge_url}/api/mt5/account/{account_number}/trades?limit=10000"
+            url = f"{self.bridge_url}/api/mt5/account/{account_number}/trades"
             
-            async with self.session.get(url) as response:
+            async with self.session.get(url, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
                     if data.get('success'):
@@ -53,31 +135,73 @@ class MT5DealsSyncService:
                         return trades
                     else:
                         logger.warning(f"⚠️ Failed to get trades for {account_number}: {data}")
-                        return []
+                        return None
                 else:
                     logger.error(f"❌ HTTP {response.status} for account {account_number}")
-                    return []
+                    return None
                     
         except Exception as e:
             logger.error(f"❌ Error fetching trades for {account_number}: {e}")
-            return []
+            return None
     
-    async def sync_account_deals(self, account_number: int) -> Dict:
+    async def sync_account_deals(self, account_number: int, full_reconciliation: Optional[bool] = None) -> Dict:
         """
         Sync deals for a single account
         UPDATED: Nov 3, 2025 - MT5 Field Standardization Compliance
+        
+        Incremental by default: only deals past the account's watermark are
+        pulled. A full-history pass runs when there is no watermark yet, when
+        the last full pass is older than MT5_DEALS_FULL_RECONCILIATION_HOURS,
+        or when full_reconciliation=True is passed explicitly.
         """
         try:
             logger.info(f"🔄 Syncing deals for account {account_number}...")
             logger.info(f"📝 Target collection: mt5_deals")
             
+            watermark = await self.watermarks.get(account_number)
+            full = full_reconciliation if full_reconciliation is not None else self.watermarks.needs_full_reconciliation(watermark)
+            if not watermark:
+                full = True
+            sync_mode = "full" if full else "incremental"
+            
             # Fetch trades from bridge
-            trades = await self.fetch_account_trades(account_number, days=90)
+            if full:
+                trades = await self.fetch_account_trades(account_number, days=90)
+            else:
+                trades = await self.fetch_account_trades(
+                    account_number,
+                    since=watermark.get('last_deal_time'),
+                    after_ticket=watermark.get('last_ticket')
+                )
+            
+            if trades is None:
+                # Bridge unreachable or erroring - not the same as "no new deals"
+                return {
+                    "account": account_number,
+                    "success": False,
+                    "sync_mode": sync_mode,
+                    "message": "Failed to fetch trades from bridge",
+                    "deals_synced": 0
+                }
             
             if not trades:
+                if not full:
+                    # No new activity since the watermark - nothing to ingest
+                    await self.watermarks.advance(account_number, [], full=False)
+                    return {
+                        "account": account_number,
+                        "success": True,
+                        "sync_mode": sync_mode,
+                        "message": "No new deals since watermark",
+                        "deals_synced": 0,
+                        "deals_updated": 0,
+                        "deals_unchanged": 0,
+                        "total_processed": 0
+                    }
                 return {
                     "account": account_number,
                     "success": False,
+                    "sync_mode": sync_mode,
                     "message": "No trades fetched",
                     "deals_synced": 0
                 }
@@ -92,77 +216,54 @@ class MT5DealsSyncService:
                 account_name = account_info.get('name', 'Unknown')
                 fund_type = account_info.get('fund_type', 'Unknown')
             
-            deals_synced = 0
-            deals_updated = 0
-            
-            # Process each trade
-            for trade in trades:
-                # Parse time from Unix timestamp or ISO string
-                time_value = trade.get('time')
-                if isinstance(time_value, int):
-                    # Unix timestamp
-                    trade_time = datetime.fromtimestamp(time_value, tz=timezone.utc)
-                elif isinstance(time_value, str):
-                    try:
-                        trade_time = datetime.fromisoformat(time_value.replace('Z', '+00:00'))
-                    except:
-                        trade_time = datetime.now(timezone.utc)
-                else:
-                    trade_time = datetime.now(timezone.utc)
-                
-                # Prepare deal document with EXACT MT5 Python API field names
-                # Following MT5 Field Standardization Mandate
-                deal_doc = {
-                    # Core MT5 deal fields (from VPS API)
-                    "ticket": trade.get('ticket'),
-                    "order": trade.get('order'),
-                    "time": trade_time,
-                    "type": trade.get('type'),  # 0=buy, 1=sell, 2=balance
-                    "entry": trade.get('entry'),  # 0=in, 1=out
-                    "symbol": trade.get('symbol'),
-                    "volume": float(trade.get('volume', 0)),  # Volume in lots
-                    "price": float(trade.get('price', 0)),
-                    "profit": float(trade.get('profit', 0)),
-                    "comment": trade.get('comment', ''),
-                    
-                    # MT5 fields not provided by VPS API (set to None for honesty)
-                    "time_msc": None,      # VPS doesn't provide milliseconds
-                    "commission": None,    # VPS doesn't provide commission
-                    "swap": None,          # VPS doesn't provide swap
-                    "fee": None,           # VPS doesn't provide fee
-                    "external_id": None,   # VPS doesn't provide external_id
-                    "position_id": None,   # VPS doesn't provide position_id
-                    "magic": None,         # VPS doesn't provide magic number
-                    "reason": None,        # VPS doesn't provide reason
-                    
-                    # FIDUS-specific metadata (added AFTER MT5 fields)
-                    "account": account_number,           # MT5 account login number
-                    "account_name": account_name,        # Human-readable name
-                    "fund_type": fund_type,              # CORE/BALANCE/DYNAMIC/UNLIMITED
-                    "synced_at": datetime.now(timezone.utc),  # When synced
-                    "synced_by": "mt5_deals_sync_service"   # Service identifier
+            sync_time = datetime.now(timezone.utc)
+            metadata = {
+                "account_name": account_name,        # Human-readable name
+                "fund_type": fund_type,              # CORE/BALANCE/DYNAMIC/UNLIMITED
+            }
+            
+            # Normalize once, then bulk upsert (unchanged deals are skipped by hash)
+            deal_docs = [
+                normalize_mt5_deal(trade, account_number, sync_time, "mt5_deals_sync_service", metadata)
+                for trade in trades
+            ]
+            stats = await self.ingestion.ingest(deal_docs)
+            
+            deals_synced = stats["inserted"]
+            deals_updated = stats["updated"]
+            
+            if stats["errors"]:
+                # Keep the watermark so the failed deals are pulled again next run
+                logger.error(f"❌ Account {account_number}: {stats['errors']} deal writes failed; watermark not advanced")
+                return {
+                    "account": account_number,
+                    "success": False,
+                    "sync_mode": sync_mode,
+                    "message": f"{stats['errors']} deal writes failed",
+                    "deals_synced": deals_synced,
+                    "deals_updated": deals_updated,
+                    "deals_unchanged": stats["unchanged"],
+                    "total_processed": len(trades)
                 }
-                
-                # Upsert to database (update if exists, insert if new)
-                # CORRECTED: Using mt5_deals collection (not mt5_deals_history)
-                result = await self.db.mt5_deals.update_one(
-                    {"ticket": deal_doc["ticket"], "account": account_number},
-                    {"$set": deal_doc},
-                    upsert=True
-                )
-                
-                if result.upserted_id:
-                    deals_synced += 1
-                elif result.modified_count > 0:
-                    deals_updated += 1
             
-            logger.info(f"✅ Account {account_number}: {deals_synced} new, {deals_updated} updated in mt5_deals collection")
+            # Deals without a broker time were stamped with sync_time; keep them
+            # out of the watermark so it never jumps past real deals
+            watermark_docs = [
+                doc for doc, trade in zip(deal_docs, trades) if has_deal_time(trade.get('time'))
+            ]
+            await self.watermarks.advance(
+                account_number, watermark_docs, full=full, run_time=sync_time, deal_count=len(deal_docs)
+            )
+            
+            logger.info(f"✅ Account {account_number}: {deals_synced} new, {deals_updated} updated, {stats['unchanged']} unchanged in mt5_deals collection")
             
             return {
                 "account": account_number,
                 "success": True,
+                "sync_mode": sync_mode,
                 "deals_synced": deals_synced,
                 "deals_updated": deals_updated,
+                "deals_unchanged": stats["unchanged"],
                 "total_processed": len(trades)
             }
             
@@ -175,8 +276,15 @@ class MT5DealsSyncService:
                 "deals_synced": 0
             }
     
-    async def sync_all_accounts(self) -> Dict:
-        """Sync deals for all managed accounts"""
+    async def sync_all_accounts(self, full_reconciliation: Optional[bool] = None, progress=None) -> Dict:
+        """
+        Sync deals for all managed accounts
+        
+        Args:
+            full_reconciliation: Force (True) or suppress (False) the full-history
+                pass; None lets each account's watermark decide
+            progress: Optional async callback(percent, message), called per account
+        """
         logger.info("=" * 60)
         logger.info("🚀 STARTING MT5 DEALS HISTORY SYNC FOR ALL ACCOUNTS")
         logger.info("📝 Target collection: mt5_deals")
@@ -185,8 +293,10 @@ class MT5DealsSyncService:
         start_time = datetime.now()
         results = []
         
-        for account_number in self.managed_accounts:
-            result = await self.sync_account_deals(account_number)
+        for index, account_number in enumerate(self.managed_accounts):
+            if progress:
+                await progress(index / len(self.managed_accounts) * 100, f"Account {account_number}")
+            result = await self.sync_account_deals(account_number, full_reconciliation)
             results.append(result)
             
             # Small delay between accounts
@@ -197,6 +307,7 @@ class MT5DealsSyncService:
         
         total_synced = sum(r.get('deals_synced', 0) for r in results)
         total_updated = sum(r.get('deals_updated', 0) for r in results)
+        total_unchanged = sum(r.get('deals_unchanged', 0) for r in results)
         successful = sum(1 for r in results if r.get('success'))
         
         summary = {
@@ -205,6 +316,7 @@ class MT5DealsSyncService:
             "accounts_successful": successful,
             "total_deals_synced": total_synced,
             "total_deals_updated": total_updated,
+            "total_deals_unchanged": total_unchanged,
             "duration_seconds": round(duration, 2),
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "results": results
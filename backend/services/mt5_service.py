@@ -326,8 +326,6 @@ class MT5Service:
                                    allocated_amount: float = 0.0) -> Optional[str]:
         """Manually add MT5 account with existing credentials (for pre-existing client accounts)"""
         try:
-            # Import here to avoid circular imports
-            from mongodb_integration import mongodb_manager
             import uuid
             
             # Validate client exists
@@ -8,17 +8,29 @@ Business Rules:
 - Performance fees apply ONLY to profits (positive TRUE P&L)
 - NO fees charged on losses (negative TRUE P&L)
 - Calculated daily based on current TRUE P&L
+  (accrual run every 15 minutes by the scheduler; reads serve the latest run)
 - Charged monthly - fees accumulate and are paid at month-end
 - Simple monthly reset (no high water mark for MVP)
 """
 
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional
 from bson import ObjectId
 import logging
+import os
+
+from pymongo import UpdateOne
+
+from services.response_cache import TAG_MONEY_MANAGERS, response_cache
 
 logger = logging.getLogger(__name__)
 
+# GET endpoints serve the stored accrual until it is this old
+ACCRUAL_MAX_AGE_MINUTES = float(os.environ.get('PERFORMANCE_FEE_ACCRUAL_MAX_AGE_MINUTES', '30'))
+LATEST_ACCRUAL_ID = 'latest'
+
+_indexes_ready = False
+
 
 class PerformanceFeeCalculator:
     """
@@ -29,6 +41,7 @@ class PerformanceFeeCalculator:
     - mt5_accounts collection: Source of TRUE P&L data
     - performance_fee_transactions collection: Historical fee records
     - daily_performance_fee_snapshots collection: Daily tracking
+    - performance_fee_accruals collection: Latest accrual run
     """
     
     def __init__(self, db):
@@ -37,10 +50,28 @@ class PerformanceFeeCalculator:
         self.mt5_accounts = db.mt5_accounts
         self.performance_fee_transactions = db.performance_fee_transactions
         self.daily_snapshots = db.daily_performance_fee_snapshots
+        self.accruals = db.performance_fee_accruals
+    
+    async def ensure_indexes(self):
+        global _indexes_ready
+        if _indexes_ready:
+            return
+        try:
+            await self.daily_snapshots.create_index([("manager_id", 1), ("snapshot_date", 1)], unique=True)
+        except Exception as e:
+            # Pre-existing duplicates (old per-account snapshots) - upserts stay idempotent without it
+            logger.warning(f"⚠️ Could not create unique snapshot index: {str(e)}")
+        _indexes_ready = True
     
     async def calculate_current_performance_fees(self) -> Dict:
         """
-        Calculate current accrued performance fees for all active managers.
+        Run the performance fee accrual for all active managers.
+        
+        Reads every manager account's TRUE P&L with one $in query, computes
+        fees in memory and writes manager accruals and daily snapshots with
+        one bulk_write each. Snapshots are upserted per (manager, day), so
+        re-running the accrual on the same day is idempotent. The result is
+        stored as the latest accrual (see get_latest_accrual).
         
         Returns:
             Dict containing:
@@ -80,23 +111,42 @@ class PerformanceFeeCalculator:
                 logger.warning("No active managers found")
                 return self._empty_result()
             
+            # Assigned MT5 account per manager (first account in array)
+            accounts = {}
+            for manager in managers:
+                assigned_accounts = manager.get("assigned_accounts", [])
+                if not assigned_accounts:
+                    logger.warning(f"Manager {manager.get('manager_id')} has no assigned accounts")
+                    continue
+                accounts[manager["_id"]] = str(assigned_accounts[0])
+            
+            # One query each for current TRUE P&L and yesterday's snapshots
+            true_pnls = await self._get_true_pnl_for_accounts(accounts.values())
+            now = datetime.now(timezone.utc)
+            snapshot_date = now.date().isoformat()
+            yesterday = (now - timedelta(days=1)).date().isoformat()
+            yesterday_fees = {
+                snapshot["manager_id"]: snapshot.get("accrued_fee_today", 0)
+                for snapshot in await self.daily_snapshots.find({
+                    "snapshot_date": yesterday,
+                    "manager_id": {"$in": list(accounts)}
+                }).to_list(None)
+            }
+            
             results = []
+            manager_operations = []
+            snapshot_operations = []
             total_true_pnl = 0
             total_fees = 0
             total_net_profit = 0
             managers_with_fees = 0
             
             for manager in managers:
-                # Get assigned MT5 account (first account in array)
-                assigned_accounts = manager.get("assigned_accounts", [])
-                if not assigned_accounts:
-                    logger.warning(f"Manager {manager.get('manager_id')} has no assigned accounts")
+                if manager["_id"] not in accounts:
                     continue
-                
-                mt5_account_id = str(assigned_accounts[0])
-                
-                # Get current TRUE P&L from MT5 account
-                true_pnl = await self._get_true_pnl_for_account(mt5_account_id)
+                mt5_account_id = accounts[manager["_id"]]
+                manager_name = manager.get("display_name") or manager.get("name", "Unknown")
+                true_pnl = true_pnls.get(mt5_account_id, 0.0)
                 
                 # Calculate performance fee (only on profits)
                 profit_for_fee = max(0, true_pnl)  # Only positive P&L
@@ -107,29 +157,41 @@ class PerformanceFeeCalculator:
                 if fee_amount > 0:
                     managers_with_fees += 1
                 
-                # Update manager document with current accruals
-                await self.money_managers.update_one(
+                # Manager document with current accruals
+                manager_operations.append(UpdateOne(
                     {"_id": manager["_id"]},
                     {
                         "$set": {
                             "current_month_profit": true_pnl,
                             "current_month_fee_accrued": fee_amount,
-                            "updated_at": datetime.now(timezone.utc)
+                            "updated_at": now
                         }
                     }
-                )
+                ))
                 
-                # Create daily snapshot
-                await self._create_daily_snapshot(
-                    manager=manager,
-                    mt5_account_id=mt5_account_id,
-                    true_pnl=true_pnl,
-                    accrued_fee=fee_amount
-                )
+                # Daily snapshot - one per manager per day
+                accrued_fee_yesterday = yesterday_fees.get(manager["_id"], 0)
+                snapshot_operations.append(UpdateOne(
+                    {"manager_id": manager["_id"], "snapshot_date": snapshot_date},
+                    {
+                        "$set": {
+                            "manager_name": manager_name,
+                            "mt5_account_id": mt5_account_id,
+                            "true_pnl_mtd": true_pnl,
+                            "performance_fee_rate": fee_rate,
+                            "accrued_fee_today": fee_amount,
+                            "accrued_fee_yesterday": accrued_fee_yesterday,
+                            "fee_change": fee_amount - accrued_fee_yesterday,
+                            "updated_at": now
+                        },
+                        "$setOnInsert": {"created_at": now}
+                    },
+                    upsert=True
+                ))
                 
                 results.append({
                     "manager_id": str(manager["_id"]),
-                    "manager_name": manager.get("display_name") or manager.get("name", "Unknown"),
+                    "manager_name": manager_name,
                     "mt5_account_id": mt5_account_id,
                     "true_pnl": round(true_pnl, 2),
                     "performance_fee_rate": fee_rate,
@@ -143,10 +205,21 @@ class PerformanceFeeCalculator:
                 total_fees += fee_amount
                 total_net_profit += net_profit
             
+            if manager_operations:
+                await self.money_managers.bulk_write(manager_operations, ordered=False)
+                response_cache.bump(TAG_MONEY_MANAGERS)
+            if snapshot_operations:
+                try:
+                    await self.ensure_indexes()
+                    await self.daily_snapshots.bulk_write(snapshot_operations, ordered=False)
+                except Exception as e:
+                    # Don't raise - snapshot failure shouldn't stop fee calculation
+                    logger.error(f"Error writing daily snapshots: {str(e)}")
+            
             logger.info(f"✅ Calculated performance fees: ${total_fees:.2f} from {len(results)} managers")
             
-            return {
-                "calculation_date": datetime.now(timezone.utc).isoformat(),
+            result = {
+                "calculation_date": now.isoformat(),
                 "managers": results,
                 "totals": {
                     "total_true_pnl": round(total_true_pnl, 2),
@@ -156,100 +229,69 @@ class PerformanceFeeCalculator:
                     "fee_impact_percentage": round((total_fees / total_true_pnl * 100), 2) if total_true_pnl > 0 else 0
                 }
             }
+            await self.accruals.replace_one(
+                {"_id": LATEST_ACCRUAL_ID},
+                {**result, "calculated_at": now},
+                upsert=True
+            )
+            return result
             
         except Exception as e:
             logger.error(f"Error calculating performance fees: {str(e)}")
             raise
     
-    async def _get_true_pnl_for_account(self, account_id: str) -> float:
+    async def get_latest_accrual(self, max_age_minutes: float = ACCRUAL_MAX_AGE_MINUTES) -> Dict:
+        """
+        Latest stored accrual (read-only); runs a new accrual only when none
+        exists yet or the latest is older than max_age_minutes.
+        """
+        latest = await self.accruals.find_one({"_id": LATEST_ACCRUAL_ID})
+        if latest:
+            calculated_at = latest.get("calculated_at")
+            if calculated_at and calculated_at.tzinfo is None:
+                calculated_at = calculated_at.replace(tzinfo=timezone.utc)
+            if calculated_at and datetime.now(timezone.utc) - calculated_at <= timedelta(minutes=max_age_minutes):
+                latest.pop("_id", None)
+                latest.pop("calculated_at", None)
+                return latest
+        
+        logger.info("Performance fee accrual missing or stale - running accrual")
+        return await self.calculate_current_performance_fees()
+    
+    async def _get_true_pnl_for_accounts(self, account_ids: Iterable[str]) -> Dict[str, float]:
         """
-        Get current TRUE P&L for an MT5 account.
+        Get current TRUE P&L for many MT5 accounts with one query.
         Uses pre-calculated true_pnl from mt5_accounts collection.
         
         Args:
-            account_id: MT5 account number as string
+            account_ids: MT5 account numbers as strings
             
         Returns:
-            TRUE P&L as float (0.0 if account not found)
+            Dict of account_id -> TRUE P&L (accounts not found are omitted, i.e. 0.0)
         """
-        try:
-            # Convert to int for query
-            account_num = int(account_id)
-            
-            account = await self.mt5_accounts.find_one({"account": account_num})
-            
-            if not account:
-                logger.warning(f"MT5 account {account_id} not found")
-                return 0.0
-            
-            # Use pre-calculated true_pnl field
-            true_pnl = account.get("true_pnl", 0)
-            return float(true_pnl)
-            
-        except ValueError:
-            logger.error(f"Invalid account_id format: {account_id}")
-            return 0.0
-        except Exception as e:
-            logger.error(f"Error getting TRUE P&L for account {account_id}: {str(e)}")
-            return 0.0
-    
-    async def _create_daily_snapshot(
-        self, 
-        manager: Dict, 
-        mt5_account_id: str,
-        true_pnl: float, 
-        accrued_fee: float
-    ):
-        """
-        Create daily snapshot of performance fee accrual.
-        Upserts to ensure only one snapshot per manager per day.
+        account_numbers = []
+        for account_id in account_ids:
+            try:
+                account_numbers.append(int(account_id))
+            except ValueError:
+                logger.error(f"Invalid account_id format: {account_id}")
         
-        Args:
-            manager: Manager document
-            mt5_account_id: MT5 account number
-            true_pnl: Current TRUE P&L
-            accrued_fee: Calculated performance fee
-        """
-        try:
-            snapshot_date = datetime.now(timezone.utc).date().isoformat()
-            
-            # Get yesterday's snapshot for comparison
-            yesterday = (datetime.now(timezone.utc) - timedelta(days=1)).date().isoformat()
-            yesterday_snapshot = await self.daily_snapshots.find_one({
-                "snapshot_date": yesterday,
-                "mt5_account_id": mt5_account_id
-            })
-            
-            accrued_fee_yesterday = 0
-            if yesterday_snapshot:
-                accrued_fee_yesterday = yesterday_snapshot.get("accrued_fee_today", 0)
-            
-            snapshot = {
-                "snapshot_date": snapshot_date,
-                "manager_id": manager["_id"],
-                "manager_name": manager.get("display_name") or manager.get("name", "Unknown"),
-                "mt5_account_id": mt5_account_id,
-                "true_pnl_mtd": true_pnl,
-                "performance_fee_rate": manager.get("performance_fee_rate", 0),
-                "accrued_fee_today": accrued_fee,
-                "accrued_fee_yesterday": accrued_fee_yesterday,
-                "fee_change": accrued_fee - accrued_fee_yesterday,
-                "created_at": datetime.now(timezone.utc)
-            }
-            
-            # Upsert (update if exists for today, insert if not)
-            await self.daily_snapshots.update_one(
-                {
-                    "snapshot_date": snapshot_date,
-                    "mt5_account_id": mt5_account_id
-                },
-                {"$set": snapshot},
-                upsert=True
-            )
-            
-        except Exception as e:
-            logger.error(f"Error creating daily snapshot: {str(e)}")
-            # Don't raise - snapshot failure shouldn't stop fee calculation
+        accounts = await self.mt5_accounts.find(
+            {"account": {"$in": account_numbers}},
+            {"_id": 0, "account": 1, "true_pnl": 1}
+        ).to_list(None)
+        
+        true_pnls = {}
+        for account in accounts:
+            try:
+                # Use pre-calculated true_pnl field
+                true_pnls[str(account["account"])] = float(account.get("true_pnl", 0) or 0)
+            except (TypeError, ValueError):
+                logger.error(f"Invalid true_pnl for account {account.get('account')}: {account.get('true_pnl')}")
+        
+        for missing in set(str(n) for n in account_numbers) - set(true_pnls):
+            logger.warning(f"MT5 account {missing} not found")
+        return true_pnls
     
     async def get_performance_fees_for_cash_flow(self) -> Dict:
         """
@@ -276,7 +318,7 @@ class PerformanceFeeCalculator:
             }
         """
         try:
-            fees = await self.calculate_current_performance_fees()
+            fees = await self.get_latest_accrual()
             
             # Filter only managers with fees > 0
             breakdown = [
@@ -327,7 +369,7 @@ class PerformanceFeeCalculator:
                 year = now.year
             
             # Get current fees
-            current_fees = await self.calculate_current_performance_fees()
+            current_fees = await self.get_latest_accrual()
             
             # Get historical transactions for the period
             period_start = datetime(year, month, 1, tzinfo=timezone.utc)
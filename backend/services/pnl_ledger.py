@@ -0,0 +1,331 @@
+"""
+P&L Ledger Service
+Running TRUE P&L components per MT5 account, maintained as deals are ingested
+
+Collection: pnl_ledger
+{
+    "_id": 886557, "account": 886557,
+    "net_deposits": 80000.0,                    # signed sum of balance operations
+    "deposits": 100000.0, "withdrawals": -20000.0,
+    "profit_withdrawals": 15000.0,              # to the separation account
+    "profit_returns": 2000.0,                   # back from the separation account
+    "inter_account_transfers_out": 5000.0, "inter_account_transfers_in": 0.0,
+    "external_deposits": 100000.0, "external_withdrawals": 0.0,
+    "unclassified_transfers": 0.0, "needs_review": 0,
+    "balance_operations": 6,
+    "realized_pnl": 18250.4,                    # profit + commission + swap + fee of buy/sell deals
+    "trade_deals": 1840,
+    "other_operations": 0.0,                    # credit, bonus, charges, ...
+    "last_deal_time": datetime, "updated_at": datetime
+}
+
+Each ingested deal is classified once (mt5_transfer_classifier.classify_transfer
+for balance operations) and its contribution is stored on the deal itself:
+
+    {"ticket": 1234, ..., "transfer_classification": {...},
+     "ledger_entry": {"net_deposits": -15000.0, "withdrawals": -15000.0,
+                      "profit_withdrawals": 15000.0, "balance_operations": 1}}
+
+rebuild() (POST /api/admin/pnl-ledger/rebuild, scripts/backfill_pnl_ledger.py)
+regenerates ledgers and entries from mt5_deals. Deal ingestion does not keep
+the ledger current: no P&L reader uses it yet (PnLCalculator and
+MoneyManagersService read mt5_deals_history), so ingest does not pay for it.
+
+apply_deals() folds written deals into the ledger by $inc of (new entry -
+stored entry), so a re-synced deal that changed is corrected rather than
+counted twice. Entries are swapped with one bulk_write of updates
+conditional on the entry that was read; updates that lost a race with a
+concurrent apply of the same deal do not match and add nothing.
+
+GET /api/mt5/pnl-ledger serves one ledger document per account (as of the
+last rebuild or apply) instead of scanning deal history.
+"""
+
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from mt5_transfer_classifier import classify_transfer
+
+logger = logging.getLogger(__name__)
+
+LEDGER_COLLECTION = 'pnl_ledger'
+
+# Ledger fields moved by $inc (amounts and counts)
+AMOUNT_FIELDS = (
+    'net_deposits', 'deposits', 'withdrawals',
+    'profit_withdrawals', 'profit_returns',
+    'inter_account_transfers_out', 'inter_account_transfers_in',
+    'external_deposits', 'external_withdrawals', 'unclassified_transfers',
+    'realized_pnl', 'other_operations',
+)
+COUNT_FIELDS = ('balance_operations', 'trade_deals', 'needs_review')
+
+# classify_transfer() type -> ledger field receiving the (absolute) amount
+CLASSIFICATION_FIELDS = {
+    'profit_withdrawal': 'profit_withdrawals',
+    'profit_return': 'profit_returns',
+    'inter_account_transfer_out': 'inter_account_transfers_out',
+    'inter_account_transfer_in': 'inter_account_transfers_in',
+    'external_deposit': 'external_deposits',
+    'external_withdrawal': 'external_withdrawals',
+}
+
+# Deal fields needed to compute an entry (rebuild)
+DEAL_PROJECTION = {
+    'account': 1, 'ticket': 1, 'type': 1, 'time': 1, 'comment': 1,
+    'profit': 1, 'commission': 1, 'swap': 1, 'fee': 1,
+}
+
+DEAL_TYPE_BALANCE = 2
+TRADE_TYPES = (0, 1)
+
+REBUILD_CHUNK_SIZE = 1000
+
+
+def _num(value: Any) -> float:
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def ledger_entry(deal: Dict[str, Any]) -> Tuple[Dict[str, float], Optional[Dict[str, Any]]]:
+    """
+    Contribution of one deal to its account ledger
+
+    Returns:
+        (entry, classification) - entry holds only non-zero fields;
+        classification is set for balance operations only
+    """
+    deal_type = deal.get('type')
+    profit = _num(deal.get('profit'))
+    entry: Dict[str, float] = {}
+    classification = None
+
+    if deal_type == DEAL_TYPE_BALANCE:
+        direction = 'out' if profit < 0 else 'in'
+        classification = classify_transfer(deal.get('comment') or '', profit, direction)
+        amount = round(abs(profit), 2)
+
+        entry['balance_operations'] = 1
+        entry['net_deposits'] = round(profit, 2)
+        entry['deposits' if profit > 0 else 'withdrawals'] = round(profit, 2)
+        field = CLASSIFICATION_FIELDS.get(classification['type'])
+        if field:
+            entry[field] = amount
+        else:
+            entry['unclassified_transfers'] = amount
+            entry['needs_review'] = 1
+
+    elif deal_type in TRADE_TYPES:
+        entry['trade_deals'] = 1
+        entry['realized_pnl'] = round(
+            profit + _num(deal.get('commission')) + _num(deal.get('swap')) + _num(deal.get('fee')), 2
+        )
+
+    elif deal_type is not None:
+        entry['other_operations'] = round(profit, 2)
+
+    return {field: value for field, value in entry.items() if value}, classification
+
+
+def entry_delta(new: Dict[str, float], old: Optional[Dict[str, float]]) -> Dict[str, float]:
+    """Per-field change from a deal's stored entry to its recomputed one"""
+    old = old or {}
+    delta = {}
+    for field in set(new) | set(old):
+        change = round(new.get(field, 0) - old.get(field, 0), 2)
+        if change:
+            delta[field] = change
+    return delta
+
+
+def format_ledger(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Ledger document -> API shape with derived totals"""
+    ledger = {'account': doc.get('account', doc.get('_id'))}
+    for field in AMOUNT_FIELDS:
+        ledger[field] = round(doc.get(field, 0.0), 2)
+    for field in COUNT_FIELDS:
+        ledger[field] = int(doc.get(field, 0))
+    ledger['net_profit_withdrawals'] = round(ledger['profit_withdrawals'] - ledger['profit_returns'], 2)
+    ledger['net_inter_account_transfers'] = round(
+        ledger['inter_account_transfers_out'] - ledger['inter_account_transfers_in'], 2
+    )
+    ledger['last_deal_time'] = doc.get('last_deal_time')
+    ledger['updated_at'] = doc.get('updated_at')
+    return ledger
+
+
+class PnLLedgerService:
+    """Maintain and query pnl_ledger"""
+
+    def __init__(self, db, deals_collection: str = 'mt5_deals'):
+        self.db = db
+        self.deals = db[deals_collection]
+        self.ledgers = db[LEDGER_COLLECTION]
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    async def _stored_entries(self, account: Any, tickets: List[Any]) -> Dict[Any, Optional[Dict[str, float]]]:
+        entries = {}
+        cursor = self.deals.find(
+            {'account': account, 'ticket': {'$in': tickets}},
+            {'_id': 0, 'ticket': 1, 'ledger_entry': 1}
+        )
+        async for row in cursor:
+            entries[row.get('ticket')] = row.get('ledger_entry')
+        return entries
+
+    async def _swap_entries(
+        self, account: Any, swaps: Dict[Any, Tuple[Optional[Dict[str, float]], Dict[str, Any]]]
+    ) -> List[Any]:
+        """
+        Store new entries, each only if the deal still holds the entry that was read
+
+        Returns:
+            Tickets whose entry was replaced by this call
+        """
+        token = uuid.uuid4().hex
+        operations = [
+            UpdateOne(
+                {'account': account, 'ticket': ticket, 'ledger_entry': old},
+                {'$set': {**update, 'ledger_token': token}}
+            )
+            for ticket, (old, update) in swaps.items()
+        ]
+        result = await self.deals.bulk_write(operations, ordered=False)
+        if result.modified_count == len(operations):
+            return list(swaps)
+        # Lost a race (or the deal was never written): find out which updates applied
+        cursor = self.deals.find(
+            {'account': account, 'ticket': {'$in': list(swaps)}, 'ledger_token': token},
+            {'_id': 0, 'ticket': 1}
+        )
+        return [row.get('ticket') async for row in cursor]
+
+    async def apply_deals(self, docs: Iterable[Dict[str, Any]]) -> int:
+        """
+        Fold written deals into their account ledgers
+
+        One read and one bulk_write of deal entries per account, then one
+        bulk_write for all ledgers.
+
+        Returns:
+            Number of accounts whose ledger moved
+        """
+        by_account: Dict[Any, Dict[Any, Dict[str, Any]]] = {}
+        for doc in docs:
+            if doc.get('account') is None or doc.get('ticket') is None:
+                continue
+            by_account.setdefault(doc['account'], {})[doc['ticket']] = doc
+        if not by_account:
+            return 0
+
+        now = datetime.now(timezone.utc)
+        ledger_operations = []
+
+        for account, deals in by_account.items():
+            # One read to skip deals whose stored entry is already current
+            stored = await self._stored_entries(account, list(deals))
+            swaps = {}
+            entries = {}
+            last_deal_time = None
+
+            for ticket, deal in deals.items():
+                if ticket not in stored:
+                    continue  # deal not written (failed ingest): nothing to fold in
+                entry, classification = ledger_entry(deal)
+                if isinstance(deal.get('time'), datetime) and (last_deal_time is None or deal['time'] > last_deal_time):
+                    last_deal_time = deal['time']
+                if stored[ticket] == entry:
+                    continue
+
+                update = {'ledger_entry': entry}
+                if classification is not None:
+                    update['transfer_classification'] = classification
+                swaps[ticket] = (stored[ticket], update)
+                entries[ticket] = entry
+
+            delta: Dict[str, float] = {}
+            if swaps:
+                for ticket in await self._swap_entries(account, swaps):
+                    for field, change in entry_delta(entries[ticket], swaps[ticket][0]).items():
+                        delta[field] = round(delta.get(field, 0) + change, 2)
+
+            ledger_update: Dict[str, Any] = {'$set': {'account': account, 'updated_at': now}}
+            delta = {field: change for field, change in delta.items() if change}
+            if delta:
+                ledger_update['$inc'] = delta
+            if last_deal_time is not None:
+                ledger_update['$max'] = {'last_deal_time': last_deal_time}
+            ledger_operations.append(UpdateOne({'_id': account}, ledger_update, upsert=True))
+
+        if not ledger_operations:
+            return 0
+        # Entries first: if the ledger write fails the ledger under-counts until rebuild()
+        await self.ledgers.bulk_write(ledger_operations, ordered=False)
+        return len(ledger_operations)
+
+    async def rebuild(self, account: Optional[int] = None) -> Dict[str, Any]:
+        """Regenerate ledgers (and every deal's entry) from mt5_deals, optionally for one account"""
+        query: Dict[str, Any] = {} if account is None else {'account': account}
+        totals: Dict[Any, Dict[str, Any]] = {}
+        operations = []
+        deals = 0
+
+        async for deal in self.deals.find(query, DEAL_PROJECTION):
+            if deal.get('account') is None:
+                continue
+            entry, classification = ledger_entry(deal)
+            ledger = totals.setdefault(deal['account'], {})
+            for field, value in entry.items():
+                ledger[field] = ledger.get(field, 0) + value
+            deal_time = deal.get('time')
+            if isinstance(deal_time, datetime) and (ledger.get('last_deal_time') is None or deal_time > ledger['last_deal_time']):
+                ledger['last_deal_time'] = deal_time
+
+            update = {'ledger_entry': entry}
+            if classification is not None:
+                update['transfer_classification'] = classification
+            operations.append(UpdateOne({'_id': deal['_id']}, {'$set': update}))
+            deals += 1
+            if len(operations) >= REBUILD_CHUNK_SIZE:
+                await self.deals.bulk_write(operations, ordered=False)
+                operations = []
+        if operations:
+            await self.deals.bulk_write(operations, ordered=False)
+
+        now = datetime.now(timezone.utc)
+        for account_number, ledger in totals.items():
+            doc = {field: round(value, 2) for field, value in ledger.items() if field != 'last_deal_time'}
+            doc.update(account=account_number, last_deal_time=ledger.get('last_deal_time'), updated_at=now)
+            await self.ledgers.replace_one({'_id': account_number}, doc, upsert=True)
+        if account is None:
+            await self.ledgers.delete_many({'_id': {'$nin': list(totals)}})
+        elif account not in totals:
+            await self.ledgers.delete_one({'_id': account})
+
+        logger.info(f"📒 Rebuilt P&L ledger for {len(totals)} accounts from {deals:,} deals (account={account})")
+        return {'success': True, 'accounts': len(totals), 'deals': deals}
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    async def get_ledgers(self, accounts: Optional[Iterable[int]] = None) -> Dict[Any, Dict[str, Any]]:
+        """Ledgers keyed by account number (one $in query); all ledgers when accounts is None"""
+        query: Dict[str, Any] = {} if accounts is None else {'_id': {'$in': list(accounts)}}
+        ledgers = {}
+        async for doc in self.ledgers.find(query):
+            ledgers[doc['_id']] = format_ledger(doc)
+        return ledgers
+
+    async def get_ledger(self, account: int) -> Optional[Dict[str, Any]]:
+        doc = await self.ledgers.find_one({'_id': account})
+        return format_ledger(doc) if doc else None
@@ -0,0 +1,292 @@
+"""
+Query Profiler
+Per-request MongoDB query counts, DB time and N+1 detection
+
+A PyMongo CommandListener registered on the Motor client attributes every
+command to the request (or background job) that issued it via a ContextVar;
+Motor copies the context into its executor threads, so the listener sees it.
+
+    client = AsyncIOMotorClient(url, event_listeners=[query_profiler])
+
+    with query_profiler.track('GET /api/admin/rebates') as stats:
+        ...                                        # stats.count, stats.db_ms
+
+Queries are grouped by shape - command, collection and filter keys with
+values stripped - so a loop doing
+    find mt5_deals_history {"account": ?, "time": {"$gte": ?}}
+once per account shows up as one shape repeated N times. A request repeating
+one shape QUERY_N_PLUS_ONE_THRESHOLD times or more is flagged and logged.
+
+Served at GET /api/health/queries.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+QUERY_PROFILING_ENABLED = os.environ.get('QUERY_PROFILING_ENABLED', 'true').lower() != 'false'
+# Identical query shapes in one request that count as an N+1 pattern
+QUERY_N_PLUS_ONE_THRESHOLD = int(os.environ.get('QUERY_N_PLUS_ONE_THRESHOLD', '10'))
+# Requests spending at least this long in MongoDB are logged even when not flagged
+QUERY_SLOW_DB_MS = float(os.environ.get('QUERY_SLOW_DB_MS', '500'))
+
+# Handshake / auth / cursor housekeeping, not application queries
+IGNORED_COMMANDS = {
+    'hello', 'ismaster', 'isMaster', 'ping', 'buildInfo', 'buildinfo',
+    'saslStart', 'saslContinue', 'authenticate', 'endSessions', 'killCursors',
+}
+# Infrastructure collections touched per progress update / lease heartbeat
+IGNORED_COLLECTIONS = {'jobs', 'scheduler_leases'}
+
+# Shapes kept per endpoint in the aggregate view
+TOP_SHAPES_KEPT = 20
+FLAGGED_KEPT = 50
+
+_current_stats: contextvars.ContextVar = contextvars.ContextVar('query_stats', default=None)
+
+
+def _shape(value: Any) -> Any:
+    """Filter/document with values replaced by '?' (operators and keys kept)"""
+    if isinstance(value, dict):
+        return {key: _shape(item) for key, item in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        if value and isinstance(value[0], dict):
+            return [_shape(value[0])]
+        return '?'
+    return '?'
+
+
+def command_shape(command_name: str, command: Dict[str, Any]) -> Optional[str]:
+    """Normalised description of a command, or None if it is not tracked"""
+    collection = command.get(command_name)
+    query: Any = None
+
+    if command_name == 'find':
+        query = command.get('filter', {})
+    elif command_name in ('update', 'delete'):
+        statements = command.get('updates' if command_name == 'update' else 'deletes') or [{}]
+        query = statements[0].get('q', {})
+    elif command_name == 'findAndModify':
+        query = command.get('query', {})
+    elif command_name in ('count', 'distinct'):
+        query = command.get('query', {})
+    elif command_name == 'aggregate':
+        pipeline = command.get('pipeline') or []
+        stages = [next(iter(stage)) for stage in pipeline if stage]
+        match = next((stage['$match'] for stage in pipeline if '$match' in stage), None)
+        query = {'stages': stages, 'match': _shape(match) if match is not None else None}
+        collection = command.get('aggregate')
+        if collection == 1:
+            collection = '<db>'
+        return f"aggregate {collection} {json.dumps(query, sort_keys=True, default=str)}"
+    elif command_name == 'getMore':
+        collection = command.get('collection')
+    elif not isinstance(collection, str):
+        collection = ''
+
+    if collection in IGNORED_COLLECTIONS:
+        return None
+
+    shape = f"{command_name} {collection}".strip()
+    if query is not None:
+        shape += f" {json.dumps(_shape(query), sort_keys=True, default=str)}"
+    return shape
+
+
+class QueryStats:
+    """Queries issued by one request or job (updated from Motor's executor threads)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.failed = 0
+        self.db_ms = 0.0
+        self.shapes: Counter = Counter()
+        self.shape_ms: Dict[str, float] = {}
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, shape: str, duration_ms: float, failed: bool = False):
+        with self._lock:
+            self.count += 1
+            self.db_ms += duration_ms
+            self.shapes[shape] += 1
+            self.shape_ms[shape] = self.shape_ms.get(shape, 0.0) + duration_ms
+            if failed:
+                self.failed += 1
+
+    def most_repeated(self):
+        """(shape, repeats) of the most repeated shape, or (None, 0)"""
+        with self._lock:
+            top = self.shapes.most_common(1)
+        return top[0] if top else (None, 0)
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.db_ms:.1f};desc="{self.count} queries"'
+
+    def to_dict(self, top: int = 5) -> Dict[str, Any]:
+        with self._lock:
+            shapes = [
+                {'shape': shape, 'count': count, 'db_ms': round(self.shape_ms[shape], 1)}
+                for shape, count in self.shapes.most_common(top)
+            ]
+        return {
+            'endpoint': self.name,
+            'queries': self.count,
+            'failed': self.failed,
+            'db_ms': round(self.db_ms, 1),
+            'elapsed_ms': round((time.perf_counter() - self.started) * 1000, 1),
+            'top_shapes': shapes,
+        }
+
+
+class QueryProfiler(monitoring.CommandListener):
+    """Command listener aggregating per-endpoint query statistics"""
+
+    def __init__(self, threshold: int = QUERY_N_PLUS_ONE_THRESHOLD, slow_db_ms: float = QUERY_SLOW_DB_MS,
+                 enabled: bool = QUERY_PROFILING_ENABLED):
+        self.threshold = threshold
+        self.slow_db_ms = slow_db_ms
+        self.enabled = enabled
+        self._pending: Dict[Any, Any] = {}
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+        self._flagged: deque = deque(maxlen=FLAGGED_KEPT)
+        self._lock = threading.Lock()
+        self.since = datetime.now(timezone.utc)
+
+    # --- pymongo.monitoring.CommandListener ---------------------------------
+
+    def started(self, event):
+        stats = _current_stats.get()
+        if stats is None or event.command_name in IGNORED_COMMANDS:
+            return
+        try:
+            shape = command_shape(event.command_name, event.command)
+        except Exception:
+            shape = event.command_name
+        if shape is not None:
+            self._pending[(event.request_id, event.connection_id)] = (stats, shape)
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool):
+        entry = self._pending.pop((event.request_id, event.connection_id), None)
+        if entry is not None:
+            stats, shape = entry
+            stats.add(shape, event.duration_micros / 1000, failed)
+
+    # --- request / job tracking ---------------------------------------------
+
+    @contextmanager
+    def track(self, name: str):
+        """Attribute queries issued inside the block (and tasks it spawns) to `name`"""
+        if not self.enabled:
+            yield QueryStats(name)
+            return
+        stats = QueryStats(name)
+        token = _current_stats.set(stats)
+        try:
+            yield stats
+        finally:
+            _current_stats.reset(token)
+            self.record(stats)
+
+    def record(self, stats: QueryStats):
+        """Fold a finished request into the per-endpoint view; log N+1 / slow ones"""
+        shape, repeats = stats.most_repeated()
+        flagged = repeats >= self.threshold
+
+        with self._lock:
+            endpoint = self._endpoints.setdefault(stats.name, {
+                'requests': 0, 'queries': 0, 'db_ms': 0.0, 'max_queries': 0,
+                'flagged_requests': 0, 'shapes': Counter(),
+            })
+            endpoint['requests'] += 1
+            endpoint['queries'] += stats.count
+            endpoint['db_ms'] += stats.db_ms
+            endpoint['max_queries'] = max(endpoint['max_queries'], stats.count)
+            endpoint['shapes'].update(stats.shapes)
+            if len(endpoint['shapes']) > TOP_SHAPES_KEPT * 5:
+                endpoint['shapes'] = Counter(dict(endpoint['shapes'].most_common(TOP_SHAPES_KEPT)))
+            if flagged:
+                endpoint['flagged_requests'] += 1
+
+        if not flagged and stats.db_ms < self.slow_db_ms:
+            return
+
+        profile = stats.to_dict()
+        profile['timestamp'] = datetime.now(timezone.utc).isoformat()
+        if flagged:
+            profile['n_plus_one'] = {'shape': shape, 'repeats': repeats}
+            with self._lock:
+                self._flagged.append(profile)
+            logger.warning(
+                f"🐢 N+1 query pattern in {stats.name}: {repeats}x {shape} "
+                f"db_profile={json.dumps(profile, default=str)}",
+                extra={'db_profile': profile}
+            )
+        else:
+            logger.info(
+                f"🐢 Slow DB time in {stats.name}: {stats.db_ms:.0f}ms over {stats.count} queries "
+                f"db_profile={json.dumps(profile, default=str)}",
+                extra={'db_profile': profile}
+            )
+
+    # --- metrics ------------------------------------------------------------
+
+    def get_stats(self, top: int = 20) -> Dict[str, Any]:
+        """Endpoints by total DB time, with their most repeated shapes"""
+        with self._lock:
+            endpoints = [
+                {
+                    'endpoint': name,
+                    'requests': data['requests'],
+                    'queries': data['queries'],
+                    'avg_queries': round(data['queries'] / data['requests'], 1),
+                    'max_queries': data['max_queries'],
+                    'db_ms': round(data['db_ms'], 1),
+                    'avg_db_ms': round(data['db_ms'] / data['requests'], 1),
+                    'flagged_requests': data['flagged_requests'],
+                    'top_shapes': [
+                        {'shape': shape, 'count': count}
+                        for shape, count in data['shapes'].most_common(5)
+                    ],
+                }
+                for name, data in self._endpoints.items()
+            ]
+            flagged = list(self._flagged)
+
+        endpoints.sort(key=lambda item: -item['db_ms'])
+        return {
+            'enabled': self.enabled,
+            'since': self.since.isoformat(),
+            'n_plus_one_threshold': self.threshold,
+            'slow_db_ms': self.slow_db_ms,
+            'endpoints': endpoints[:top],
+            'recent_flagged': flagged[-top:][::-1],
+        }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._flagged.clear()
+            self.since = datetime.now(timezone.utc)
+
+
+# Global instance (registered on the Motor client in server.py)
+query_profiler = QueryProfiler()
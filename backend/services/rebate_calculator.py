@@ -2,14 +2,45 @@
 """
 Broker Rebates Calculator Service
 Calculates IB rebates based on MT5 trading volume
+
+One run costs a fixed number of queries whatever the number of accounts or
+periods: accounts, the effective-dated broker config table, a single $group
+over mt5_trades keyed by (account, period) and one upserting bulk_write of
+rebate_transactions. Many historical months can be recomputed in one run
+(audit backfills, POST /api/admin/rebates/backfill).
 """
 
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Optional
+from typing import Awaitable, Callable, Iterable, List, Dict, Optional, Tuple
 import logging
 
+from pymongo import UpdateOne
+
 logger = logging.getLogger(__name__)
 
+_indexes_ready = False
+
+
+def _utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def monthly_periods(start_month: str, end_month: str) -> List[Tuple[datetime, datetime]]:
+    """
+    Calendar-month periods from 'YYYY-MM' to 'YYYY-MM' inclusive
+
+    Each period ends one millisecond before the next month (MongoDB's date
+    precision), matching the month windows used by get_rebate_summary().
+    """
+    month = datetime.strptime(start_month, '%Y-%m').replace(tzinfo=timezone.utc)
+    last = datetime.strptime(end_month, '%Y-%m').replace(tzinfo=timezone.utc)
+    periods = []
+    while month <= last:
+        next_month = month.replace(year=month.year + 1, month=1) if month.month == 12 else month.replace(month=month.month + 1)
+        periods.append((month, next_month - timedelta(milliseconds=1)))
+        month = next_month
+    return periods
+
 
 class RebateCalculator:
     """
@@ -26,12 +57,102 @@ class RebateCalculator:
         self.rebate_config = db.broker_rebate_config
         self.rebate_transactions = db.rebate_transactions
     
+    async def ensure_indexes(self):
+        global _indexes_ready
+        if _indexes_ready:
+            return
+        await self.rebate_transactions.create_index([("account_id", 1), ("period_start", 1), ("period_end", 1)])
+        _indexes_ready = True
+    
+    async def load_config_table(self, broker_codes: Iterable[str]) -> Dict[str, List[Dict]]:
+        """
+        Effective-dated rebate configs per broker, loaded with one query
+        
+        Active configs plus retired ones that carry an end_date, each list
+        sorted by effective_date (oldest first).
+        """
+        cursor = self.rebate_config.find({
+            "broker_code": {"$in": sorted(set(broker_codes))},
+            "$or": [{"is_active": True}, {"end_date": {"$ne": None}}]
+        }).sort("effective_date", 1)
+        
+        table: Dict[str, List[Dict]] = {}
+        for config in await cursor.to_list(length=None):
+            table.setdefault(config.get('broker_code'), []).append(config)
+        return table
+    
+    @staticmethod
+    def resolve_config(configs: List[Dict], period_start: datetime, period_end: datetime) -> Optional[Dict]:
+        """
+        Config in effect for a period: the latest one effective on or before
+        period_end that had not ended before period_start. Periods that end
+        before every config's effective_date use the earliest one (rates are
+        usually entered after the fact); any other period without a config in
+        effect (e.g. after a retired config) has none.
+        """
+        in_effect = [
+            config for config in configs
+            if (config.get('effective_date') is None or _utc(config['effective_date']) <= period_end)
+            and (config.get('end_date') is None or _utc(config['end_date']) >= period_start)
+        ]
+        if in_effect:
+            return in_effect[-1]
+        predates_all = all(
+            config.get('effective_date') is not None and _utc(config['effective_date']) > period_end
+            for config in configs
+        )
+        return configs[0] if configs and predates_all else None
+    
+    async def _period_volumes(
+        self,
+        account_numbers: List[int],
+        periods: List[Tuple[datetime, datetime]]
+    ) -> Dict[Tuple[int, int], Dict]:
+        """
+        Raw volume and trade count per (account, period index)
+        
+        One $group over mt5_trades for every account and period; each trade
+        is assigned to its period with $switch on close_time.
+        """
+        period_of_trade = {
+            "$switch": {
+                "branches": [
+                    {
+                        "case": {"$and": [
+                            {"$gte": ["$close_time", period_start]},
+                            {"$lte": ["$close_time", period_end]}
+                        ]},
+                        "then": index
+                    }
+                    for index, (period_start, period_end) in enumerate(periods)
+                ],
+                "default": -1
+            }
+        }
+        pipeline = [
+            {"$match": {
+                "account": {"$in": account_numbers},
+                "close_time": {"$gte": periods[0][0], "$lte": max(end for _, end in periods)}
+            }},
+            {"$project": {"account": 1, "volume": 1, "period": period_of_trade}},
+            {"$match": {"period": {"$gte": 0}}},
+            {"$group": {
+                "_id": {"account": "$account", "period": "$period"},
+                # $sum skips non-numeric volumes
+                "volume": {"$sum": "$volume"},
+                "trades": {"$sum": 1}
+            }}
+        ]
+        rows = await self.mt5_trades.aggregate(pipeline).to_list(length=None)
+        return {(row['_id']['account'], row['_id']['period']): row for row in rows}
+    
     async def calculate_rebates_for_period(
         self,
         start_date: datetime,
         end_date: datetime,
         account_ids: Optional[List[str]] = None,
-        auto_approve: bool = False
+        auto_approve: bool = False,
+        progress: Optional[Callable[[float, str], Awaitable]] = None
     ) -> Dict:
         """
         Calculate rebates based on trading volume for specified period.
@@ -41,19 +162,58 @@ class RebateCalculator:
             end_date: End of period
             account_ids: Specific accounts to process (None = all accounts)
             auto_approve: Automatically approve calculated rebates
+            progress: Optional async callback(percent, message), called per stage
+                      (background jobs use it for progress and cancellation)
         
         Returns:
             Dictionary with calculation results
+        """
+        result = await self.calculate_rebates_for_periods(
+            [(start_date, end_date)], account_ids=account_ids, auto_approve=auto_approve, progress=progress
+        )
+        if not result["success"]:
+            return result
+        
+        period = result["periods"][0]
+        return {
+            "success": True,
+            "calculation_id": result["calculation_id"],
+            "accounts_processed": period["accounts_processed"],
+            "total_volume": period["total_volume"],
+            "total_rebates": period["total_rebates"],
+            "rebate_transactions": period["rebate_transactions"],
+            "created_at": result["created_at"]
+        }
+    
+    async def calculate_rebates_for_periods(
+        self,
+        periods: List[Tuple[datetime, datetime]],
+        account_ids: Optional[List[str]] = None,
+        auto_approve: bool = False,
+        progress: Optional[Callable[[float, str], Awaitable]] = None
+    ) -> Dict:
+        """
+        Calculate rebates for one or many (start, end) periods in a single run.
+        
+        Used for the regular period calculation and for audit backfills that
+        recompute many historical months at once. Periods must not overlap.
         
         Process:
         1. Get all MT5 accounts (or specific ones) with rebate tracking enabled
-        2. For each account, get broker rebate configuration
-        3. Calculate volume traded in period from mt5_trades
-        4. Calculate rebate = volume × rebate_per_lot
-        5. Create rebate_transaction record
+        2. Preload the effective-dated rebate configs of their brokers
+        3. Group trade volume per (account, period) from mt5_trades in one pipeline
+        4. Calculate rebate = volume × rebate_per_lot of the config in effect
+        5. Upsert every rebate_transaction with one bulk_write
         """
+        if not periods:
+            raise ValueError("At least one rebate period is required")
+        periods = sorted((_utc(start), _utc(end)) for start, end in periods)
+        for (_, previous_end), (next_start, _) in zip(periods, periods[1:]):
+            if next_start <= previous_end:
+                raise ValueError(f"Rebate periods overlap at {next_start.isoformat()}")
         
-        logger.info(f"🔄 Starting rebate calculation for period {start_date} to {end_date}")
+        logger.info(f"🔄 Starting rebate calculation for {len(periods)} period(s) "
+                    f"from {periods[0][0]} to {periods[-1][1]}")
         
         # 1. Get accounts to process
         query = {"track_rebates": True}
@@ -73,132 +233,138 @@ class RebateCalculator:
         
         logger.info(f"📊 Processing {len(accounts)} accounts for rebate calculation")
         
-        results = []
-        total_volume = 0
-        total_rebates = 0
+        # 2. Broker configs (one query for every broker and period)
+        if progress:
+            await progress(10, "Loading broker rebate configs")
+        config_table = await self.load_config_table(account.get('broker_code', 'MEX') for account in accounts)
         
-        for account in accounts:
-            account_id = account.get('account')
-            broker_code = account.get('broker_code', 'MEX')
-            
-            # 2. Get broker rebate config
-            broker_config_cursor = self.rebate_config.find({
-                "broker_code": broker_code,
-                "is_active": True
-            }).sort("effective_date", -1).limit(1)
-            
-            broker_config_list = await broker_config_cursor.to_list(length=1)
-            
-            if not broker_config_list:
-                logger.warning(f"⚠️ No rebate config found for broker {broker_code}")
-                continue
-            
-            broker_config = broker_config_list[0]
-            rebate_per_lot = broker_config.get('rebate_per_lot', 0)
+        # 3. Volume per account and period (one pipeline)
+        if progress:
+            await progress(30, f"Grouping trade volume for {len(accounts)} accounts")
+        volumes = await self._period_volumes([account.get('account') for account in accounts], periods)
+        
+        # 4. Rebates
+        if progress:
+            await progress(70, "Calculating rebates")
+        now = datetime.now(timezone.utc)
+        operations = []
+        period_results = []
+        missing_configs = set()
+        
+        for index, (start_date, end_date) in enumerate(periods):
+            results = []
+            total_volume = 0
+            total_rebates = 0
             
-            # 3. Calculate volume from mt5_trades
-            # Query trades in the period
-            trades_cursor = self.mt5_trades.find({
-                "account": account_id,
-                "close_time": {
-                    "$gte": start_date,
-                    "$lte": end_date
+            for account in accounts:
+                account_id = account.get('account')
+                broker_code = account.get('broker_code', 'MEX')
+                
+                broker_config = self.resolve_config(config_table.get(broker_code, []), start_date, end_date)
+                if not broker_config:
+                    missing_configs.add(broker_code)
+                    continue
+                rebate_per_lot = broker_config.get('rebate_per_lot', 0)
+                
+                row = volumes.get((account_id, index), {})
+                total_volume_raw = row.get('volume', 0)
+                trade_count = row.get('trades', 0)
+                
+                # Convert to standard lots
+                # MT5 stores volume in different ways depending on the data source
+                # If the volume looks like it's already in lots (< 100), use as-is
+                # Otherwise divide by 10000 to get lots
+                if total_volume_raw < 100:
+                    volume_standard_lots = total_volume_raw
+                else:
+                    volume_standard_lots = total_volume_raw / 10000
+                
+                rebate_earned = volume_standard_lots * rebate_per_lot
+                
+                if rebate_earned <= 0:
+                    continue
+                
+                # 5. Transaction record - workflow fields (verification, payment)
+                # are only set on insert so recalculations keep approvals/payments
+                calculated = {
+                    "account_id": str(account_id),
+                    "account_name": f"{account_id} - {account.get('name', 'Unknown')}",
+                    "broker_name": broker_config.get('broker_name'),
+                    "broker_code": broker_config.get('broker_code'),
+                    "volume_lots": round(volume_standard_lots, 2),
+                    "rebate_per_lot": rebate_per_lot,
+                    "rebate_earned": round(rebate_earned, 2),
+                    "currency": "USD",
+                    "period_start": start_date,
+                    "period_end": end_date,
+                    "calculation_date": now,
+                    "notes": f"Automated calculation from {trade_count} trades",
+                    "updated_at": now
                 }
-            })
-            
-            trades = await trades_cursor.to_list(length=None)
-            
-            # Calculate total volume in lots
-            # MT5 stores volume in different ways depending on the data source
-            # Typically it's in hundreds (100 = 0.01 lot, 10000 = 1.00 lot)
-            total_volume_raw = 0
-            for trade in trades:
-                volume = trade.get('volume', 0)
-                # If volume is already in decimal format (e.g., 0.5 for 0.5 lots)
-                if isinstance(volume, (int, float)):
-                    total_volume_raw += volume
-            
-            # Convert to standard lots
-            # If the volume looks like it's already in lots (< 100), use as-is
-            # Otherwise divide by 10000 to get lots
-            if total_volume_raw < 100:
-                volume_standard_lots = total_volume_raw
-            else:
-                volume_standard_lots = total_volume_raw / 10000
-            
-            # 4. Calculate rebate
-            rebate_earned = volume_standard_lots * rebate_per_lot
-            
-            if rebate_earned <= 0:
-                logger.info(f"⚠️ Account {account_id}: No volume traded in period, skipping")
-                continue
-            
-            # 5. Create transaction record
-            transaction = {
-                "account_id": str(account_id),
-                "account_name": f"{account_id} - {account.get('name', 'Unknown')}",
-                "broker_name": broker_config.get('broker_name'),
-                "broker_code": broker_config.get('broker_code'),
-                "volume_lots": round(volume_standard_lots, 2),
-                "rebate_per_lot": rebate_per_lot,
-                "rebate_earned": round(rebate_earned, 2),
-                "currency": "USD",
-                "period_start": start_date,
-                "period_end": end_date,
-                "calculation_date": datetime.now(timezone.utc),
-                "status": "calculated",
-                "verification_status": "approved" if auto_approve else "pending",
-                "payment_status": "unpaid",
-                "payment_date": None,
-                "calculated_by": "system",
-                "notes": f"Automated calculation from {len(trades)} trades",
-                "created_at": datetime.now(timezone.utc),
-                "updated_at": datetime.now(timezone.utc)
-            }
-            
-            # Check if transaction already exists for this period
-            existing = await self.rebate_transactions.find_one({
-                "account_id": str(account_id),
-                "period_start": start_date,
-                "period_end": end_date
-            })
-            
-            if existing:
-                # Update existing transaction
-                await self.rebate_transactions.update_one(
-                    {"_id": existing["_id"]},
-                    {"$set": transaction}
-                )
-                logger.info(f"✅ Updated rebate for account {account_id}: ${rebate_earned:.2f}")
-            else:
-                # Insert new transaction
-                await self.rebate_transactions.insert_one(transaction)
-                logger.info(f"✅ Created rebate for account {account_id}: ${rebate_earned:.2f}")
+                on_insert = {
+                    "status": "calculated",
+                    "verification_status": "pending",
+                    "payment_status": "unpaid",
+                    "payment_date": None,
+                    "calculated_by": "system",
+                    "created_at": now
+                }
+                if auto_approve:
+                    calculated["verification_status"] = "approved"
+                    del on_insert["verification_status"]
+                
+                operations.append(UpdateOne(
+                    {"account_id": str(account_id), "period_start": start_date, "period_end": end_date},
+                    {"$set": calculated, "$setOnInsert": on_insert},
+                    upsert=True
+                ))
+                
+                results.append({
+                    "account_id": str(account_id),
+                    "account_name": calculated["account_name"],
+                    "volume_lots": round(volume_standard_lots, 2),
+                    "rebate_earned": round(rebate_earned, 2),
+                    "status": "calculated",
+                    "verification_status": "approved" if auto_approve else "pending"
+                })
+                
+                total_volume += volume_standard_lots
+                total_rebates += rebate_earned
             
-            results.append({
-                "account_id": str(account_id),
-                "account_name": transaction["account_name"],
-                "volume_lots": round(volume_standard_lots, 2),
-                "rebate_earned": round(rebate_earned, 2),
-                "status": transaction["status"],
-                "verification_status": transaction["verification_status"]
+            period_results.append({
+                "period_start": start_date.isoformat(),
+                "period_end": end_date.isoformat(),
+                "accounts_processed": len(results),
+                "total_volume": round(total_volume, 2),
+                "total_rebates": round(total_rebates, 2),
+                "rebate_transactions": results
             })
-            
-            total_volume += volume_standard_lots
-            total_rebates += rebate_earned
         
-        calculation_id = f"calc_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}"
+        for broker_code in sorted(missing_configs):
+            logger.warning(f"⚠️ No rebate config found for broker {broker_code}")
+        
+        if progress:
+            await progress(90, f"Saving {len(operations)} rebate transactions")
+        if operations:
+            await self.ensure_indexes()
+            write = await self.rebate_transactions.bulk_write(operations, ordered=False)
+            logger.info(f"✅ Rebate transactions saved: {write.upserted_count} created, {write.modified_count} updated")
+        
+        calculation_id = f"calc_{now.strftime('%Y%m%d_%H%M%S')}"
+        total_rebates = sum(period["total_rebates"] for period in period_results)
         
-        logger.info(f"✅ Rebate calculation complete: {len(results)} accounts, ${total_rebates:.2f} total")
+        logger.info(f"✅ Rebate calculation complete: {len(operations)} transactions over "
+                    f"{len(periods)} period(s), ${total_rebates:.2f} total")
         
         return {
             "success": True,
             "calculation_id": calculation_id,
-            "accounts_processed": len(results),
-            "total_volume": round(total_volume, 2),
+            "periods_processed": len(period_results),
+            "transactions": len(operations),
+            "total_volume": round(sum(period["total_volume"] for period in period_results), 2),
             "total_rebates": round(total_rebates, 2),
-            "rebate_transactions": results,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "periods": period_results,
+            "created_at": now.isoformat()
         }
     
     async def get_rebates_for_cash_flow(
@@ -0,0 +1,250 @@
+"""
+Response Cache
+Event-driven cache for dashboard aggregate endpoints
+
+Responses are keyed by (endpoint, parameters) and remember the version of
+every source tag they were computed from ("mt5_accounts", "investments",
+...). Writers bump the tags instead of waiting for a TTL:
+- VPSSyncService / BridgeEventIngestService (mt5_accounts)
+- DealIngestionService (mt5_deals, viking_deals)
+- Investment Committee and single-source write endpoints (@invalidates)
+
+An entry is served only while all of its tag versions are current and it
+is younger than RESPONSE_CACHE_TTL_SECONDS (a safety net for writers that
+do not bump). server.py backs the tag versions with SharedVersions
+(services/shared_state.py), so a bump in one Uvicorn worker invalidates
+the entries of every worker within SHARED_VERSION_CACHE_SECONDS; without
+it (scripts, tests) versions are per-process counters. Concurrent identical requests share one computation
+(single-flight). Counters are exposed via get_stats().
+
+Usage:
+    @api_router.get("/fund-portfolio/overview")
+    @response_cache.cached("fund-portfolio/overview", tags=(TAG_INVESTMENTS, TAG_MT5_ACCOUNTS))
+    async def get_fund_portfolio_overview(): ...
+
+    @api_router.get("/admin/trading-analytics/rolling/funds/{fund_name}")
+    @response_cache.cached("admin/trading-analytics/rolling/fund", tags=(TAG_MT5_ACCOUNTS, TAG_MT5_DEALS, TAG_MONEY_MANAGERS), ttl_seconds=86400, daily=True)
+    async def get_fund_rolling_performance(fund_name: str, days: int = 365): ...
+
+    @router.post("/apply-allocations")
+    @response_cache.invalidates(TAG_MT5_ACCOUNTS)
+    async def apply_allocations(...): ...
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from services.shared_state import SharedVersions
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_TTL_SECONDS = int(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', '300'))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '512'))
+
+# Source collection tags
+TAG_MT5_ACCOUNTS = 'mt5_accounts'
+TAG_MT5_DEALS = 'mt5_deals'
+TAG_INVESTMENTS = 'investments'
+TAG_MONEY_MANAGERS = 'money_managers'
+TAG_VIKING_DEALS = 'viking_deals'
+
+# Endpoint arguments that identify the caller, not the response
+IGNORED_PARAMS = ('current_user', 'request', 'db')
+
+
+class CacheEntry:
+    """Cached response plus the tag versions it was computed from"""
+
+    def __init__(self, value: Any, versions: Tuple):
+        self.value = value
+        self.versions = versions
+        self.stored_at = time.monotonic()
+
+
+class ResponseCache:
+    """In-process response cache with version tags and single-flight"""
+
+    def __init__(self, ttl_seconds: int = RESPONSE_CACHE_TTL_SECONDS, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple, CacheEntry] = {}
+        self._versions: Dict[str, int] = {}
+        self._shared: Optional[SharedVersions] = None
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'stale': 0, 'invalidations': 0}
+        self._endpoint_stats: Dict[str, Dict[str, int]] = {}
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
+    def use_shared_versions(self, versions: SharedVersions):
+        """Share tag versions with the other workers"""
+        self._shared = versions
+
+    def version(self, tag: str) -> int:
+        """Bumps of tag seen by this worker"""
+        return self._versions.get(tag, 0)
+
+    async def tag_versions(self, tags: Tuple[str, ...]) -> Tuple:
+        if self._shared is None:
+            return tuple(self.version(t) for t in tags)
+        return tuple([await self._shared.get(t) for t in tags])
+
+    def bump(self, *tags: str):
+        """Mark source data as changed; dependent entries stop being served"""
+        for tag in set(tags):
+            self._versions[tag] = self._versions.get(tag, 0) + 1
+            self._stats['invalidations'] += 1
+            if self._shared is not None:
+                self._shared.bump(tag)
+
+    def clear(self):
+        self._entries.clear()
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def _count(self, endpoint: str, stat: str):
+        self._stats[stat] += 1
+        counters = self._endpoint_stats.setdefault(endpoint, {'hits': 0, 'misses': 0, 'coalesced': 0})
+        if stat in counters:
+            counters[stat] += 1
+
+    def _fresh_entry(self, key: Tuple, versions: Tuple, ttl_seconds: int) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.versions != versions or time.monotonic() - entry.stored_at >= ttl_seconds:
+            self._entries.pop(key, None)
+            self._stats['stale'] += 1
+            return None
+        return entry
+
+    def _store(self, key: Tuple, entry: CacheEntry):
+        if key not in self._entries and len(self._entries) >= self.max_entries:
+            oldest = min(self._entries, key=lambda k: self._entries[k].stored_at)
+            self._entries.pop(oldest, None)
+        self._entries[key] = entry
+
+    async def get_or_compute(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        tags: Iterable[str],
+        compute: Callable[[], Awaitable[Any]],
+        ttl_seconds: Optional[int] = None
+    ) -> Any:
+        """
+        Cached response for (endpoint, params), computing it at most once at a time
+
+        Responses with success=False and raised exceptions are never cached;
+        an exception is re-raised to every request waiting on that computation.
+        """
+        tags = tuple(sorted(set(tags)))
+        key = (endpoint, tuple(sorted((k, repr(v)) for k, v in params.items())))
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+
+        versions = await self.tag_versions(tags)
+        entry = self._fresh_entry(key, versions, ttl)
+        if entry:
+            self._count(endpoint, 'hits')
+            return entry.value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._count(endpoint, 'coalesced')
+            return await asyncio.shield(inflight)
+
+        self._count(endpoint, 'misses')
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieved here so an exception nobody waited on is not logged as lost
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            # Only cache if no writer bumped a tag while we were computing
+            cacheable = not (isinstance(value, dict) and value.get('success') is False)
+            if cacheable and versions == await self.tag_versions(tags):
+                self._store(key, CacheEntry(value, versions))
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    # ------------------------------------------------------------------
+    # Decorators
+    # ------------------------------------------------------------------
+
+    def cached(
+        self,
+        endpoint: str,
+        tags: Iterable[str],
+        ttl_seconds: Optional[int] = None,
+        daily: bool = False
+    ):
+        """
+        Cache an async endpoint by its (non-caller) keyword arguments
+
+        daily=True also keys entries by the UTC date, for responses built from
+        completed days only: they are recomputed once the day rolls over.
+        """
+        tags = tuple(tags)
+
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                params = {k: v for k, v in kwargs.items() if k not in IGNORED_PARAMS}
+                if daily:
+                    params['utc_day'] = datetime.now(timezone.utc).date().isoformat()
+                return await self.get_or_compute(
+                    endpoint, params, tags, lambda: func(*args, **kwargs), ttl_seconds
+                )
+            return wrapper
+        return decorator
+
+    def invalidates(self, *tags: str):
+        """Bump tags after an async write endpoint returns successfully"""
+
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                result = await func(*args, **kwargs)
+                if not (isinstance(result, dict) and result.get('success') is False):
+                    self.bump(*tags)
+                return result
+            return wrapper
+        return decorator
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._stats['hits'] + self._stats['misses'] + self._stats['coalesced']
+        return {
+            **self._stats,
+            'hit_rate': round((self._stats['hits'] + self._stats['coalesced']) / lookups * 100, 2) if lookups else 0,
+            'entries': len(self._entries),
+            'inflight': len(self._inflight),
+            'tag_versions': dict(self._versions),
+            'ttl_seconds': self.ttl_seconds,
+            'by_endpoint': {k: dict(v) for k, v in self._endpoint_stats.items()}
+        }
+
+
+# Global instance
+response_cache = ResponseCache()
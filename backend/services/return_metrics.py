@@ -0,0 +1,519 @@
+"""
+Return Metrics Library
+NumPy-backed daily return series and risk-adjusted performance metrics shared
+by the trading and live demo analytics
+
+Series are built per calendar day (UTC):
+- daily_returns_from_deals: deal P&L bucketed by day, divided by the equity
+  at the start of that day (initial equity + P&L of all previous days)
+- daily_returns_from_equity: last equity snapshot per day, percentage change
+  day over day
+
+Several series are stacked into a (managers x days) matrix by
+returns_matrix(); every metric function works along the last axis, so one
+call scores all managers at once. Days before a series starts (or after it
+ends) are NaN and ignored; days without deals inside a series are 0.
+
+Conventions (kept from TradingAnalyticsService):
+- returns are fractions (0.01 = 1%), percentages only in the output dicts
+- risk-free rate 0, annualisation over CALENDAR_DAYS_PER_YEAR
+- Sortino/Calmar with no downside are RATIO_CAP when the return is
+  positive and 0 otherwise; Sharpe with no volatility is 0
+
+Rolling versions use O(n) sliding windows: cumulative sums for mean and
+volatility, van Herk/Gil-Werman block maxima for the running peak.
+
+Used by:
+- TradingAnalyticsService.get_manager_analytics / get_managers_ranking
+- LiveDemoAnalyticsService._calculate_manager_performance
+- RollingPerformanceService (services/rolling_performance_service.py)
+"""
+
+import warnings
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from services.equity_curve import _to_epoch, deals_to_columns
+
+CALENDAR_DAYS_PER_YEAR = 365
+RATIO_CAP = 999.99
+DEFAULT_CONFIDENCE = 0.95
+
+SECONDS_PER_DAY = 86400
+
+# Deviations below this are rounding noise (a constant series), not risk
+_NO_RISK = 1e-12
+
+
+# ----------------------------------------------------------------------
+# Series construction
+# ----------------------------------------------------------------------
+
+def _day_index(value: Any) -> Optional[int]:
+    """Days since the epoch for a datetime / ISO string / epoch seconds"""
+    epoch = _to_epoch(value)
+    return int(epoch // SECONDS_PER_DAY) if np.isfinite(epoch) else None
+
+
+def day_to_date(day: int) -> str:
+    """Epoch day index -> 'YYYY-MM-DD'"""
+    return datetime.fromtimestamp(int(day) * SECONDS_PER_DAY, tz=timezone.utc).date().isoformat()
+
+
+def _day_range(first: int, last: int, start: Any = None, end: Any = None) -> Tuple[int, int]:
+    start_day = _day_index(start) if start is not None else None
+    end_day = _day_index(end) if end is not None else None
+    return (first if start_day is None else start_day), (last if end_day is None else end_day)
+
+
+def daily_pnl(
+    times: np.ndarray,
+    pnl: np.ndarray,
+    start: Any = None,
+    end: Any = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sum per-deal P&L into calendar days
+
+    Args:
+        times: Epoch seconds per deal (as deals_to_columns returns them)
+        pnl: P&L per deal
+        start, end: Optional first/last day of the series; default to the
+            first/last deal. Deals outside the range are dropped.
+
+    Returns:
+        (days, pnl) - int64 epoch day indices covering every day of the
+        range, float64 P&L per day
+    """
+    times = np.asarray(times, dtype=np.float64)
+    pnl = np.asarray(pnl, dtype=np.float64)
+    valid = np.isfinite(times)
+    days = np.floor(times[valid] / SECONDS_PER_DAY).astype(np.int64)
+    pnl = pnl[valid]
+
+    if days.size == 0 and (start is None or end is None):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    first, last = _day_range(
+        int(days.min()) if days.size else 0, int(days.max()) if days.size else 0, start, end
+    )
+    if last < first:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    inside = (days >= first) & (days <= last)
+    totals = np.bincount(days[inside] - first, weights=pnl[inside], minlength=last - first + 1)
+    return np.arange(first, last + 1, dtype=np.int64), totals
+
+
+def daily_returns_from_deals(
+    deals: List[Dict[str, Any]],
+    initial_equity: float,
+    time_field: str = "time",
+    include_costs: bool = True,
+    start: Any = None,
+    end: Any = None
+) -> Dict[str, np.ndarray]:
+    """
+    Daily return series for an account from its deals
+
+    Returns:
+        {"days": int64 epoch days, "pnl": P&L per day,
+         "equity": end-of-day equity, "returns": fractional return per day}
+    """
+    columns = deals_to_columns(deals, time_field=time_field, include_costs=include_costs)
+    days, pnl = daily_pnl(columns["time"], columns["pnl"], start, end)
+    return returns_from_daily_pnl(days, pnl, initial_equity)
+
+
+def returns_from_daily_pnl(days: np.ndarray, pnl: np.ndarray, initial_equity: float) -> Dict[str, np.ndarray]:
+    """Daily P&L -> equity and returns on start-of-day equity"""
+    pnl = np.asarray(pnl, dtype=np.float64)
+    equity = float(initial_equity) + np.cumsum(pnl)
+    opening = np.concatenate(([float(initial_equity)], equity[:-1])) if pnl.size else equity
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(opening > 0, pnl / opening, 0.0)
+    return {"days": np.asarray(days, dtype=np.int64), "pnl": pnl, "equity": equity, "returns": returns}
+
+
+def daily_returns_from_equity(
+    snapshots: List[Dict[str, Any]],
+    time_field: str = "timestamp",
+    value_field: str = "equity",
+    start: Any = None,
+    end: Any = None
+) -> Dict[str, np.ndarray]:
+    """
+    Daily return series from equity snapshots (last snapshot of each day)
+
+    Days without a snapshot carry the previous equity forward (0 return).
+    """
+    n = len(snapshots)
+    times = np.empty(n, dtype=np.float64)
+    values = np.empty(n, dtype=np.float64)
+    for i, snapshot in enumerate(snapshots):
+        times[i] = _to_epoch(snapshot.get(time_field))
+        value = snapshot.get(value_field)
+        values[i] = float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+
+    valid = np.isfinite(times) & np.isfinite(values)
+    times, values = times[valid], values[valid]
+    empty = {
+        "days": np.empty(0, dtype=np.int64), "pnl": np.empty(0), "equity": np.empty(0), "returns": np.empty(0)
+    }
+    if times.size == 0:
+        return empty
+
+    order = np.argsort(times, kind="stable")
+    days = np.floor(times[order] / SECONDS_PER_DAY).astype(np.int64)
+    values = values[order]
+
+    first, last = _day_range(int(days[0]), int(days[-1]), start, end)
+    inside = (days >= first) & (days <= last)
+    days, values = days[inside], values[inside]
+    if days.size == 0:
+        return empty
+
+    # Last snapshot per day, then forward-fill days without one
+    last_of_day = np.flatnonzero(np.append(np.diff(days) != 0, True))
+    span = np.arange(first, last + 1, dtype=np.int64)
+    slot = np.searchsorted(days[last_of_day], span, side="right") - 1
+    equity = np.where(slot >= 0, values[last_of_day][np.maximum(slot, 0)], np.nan)
+
+    # Days before the first snapshot are not part of the series
+    known = slot >= 0
+    span, equity = span[known], equity[known]
+    previous = np.concatenate(([equity[0]], equity[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(previous > 0, equity / previous - 1.0, 0.0)
+    return {"days": span, "pnl": equity - previous, "equity": equity, "returns": returns}
+
+
+def returns_matrix(series: Mapping[Any, Mapping[str, np.ndarray]]) -> Dict[str, Any]:
+    """
+    Stack daily series onto one calendar
+
+    Args:
+        series: key -> {"days", "returns", ...} as the builders return
+
+    Returns:
+        {"keys": list, "days": int64 epoch days,
+         "returns": float64 (len(keys) x len(days)), NaN outside each series}
+    """
+    keys = list(series)
+    non_empty = [series[key]["days"] for key in keys if len(series[key]["days"])]
+    if not non_empty:
+        return {"keys": keys, "days": np.empty(0, dtype=np.int64), "returns": np.empty((len(keys), 0))}
+
+    first = min(int(days[0]) for days in non_empty)
+    last = max(int(days[-1]) for days in non_empty)
+    matrix = np.full((len(keys), last - first + 1), np.nan)
+    for row, key in enumerate(keys):
+        days = np.asarray(series[key]["days"], dtype=np.int64)
+        if days.size:
+            matrix[row, days - first] = series[key]["returns"]
+    return {"keys": keys, "days": np.arange(first, last + 1, dtype=np.int64), "returns": matrix}
+
+
+# ----------------------------------------------------------------------
+# Point-in-time metrics (along the last axis; 1-D or 2-D input)
+# ----------------------------------------------------------------------
+
+def _as_2d(returns: Any) -> Tuple[np.ndarray, bool]:
+    returns = np.asarray(returns, dtype=np.float64)
+    return (returns[np.newaxis, :], True) if returns.ndim == 1 else (returns, False)
+
+
+def _out(values: np.ndarray, squeeze: bool):
+    return float(values[0]) if squeeze else values
+
+
+def _guarded_ratio(
+    numerator: np.ndarray,
+    denominator: np.ndarray,
+    scale: float = 1.0,
+    no_risk_cap: bool = True
+) -> np.ndarray:
+    """
+    numerator / denominator * scale, clipped to +/-RATIO_CAP
+
+    Where the denominator is 0: RATIO_CAP for a positive numerator (if
+    no_risk_cap) and 0 otherwise.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = numerator / denominator * scale
+    no_risk_value = np.where(numerator > 0, RATIO_CAP, 0.0) if no_risk_cap else 0.0
+    ratio = np.where(denominator > _NO_RISK, ratio, no_risk_value)
+    return np.clip(np.nan_to_num(ratio), -RATIO_CAP, RATIO_CAP)
+
+
+def observations(returns: Any):
+    """Number of days in each series"""
+    matrix, squeeze = _as_2d(returns)
+    counts = np.sum(np.isfinite(matrix), axis=-1)
+    return int(counts[0]) if squeeze else counts
+
+
+def _moments(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    finite = np.isfinite(matrix)
+    count = finite.sum(axis=-1)
+    values = np.where(finite, matrix, 0.0)
+    safe = np.maximum(count, 1)
+    mean = values.sum(axis=-1) / safe
+    centred = np.where(finite, matrix - mean[:, np.newaxis], 0.0)
+    std = np.sqrt((centred ** 2).sum(axis=-1) / np.maximum(count - 1, 1))
+    return count, mean, np.where(count > 1, std, 0.0)
+
+
+def volatility(returns: Any, periods_per_year: int = CALENDAR_DAYS_PER_YEAR):
+    """Annualised standard deviation of daily returns"""
+    matrix, squeeze = _as_2d(returns)
+    _, _, std = _moments(matrix)
+    return _out(std * np.sqrt(periods_per_year), squeeze)
+
+
+def sharpe_ratio(returns: Any, risk_free: float = 0.0, periods_per_year: int = CALENDAR_DAYS_PER_YEAR):
+    """Annualised Sharpe ratio; risk_free is an annual rate (fraction)"""
+    matrix, squeeze = _as_2d(returns)
+    count, mean, std = _moments(matrix)
+    excess = mean - risk_free / periods_per_year
+    sharpe = _guarded_ratio(excess, std, np.sqrt(periods_per_year), no_risk_cap=False)
+    return _out(np.where(count > 1, sharpe, 0.0), squeeze)
+
+
+def sortino_ratio(returns: Any, risk_free: float = 0.0, periods_per_year: int = CALENDAR_DAYS_PER_YEAR):
+    """Annualised Sortino ratio (downside deviation over all days, target = risk-free)"""
+    matrix, squeeze = _as_2d(returns)
+    count, mean, _ = _moments(matrix)
+    target = risk_free / periods_per_year
+    shortfall = np.where(np.isfinite(matrix), np.minimum(matrix - target, 0.0), 0.0)
+    downside = np.sqrt((shortfall ** 2).sum(axis=-1) / np.maximum(count, 1))
+    sortino = _guarded_ratio(mean - target, downside, np.sqrt(periods_per_year))
+    return _out(np.where(count > 1, sortino, 0.0), squeeze)
+
+
+def total_return(returns: Any):
+    """Compounded return over the series"""
+    matrix, squeeze = _as_2d(returns)
+    growth = np.prod(np.where(np.isfinite(matrix), 1.0 + matrix, 1.0), axis=-1)
+    return _out(growth - 1.0, squeeze)
+
+
+def annualized_return(returns: Any, periods_per_year: int = CALENDAR_DAYS_PER_YEAR):
+    """Compounded return scaled to a year"""
+    matrix, squeeze = _as_2d(returns)
+    count = np.sum(np.isfinite(matrix), axis=-1)
+    growth = 1.0 + total_return(matrix)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        annual = np.where(
+            (count > 0) & (growth > 0),
+            np.power(np.maximum(growth, 0.0), periods_per_year / np.maximum(count, 1)) - 1.0,
+            np.where(growth <= 0, -1.0, 0.0)
+        )
+    return _out(np.nan_to_num(annual, posinf=RATIO_CAP), squeeze)
+
+
+def cumulative_equity(returns: Any) -> np.ndarray:
+    """Growth of 1.0 through the series (NaN days carry the level forward)"""
+    matrix = np.asarray(returns, dtype=np.float64)
+    return np.cumprod(np.where(np.isfinite(matrix), 1.0 + matrix, 1.0), axis=-1)
+
+
+def drawdown_series(returns: Any) -> np.ndarray:
+    """Fractional drawdown from the running peak (<= 0) for every day"""
+    equity = cumulative_equity(returns)
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0), axis=-1)
+    return equity / peak - 1.0
+
+
+def max_drawdown(returns: Any):
+    """Largest peak-to-trough loss as a positive fraction"""
+    matrix, squeeze = _as_2d(returns)
+    if matrix.shape[-1] == 0:
+        return _out(np.zeros(matrix.shape[0]), squeeze)
+    return _out(-drawdown_series(matrix).min(axis=-1), squeeze)
+
+
+def calmar_ratio(returns: Any, periods_per_year: int = CALENDAR_DAYS_PER_YEAR):
+    """Annualised return / max drawdown"""
+    matrix, squeeze = _as_2d(returns)
+    return _out(_guarded_ratio(annualized_return(matrix, periods_per_year), max_drawdown(matrix)), squeeze)
+
+
+def value_at_risk(returns: Any, confidence: float = DEFAULT_CONFIDENCE):
+    """Historical one-day VaR as a positive loss fraction"""
+    matrix, squeeze = _as_2d(returns)
+    if matrix.shape[-1] == 0:
+        return _out(np.zeros(matrix.shape[0]), squeeze)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)   # all-NaN rows
+        quantile = np.nanquantile(matrix, 1.0 - confidence, axis=-1)
+    return _out(np.maximum(-np.nan_to_num(quantile), 0.0), squeeze)
+
+
+def conditional_value_at_risk(returns: Any, confidence: float = DEFAULT_CONFIDENCE):
+    """Historical expected shortfall: mean loss on days at or beyond the VaR"""
+    matrix, squeeze = _as_2d(returns)
+    var = value_at_risk(matrix, confidence)
+    tail = np.isfinite(matrix) & (matrix <= -var[:, np.newaxis])
+    count = tail.sum(axis=-1)
+    losses = np.where(tail, matrix, 0.0).sum(axis=-1) / np.maximum(count, 1)
+    return _out(np.where(count > 0, np.maximum(-losses, 0.0), var), squeeze)
+
+
+def summarize(
+    returns: Any,
+    risk_free: float = 0.0,
+    periods_per_year: int = CALENDAR_DAYS_PER_YEAR,
+    confidence: float = DEFAULT_CONFIDENCE
+) -> Dict[str, np.ndarray]:
+    """
+    Every point-in-time metric for each row of a returns matrix
+
+    Returns:
+        Dict of arrays (one value per row); fractions except the ratios
+    """
+    matrix, _ = _as_2d(returns)
+    return {
+        "days": observations(matrix),
+        "total_return": total_return(matrix),
+        "annualized_return": annualized_return(matrix, periods_per_year),
+        "volatility": volatility(matrix, periods_per_year),
+        "sharpe_ratio": sharpe_ratio(matrix, risk_free, periods_per_year),
+        "sortino_ratio": sortino_ratio(matrix, risk_free, periods_per_year),
+        "max_drawdown": max_drawdown(matrix),
+        "calmar_ratio": calmar_ratio(matrix, periods_per_year),
+        "var": value_at_risk(matrix, confidence),
+        "cvar": conditional_value_at_risk(matrix, confidence),
+    }
+
+
+def summary_row(summary: Mapping[str, np.ndarray], row: int) -> Dict[str, Any]:
+    """One row of summarize() as API values (percentages rounded to 2dp, ratios to 3dp)"""
+    return {
+        "observation_days": int(summary["days"][row]),
+        "total_return_pct": round(float(summary["total_return"][row]) * 100, 2),
+        "annualized_return_pct": round(float(summary["annualized_return"][row]) * 100, 2),
+        "volatility_pct": round(float(summary["volatility"][row]) * 100, 2),
+        "sharpe_ratio": round(float(summary["sharpe_ratio"][row]), 3),
+        "sortino_ratio": round(float(summary["sortino_ratio"][row]), 3),
+        "max_drawdown_pct": round(float(summary["max_drawdown"][row]) * 100, 2),
+        "calmar_ratio": round(float(summary["calmar_ratio"][row]), 3),
+        "var_95_pct": round(float(summary["var"][row]) * 100, 2),
+        "cvar_95_pct": round(float(summary["cvar"][row]) * 100, 2),
+    }
+
+
+# ----------------------------------------------------------------------
+# Rolling metrics (O(n) per series)
+# ----------------------------------------------------------------------
+
+def _window_sums(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing sums over `window` days via a cumulative sum"""
+    cumulative = np.cumsum(values, axis=-1)
+    shifted = np.zeros_like(cumulative)
+    shifted[..., window:] = cumulative[..., :-window]
+    return cumulative - shifted
+
+
+def rolling_max(values: Any, window: int) -> np.ndarray:
+    """
+    Trailing maximum over `window` days (van Herk/Gil-Werman)
+
+    Prefix maxima within fixed blocks of `window` plus suffix maxima of the
+    previous block give every window maximum in O(n), independent of window.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = values.shape[-1]
+    if n == 0 or window <= 1:
+        return values.copy()
+
+    pad = (-n) % window
+    lead = values.shape[:-1]
+    padded = np.concatenate([values, np.full(lead + (pad,), -np.inf)], axis=-1)
+    blocks = padded.reshape(lead + (-1, window))
+    prefix = np.maximum.accumulate(blocks, axis=-1).reshape(lead + (-1,))
+    suffix = np.flip(np.maximum.accumulate(np.flip(blocks, axis=-1), axis=-1), axis=-1).reshape(lead + (-1,))
+
+    index = np.arange(n)
+    start = index - window + 1
+    result = prefix[..., :n].copy()
+    ready = start >= 0
+    result[..., ready] = np.maximum(suffix[..., start[ready]], prefix[..., index[ready]])
+    # Partial windows at the start: the running maximum so far
+    result[..., ~ready] = np.maximum.accumulate(values[..., :min(window - 1, n)], axis=-1)
+    return result
+
+
+def rolling_metrics(
+    returns: Any,
+    window: int,
+    risk_free: float = 0.0,
+    periods_per_year: int = CALENDAR_DAYS_PER_YEAR,
+    min_periods: Optional[int] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Trailing-window return, volatility, Sharpe and drawdown for every day
+
+    Args:
+        returns: Daily returns, 1-D or (series x days); NaN days are skipped
+        window: Window length in days
+        min_periods: Observed (non-NaN) days a window needs; defaults to window
+
+    Returns:
+        Arrays shaped like returns; NaN until a window holds min_periods observed days:
+        "return" compounded window return, "volatility" annualised,
+        "sharpe" annualised, "drawdown" equity vs the window's peak (<= 0)
+    """
+    matrix = np.asarray(returns, dtype=np.float64)
+    finite = np.isfinite(matrix)
+    values = np.where(finite, matrix, 0.0)
+
+    count = _window_sums(finite.astype(np.float64), window)
+    total = _window_sums(values, window)
+    squares = _window_sums(values ** 2, window)
+    log_growth = _window_sums(np.log1p(np.maximum(values, -0.999999)), window)
+
+    safe = np.maximum(count, 1)
+    mean = total / safe
+    variance = np.maximum(squares - safe * mean ** 2, 0.0) / np.maximum(count - 1, 1)
+    std = np.sqrt(variance)
+
+    if min_periods is None:
+        min_periods = window
+    full = (count >= min_periods) & (count > 1)
+
+    window_return = np.expm1(log_growth)
+    vol = std * np.sqrt(periods_per_year)
+    sharpe = _guarded_ratio(mean - risk_free / periods_per_year, std, np.sqrt(periods_per_year), no_risk_cap=False)
+
+    # Drawdown from the highest equity level seen within the window
+    equity = cumulative_equity(matrix)
+    opening = np.concatenate([np.ones(matrix.shape[:-1] + (1,)), equity[..., :-1]], axis=-1)
+    peak = np.maximum(rolling_max(equity, window), _lagged(opening, window - 1))
+    drawdown = equity / peak - 1.0
+
+    nan = np.nan
+    return {
+        "return": np.where(full, window_return, nan),
+        "volatility": np.where(full, vol, nan),
+        "sharpe": np.where(full, sharpe, nan),
+        "drawdown": np.where(full, drawdown, nan),
+    }
+
+
+def _lagged(values: np.ndarray, lag: int) -> np.ndarray:
+    """values shifted right by lag (the first value repeats)"""
+    if lag <= 0:
+        return values
+    lagged = np.empty_like(values)
+    lagged[..., lag:] = values[..., :-lag] if values.shape[-1] > lag else values[..., :0]
+    lagged[..., :lag] = values[..., :1]
+    return lagged
+
+
+def to_list(values: np.ndarray, scale: float = 1.0, digits: int = 4) -> List[Optional[float]]:
+    """Array -> JSON list (scaled, rounded; NaN becomes None)"""
+    scaled = np.round(np.asarray(values, dtype=np.float64) * scale, digits)
+    return [float(value) if np.isfinite(value) else None for value in scaled]
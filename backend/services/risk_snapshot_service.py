@@ -0,0 +1,227 @@
+"""
+Risk Snapshot Service
+Materialized, versioned risk-engine results for the admin risk dashboard
+
+Collection: risk_snapshots
+{
+    "kind": "risk_control_score",   # see SNAPSHOT_KINDS
+    "account": 886557,              # None for portfolio-level kinds (narrative)
+    "period_days": 30,
+    "version": 12,                  # increments per (kind, account, period_days)
+    "computed_at": datetime,
+    "duration_ms": 184.2,
+    "payload": {...}                # exactly what the live computation returned
+}
+
+refresh_all() runs from the scheduler after each MT5 deals sync and stores a
+new version for every active account at the dashboard's default periods.
+The /admin/risk-engine endpoints serve the latest version via serve(); a
+missing snapshot (e.g. a non-default period) is computed live once and
+stored, and ?fresh=true always recomputes. Only the newest
+RISK_SNAPSHOT_HISTORY versions are kept per key.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# A snapshot older than this is still served, but flagged as stale
+RISK_SNAPSHOT_MAX_AGE_SECONDS = int(os.environ.get('RISK_SNAPSHOT_MAX_AGE_SECONDS', '3600'))
+RISK_SNAPSHOT_HISTORY = int(os.environ.get('RISK_SNAPSHOT_HISTORY', '5'))
+RISK_SNAPSHOT_CONCURRENCY = int(os.environ.get('RISK_SNAPSHOT_CONCURRENCY', '4'))
+
+# kind -> default period_days precomputed by refresh_all (matches endpoint defaults)
+SNAPSHOT_KINDS = {
+    'risk_control_score': 30,
+    'drawdown_analysis': 90,
+    'strategy_analysis': 30,
+    'narrative': 30,
+}
+
+ACTIVE_ACCOUNTS_QUERY = {"status": "active", "initial_allocation": {"$gt": 0}}
+
+
+def _to_bson(value: Any) -> Any:
+    """Make a computed payload storable (NumPy scalars -> Python, keys -> str)"""
+    if isinstance(value, dict):
+        return {str(k): _to_bson(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_bson(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class RiskSnapshotService:
+    """Compute, store and serve risk-engine snapshots"""
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db.risk_snapshots
+
+    # ------------------------------------------------------------------
+    # Computation
+    # ------------------------------------------------------------------
+
+    async def compute(self, kind: str, account: Optional[int], period_days: int) -> Dict[str, Any]:
+        """Run the live risk-engine computation for a snapshot kind"""
+        from services.hull_risk_engine import HullRiskEngine
+        engine = HullRiskEngine(self.db)
+
+        if kind == 'risk_control_score':
+            return await engine.calculate_risk_control_score(account, period_days)
+        if kind == 'drawdown_analysis':
+            return await engine.analyze_drawdown_triggers(account, period_days)
+        if kind == 'strategy_analysis':
+            return await engine.get_strategy_risk_analysis(account, period_days)
+        if kind == 'narrative':
+            from services.trading_analytics_service import TradingAnalyticsService
+            managers_data = await TradingAnalyticsService(self.db).get_managers_ranking(period_days)
+            return engine.generate_risk_profile_narrative(managers_data.get("managers", []), period_days)
+        raise ValueError(f"Unknown risk snapshot kind: {kind}")
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    async def get_latest(self, kind: str, account: Optional[int], period_days: int) -> Optional[Dict[str, Any]]:
+        cursor = self.collection.find(
+            {"kind": kind, "account": account, "period_days": period_days},
+            {"_id": 0}
+        ).sort("version", -1).limit(1)
+        rows = await cursor.to_list(length=1)
+        return rows[0] if rows else None
+
+    async def store(
+        self,
+        kind: str,
+        account: Optional[int],
+        period_days: int,
+        payload: Dict[str, Any],
+        duration_ms: float = 0.0
+    ) -> Dict[str, Any]:
+        """Insert the next version of a snapshot and prune old versions"""
+        key = {"kind": kind, "account": account, "period_days": period_days}
+        latest = await self.get_latest(kind, account, period_days)
+        version = (latest or {}).get("version", 0) + 1
+
+        snapshot = {
+            **key,
+            "version": version,
+            "computed_at": datetime.now(timezone.utc),
+            "duration_ms": round(duration_ms, 1),
+            "payload": _to_bson(payload),
+        }
+        await self.collection.insert_one(dict(snapshot))
+
+        if version > RISK_SNAPSHOT_HISTORY:
+            await self.collection.delete_many({**key, "version": {"$lte": version - RISK_SNAPSHOT_HISTORY}})
+        return snapshot
+
+    async def refresh(self, kind: str, account: Optional[int], period_days: int) -> Optional[Dict[str, Any]]:
+        """Compute and store one snapshot (errors are not stored)"""
+        started = time.perf_counter()
+        payload = await self.compute(kind, account, period_days)
+        duration_ms = (time.perf_counter() - started) * 1000
+        if not isinstance(payload, dict) or payload.get("error"):
+            return None
+        return await self.store(kind, account, period_days, payload, duration_ms)
+
+    async def refresh_all(self) -> Dict[str, Any]:
+        """Precompute every snapshot kind for every active account"""
+        started = time.perf_counter()
+        accounts = await self.db.mt5_accounts.find(
+            ACTIVE_ACCOUNTS_QUERY, {"_id": 0, "account": 1}
+        ).to_list(length=500)
+        account_numbers = [a["account"] for a in accounts if a.get("account") is not None]
+
+        tasks = []
+        for kind, period_days in SNAPSHOT_KINDS.items():
+            if kind == 'narrative':
+                tasks.append((kind, None, period_days))
+            else:
+                tasks.extend((kind, account, period_days) for account in account_numbers)
+
+        semaphore = asyncio.Semaphore(max(1, RISK_SNAPSHOT_CONCURRENCY))
+        failed: List[Dict[str, Any]] = []
+
+        async def run(kind: str, account: Optional[int], period_days: int) -> bool:
+            async with semaphore:
+                try:
+                    return await self.refresh(kind, account, period_days) is not None
+                except Exception as e:
+                    failed.append({"kind": kind, "account": account, "error": str(e)})
+                    logger.error(f"❌ Risk snapshot {kind} for account {account} failed: {e}")
+                    return False
+
+        results = await asyncio.gather(*(run(*task) for task in tasks))
+        stored = sum(1 for ok in results if ok)
+        duration = time.perf_counter() - started
+        logger.info(
+            f"📸 Risk snapshots refreshed: {stored}/{len(tasks)} stored for "
+            f"{len(account_numbers)} accounts in {duration:.1f}s"
+        )
+        return {
+            "success": True,
+            "accounts": len(account_numbers),
+            "snapshots_stored": stored,
+            "snapshots_skipped": len(tasks) - stored,
+            "failed": failed,
+            "duration_seconds": round(duration, 2),
+        }
+
+    # ------------------------------------------------------------------
+    # Serving
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _meta(snapshot: Dict[str, Any], source: str) -> Dict[str, Any]:
+        computed_at = snapshot["computed_at"]
+        if computed_at.tzinfo is None:
+            computed_at = computed_at.replace(tzinfo=timezone.utc)
+        age = (datetime.now(timezone.utc) - computed_at).total_seconds()
+        return {
+            "source": source,
+            "version": snapshot["version"],
+            "computed_at": computed_at.isoformat(),
+            "age_seconds": round(max(age, 0.0), 1),
+            "stale": age > RISK_SNAPSHOT_MAX_AGE_SECONDS,
+            "compute_ms": snapshot.get("duration_ms"),
+        }
+
+    async def serve(
+        self,
+        kind: str,
+        account: Optional[int],
+        period_days: int,
+        fresh: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Latest snapshot payload plus a 'snapshot' metadata block
+
+        Falls back to a live computation (which is then stored) when fresh
+        is requested or no snapshot exists yet. Live errors are returned
+        as computed, without snapshot metadata.
+        """
+        if not fresh:
+            snapshot = await self.get_latest(kind, account, period_days)
+            if snapshot:
+                return {**snapshot["payload"], "snapshot": self._meta(snapshot, "snapshot")}
+
+        started = time.perf_counter()
+        payload = await self.compute(kind, account, period_days)
+        duration_ms = (time.perf_counter() - started) * 1000
+        if not isinstance(payload, dict) or payload.get("error"):
+            return payload
+
+        snapshot = await self.store(kind, account, period_days, payload, duration_ms)
+        return {**payload, "snapshot": self._meta(snapshot, "live")}
@@ -0,0 +1,242 @@
+"""
+Rolling Performance Service
+Rolling 7/30/90-day return, volatility, Sharpe and drawdown series for
+managers, funds and VIKING strategies
+
+Daily trading P&L (buy/sell deals incl. commission and swap) is read from
+deal_rollups_daily with one query for every account of a request; VIKING
+strategies supply their own daily P&L from viking_deals_history. Returns are
+daily P&L over start-of-day equity (capital + P&L since the series start),
+and every window of every entity is computed in one O(n) pass over the
+(entities x days) matrix (services.return_metrics.rolling_metrics).
+
+Series end at the last completed UTC day, so the endpoints cache them per
+day (response_cache.cached(..., daily=True)).
+
+Series shape (values are null until a window has enough history):
+{
+    "capital": 100000.0,
+    "daily_pnl": [...], "daily_return_pct": [...], "equity": [...],
+    "windows": {
+        "7d":  {"return_pct": [...], "volatility_pct": [...], "sharpe": [...], "drawdown_pct": [...]},
+        "30d": {...},
+        "90d": {...}
+    }
+}
+"""
+
+import logging
+import os
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.deal_rollup_service import DealRollupService
+from services.return_metrics import rolling_metrics, to_list
+
+logger = logging.getLogger(__name__)
+
+ROLLING_WINDOWS = (7, 30, 90)
+DEFAULT_HISTORY_DAYS = int(os.environ.get('ROLLING_PERFORMANCE_DAYS', '365'))
+MAX_HISTORY_DAYS = 1095
+
+
+def last_complete_day(now: Optional[datetime] = None) -> date:
+    """Yesterday (UTC): the last day whose deals are final"""
+    return (now or datetime.now(timezone.utc)).date() - timedelta(days=1)
+
+
+def series_range(history_days: int, end_day: Optional[date] = None) -> Tuple[date, date, int]:
+    """
+    (first_day, end_day, history_days) of a request
+
+    first_day includes a warm-up of the longest window so the first
+    returned day already has every window filled.
+    """
+    history_days = max(1, min(int(history_days), MAX_HISTORY_DAYS))
+    end_day = end_day or last_complete_day()
+    first_day = end_day - timedelta(days=history_days + max(ROLLING_WINDOWS) - 2)
+    return first_day, end_day, history_days
+
+
+def build_series(
+    pnl: np.ndarray,
+    capital: Sequence[float],
+    first_day: date,
+    history_days: int,
+    windows: Sequence[int] = ROLLING_WINDOWS
+) -> Dict[str, Any]:
+    """
+    Rolling series for every row of a daily P&L matrix
+
+    Args:
+        pnl: (entities x days) daily P&L starting at first_day
+        capital: Starting equity per entity
+        first_day: Day of column 0
+        history_days: Number of trailing days to return
+
+    Returns:
+        {"dates": [...], "series": [one series dict per row]}
+    """
+    pnl = np.atleast_2d(np.asarray(pnl, dtype=np.float64))
+    capital = np.asarray(capital, dtype=np.float64)
+    equity = capital[:, np.newaxis] + np.cumsum(pnl, axis=-1)
+    opening = np.concatenate([capital[:, np.newaxis], equity[:, :-1]], axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(opening > 0, pnl / opening, 0.0)
+
+    rolling = {window: rolling_metrics(returns, window) for window in windows}
+    keep = slice(max(pnl.shape[-1] - history_days, 0), None)
+    dates = [(first_day + timedelta(days=offset)).isoformat() for offset in range(pnl.shape[-1])][keep]
+
+    series = []
+    for row in range(pnl.shape[0]):
+        series.append({
+            "capital": round(float(capital[row]), 2),
+            "daily_pnl": to_list(pnl[row, keep], digits=2),
+            "daily_return_pct": to_list(returns[row, keep], scale=100),
+            "equity": to_list(equity[row, keep], digits=2),
+            "windows": {
+                f"{window}d": {
+                    "return_pct": to_list(metrics["return"][row, keep], scale=100),
+                    "volatility_pct": to_list(metrics["volatility"][row, keep], scale=100),
+                    "sharpe": to_list(metrics["sharpe"][row, keep], digits=3),
+                    "drawdown_pct": to_list(metrics["drawdown"][row, keep], scale=100),
+                }
+                for window, metrics in rolling.items()
+            }
+        })
+    return {"dates": dates, "series": series}
+
+
+def _amount(value: Any) -> float:
+    if hasattr(value, 'to_decimal'):
+        return float(value.to_decimal())
+    return float(value or 0)
+
+
+class RollingPerformanceService:
+    """Rolling performance series from the daily deal rollups"""
+
+    def __init__(self, db):
+        self.db = db
+        self.rollups = DealRollupService(db)
+
+    async def _daily_pnl(self, groups: List[List[int]], first_day: date, end_day: date) -> np.ndarray:
+        """(groups x days) trading P&L; one rollup query for all accounts"""
+        matrix = np.zeros((len(groups), (end_day - first_day).days + 1))
+        members: Dict[int, List[int]] = {}
+        for index, accounts in enumerate(groups):
+            for account in accounts:
+                members.setdefault(account, []).append(index)
+        if not members:
+            return matrix
+
+        # Whole days only: the open-ended window is served from the rollups alone
+        rows = await self.rollups.rows(
+            start=datetime.combine(first_day, time.min, tzinfo=timezone.utc),
+            accounts=list(members)
+        )
+        for row in rows:
+            try:
+                offset = (date.fromisoformat(row.get("day") or "") - first_day).days
+            except ValueError:
+                continue
+            if not 0 <= offset < matrix.shape[-1]:
+                continue
+            pnl = (row.get("trade_profit") or 0) + (row.get("trade_commission") or 0) + (row.get("trade_swap") or 0)
+            for index in members.get(row.get("account"), ()):
+                matrix[index, offset] += pnl
+        return matrix
+
+    async def _allocations(self, accounts: List[int]) -> Dict[int, float]:
+        """initial_allocation per account (one $in query)"""
+        if not accounts:
+            return {}
+        docs = await self.db.mt5_accounts.find(
+            {"account": {"$in": accounts}}, {"_id": 0, "account": 1, "initial_allocation": 1}
+        ).to_list(length=None)
+        return {doc.get("account"): _amount(doc.get("initial_allocation")) for doc in docs}
+
+    async def _build(
+        self,
+        entities: List[Dict[str, Any]],
+        history_days: int,
+        end_day: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        Series for entities [{"accounts": [...], "capital": optional, ...}]
+
+        Capital defaults to the summed initial_allocation of the accounts.
+        """
+        first_day, end_day, history_days = series_range(history_days, end_day)
+        groups = [list(entity["accounts"]) for entity in entities]
+        all_accounts = sorted({account for accounts in groups for account in accounts})
+
+        pnl = await self._daily_pnl(groups, first_day, end_day)
+        allocations = await self._allocations(all_accounts)
+        capital = [
+            entity["capital"] if entity.get("capital") else sum(allocations.get(a, 0.0) for a in entity["accounts"])
+            for entity in entities
+        ]
+
+        built = build_series(pnl, capital, first_day, history_days)
+        items = [{**entity, **series} for entity, series in zip(entities, built["series"])]
+        logger.info(f"📈 Rolling series for {len(items)} entities over {history_days} days ({len(all_accounts)} accounts)")
+        return {
+            "windows": [f"{window}d" for window in ROLLING_WINDOWS],
+            "as_of": end_day.isoformat(),
+            "dates": built["dates"],
+            "items": items
+        }
+
+    # ------------------------------------------------------------------
+    # Entities
+    # ------------------------------------------------------------------
+
+    async def managers(self, history_days: int = DEFAULT_HISTORY_DAYS) -> Dict[str, Any]:
+        """Every active money manager in one batch"""
+        managers = await self.db.money_managers.find(
+            {"status": "active"}, {"_id": 0, "manager_id": 1, "name": 1, "assigned_accounts": 1}
+        ).to_list(length=None)
+        entities = [
+            {
+                "manager_id": manager.get("manager_id"),
+                "name": manager.get("name"),
+                "accounts": list(manager.get("assigned_accounts") or [])
+            }
+            for manager in managers
+        ]
+        return await self._build(entities, history_days)
+
+    async def manager(self, manager_id: str, history_days: int = DEFAULT_HISTORY_DAYS) -> Optional[Dict[str, Any]]:
+        """
+        One money manager; a numeric id that is not a manager_id is treated
+        as an account number (e.g. LIVE DEMO candidates)
+        """
+        manager = await self.db.money_managers.find_one(
+            {"manager_id": manager_id}, {"_id": 0, "manager_id": 1, "name": 1, "assigned_accounts": 1}
+        )
+        if manager:
+            entity = {
+                "manager_id": manager.get("manager_id"),
+                "name": manager.get("name"),
+                "accounts": list(manager.get("assigned_accounts") or [])
+            }
+        elif manager_id.isdigit():
+            entity = {"manager_id": manager_id, "name": None, "accounts": [int(manager_id)]}
+        else:
+            return None
+        return await self._build([entity], history_days)
+
+    async def fund(self, fund_name: str, history_days: int = DEFAULT_HISTORY_DAYS) -> Optional[Dict[str, Any]]:
+        """A fund from TradingAnalyticsService.FUND_STRUCTURE"""
+        from services.trading_analytics_service import TradingAnalyticsService
+
+        fund_config = TradingAnalyticsService(self.db).FUND_STRUCTURE.get(fund_name)
+        if fund_config is None:
+            return None
+        # Fund returns are measured on its AUM, as in get_fund_analytics
+        entity = {"fund_name": fund_name, "accounts": list(fund_config["accounts"]), "capital": fund_config.get("aum")}
+        return await self._build([entity], history_days)
@@ -0,0 +1,239 @@
+"""
+Shared State Store
+Mongo-backed replacement for server.py's module-level state dicts
+
+With several Uvicorn workers a module-level dict only exists in the worker
+that wrote it: an OAuth callback, a password reset or a redemption approval
+landing on another worker would not find its state. SharedStateStore keeps
+each entry as one document and adds a short per-process read cache:
+
+    oauth_states = SharedStateStore(db, 'state_oauth', ttl_seconds=600, cache_seconds=0)
+    await oauth_states.set(state, {'created_at': ...})
+    if await oauth_states.pop(state) is None: ...      # atomic one-shot consume
+
+Collection layout (one collection per store):
+{
+    "_id": "<key>",
+    "value": {...},                 # plain dicts/lists (pydantic models via .dict())
+    "updated_at": datetime,
+    "expires_at": datetime          # only for stores with ttl_seconds (TTL index)
+}
+
+Reads served from the local cache may be up to cache_seconds old; writes
+from this worker update it immediately. Security-sensitive stores (tokens,
+OAuth state) use cache_seconds=0 so every read goes to Mongo.
+
+SharedVersions builds on it to invalidate per-process caches (response
+cache tags, memoized deals, instrument specs) in every worker:
+
+    deal_versions = SharedVersions(db, 'state_deal_store_versions')
+    deal_versions.bump('886557')             # sync; written to Mongo in the background
+    await deal_versions.get('886557')        # token to compare cached entries against
+"""
+
+import asyncio
+import copy
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+SHARED_STATE_CACHE_SECONDS = float(os.environ.get('SHARED_STATE_CACHE_SECONDS', '2'))
+# How long another worker's bump may go unnoticed by a per-process cache
+SHARED_VERSION_CACHE_SECONDS = float(os.environ.get('SHARED_VERSION_CACHE_SECONDS', '1'))
+
+_MISSING = object()
+
+
+def _restore(value: Any) -> Any:
+    """Mongo returns naive UTC datetimes; make them aware like the values that were stored"""
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, dict):
+        return {k: _restore(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_restore(v) for v in value]
+    return value
+
+
+class SharedStateStore:
+    """Key/value store shared by every worker, with a short local read cache"""
+
+    def __init__(
+        self,
+        db,
+        name: str,
+        ttl_seconds: Optional[float] = None,
+        cache_seconds: float = SHARED_STATE_CACHE_SECONDS
+    ):
+        self.name = name
+        self.collection = db[name]
+        self.ttl_seconds = ttl_seconds
+        self.cache_seconds = cache_seconds
+        self._cache: Dict[str, Tuple[float, Any]] = {}
+        self._all: Optional[Tuple[float, List[Tuple[str, Any]]]] = None
+        self._indexes_ready = False
+
+    async def _ensure_indexes(self):
+        if self._indexes_ready or self.ttl_seconds is None:
+            return
+        await self.collection.create_index('expires_at', expireAfterSeconds=0)
+        self._indexes_ready = True
+
+    def _live_query(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        # The TTL monitor only runs once a minute; never serve an expired entry
+        if self.ttl_seconds is not None:
+            query['$or'] = [{'expires_at': {'$gt': datetime.now(timezone.utc)}}, {'expires_at': None}]
+        return query
+
+    def _remember(self, key: str, value: Any):
+        self._all = None
+        if self.cache_seconds > 0:
+            self._cache[key] = (time.monotonic(), copy.deepcopy(value))
+
+    def _forget(self, key: str):
+        self._all = None
+        self._cache.pop(key, None)
+
+    # ------------------------------------------------------------------
+    # Single entries
+    # ------------------------------------------------------------------
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        cached = self._cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            stored_at, value = cached
+            if time.monotonic() - stored_at < self.cache_seconds:
+                return copy.deepcopy(value)
+            self._cache.pop(key, None)
+
+        doc = await self.collection.find_one(self._live_query({'_id': key}), {'value': 1})
+        if doc is None:
+            return default
+        value = _restore(doc.get('value'))
+        self._remember(key, value)
+        return value
+
+    async def contains(self, key: str) -> bool:
+        return await self.get(key, _MISSING) is not _MISSING
+
+    async def set(self, key: str, value: Any):
+        await self._ensure_indexes()
+        now = datetime.now(timezone.utc)
+        fields = {'value': value, 'updated_at': now}
+        if self.ttl_seconds is not None:
+            fields['expires_at'] = now + timedelta(seconds=self.ttl_seconds)
+        await self.collection.update_one({'_id': key}, {'$set': fields}, upsert=True)
+        self._remember(key, value)
+
+    async def update(self, key: str, fields: Dict[str, Any], expected: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Set fields inside an existing dict value
+
+        expected: field values the stored entry must still have (e.g.
+        {'status': 'pending'}), so two workers cannot both apply a transition.
+        Returns False if the key is missing or no longer matches.
+        """
+        updates = {f'value.{field}': value for field, value in fields.items()}
+        updates['updated_at'] = datetime.now(timezone.utc)
+        query = {'_id': key}
+        for field, value in (expected or {}).items():
+            query[f'value.{field}'] = value
+        doc = await self.collection.find_one_and_update(
+            self._live_query(query),
+            {'$set': updates},
+            return_document=ReturnDocument.AFTER
+        )
+        if doc is None:
+            self._forget(key)
+            return False
+        self._remember(key, _restore(doc.get('value')))
+        return True
+
+    async def pop(self, key: str, default: Any = None) -> Any:
+        """Remove and return an entry; only one worker can consume it"""
+        doc = await self.collection.find_one_and_delete(self._live_query({'_id': key}))
+        self._forget(key)
+        return default if doc is None else _restore(doc.get('value'))
+
+    async def delete(self, key: str) -> bool:
+        result = await self.collection.delete_one({'_id': key})
+        self._forget(key)
+        return result.deleted_count > 0
+
+    # ------------------------------------------------------------------
+    # Whole store
+    # ------------------------------------------------------------------
+
+    async def items(self) -> List[Tuple[str, Any]]:
+        if self._all is not None and time.monotonic() - self._all[0] < self.cache_seconds:
+            return copy.deepcopy(self._all[1])
+
+        docs = await self.collection.find(self._live_query({}), {'value': 1}).to_list(length=None)
+        entries = [(doc['_id'], _restore(doc.get('value'))) for doc in docs]
+        if self.cache_seconds > 0:
+            self._all = (time.monotonic(), copy.deepcopy(entries))
+        return entries
+
+    async def keys(self) -> List[str]:
+        return [key for key, _ in await self.items()]
+
+    async def values(self) -> List[Any]:
+        return [value for _, value in await self.items()]
+
+
+class SharedVersions:
+    """
+    Version tokens shared by every worker, for invalidating per-process caches
+
+    bump() is synchronous so existing invalidation call sites keep working:
+    the new token is visible in this worker at once and written to Mongo in
+    the background. Other workers see it once their cached read (at most
+    cache_seconds old) expires.
+    """
+
+    def __init__(self, db, name: str, cache_seconds: float = SHARED_VERSION_CACHE_SECONDS):
+        self.store = SharedStateStore(db, name, cache_seconds=cache_seconds)
+        self._pending: Dict[str, str] = {}
+        self._tasks: set = set()
+
+    def bump(self, key: str) -> str:
+        token = uuid.uuid4().hex
+        self._pending[key] = token
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.warning(f"⚠️  {self.store.name}: '{key}' bumped outside the event loop, other workers rely on their TTL")
+            return token
+        task = loop.create_task(self._publish(key, token))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return token
+
+    async def _publish(self, key: str, token: str):
+        try:
+            await self.store.set(key, token)
+        except Exception as e:
+            # Stays pending: this worker keeps seeing the bump, others fall back to their TTL
+            logger.error(f"❌ {self.store.name}: failed to publish '{key}': {e}")
+            return
+        if self._pending.get(key) == token:
+            self._pending.pop(key, None)
+
+    async def get(self, key: str) -> Optional[str]:
+        """Current token for key (None until it is first bumped)"""
+        pending = self._pending.get(key)
+        if pending is not None:
+            return pending
+        return await self.store.get(key)
+
+    async def flush(self):
+        """Wait for bumps still being written (shutdown, tests)"""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
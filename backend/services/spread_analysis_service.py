@@ -10,11 +10,14 @@ from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional
 import logging
 
+from services.deal_rollup_service import DealRollupService, merge_rows
+
 logger = logging.getLogger(__name__)
 
 class SpreadAnalysisService:
     def __init__(self, db):
         self.db = db
+        self.rollups = DealRollupService(db)
     
     async def get_spread_statistics(
         self,
@@ -43,55 +46,29 @@ class SpreadAnalysisService:
             }
         """
         try:
-            # Build query (only trading deals with spread data)
-            query = {
-                "type": {"$in": [0, 1]},  # Buy/Sell only
-                "spread": {"$exists": True, "$ne": None, "$gt": 0}
-            }
-            
-            if symbol:
-                query["symbol"] = symbol
-            
-            if start_date:
-                query.setdefault("time", {})["$gte"] = start_date
-            
-            if end_date:
-                query.setdefault("time", {})["$lte"] = end_date
-            
-            # Aggregation by symbol
-            pipeline = [
-                {"$match": query},
-                {
-                    "$group": {
-                        "_id": "$symbol",
-                        "avg_spread": {"$avg": "$spread"},
-                        "min_spread": {"$min": "$spread"},
-                        "max_spread": {"$max": "$spread"},
-                        "total_deals": {"$sum": 1},
-                        "total_volume": {"$sum": "$volume"}
-                    }
-                },
-                {"$sort": {"total_deals": -1}}
-            ]
-            
-            results = await self.db.mt5_deals.aggregate(pipeline).to_list(length=None)
+            # Daily rollups keep spread sum/count/min/max for buy/sell deals with spread data
+            rows = await self.rollups.rows(start=start_date, end=end_date, symbol=symbol or None)
             
             # Format results
             by_symbol = []
             total_deals = 0
             total_spread = 0
             
-            for item in results:
+            for (sym,), item in merge_rows(rows, ("symbol",)).items():
+                if not item["spread_count"]:
+                    continue
                 by_symbol.append({
-                    "symbol": item["_id"],
-                    "avg_spread": round(item["avg_spread"], 2),
-                    "min_spread": round(item["min_spread"], 2),
-                    "max_spread": round(item["max_spread"], 2),
-                    "total_deals": item["total_deals"],
-                    "total_volume": round(item["total_volume"], 2)
+                    "symbol": sym,
+                    "avg_spread": round(item["spread_sum"] / item["spread_count"], 2),
+                    "min_spread": round(item["spread_min"], 2),
+                    "max_spread": round(item["spread_max"], 2),
+                    "total_deals": item["spread_count"],
+                    "total_volume": round(item["spread_volume"], 2)
                 })
-                total_deals += item["total_deals"]
-                total_spread += item["avg_spread"] * item["total_deals"]
+                total_deals += item["spread_count"]
+                total_spread += item["spread_sum"]
+            
+            by_symbol.sort(key=lambda entry: entry["total_deals"], reverse=True)
             
             avg_spread_all = round(total_spread / total_deals, 2) if total_deals > 0 else 0
             
@@ -0,0 +1,230 @@
+"""
+Startup Profiling and Readiness
+Import-time budget, lazy heavy dependencies and a readiness gate for server.py
+
+Cold starts on Render were dominated by importing every client library
+(Google APIs, PDF/signing, PIL) and by running all initializers before the
+first request was served. This module keeps both visible and out of the way:
+
+    startup_profiler.checkpoint('google_workspace')   # time since last checkpoint
+
+    build = lazy_import('googleapiclient.discovery', 'build')   # imported on first call
+    drive_service = lazy_object('drive_service', lambda: DriveService(...))
+
+    readiness.start('mt5_service', mt5_service.initialize())    # background
+    readiness.start('default_users', ensure_default_users(), critical=True)
+    await readiness.wait(STARTUP_BUDGET_SECONDS)               # bounded wait
+
+/api/health answers as soon as Uvicorn serves; /api/health/ready returns 503
+until every critical initializer has finished.
+"""
+
+import asyncio
+import importlib
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds startup may wait for critical initializers before serving anyway
+STARTUP_BUDGET_SECONDS = float(os.environ.get('STARTUP_BUDGET_SECONDS', '8'))
+# Import sections slower than this are logged as warnings
+SLOW_IMPORT_MS = float(os.environ.get('STARTUP_SLOW_IMPORT_MS', '500'))
+
+
+class StartupProfiler:
+    """Wall-clock breakdown of module import sections and lazy imports"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.sections: Dict[str, float] = {}
+        self.lazy_imports: Dict[str, float] = {}
+        self.import_finished_ms: Optional[float] = None
+
+    def checkpoint(self, section: str) -> float:
+        """Attribute the time since the previous checkpoint to `section`"""
+        now = time.perf_counter()
+        elapsed_ms = (now - self._last) * 1000
+        self.sections[section] = self.sections.get(section, 0.0) + elapsed_ms
+        self._last = now
+        return elapsed_ms
+
+    def record_lazy(self, name: str, elapsed_ms: float):
+        self.lazy_imports[name] = elapsed_ms
+
+    def finish_imports(self):
+        """Mark the end of server.py import (all routes registered)"""
+        self.checkpoint('router_includes')
+        self.import_finished_ms = (time.perf_counter() - self.started) * 1000
+
+    def report(self, top: int = 10):
+        """Log the slowest import sections"""
+        total = self.import_finished_ms or (time.perf_counter() - self.started) * 1000
+        logger.info(f"⏱️ server.py import took {total:.0f}ms")
+        for section, elapsed_ms in sorted(self.sections.items(), key=lambda item: -item[1])[:top]:
+            share = elapsed_ms / total * 100 if total else 0
+            line = f"   {section:<28} {elapsed_ms:8.0f}ms ({share:4.1f}%)"
+            if elapsed_ms >= SLOW_IMPORT_MS:
+                logger.warning(f"{line} ⚠️ slow")
+            else:
+                logger.info(line)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'import_ms': round(self.import_finished_ms, 1) if self.import_finished_ms else None,
+            'sections_ms': {
+                name: round(ms, 1)
+                for name, ms in sorted(self.sections.items(), key=lambda item: -item[1])
+            },
+            'lazy_imports_ms': {name: round(ms, 1) for name, ms in self.lazy_imports.items()},
+        }
+
+
+startup_profiler = StartupProfiler()
+
+
+class LazyObject:
+    """
+    Stand-in for a module, class, function or service instance that is only
+    built on first use. Attribute access, assignment and calls are forwarded
+    to the real object; the build time is reported to startup_profiler.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        object.__setattr__(self, '_lazy_name', name)
+        object.__setattr__(self, '_lazy_factory', factory)
+        object.__setattr__(self, '_lazy_target', None)
+        object.__setattr__(self, '_lazy_lock', threading.Lock())
+
+    def _resolve(self):
+        target = object.__getattribute__(self, '_lazy_target')
+        if target is not None:
+            return target
+        with object.__getattribute__(self, '_lazy_lock'):
+            target = object.__getattribute__(self, '_lazy_target')
+            if target is None:
+                name = object.__getattribute__(self, '_lazy_name')
+                started = time.perf_counter()
+                target = object.__getattribute__(self, '_lazy_factory')()
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                startup_profiler.record_lazy(name, elapsed_ms)
+                logger.info(f"📦 Loaded {name} on first use ({elapsed_ms:.0f}ms)")
+                object.__setattr__(self, '_lazy_target', target)
+        return target
+
+    @property
+    def is_loaded(self) -> bool:
+        return object.__getattribute__(self, '_lazy_target') is not None
+
+    def __getattr__(self, item):
+        return getattr(self._resolve(), item)
+
+    def __setattr__(self, item, value):
+        setattr(self._resolve(), item, value)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        state = 'loaded' if self.is_loaded else 'not loaded'
+        return f"<LazyObject {object.__getattribute__(self, '_lazy_name')} ({state})>"
+
+
+def lazy_import(module: str, attr: Optional[str] = None) -> LazyObject:
+    """Lazy `import module` / `from module import attr`"""
+    name = f"{module}.{attr}" if attr else module
+
+    def load():
+        loaded = importlib.import_module(module)
+        return getattr(loaded, attr) if attr else loaded
+
+    return LazyObject(name, load)
+
+
+def lazy_object(name: str, factory: Callable[[], Any]) -> LazyObject:
+    """Lazy service instance; `factory` imports and constructs it"""
+    return LazyObject(name, factory)
+
+
+class ReadinessGate:
+    """Tracks startup initializers running in the background"""
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._critical: List[str] = []
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self.started_at = datetime.now(timezone.utc)
+        self.ready_at: Optional[datetime] = None
+
+    def start(self, name: str, initializer: Awaitable, critical: bool = False) -> asyncio.Task:
+        """Run `initializer` in the background; critical ones gate readiness"""
+        if critical:
+            self._critical.append(name)
+        self._results[name] = {'status': 'running', 'critical': critical}
+        task = asyncio.create_task(self._run(name, initializer))
+        self._tasks[name] = task
+        return task
+
+    async def _run(self, name: str, initializer: Awaitable):
+        started = time.perf_counter()
+        try:
+            await initializer
+            self._results[name].update(status='completed')
+        except asyncio.CancelledError:
+            self._results[name].update(status='cancelled')
+            raise
+        except Exception as e:
+            logger.error(f"❌ Startup initializer {name} failed: {e}")
+            self._results[name].update(status='failed', error=str(e))
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._results[name]['duration_ms'] = round(elapsed_ms, 1)
+            if self.ready_at is None and self.is_ready:
+                self.ready_at = datetime.now(timezone.utc)
+                logger.info(f"✅ Critical startup initializers finished ({self._since_start():.1f}s)")
+
+    def _since_start(self) -> float:
+        return (datetime.now(timezone.utc) - self.started_at).total_seconds()
+
+    @property
+    def is_ready(self) -> bool:
+        """All critical initializers have finished (failures are reported, not retried)"""
+        return all(self._results[name]['status'] != 'running' for name in self._critical)
+
+    async def wait(self, timeout: float = STARTUP_BUDGET_SECONDS) -> bool:
+        """Wait up to `timeout` seconds for the critical initializers"""
+        pending = [self._tasks[name] for name in self._critical if not self._tasks[name].done()]
+        if pending:
+            await asyncio.wait(pending, timeout=timeout)
+        if not self.is_ready:
+            still_running = [name for name in self._critical if self._results[name]['status'] == 'running']
+            logger.warning(
+                f"⚠️ Startup budget of {timeout:.0f}s exceeded - serving while {', '.join(still_running)} finish"
+            )
+        return self.is_ready
+
+    async def cancel(self):
+        """Cancel initializers still running (shutdown)"""
+        pending = [task for task in self._tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def get_status(self) -> Dict[str, Any]:
+        failed = [name for name, result in self._results.items() if result['status'] == 'failed']
+        return {
+            'ready': self.is_ready,
+            'degraded': bool(failed),
+            'started_at': self.started_at.isoformat(),
+            'ready_at': self.ready_at.isoformat() if self.ready_at else None,
+            'initializers': {name: dict(result) for name, result in self._results.items()},
+        }
+
+
+readiness = ReadinessGate()
@@ -0,0 +1,97 @@
+"""
+Deal Sync Watermarks
+Per-account cursor for incremental MT5 deal syncing
+
+Collection: mt5_sync_watermarks
+{
+    "account": 886557,
+    "last_deal_time": datetime,           # newest deal time ingested
+    "last_ticket": 123456789,             # highest deal ticket ingested
+    "last_sync_run": datetime,            # last sync attempt (any mode)
+    "last_sync_mode": "incremental",      # "incremental" or "full"
+    "last_full_reconciliation": datetime  # last full-history pass
+}
+
+The watermark only ever moves forward ($max), so an out-of-order or partial
+page can never rewind it. A periodic full reconciliation pass re-pulls the
+whole history to pick up broker-side corrections to older deals.
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# How often a full-history reconciliation pass runs per account
+FULL_RECONCILIATION_HOURS = int(os.environ.get('MT5_DEALS_FULL_RECONCILIATION_HOURS', '24'))
+
+
+class SyncWatermarkStore:
+    """Read/advance per-account deal sync watermarks"""
+
+    def __init__(self, db, collection: str = 'mt5_sync_watermarks'):
+        self.collection = db[collection]
+        self.full_reconciliation_interval = timedelta(hours=FULL_RECONCILIATION_HOURS)
+
+    async def get(self, account: int) -> Optional[Dict[str, Any]]:
+        """Get the watermark for an account (None if never synced)"""
+        return await self.collection.find_one({'account': account}, {'_id': 0})
+
+    def needs_full_reconciliation(self, watermark: Optional[Dict[str, Any]], now: Optional[datetime] = None) -> bool:
+        """True when there is no usable cursor or the last full pass is too old"""
+        if not watermark or watermark.get('last_ticket') is None:
+            return True
+
+        last_full = watermark.get('last_full_reconciliation')
+        if last_full is None:
+            return True
+        if last_full.tzinfo is None:
+            last_full = last_full.replace(tzinfo=timezone.utc)
+
+        now = now or datetime.now(timezone.utc)
+        return now - last_full >= self.full_reconciliation_interval
+
+    async def advance(
+        self,
+        account: int,
+        deal_docs: List[Dict[str, Any]],
+        full: bool,
+        run_time: Optional[datetime] = None,
+        deal_count: Optional[int] = None
+    ) -> None:
+        """
+        Move the watermark past the given deals and record the sync run
+
+        Args:
+            account: MT5 account number
+            deal_docs: Normalized deal documents that may move the watermark
+                (deals without a broker time must be left out by the caller)
+            full: Whether this run was a full reconciliation pass
+            run_time: Time of the sync run
+            deal_count: Deals fetched in this run (defaults to len(deal_docs))
+        """
+        run_time = run_time or datetime.now(timezone.utc)
+
+        update: Dict[str, Any] = {
+            '$set': {
+                'last_sync_run': run_time,
+                'last_sync_mode': 'full' if full else 'incremental',
+                'last_sync_deal_count': len(deal_docs) if deal_count is None else deal_count
+            }
+        }
+        if full:
+            update['$set']['last_full_reconciliation'] = run_time
+
+        tickets = [d['ticket'] for d in deal_docs if isinstance(d.get('ticket'), int)]
+        times = [d['time'] for d in deal_docs if isinstance(d.get('time'), datetime)]
+        max_fields = {}
+        if tickets:
+            max_fields['last_ticket'] = max(tickets)
+        if times:
+            max_fields['last_deal_time'] = max(times)
+        if max_fields:
+            update['$max'] = max_fields
+
+        await self.collection.update_one({'account': account}, update, upsert=True)
@@ -9,7 +9,8 @@ This service provides comprehensive trading analytics across 3 levels:
 
 Key Features:
 - Manager performance ranking
-- Risk-adjusted returns (Sharpe, Sortino, Calmar ratios)
+- Risk-adjusted returns (Sharpe, Sortino, Calmar ratios, volatility, VaR/CVaR)
+  from daily return series, batched across managers (services/return_metrics.py)
 - Fund-level aggregation
 - Portfolio-wide analytics
 """
@@ -18,7 +19,10 @@ import logging
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional, Any
 from motor.motor_asyncio import AsyncIOMotorDatabase
-import math
+
+from services import return_metrics
+from services.equity_curve import deals_to_columns, equity_curve
+from services.return_metrics import daily_returns_from_deals, returns_matrix, summarize, summary_row
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -185,12 +189,11 @@ class TradingAnalyticsService:
             total_pnl = 0
             total_equity = 0
             
+            analytics = await self._analyze_managers(fund_config["managers"], period_days)
             for manager_config in fund_config["managers"]:
-                manager_perf = await self.get_manager_analytics(
-                    manager_config["id"],
-                    manager_config["account"],
-                    period_days
-                )
+                manager_perf = analytics[(manager_config["id"], manager_config["account"])]
+                if isinstance(manager_perf, Exception):
+                    raise manager_perf
                 managers_performance.append(manager_perf)
                 total_pnl += manager_perf["total_pnl"]
                 total_equity += manager_perf["current_equity"]
@@ -232,6 +235,227 @@ class TradingAnalyticsService:
             logger.error(f"❌ Failed to calculate fund analytics for {fund_name}: {str(e)}")
             raise
     
+    def _find_manager_config(self, manager_id: str, account_num: int) -> Optional[Dict[str, Any]]:
+        """Manager entry in FUND_STRUCTURE for (manager_id, account)"""
+        for fund_data in self.FUND_STRUCTURE.values():
+            for mgr in fund_data.get("managers", []):
+                if mgr["id"] == manager_id and mgr["account"] == account_num:
+                    return mgr
+        return None
+    
+    def _analysis_window(self, account_data: Dict[str, Any], period_days: int):
+        """(allocation_start_date, days_since_allocation, start_date, end_date) for an account"""
+        end_date = datetime.now(timezone.utc)
+        allocation_start_date = account_data.get("allocation_start_date")
+        if allocation_start_date:
+            # Ensure the datetime is timezone-aware
+            if allocation_start_date.tzinfo is None:
+                allocation_start_date = allocation_start_date.replace(tzinfo=timezone.utc)
+            # Use allocation start date for accurate P&L calculation
+            return allocation_start_date, (end_date - allocation_start_date).days, allocation_start_date, end_date
+        return None, period_days, end_date - timedelta(days=period_days), end_date
+    
+    async def _load_trades(self, windows: Dict[int, tuple]) -> Dict[int, List[Dict]]:
+        """
+        Trades (type 0) for several accounts, each within its own (start, end) window
+        
+        One query per deals collection (mt5_deals + mt5_deals_history) for all
+        accounts, deduplicated by deal ID.
+        """
+        trades_by_account: Dict[int, Dict[Any, Dict]] = {account: {} for account in windows}
+        if not windows:
+            return {}
+        
+        earliest = min(start for start, _ in windows.values())
+        latest = max(end for _, end in windows.values())
+        query = {
+            "account": {"$in": list(windows)},
+            "type": 0,  # Only actual trades (type 0), not deposits/withdrawals
+            "time": {"$gte": earliest, "$lte": latest}
+        }
+        
+        for collection in (self.db.mt5_deals, self.db.mt5_deals_history):
+            for trade in await collection.find(query).to_list(length=None):
+                account = trade.get("account")
+                window = windows.get(account)
+                deal_id = trade.get("deal") or trade.get("ticket")
+                if window is None or not deal_id:
+                    continue
+                trade_time = trade.get("time")
+                if isinstance(trade_time, datetime):
+                    if trade_time.tzinfo is None:
+                        trade_time = trade_time.replace(tzinfo=timezone.utc)
+                    if not window[0] <= trade_time <= window[1]:
+                        continue
+                trades_by_account[account][deal_id] = trade
+        
+        return {account: list(trades.values()) for account, trades in trades_by_account.items()}
+    
+    async def _analyze_managers(
+        self,
+        managers: List[Dict[str, Any]],
+        period_days: int
+    ) -> Dict[tuple, Any]:
+        """
+        Manager analytics for many (manager, account) pairs in one batch
+        
+        Accounts and trades are read with one $in query per collection and
+        the risk metrics of every manager come from one returns matrix
+        (services.return_metrics).
+        
+        Args:
+            managers: [{"id", "account", ...}] manager configs
+            period_days: Number of days to analyze
+        
+        Returns:
+            (manager_id, account) -> analytics dict, or the ValueError for
+            accounts that were not found
+        """
+        accounts = list(dict.fromkeys(m["account"] for m in managers))
+        account_docs = await self.db.mt5_accounts.find({"account": {"$in": accounts}}).to_list(length=None)
+        accounts_by_number = {doc.get("account"): doc for doc in account_docs}
+        
+        windows = {}
+        for account_num in accounts:
+            if account_num in accounts_by_number:
+                windows[account_num] = self._analysis_window(accounts_by_number[account_num], period_days)
+        trades_by_account = await self._load_trades({a: (w[2], w[3]) for a, w in windows.items()})
+        
+        # Daily return series per account -> one matrix -> every risk metric at once
+        series = {}
+        allocations = {}
+        for account_num, window in windows.items():
+            allocations[account_num] = self._initial_allocation(accounts_by_number[account_num])
+            series[account_num] = daily_returns_from_deals(
+                trades_by_account.get(account_num, []),
+                allocations[account_num],
+                start=window[2],
+                end=window[3]
+            )
+        matrix = returns_matrix(series)
+        summary = summarize(matrix["returns"])
+        risk_by_account = {account: summary_row(summary, row) for row, account in enumerate(matrix["keys"])}
+        
+        results = {}
+        for manager in managers:
+            key = (manager["id"], manager["account"])
+            account_data = accounts_by_number.get(manager["account"])
+            if not account_data:
+                logger.warning(f"Account {manager['account']} not found in mt5_accounts")
+                results[key] = ValueError(f"Account {manager['account']} not found")
+                continue
+            results[key] = self._manager_analytics(
+                manager["id"],
+                manager["account"],
+                account_data,
+                windows[manager["account"]],
+                trades_by_account.get(manager["account"], []),
+                risk_by_account[manager["account"]],
+                period_days
+            )
+        return results
+    
+    @staticmethod
+    def _initial_allocation(account_data: Dict[str, Any]) -> float:
+        # FIXED: Use corrected initial_allocation from mt5_accounts (tagged with capital_source)
+        # This accounts for proper capital source categorization (client, FIDUS, reinvested)
+        value = account_data.get("initial_allocation", 0)
+        if hasattr(value, 'to_decimal'):
+            return float(value.to_decimal())
+        return float(value or 0)
+    
+    def _manager_analytics(
+        self,
+        manager_id: str,
+        account_num: int,
+        account_data: Dict[str, Any],
+        window: tuple,
+        trades: List[Dict],
+        risk: Dict[str, Any],
+        period_days: int
+    ) -> Dict[str, Any]:
+        """Assemble manager analytics from loaded account data, trades and risk metrics"""
+        manager_config = self._find_manager_config(manager_id, account_num)
+        if not manager_config:
+            logger.warning(f"Manager config not found for {manager_id}, using account data")
+            manager_config = {
+                "name": account_data.get("manager", "Unknown"),
+                "id": manager_id
+            }
+        
+        equity = account_data.get("equity", 0)
+        initial_allocation = self._initial_allocation(account_data)
+        
+        # TRUE P&L for MANAGER PERFORMANCE = Current Equity - Initial Allocation
+        # (Do NOT add profit_withdrawals - those went to separation accounts)
+        # Manager is judged on current account performance only
+        current_equity = equity
+        true_pnl = current_equity - initial_allocation
+        
+        allocation_start_date, days_since_allocation, _, _ = window
+        
+        # Calculate return percentage
+        return_percentage = (true_pnl / initial_allocation * 100) if initial_allocation > 0 else 0
+        
+        # Calculate trading statistics
+        total_trades = len(trades)
+        winning_trades = [t for t in trades if t["profit"] > 0]
+        losing_trades = [t for t in trades if t["profit"] < 0]
+        
+        win_rate = (len(winning_trades) / total_trades * 100) if total_trades > 0 else 0
+        
+        # Calculate profit factor
+        gross_profit = sum(t["profit"] for t in winning_trades) if winning_trades else 0
+        gross_loss = abs(sum(t["profit"] for t in losing_trades)) if losing_trades else 0
+        profit_factor = (gross_profit / gross_loss) if gross_loss > 0 else 999.99
+        
+        # Calculate contribution to fund
+        fund_name = account_data.get("fund_code", "Unknown")
+        fund_aum = self.FUND_STRUCTURE.get(fund_name, {}).get("aum", initial_allocation)
+        contribution_to_fund = (true_pnl / fund_aum * 100) if fund_aum > 0 else 0
+        
+        return {
+            "manager_id": manager_id,
+            "manager_name": manager_config.get("name", account_data.get("manager", "Unknown")),
+            "strategy": manager_config.get("method", account_data.get("fund_type", "Unknown")),
+            "execution_type": manager_config.get("method", "Copy Trade"),
+            "risk_level": "Medium",  # Default for now
+            "account": account_num,
+            "fund": account_data.get("fund_type", "Unknown"),
+            
+            # Financial metrics
+            "initial_allocation": round(initial_allocation, 2),
+            "current_equity": round(current_equity, 2),
+            "total_pnl": round(true_pnl, 2),
+            "return_percentage": round(return_percentage, 2),
+            "contribution_to_fund": round(contribution_to_fund, 2),
+            
+            # Allocation date tracking
+            "allocation_start_date": allocation_start_date.isoformat() if allocation_start_date else None,
+            "days_since_allocation": days_since_allocation,
+            
+            # Trading statistics
+            "total_trades": total_trades,
+            "winning_trades": len(winning_trades),
+            "losing_trades": len(losing_trades),
+            "win_rate": round(win_rate, 2),
+            "profit_factor": round(profit_factor, 2),
+            
+            # Risk-adjusted returns (annualised, from daily returns); the
+            # Calmar ratio divides by the same peak-to-trough drawdown
+            "sharpe_ratio": risk["sharpe_ratio"],
+            "sortino_ratio": risk["sortino_ratio"],
+            "max_drawdown_pct": risk["max_drawdown_pct"],
+            "calmar_ratio": risk["calmar_ratio"],
+            "volatility_pct": risk["volatility_pct"],
+            "var_95_pct": risk["var_95_pct"],
+            "cvar_95_pct": risk["cvar_95_pct"],
+            
+            # Status
+            "status": "active" if true_pnl != 0 or total_trades > 0 else "inactive",
+            "period_days": days_since_allocation  # Use actual days since allocation
+        }
+    
     async def get_manager_analytics(
         self,
         manager_id: str,
@@ -252,165 +476,11 @@ class TradingAnalyticsService:
         try:
             logger.info(f"📊 Calculating manager analytics for {manager_id} (account {account_num})")
             
-            # Get account data from mt5_accounts (primary source of truth)
-            account_data = await self.db.mt5_accounts.find_one({"account": account_num})
-            if not account_data:
-                logger.warning(f"Account {account_num} not found in mt5_accounts")
-                raise ValueError(f"Account {account_num} not found")
-            
-            # Get manager info from FUND_STRUCTURE or account data
-            # Find manager config from FUND_STRUCTURE
-            manager_config = None
-            for fund_name, fund_data in self.FUND_STRUCTURE.items():
-                for mgr in fund_data.get("managers", []):
-                    if mgr["id"] == manager_id and mgr["account"] == account_num:
-                        manager_config = mgr
-                        break
-                if manager_config:
-                    break
-            
-            if not manager_config:
-                logger.warning(f"Manager config not found for {manager_id}, using account data")
-                manager_config = {
-                    "name": account_data.get("manager", "Unknown"),
-                    "id": manager_id
-                }
-            
-            balance = account_data.get("balance", 0)
-            equity = account_data.get("equity", 0)
-            
-            # FIXED: Use corrected initial_allocation from mt5_accounts (tagged with capital_source)
-            # This accounts for proper capital source categorization (client, FIDUS, reinvested)
-            initial_allocation = float(account_data.get("initial_allocation", 0))
-            if hasattr(account_data.get("initial_allocation"), 'to_decimal'):
-                initial_allocation = float(account_data.get("initial_allocation").to_decimal())
-            
-            # Get profit withdrawals from account data (for reference, not used in manager P&L)
-            profit_withdrawals = float(account_data.get("profit_withdrawals", 0))
-            if hasattr(account_data.get("profit_withdrawals"), 'to_decimal'):
-                profit_withdrawals = float(account_data.get("profit_withdrawals").to_decimal())
-            
-            # TRUE P&L for MANAGER PERFORMANCE = Current Equity - Initial Allocation
-            # (Do NOT add profit_withdrawals - those went to separation accounts)
-            # Manager is judged on current account performance only
-            current_equity = equity
-            true_pnl = current_equity - initial_allocation
-            
-            # Get allocation start date from account data
-            allocation_start_date = account_data.get("allocation_start_date")
-            if allocation_start_date:
-                # Ensure the datetime is timezone-aware
-                if allocation_start_date.tzinfo is None:
-                    allocation_start_date = allocation_start_date.replace(tzinfo=timezone.utc)
-                # Calculate days since allocation for accurate period tracking
-                days_since_allocation = (datetime.now(timezone.utc) - allocation_start_date).days
-            else:
-                days_since_allocation = period_days
-            
-            # Calculate return percentage
-            return_percentage = (true_pnl / initial_allocation * 100) if initial_allocation > 0 else 0
-            
-            # Calculate drawdown percentage
-            if initial_allocation > 0 and balance < initial_allocation:
-                drawdown_pct = ((initial_allocation - balance) / initial_allocation * 100)
-            else:
-                drawdown_pct = 0
-            
-            # Get trades for this account
-            # Use allocation_start_date if available, otherwise fall back to period_days
-            end_date = datetime.now(timezone.utc)
-            if allocation_start_date:
-                # Use allocation start date for accurate P&L calculation
-                start_date = allocation_start_date
-                logger.info(f"📊 Using allocation_start_date {start_date} for account {account_num}")
-            else:
-                start_date = end_date - timedelta(days=period_days)
-            
-            # Query both mt5_deals and mt5_deals_history for complete trade data
-            trades_cursor = self.db.mt5_deals.find({
-                "account": account_num,
-                "type": 0,  # Only actual trades (type 0), not deposits/withdrawals
-                "time": {"$gte": start_date, "$lte": end_date}
-            })
-            trades = await trades_cursor.to_list(length=None)
-            
-            # Also check mt5_deals_history for older trades
-            history_cursor = self.db.mt5_deals_history.find({
-                "account": account_num,
-                "type": 0,
-                "time": {"$gte": start_date, "$lte": end_date}
-            })
-            history_trades = await history_cursor.to_list(length=None)
-            
-            # Combine and deduplicate trades by deal ID
-            all_trades_map = {}
-            for t in trades + history_trades:
-                deal_id = t.get("deal") or t.get("ticket")
-                if deal_id:
-                    all_trades_map[deal_id] = t
-            trades = list(all_trades_map.values())
-            
-            # Calculate trading statistics
-            total_trades = len(trades)
-            winning_trades = [t for t in trades if t["profit"] > 0]
-            losing_trades = [t for t in trades if t["profit"] < 0]
-            
-            win_rate = (len(winning_trades) / total_trades * 100) if total_trades > 0 else 0
-            
-            # Calculate profit factor
-            gross_profit = sum(t["profit"] for t in winning_trades) if winning_trades else 0
-            gross_loss = abs(sum(t["profit"] for t in losing_trades)) if losing_trades else 0
-            profit_factor = (gross_profit / gross_loss) if gross_loss > 0 else 999.99
-            
-            # Calculate risk-adjusted returns
-            sharpe_ratio = await self.calculate_sharpe_ratio(trades, initial_allocation)
-            sortino_ratio = await self.calculate_sortino_ratio(trades, initial_allocation)
-            # Use calculated drawdown from balance, not from trades
-            max_drawdown = drawdown_pct
-            calmar_ratio = await self.calculate_calmar_ratio(return_percentage, max_drawdown, period_days)
-            
-            # Calculate contribution to fund
-            fund_name = account_data.get("fund_code", "Unknown")
-            fund_aum = self.FUND_STRUCTURE.get(fund_name, {}).get("aum", initial_allocation)
-            contribution_to_fund = (true_pnl / fund_aum * 100) if fund_aum > 0 else 0
-            
-            return {
-                "manager_id": manager_id,
-                "manager_name": manager_config.get("name", account_data.get("manager", "Unknown")),
-                "strategy": manager_config.get("method", account_data.get("fund_type", "Unknown")),
-                "execution_type": manager_config.get("method", "Copy Trade"),
-                "risk_level": "Medium",  # Default for now
-                "account": account_num,
-                "fund": account_data.get("fund_type", "Unknown"),
-                
-                # Financial metrics
-                "initial_allocation": round(initial_allocation, 2),
-                "current_equity": round(current_equity, 2),
-                "total_pnl": round(true_pnl, 2),
-                "return_percentage": round(return_percentage, 2),
-                "contribution_to_fund": round(contribution_to_fund, 2),
-                
-                # Allocation date tracking
-                "allocation_start_date": allocation_start_date.isoformat() if allocation_start_date else None,
-                "days_since_allocation": days_since_allocation,
-                
-                # Trading statistics
-                "total_trades": total_trades,
-                "winning_trades": len(winning_trades),
-                "losing_trades": len(losing_trades),
-                "win_rate": round(win_rate, 2),
-                "profit_factor": round(profit_factor, 2),
-                
-                # Risk-adjusted returns
-                "sharpe_ratio": round(sharpe_ratio, 3),
-                "sortino_ratio": round(sortino_ratio, 3),
-                "max_drawdown_pct": round(max_drawdown, 2),
-                "calmar_ratio": round(calmar_ratio, 3),
-                
-                # Status
-                "status": "active" if true_pnl != 0 or total_trades > 0 else "inactive",
-                "period_days": days_since_allocation  # Use actual days since allocation
-            }
+            results = await self._analyze_managers([{"id": manager_id, "account": account_num}], period_days)
+            result = results[(manager_id, account_num)]
+            if isinstance(result, Exception):
+                raise result
+            return result
             
         except Exception as e:
             logger.error(f"❌ Failed to calculate manager analytics for {manager_id}: {str(e)}")
@@ -420,6 +490,9 @@ class TradingAnalyticsService:
         """
         Get all managers ranked by performance
         
+        All managers are analysed in one batch (_analyze_managers): one query
+        per collection and one returns matrix for the risk metrics.
+        
         Args:
             period_days: Number of days to analyze
             
@@ -430,57 +503,52 @@ class TradingAnalyticsService:
             logger.info(f"📊 Calculating managers ranking for {period_days} days")
             
             # Get all ACTIVE managers from Main Fund (March 2026 allocation)
-            # Track unique managers to avoid duplicates (some managers handle multiple accounts)
-            unique_managers = {}  # Key: manager_id, Value: aggregated performance
-            
+            active = []
             for fund_name in ["Main Fund"]:  # Process active fund only
                 fund_config = self.FUND_STRUCTURE.get(fund_name)
                 if not fund_config:
                     continue
-                    
                 for manager_config in fund_config["managers"]:
                     # Skip inactive managers
                     if manager_config.get("status") == "inactive":
                         logger.info(f"⏭️  Skipping {manager_config['name']} - inactive status")
                         continue
-                    
-                    manager_id = manager_config["id"]
-                    
-                    try:
-                        manager_perf = await self.get_manager_analytics(
-                            manager_config["id"],
-                            manager_config["account"],
-                            period_days
-                        )
-                        
-                        # If this manager already processed, aggregate their performance across accounts
-                        if manager_id in unique_managers:
-                            existing = unique_managers[manager_id]
-                            # Aggregate P&L and equity across all accounts
-                            existing["total_pnl"] += manager_perf["total_pnl"]
-                            existing["current_equity"] += manager_perf["current_equity"]
-                            existing["initial_allocation"] += manager_perf["initial_allocation"]
-                            existing["total_trades"] += manager_perf["total_trades"]
-                            # Add account to assigned_accounts list
-                            if "assigned_accounts" not in existing:
-                                existing["assigned_accounts"] = []
-                            existing["assigned_accounts"].append(manager_config["account"])
-                            # Recalculate return percentage
-                            if existing["initial_allocation"] > 0:
-                                existing["return_percentage"] = (existing["total_pnl"] / existing["initial_allocation"]) * 100
-                            logger.info(f"📊 Aggregated performance for {manager_config['name']} across multiple accounts")
-                        else:
-                            # First time seeing this manager
-                            manager_perf["fund_type"] = fund_name
-                            manager_perf["status"] = manager_config.get("status", "active")
-                            manager_perf["assigned_accounts"] = [manager_config["account"]]
-                            manager_perf["profile_url"] = manager_config.get("profile_url", "")
-                            unique_managers[manager_id] = manager_perf
-                            logger.info(f"✅ Added {manager_perf['manager_name']} from {fund_name} fund")
-                        
-                    except Exception as e:
-                        logger.warning(f"⚠️  Failed to get analytics for {manager_config['name']}: {str(e)}")
-                        continue
+                    active.append((fund_name, manager_config))
+            
+            analytics = await self._analyze_managers([config for _, config in active], period_days)
+            
+            # Track unique managers to avoid duplicates (some managers handle multiple accounts)
+            unique_managers = {}  # Key: manager_id, Value: aggregated performance
+            
+            for fund_name, manager_config in active:
+                manager_id = manager_config["id"]
+                manager_perf = analytics[(manager_id, manager_config["account"])]
+                if isinstance(manager_perf, Exception):
+                    logger.warning(f"⚠️  Failed to get analytics for {manager_config['name']}: {str(manager_perf)}")
+                    continue
+                manager_perf = dict(manager_perf)
+                
+                # If this manager already processed, aggregate their performance across accounts
+                if manager_id in unique_managers:
+                    existing = unique_managers[manager_id]
+                    # Aggregate P&L and equity across all accounts
+                    existing["total_pnl"] += manager_perf["total_pnl"]
+                    existing["current_equity"] += manager_perf["current_equity"]
+                    existing["initial_allocation"] += manager_perf["initial_allocation"]
+                    existing["total_trades"] += manager_perf["total_trades"]
+                    existing["assigned_accounts"].append(manager_config["account"])
+                    # Recalculate return percentage
+                    if existing["initial_allocation"] > 0:
+                        existing["return_percentage"] = (existing["total_pnl"] / existing["initial_allocation"]) * 100
+                    logger.info(f"📊 Aggregated performance for {manager_config['name']} across multiple accounts")
+                else:
+                    # First time seeing this manager
+                    manager_perf["fund_type"] = fund_name
+                    manager_perf["status"] = manager_config.get("status", "active")
+                    manager_perf["assigned_accounts"] = [manager_config["account"]]
+                    manager_perf["profile_url"] = manager_config.get("profile_url", "")
+                    unique_managers[manager_id] = manager_perf
+                    logger.info(f"✅ Added {manager_perf['manager_name']} from {fund_name} fund")
             
             # Convert dict back to list
             all_managers = list(unique_managers.values())
@@ -515,9 +583,9 @@ class TradingAnalyticsService:
     
     async def calculate_sharpe_ratio(self, trades: List[Dict], allocation: float) -> float:
         """
-        Calculate Sharpe Ratio for a series of trades
+        Calculate annualised Sharpe Ratio from the daily returns of a series of trades
         
-        Sharpe Ratio = (Average Return - Risk-Free Rate) / Standard Deviation of Returns
+        Sharpe Ratio = (Average Daily Return - Risk-Free Rate) / Std Dev of Daily Returns * sqrt(365)
         
         Args:
             trades: List of trade documents
@@ -529,32 +597,12 @@ class TradingAnalyticsService:
         if not trades or allocation == 0:
             return 0.0
         
-        # Calculate daily returns
-        returns = [t["profit"] / allocation for t in trades]
-        
-        if len(returns) < 2:
-            return 0.0
-        
-        # Calculate mean return
-        mean_return = sum(returns) / len(returns)
-        
-        # Calculate standard deviation
-        variance = sum((r - mean_return) ** 2 for r in returns) / len(returns)
-        std_dev = math.sqrt(variance) if variance > 0 else 0
-        
-        if std_dev == 0:
-            return 0.0
-        
-        # Risk-free rate (assume 0 for simplicity)
-        risk_free_rate = 0.0
-        
-        sharpe = (mean_return - risk_free_rate) / std_dev
-        
-        return sharpe
+        series = daily_returns_from_deals(trades, allocation)
+        return return_metrics.sharpe_ratio(series["returns"])
     
     async def calculate_sortino_ratio(self, trades: List[Dict], allocation: float) -> float:
         """
-        Calculate Sortino Ratio (only considers downside deviation)
+        Calculate annualised Sortino Ratio (only considers downside deviation of daily returns)
         
         Args:
             trades: List of trade documents
@@ -566,30 +614,8 @@ class TradingAnalyticsService:
         if not trades or allocation == 0:
             return 0.0
         
-        # Calculate returns
-        returns = [t["profit"] / allocation for t in trades]
-        
-        if len(returns) < 2:
-            return 0.0
-        
-        # Calculate mean return
-        mean_return = sum(returns) / len(returns)
-        
-        # Calculate downside deviation (only negative returns)
-        negative_returns = [r for r in returns if r < 0]
-        
-        if not negative_returns:
-            return 999.99  # No downside, extremely high Sortino
-        
-        downside_variance = sum(r ** 2 for r in negative_returns) / len(negative_returns)
-        downside_dev = math.sqrt(downside_variance)
-        
-        if downside_dev == 0:
-            return 0.0
-        
-        sortino = mean_return / downside_dev
-        
-        return sortino
+        series = daily_returns_from_deals(trades, allocation)
+        return return_metrics.sortino_ratio(series["returns"])
     
     async def calculate_max_drawdown(self, trades: List[Dict], allocation: float) -> float:
         """
@@ -605,23 +631,11 @@ class TradingAnalyticsService:
         if not trades or allocation == 0:
             return 0.0
         
-        # Build equity curve
-        equity = allocation
-        peak = allocation
-        max_dd = 0.0
-        
-        for trade in sorted(trades, key=lambda x: x.get("close_time", datetime.now())):
-            equity += trade["profit"]
-            
-            if equity > peak:
-                peak = equity
-            
-            drawdown = ((peak - equity) / peak * 100) if peak > 0 else 0
-            
-            if drawdown > max_dd:
-                max_dd = drawdown
+        # Equity curve ordered by close time (shared NumPy kernel)
+        columns = deals_to_columns(trades, time_field="close_time", include_costs=False)
+        curve = equity_curve(columns["pnl"], allocation)
         
-        return max_dd
+        return curve["max_drawdown"]["pct"]
     
     async def calculate_calmar_ratio(
         self,
@@ -0,0 +1,138 @@
+"""
+Async MongoDB Integration Unit Tests
+Tests the Motor-backed AsyncMongoDBManager used by FastAPI handlers
+
+Test Coverage:
+- get_all_clients joins profile/readiness/investment totals in 2 queries
+- get_investments_by_client loads every client's investments in 1 query
+- get_all_mt5_accounts resolves client names with $in lookups (no N+1)
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from async_mongodb_integration import AsyncMongoDBManager
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self._rows = [dict(r) for r in rows]
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._rows:
+            raise StopAsyncIteration
+        return self._rows.pop(0)
+
+    async def to_list(self, length=None):
+        return self._rows[:length] if length else self._rows
+
+
+class FakeCollection:
+    def __init__(self, rows=None, aggregate_rows=None):
+        self.rows = rows or []
+        self.aggregate_rows = aggregate_rows or []
+        self.calls = []
+
+    def _match(self, row, query):
+        for key, cond in query.items():
+            if isinstance(cond, dict) and '$in' in cond:
+                if row.get(key) not in cond['$in']:
+                    return False
+            elif row.get(key) != cond:
+                return False
+        return True
+
+    def find(self, query=None, projection=None):
+        self.calls.append(('find', query))
+        return _Cursor(r for r in self.rows if self._match(r, query or {}))
+
+    def aggregate(self, pipeline):
+        self.calls.append(('aggregate', pipeline))
+        return _Cursor(self.aggregate_rows)
+
+
+def _db(**collections):
+    db = SimpleNamespace(name='fidus_test', **collections)
+    return db
+
+
+class TestAsyncMongoDBManager:
+    """AsyncMongoDBManager unit tests"""
+
+    def test_get_all_clients_batches_joins(self):
+        created = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        users = FakeCollection(aggregate_rows=[
+            {'id': 'client_001', 'username': 'alice', 'email': 'a@x.com', 'type': 'client', 'status': 'active',
+             'created_at': created, 'profile': [{'name': 'Alice A', 'phone': '123'}],
+             'readiness': [{'client_id': 'client_001', 'aml_kyc_completed': True, 'agreement_signed': True,
+                            'investment_ready': True, 'account_creation_date': created}]},
+            {'id': 'client_002', 'username': 'bob', 'email': 'b@x.com', 'type': 'client', 'status': 'active',
+             'created_at': datetime(2025, 2, 1, tzinfo=timezone.utc), 'profile': [], 'readiness': []},
+        ])
+        investments = FakeCollection(aggregate_rows=[{'_id': 'client_001', 'count': 2, 'total': 150000}])
+        manager = AsyncMongoDBManager(_db(users=users, investments=investments))
+
+        clients = asyncio.run(manager.get_all_clients())
+
+        assert [c['id'] for c in clients] == ['client_002', 'client_001']  # newest first
+        alice = clients[1]
+        assert alice['name'] == 'Alice A' and alice['phone'] == '123'
+        assert alice['total_investments'] == 2 and alice['total_invested'] == 150000
+        assert alice['investment_ready'] is True
+        assert alice['readiness_status']['account_creation_date'] == created.isoformat()
+        assert clients[0]['name'] == 'bob' and clients[0]['total_invested'] == 0
+        assert clients[0]['readiness_status']['investment_ready'] is False
+        assert len(users.calls) == 1 and len(investments.calls) == 1
+        print("✅ get_all_clients: 2 queries for all clients")
+
+    def test_get_investments_by_client_single_query(self):
+        deposit = datetime(2025, 3, 1, tzinfo=timezone.utc)
+        investments = FakeCollection(rows=[
+            {'client_id': 'client_001', 'investment_id': 'inv-1', 'fund_code': 'CORE',
+             'principal_amount': 100000, 'deposit_date': deposit},
+            {'client_id': 'client_001', 'investment_id': 'inv-2', 'fund_code': 'BALANCE',
+             'principal_amount': 50000, 'current_value': 52000, 'deposit_date': deposit},
+            {'client_id': 'client_009', 'investment_id': 'inv-9', 'fund_code': 'CORE',
+             'principal_amount': 1, 'deposit_date': deposit},
+        ])
+        manager = AsyncMongoDBManager(_db(investments=investments))
+
+        by_client = asyncio.run(manager.get_investments_by_client(c for c in ['client_001', 'client_002']))
+
+        assert set(by_client) == {'client_001', 'client_002'}
+        assert by_client['client_002'] == []
+        inv_1 = by_client['client_001'][0]
+        assert inv_1['fund_name'] == 'FIDUS Core Fund'
+        assert inv_1['current_value'] == 100000  # defaults to principal
+        assert by_client['client_001'][1]['current_value'] == 52000
+        assert len(investments.calls) == 1
+        print("✅ get_investments_by_client: 1 query for all clients")
+
+    def test_get_all_mt5_accounts_resolves_names_in_bulk(self):
+        now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        accounts = FakeCollection(rows=[
+            {'account_id': f'acc-{i}', 'client_id': cid, 'fund_code': 'CORE', 'mt5_login': 1000 + i,
+             'mt5_server': 'Srv', 'total_allocated': 1000.0, 'current_equity': 1100.0, 'profit_loss': 100.0,
+             'status': 'active', 'created_at': now, 'updated_at': now}
+            for i, cid in enumerate(['client_001', 'client_001', 'client_002', 'client_003'])
+        ])
+        users = FakeCollection(rows=[{'id': 'client_001', 'username': 'alice'}, {'id': 'client_002', 'username': 'bob'}])
+        profiles = FakeCollection(rows=[{'client_id': 'client_001', 'name': 'Alice A'}])
+        manager = AsyncMongoDBManager(_db(mt5_accounts=accounts, users=users, client_profiles=profiles))
+
+        result = asyncio.run(manager.get_all_mt5_accounts())
+
+        assert [a['client_name'] for a in result] == ['Alice A', 'Alice A', 'client_002', 'client_003']
+        assert result[0]['profit_loss_percentage'] == 10.0
+        assert result[0]['broker_name'] == 'Unknown Broker'
+        assert 'investment_ids' not in result[0]
+        assert len(users.calls) == 1 and len(profiles.calls) == 1
+        print("✅ get_all_mt5_accounts: client names resolved with $in lookups")
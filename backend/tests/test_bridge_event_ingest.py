@@ -0,0 +1,231 @@
+"""
+Bridge Event Ingest Unit Tests
+Tests BridgeEventIngestService applying events pushed by the MT5 bridges
+
+Test Coverage:
+- Account figures from the newest event per account go out in one bulk_write
+- Account figures survive a position event stamped with the same time
+- Closed deals are ingested into mt5_deals
+- Re-sent events (at-least-once delivery) are acknowledged but not re-applied
+- Events whose apply failed are re-applied when the bridge re-sends them
+- Sequence gaps are counted on the stream state
+- Polling runs only as periodic reconciliation for accounts a live stream covers
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.bridge_event_ingest import BridgeEventIngestService
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self._rows = list(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._rows:
+            raise StopAsyncIteration
+        return self._rows.pop(0)
+
+    async def to_list(self, length=None):
+        return list(self._rows)
+
+
+class FakeEvents:
+    def __init__(self):
+        self.rows = []
+
+    async def create_index(self, keys, **kwargs):
+        pass
+
+    def _matching(self, query):
+        seqs = set(query['seq']['$in'])
+        return [r for r in self.rows if r['bridge_id'] == query['bridge_id'] and r['seq'] in seqs]
+
+    def find(self, query, projection=None):
+        return _Cursor({'seq': r['seq'], 'applied': r['applied']} for r in self._matching(query))
+
+    async def insert_many(self, docs, ordered=True):
+        self.rows.extend(docs)
+
+    async def update_many(self, query, update):
+        for row in self._matching(query):
+            row.update(update['$set'])
+
+
+class FakeState:
+    def __init__(self):
+        self.doc = None
+
+    async def find_one(self, query, projection=None):
+        return dict(self.doc) if self.doc is not None else None
+
+    def find(self, query, projection=None):
+        live = self.doc is not None and self.doc['last_event_at'] >= query['last_event_at']['$gte']
+        return _Cursor([dict(self.doc)] if live else [])
+
+    async def update_one(self, query, update, upsert=False):
+        doc = self.doc or {'bridge_id': query['bridge_id'], 'events_received': 0, 'duplicates': 0, 'gaps': 0}
+        doc['last_seq'] = max(doc.get('last_seq', 0), update['$max']['last_seq'])
+        doc.update(update['$set'])
+        for key, value in update['$inc'].items():
+            doc[key] += value
+        accounts = doc.setdefault('accounts', [])
+        accounts.extend(a for a in update['$addToSet']['accounts']['$each'] if a not in accounts)
+        self.doc = doc
+
+
+class FakeSharedState:
+    """Collection behind SharedStateStore, shared by every service instance (worker)"""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one(self, query, projection=None):
+        return self.docs.get(query['_id'])
+
+    def find(self, query, projection=None):
+        return _Cursor(list(self.docs.values()))
+
+    async def update_one(self, query, update, upsert=False):
+        self.docs.setdefault(query['_id'], {'_id': query['_id']}).update(update['$set'])
+
+
+class FakeBulk:
+    def __init__(self):
+        self.operations = []
+        self.docs = {}
+
+    def find(self, query, projection=None):
+        return _Cursor([])
+
+    async def bulk_write(self, operations, ordered=True):
+        self.operations.extend(operations)
+        return SimpleNamespace(upserted_count=len(operations), modified_count=0)
+
+
+class FakeDB(dict):
+    def __init__(self):
+        super().__init__(mt5_deals=FakeBulk(), state_bridge_reconcile=FakeSharedState())
+        self.mt5_bridge_events = FakeEvents()
+        self.mt5_bridge_stream_state = FakeState()
+        self.mt5_accounts = FakeBulk()
+
+
+def _event(seq, event_type, account, time, data):
+    return {'seq': seq, 'type': event_type, 'account': account, 'time': time, 'data': data}
+
+
+EVENTS = [
+    _event(1, 'account_update', 1001, '2025-06-01T12:00:00+00:00', {'balance': 100.0, 'equity': 101.0}),
+    _event(2, 'account_update', 1001, '2025-06-01T12:00:15+00:00', {'balance': 100.0, 'equity': 107.5}),
+    _event(3, 'deal_closed', 1001, '2025-06-01T12:00:15+00:00',
+           {'ticket': 555, 'time': 1748779200, 'type': 1, 'entry': 1, 'symbol': 'EURUSD', 'volume': 0.5, 'profit': 12.0}),
+    _event(4, 'position_closed', 1002, '2025-06-01T12:00:20+00:00', {'ticket': 77, 'open_positions': 0}),
+]
+
+
+class TestBridgeEventIngest:
+    """Bridge event ingest unit tests"""
+
+    def test_applies_events_once(self):
+        db = FakeDB()
+        service = BridgeEventIngestService(db)
+
+        async def run():
+            first = await service.ingest('MEXAtlantic-Real', EVENTS)
+            second = await service.ingest('MEXAtlantic-Real', EVENTS[2:])  # re-sent after a lost ack
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert first['accepted'] == 4 and first['acked_seq'] == 4
+        assert first['applied'] == {'accounts_updated': 2, 'deals_written': 1}
+        newest = db.mt5_accounts.operations[0]._doc['$set']
+        assert newest['equity'] == 107.5 and newest['data_source'] == 'VPS_STREAM'
+        assert db.mt5_accounts.operations[1]._doc['$set']['open_positions'] == 0
+        assert db['mt5_deals'].operations[0]._doc['$set']['ticket'] == 555
+
+        assert second['accepted'] == 0 and second['duplicates'] == 2 and second['acked_seq'] == 4
+        assert len(db.mt5_accounts.operations) == 2
+        assert db.mt5_bridge_stream_state.doc['events_received'] == 4
+        assert db.mt5_bridge_stream_state.doc['accounts'] == [1001, 1002]
+        assert all(row['applied'] for row in db.mt5_bridge_events.rows)
+        print("✅ Events applied once; re-sent events only acknowledged")
+
+    def test_position_event_keeps_account_figures(self):
+        db = FakeDB()
+        service = BridgeEventIngestService(db)
+        snapshot = '2025-06-01T12:00:30+00:00'  # one bridge diff stamps both events alike
+        events = [
+            _event(1, 'account_update', 1001, snapshot, {'balance': 100.0, 'equity': 98.0, 'margin': 20.0}),
+            _event(2, 'position_opened', 1001, snapshot, {'ticket': 88, 'open_positions': 1}),
+        ]
+
+        result = asyncio.run(service.ingest('MEXAtlantic-Real', events))
+
+        assert result['applied']['accounts_updated'] == 1
+        update = db.mt5_accounts.operations[0]._doc['$set']
+        assert update['balance'] == 100.0 and update['equity'] == 98.0 and update['margin'] == 20.0
+        assert update['open_positions'] == 1
+        print("✅ account_update and position events of one snapshot merge into one update")
+
+    def test_failed_apply_is_retried_on_redelivery(self):
+        db = FakeDB()
+        service = BridgeEventIngestService(db)
+
+        async def failing_bulk_write(operations, ordered=True):
+            raise ConnectionError("primary stepped down")
+
+        db.mt5_accounts.bulk_write = failing_bulk_write
+        with pytest.raises(ConnectionError):
+            asyncio.run(service.ingest('MEXAtlantic-Real', EVENTS[:2]))
+        assert [row['applied'] for row in db.mt5_bridge_events.rows] == [False, False]
+
+        del db.mt5_accounts.bulk_write  # store is back; the bridge re-sends the batch
+        result = asyncio.run(service.ingest('MEXAtlantic-Real', EVENTS[:2]))
+
+        assert result['accepted'] == 2 and result['duplicates'] == 0
+        assert db.mt5_accounts.operations[0]._doc['$set']['equity'] == 107.5
+        assert len(db.mt5_bridge_events.rows) == 2
+        assert all(row['applied'] for row in db.mt5_bridge_events.rows)
+        print("✅ Unapplied events are applied when the bridge re-sends them")
+
+    def test_sequence_gap_counted(self):
+        db = FakeDB()
+        service = BridgeEventIngestService(db)
+
+        async def run():
+            await service.ingest('MEXAtlantic-Real', EVENTS[:1])
+            return await service.ingest('MEXAtlantic-Real', EVENTS[3:])
+
+        result = asyncio.run(run())
+
+        assert result['accepted'] == 1
+        assert db.mt5_bridge_stream_state.doc['gaps'] == 1
+        assert db.mt5_bridge_stream_state.doc['last_seq'] == 4
+        print("✅ Sequence gaps are counted")
+
+    def test_reconcile_due_per_account(self):
+        db = FakeDB()
+        worker_a = BridgeEventIngestService(db)
+        worker_b = BridgeEventIngestService(db)
+
+        assert asyncio.run(worker_a.reconcile_due([1001, 1002])) == [1001, 1002]  # no stream: poll all
+
+        db.mt5_bridge_stream_state.doc = {
+            'bridge_id': 'b', 'last_event_at': datetime.now(timezone.utc), 'accounts': [1001]
+        }
+        assert asyncio.run(worker_a.reconcile_due([1001, 1002])) == [1001, 1002]  # first reconciliation pass
+        assert asyncio.run(worker_b.reconcile_due([1001, 1002])) == [1002]  # 1001 streamed, 1002 is not
+        print("✅ Polling reduced to reconciliation only for streamed accounts, across workers")
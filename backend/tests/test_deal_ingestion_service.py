@@ -0,0 +1,155 @@
+"""
+Deal Ingestion Service Unit Tests
+Tests the shared bulk/idempotent ingestion stage used by the deal syncs
+
+Test Coverage:
+- normalize_mt5_deal parses Unix/ISO times and keeps MT5 field names
+- content_hash ignores bookkeeping fields (synced_at, updated_at)
+- content_hash is identical across writers (synced_by and writer metadata)
+- ingest() inserts new deals, skips unchanged ones and updates changed ones
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.deal_ingestion_service import (
+    DealIngestionService,
+    content_hash,
+    normalize_mt5_deal,
+)
+
+
+class _AsyncCursor:
+    def __init__(self, rows):
+        self._rows = list(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._rows:
+            raise StopAsyncIteration
+        return self._rows.pop(0)
+
+
+class FakeCollection:
+    """Minimal in-memory stand-in for a Motor collection"""
+
+    def __init__(self):
+        self.docs = {}
+        self.bulk_calls = 0
+
+    def find(self, query, projection=None):
+        account = query['account']
+        tickets = set(query['ticket']['$in'])
+        return _AsyncCursor(
+            dict(doc) for (acc, ticket), doc in self.docs.items()
+            if acc == account and ticket in tickets
+        )
+
+    async def bulk_write(self, operations, ordered=True):
+        self.bulk_calls += 1
+        upserted = modified = 0
+        for op in operations:
+            key = (op._filter['account'], op._filter['ticket'])
+            if key in self.docs:
+                modified += 1
+            else:
+                upserted += 1
+            self.docs.setdefault(key, {}).update(op._doc['$set'])
+        return SimpleNamespace(upserted_count=upserted, modified_count=modified)
+
+
+class FakeDB(dict):
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+
+class TestDealIngestionService:
+    """Deal ingestion unit tests"""
+
+    def _trade(self, ticket, profit=10.0):
+        return {
+            'ticket': ticket,
+            'order': ticket + 1,
+            'time': 1735725600,
+            'type': 0,
+            'entry': 1,
+            'symbol': 'XAUUSD',
+            'volume': '0.5',
+            'price': 2650.0,
+            'profit': profit,
+        }
+
+    def test_normalize_mt5_deal(self):
+        sync_time = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        doc = normalize_mt5_deal(self._trade(1001), 886557, sync_time, 'test', {'fund_type': 'BALANCE'})
+
+        assert doc['time'] == datetime.fromtimestamp(1735725600, tz=timezone.utc)
+        assert doc['volume'] == 0.5
+        assert doc['commission'] is None
+        assert doc['account'] == 886557
+        assert doc['fund_type'] == 'BALANCE'
+        print("✅ normalize_mt5_deal produces MT5-standard document")
+
+    def test_content_hash_ignores_bookkeeping(self):
+        t1 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        t2 = datetime(2025, 1, 2, tzinfo=timezone.utc)
+        doc_a = normalize_mt5_deal(self._trade(1001), 886557, t1, 'test')
+        doc_b = normalize_mt5_deal(self._trade(1001), 886557, t2, 'test')
+        doc_a['time'] = doc_b['time']
+
+        assert content_hash(doc_a) == content_hash(doc_b)
+        print("✅ content_hash is stable across sync runs")
+
+    def test_content_hash_ignores_writer_metadata(self):
+        sync_time = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        from_sync = normalize_mt5_deal(
+            self._trade(1001), 886557, sync_time, 'mt5_deals_sync_service',
+            {'account_name': 'BALANCE - Manager', 'fund_type': 'BALANCE'}
+        )
+        from_vps = normalize_mt5_deal(
+            self._trade(1001), 886557, sync_time, 'vps_bridge_service', {'synced_from_vps': True}
+        )
+        from_bridge = normalize_mt5_deal(
+            self._trade(1001), 886557, sync_time, 'bridge_stream', {'bridge_seq': 42}
+        )
+
+        assert content_hash(from_sync) == content_hash(from_vps) == content_hash(from_bridge)
+        assert content_hash(from_sync) != content_hash(
+            normalize_mt5_deal(self._trade(1001, profit=11.0), 886557, sync_time, 'vps_bridge_service')
+        )
+        print("✅ content_hash matches across the deal writers")
+
+    def test_ingest_inserts_skips_and_updates(self):
+        db = FakeDB()
+        service = DealIngestionService(db, collection='mt5_deals', chunk_size=2)
+        sync_time = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+        def docs(profit_for_1002=10.0):
+            return [
+                normalize_mt5_deal(self._trade(1001), 886557, sync_time, 'test'),
+                normalize_mt5_deal(self._trade(1002, profit_for_1002), 886557, sync_time, 'test'),
+                normalize_mt5_deal(self._trade(1003), 886557, sync_time, 'test'),
+            ]
+
+        first = asyncio.run(service.ingest(docs()))
+        assert first['inserted'] == 3
+        assert first['unchanged'] == 0
+
+        second = asyncio.run(service.ingest(docs()))
+        assert second['inserted'] == 0
+        assert second['updated'] == 0
+        assert second['unchanged'] == 3
+
+        third = asyncio.run(service.ingest(docs(profit_for_1002=25.0)))
+        assert third['updated'] == 1
+        assert third['unchanged'] == 2
+        assert db['mt5_deals'].docs[(886557, 1002)]['profit'] == 25.0
+        print("✅ ingest() is idempotent and only writes changed deals")
@@ -0,0 +1,240 @@
+"""
+Deal Rollup Service Unit Tests
+Tests the daily (account, symbol, day) rollups maintained at ingest time
+
+Test Coverage:
+- Ingesting deals refreshes only the touched buckets, without double
+  counting when a deal is re-synced with new figures
+- Buckets for symbols that no longer have deals are removed
+- rows() reads whole days from the rollups and only the partial edge days
+  from mt5_deals, matching a scan of the raw deals
+- MT5DealsService.get_deals still lists raw deals (/api/mt5/deals) while
+  get_deals_summary reduces the rollups (/api/mt5/deals/summary)
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.deal_ingestion_service import DealIngestionService
+from services.deal_rollup_service import DealRollupService, merge_rows
+from services.mt5_deals_service import MT5DealsService
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self._rows = list(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._rows:
+            raise StopAsyncIteration
+        return self._rows.pop(0)
+
+    def sort(self, field, direction=1):
+        self._rows.sort(key=lambda row: row[field], reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self._rows = self._rows[:count]
+        return self
+
+    async def to_list(self, length=None):
+        return list(self._rows)
+
+
+def _matches(doc, query):
+    if '$or' in query:
+        return any(_matches(doc, sub) for sub in query['$or'])
+    for field, cond in query.items():
+        value = doc.get(field)
+        if not isinstance(cond, dict):
+            if value != cond:
+                return False
+            continue
+        for op, arg in cond.items():
+            if op == '$in' and value not in arg:
+                return False
+            if op == '$nin' and value in arg:
+                return False
+            if op == '$gte' and not value >= arg:
+                return False
+            if op == '$lt' and not value < arg:
+                return False
+            if op == '$lte' and not value <= arg:
+                return False
+    return True
+
+
+class FakeDeals:
+    """mt5_deals stand-in; aggregate() groups like ROLLUP_GROUP for the fields under test"""
+
+    def __init__(self):
+        self.docs = {}
+        self.group_matches = []
+
+    def find(self, query, projection=None):
+        return _Cursor(dict(d) for d in self.docs.values() if _matches(d, query))
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            self.docs[(op._filter['account'], op._filter['ticket'])] = dict(op._doc['$set'])
+        return SimpleNamespace(upserted_count=len(operations), modified_count=0)
+
+    def aggregate(self, pipeline):
+        match = pipeline[0]['$match']
+        self.group_matches.append(match)
+        buckets = {}
+        for deal in self.docs.values():
+            if not _matches(deal, match):
+                continue
+            key = {'account': deal['account'], 'symbol': deal.get('symbol') or '',
+                   'day': deal['time'].strftime('%Y-%m-%d')}
+            row = buckets.setdefault(tuple(key.values()), {
+                '_id': key, 'deals': 0, 'profit': 0.0, 'trade_deals': 0, 'trade_volume': 0.0,
+                'first_deal': deal['time'], 'last_deal': deal['time']
+            })
+            row['deals'] += 1
+            row['profit'] += deal['profit']
+            if deal['type'] in (0, 1):
+                row['trade_deals'] += 1
+                row['trade_volume'] += deal['volume']
+            row['first_deal'] = min(row['first_deal'], deal['time'])
+            row['last_deal'] = max(row['last_deal'], deal['time'])
+        return _Cursor(buckets.values())
+
+
+class FakeRollups:
+    def __init__(self):
+        self.docs = []
+        self.finds = []
+
+    async def create_index(self, keys, **kwargs):
+        pass
+
+    def find(self, query, projection=None):
+        self.finds.append(query)
+        return _Cursor(dict(d) for d in self.docs if _matches(d, query))
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            if hasattr(op, '_doc'):
+                self.docs = [d for d in self.docs if not _matches(d, op._filter)]
+                self.docs.append(dict(op._doc['$set']))
+            else:
+                self.docs = [d for d in self.docs if not _matches(d, op._filter)]
+
+
+class FakeDB(dict):
+    def __init__(self):
+        super().__init__(mt5_deals=FakeDeals(), deal_rollups_daily=FakeRollups())
+
+    def __getattr__(self, name):
+        return self[name]
+
+
+DAY = datetime(2025, 6, 2, tzinfo=timezone.utc)
+
+
+def _deal(ticket, hours, profit, symbol='EURUSD', deal_type=0, volume=1.0, account=1001):
+    return {'account': account, 'ticket': ticket, 'time': DAY + timedelta(hours=hours),
+            'type': deal_type, 'symbol': symbol, 'volume': volume, 'profit': profit}
+
+
+class TestDealRollupService:
+    """Deal rollup unit tests"""
+
+    def test_ingest_refreshes_touched_buckets(self):
+        db = FakeDB()
+        ingestion = DealIngestionService(db)
+
+        async def run():
+            await ingestion.ingest([
+                _deal(1, 1, 10.0), _deal(2, 2, -4.0), _deal(3, 3, 0.0, symbol='XAUUSD'),
+                _deal(4, 30, 7.0), _deal(5, 5, 100.0, deal_type=2, symbol=None),
+            ])
+            # Re-sync: ticket 2 changed, ticket 3 moved to another symbol
+            await ingestion.ingest([_deal(2, 2, -6.0), _deal(3, 3, 0.0, symbol='GBPUSD')])
+
+        asyncio.run(run())
+
+        rollups = {(d['day'], d['symbol']): d for d in db['deal_rollups_daily'].docs}
+        assert set(rollups) == {('2025-06-02', 'EURUSD'), ('2025-06-02', 'GBPUSD'),
+                                ('2025-06-02', ''), ('2025-06-03', 'EURUSD')}
+        eurusd = rollups[('2025-06-02', 'EURUSD')]
+        assert eurusd['deals'] == 2 and eurusd['profit'] == 4.0 and eurusd['trade_volume'] == 2.0
+        assert rollups[('2025-06-02', '')]['trade_deals'] == 0
+        # The second ingest only regrouped the day it touched
+        assert len(db['mt5_deals'].group_matches[-1]['$or']) == 1
+        print("✅ Rollups refreshed per touched bucket without double counting")
+
+    def test_rows_match_raw_deals(self):
+        db = FakeDB()
+        deals = [_deal(t, t * 7, float(t), volume=0.1 * t, account=1001 + t % 2) for t in range(1, 40)]
+
+        async def run():
+            await DealIngestionService(db).ingest([dict(d) for d in deals])
+            service = DealRollupService(db)
+            db['mt5_deals'].group_matches.clear()
+            return await service.rows(start=DAY + timedelta(hours=13), end=DAY + timedelta(days=8, hours=6),
+                                      accounts=[1001, 1002])
+
+        rows = asyncio.run(run())
+
+        start, end = DAY + timedelta(hours=13), DAY + timedelta(days=8, hours=6)
+        in_window = [d for d in deals if start <= d['time'] <= end]
+        merged = merge_rows(rows)[()]
+        assert merged['deals'] == len(in_window)
+        assert round(merged['trade_volume'], 6) == round(sum(d['volume'] for d in in_window), 6)
+        assert merged['first_deal'] == min(d['time'] for d in in_window)
+
+        # Only the two partial edge days were grouped from raw deals
+        assert len(db['mt5_deals'].group_matches) == 2
+        assert db['deal_rollups_daily'].finds[-1]['day'] == {'$gte': '2025-06-03', '$lt': '2025-06-10'}
+        print(f"✅ {len(rows)} rollup rows match {len(in_window)} raw deals in the window")
+
+
+class TestMT5DealsService:
+    """MT5 deals service unit tests"""
+
+    def _db(self):
+        db = FakeDB()
+        deals = [
+            _deal(1, 1, 10.0), _deal(2, 2, -4.0, deal_type=1), _deal(3, 26, 7.0, symbol='XAUUSD'),
+            _deal(4, 27, 100.0, deal_type=2, symbol=None), _deal(5, 3, 5.0, account=1002),
+        ]
+        asyncio.run(DealIngestionService(db).ingest(deals))
+        return db
+
+    def test_get_deals_lists_raw_deals(self):
+        service = MT5DealsService(self._db())
+
+        deals = asyncio.run(service.get_deals(account_number=1001, limit=3))
+        assert [d['ticket'] for d in deals] == [4, 3, 2]  # newest first, limited
+        assert deals[0]['time'] == (DAY + timedelta(hours=27)).isoformat()
+
+        trades = asyncio.run(service.get_deals(account_number=1001, symbol='EURUSD', deal_type=1))
+        assert [d['ticket'] for d in trades] == [2]
+        print("✅ get_deals returns filtered raw deals, newest first")
+
+    def test_get_deals_summary_reduces_rollups(self):
+        service = MT5DealsService(self._db())
+
+        summary = asyncio.run(service.get_deals_summary(account_number=1001))
+        assert summary['total_deals'] == 4
+        assert summary['total_profit'] == 113.0
+        assert summary['symbols_traded'] == ['EURUSD', 'XAUUSD']
+        assert summary['date_range'] == {
+            'start': (DAY + timedelta(hours=1)).isoformat(),
+            'end': (DAY + timedelta(hours=27)).isoformat()
+        }
+
+        empty = asyncio.run(service.get_deals_summary(account_number=9999))
+        assert empty['total_deals'] == 0 and empty['date_range'] is None
+        print("✅ get_deals_summary aggregates the daily rollups")
@@ -0,0 +1,108 @@
+"""
+Deal Store Unit Tests
+Tests the per-account memoized deal loader used by HullRiskEngine
+
+Test Coverage:
+- A second get() for the same window is served from memory (no query)
+- invalidate() drops the account so the next get() reloads
+- Callers receive deal copies and read-only column views, never the cache
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.deal_store import DealStore
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def sort(self, *args):
+        return self
+
+    async def to_list(self, length=None):
+        return [dict(row) for row in self._rows[:length]]
+
+
+class FakeDeals:
+    def __init__(self, rows):
+        self.rows = rows
+        self.find_calls = 0
+
+    async def find_one(self, query, projection=None):
+        return next((r for r in self.rows if r['account'] == query['account']), None)
+
+    def find(self, query, projection=None):
+        self.find_calls += 1
+        return _Cursor([r for r in self.rows if r['account'] == query['account']])
+
+
+class FakeDB(dict):
+    def __getattr__(self, name):
+        return self[name]
+
+
+def _db():
+    rows = [
+        {'account': 886557, 'ticket': 1, 'time': datetime(2025, 1, 1, tzinfo=timezone.utc), 'symbol': 'XAUUSD', 'profit': 100.0},
+        {'account': 886557, 'ticket': 2, 'time': datetime(2025, 1, 2, tzinfo=timezone.utc), 'symbol': 'XAUUSD', 'profit': -40.0},
+    ]
+    return FakeDB(mt5_deals=FakeDeals(rows), mt5_deals_history=FakeDeals([]))
+
+
+class TestDealStore:
+    """Deal store unit tests"""
+
+    def test_second_get_is_a_cache_hit(self):
+        db = _db()
+        store = DealStore()
+
+        first = asyncio.run(store.get(db, 886557))
+        second = asyncio.run(store.get(db, 886557))
+
+        assert first is second
+        assert len(second) == 2
+        assert db['mt5_deals'].find_calls == 1
+        print("✅ Repeated loads are served from memory")
+
+    def test_invalidate_forces_reload(self):
+        db = _db()
+        store = DealStore()
+
+        asyncio.run(store.get(db, 886557))
+        store.invalidate([886557])
+        db['mt5_deals'].rows.append(
+            {'account': 886557, 'ticket': 3, 'time': datetime(2025, 1, 3, tzinfo=timezone.utc), 'symbol': 'EURUSD', 'profit': 5.0}
+        )
+        entry = asyncio.run(store.get(db, 886557))
+
+        assert db['mt5_deals'].find_calls == 2
+        assert [d['ticket'] for d in entry.deals] == [1, 2, 3]
+        print("✅ invalidate() drops the cached account")
+
+    def test_callers_cannot_mutate_cache(self):
+        db = _db()
+        store = DealStore()
+        entry = asyncio.run(store.get(db, 886557))
+
+        deals = entry.deals
+        deals[0]['profit'] = 999.0
+        deals.append({'ticket': 99})
+        assert entry.deals[0]['profit'] == 100.0
+        assert len(entry.deals) == 2
+
+        columns = entry.columns
+        with pytest.raises(ValueError):
+            columns['pnl'][0] = 999.0
+        columns['symbols'].append('BOGUS')
+        assert 'BOGUS' not in entry.columns['symbols']
+        np.testing.assert_allclose(entry.columns['pnl'], [100.0, -40.0])
+        print("✅ Deals and columns handed out are isolated from the cache")
@@ -0,0 +1,177 @@
+"""
+Deal Sync Watermark Unit Tests
+Tests the incremental MT5 deals sync cursor and the VIKING monitor upload watermark
+
+Test Coverage:
+- Deals without a broker time never move the watermark
+- Delta paging stops when a bridge without cursor support repeats its page
+- A bridge fetch failure or failed deal writes leave the watermark alone
+- VIKING monitors only advance last_trade_ticket after a successful upload
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'vps-scripts'))
+
+from services.mt5_deals_sync_service import DELTA_PAGE_SIZE, MT5DealsSyncService
+from services.sync_watermarks import SyncWatermarkStore
+
+import viking_file_monitor
+
+
+class FakeWatermarks:
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one(self, query, projection=None):
+        doc = self.docs.get(query['account'])
+        return dict(doc) if doc else None
+
+    async def update_one(self, query, update, upsert=False):
+        doc = self.docs.setdefault(query['account'], {'account': query['account']})
+        doc.update(update.get('$set', {}))
+        for key, value in update.get('$max', {}).items():
+            if doc.get(key) is None or value > doc[key]:
+                doc[key] = value
+
+
+class FakeConfigs:
+    async def find_one(self, query):
+        return None
+
+
+class FakeDB(dict):
+    def __getattr__(self, name):
+        return self[name]
+
+
+def _trade(ticket, time=None):
+    trade = {'ticket': ticket, 'type': 0, 'entry': 1, 'symbol': 'XAUUSD', 'volume': 0.1, 'profit': 5.0}
+    if time is not None:
+        trade['time'] = time
+    return trade
+
+
+class TestDealSyncWatermarks:
+    """Incremental deal sync cursor unit tests"""
+
+    def test_deal_without_time_does_not_move_watermark(self):
+        watermarks = FakeWatermarks()
+        db = FakeDB(mt5_sync_watermarks=watermarks, mt5_account_config=FakeConfigs())
+
+        service = MT5DealsSyncService()
+        service.db = db
+        service.watermarks = SyncWatermarkStore(db)
+        service.ingestion = SimpleNamespace(
+            ingest=lambda docs: asyncio.sleep(0, {'inserted': len(docs), 'updated': 0, 'unchanged': 0, 'errors': 0})
+        )
+
+        async def fetch(account_number, **kwargs):
+            return [_trade(5001, 1735725600), _trade(5002)]
+        service.fetch_account_trades = fetch
+
+        result = asyncio.run(service.sync_account_deals(886557, full_reconciliation=True))
+
+        watermark = watermarks.docs[886557]
+        assert result['success']
+        assert watermark['last_deal_time'] == datetime.fromtimestamp(1735725600, tz=timezone.utc)
+        assert watermark['last_ticket'] == 5001
+        assert watermark['last_sync_deal_count'] == 2
+        print("✅ Deals without a broker time are kept out of the watermark")
+
+    def _incremental_service(self, watermarks, fetch, ingest_stats):
+        db = FakeDB(mt5_sync_watermarks=watermarks, mt5_account_config=FakeConfigs())
+        service = MT5DealsSyncService()
+        service.db = db
+        service.watermarks = SyncWatermarkStore(db)
+        service.watermarks.needs_full_reconciliation = lambda watermark: False
+        service.ingestion = SimpleNamespace(ingest=lambda docs: asyncio.sleep(0, ingest_stats))
+        service._fetch_trades_page = fetch
+        return service
+
+    def test_fetch_failure_keeps_watermark(self):
+        watermarks = FakeWatermarks()
+        last_time = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        watermarks.docs[886557] = {'account': 886557, 'last_deal_time': last_time, 'last_ticket': 5001}
+
+        async def fetch_page(account_number, params):
+            return None  # bridge outage
+        service = self._incremental_service(watermarks, fetch_page, {})
+
+        result = asyncio.run(service.sync_account_deals(886557))
+
+        assert result['success'] is False
+        assert watermarks.docs[886557] == {'account': 886557, 'last_deal_time': last_time, 'last_ticket': 5001}
+        print("✅ A bridge outage is reported as a failed sync")
+
+    def test_failed_writes_keep_watermark(self):
+        watermarks = FakeWatermarks()
+        last_time = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        watermarks.docs[886557] = {'account': 886557, 'last_deal_time': last_time, 'last_ticket': 5001}
+
+        async def fetch_page(account_number, params):
+            return [_trade(5002, 1735725600)]
+        service = self._incremental_service(
+            watermarks, fetch_page, {'inserted': 0, 'updated': 0, 'unchanged': 0, 'errors': 1}
+        )
+
+        result = asyncio.run(service.sync_account_deals(886557))
+
+        assert result['success'] is False
+        assert watermarks.docs[886557]['last_ticket'] == 5001
+        print("✅ Failed deal writes do not move the watermark")
+
+    def test_delta_paging_stops_when_cursor_is_ignored(self):
+        full_page = [_trade(1000 + i, 1735725600 + i) for i in range(DELTA_PAGE_SIZE)]
+        calls = []
+
+        service = MT5DealsSyncService()
+
+        async def fetch_page(account_number, params):
+            calls.append(dict(params))
+            return full_page  # legacy bridge: same newest page regardless of cursor
+        service._fetch_trades_page = fetch_page
+
+        trades = asyncio.run(service.fetch_account_trades(886557, after_ticket=500))
+
+        assert len(calls) == 2
+        assert len(trades) == DELTA_PAGE_SIZE
+        print("✅ Delta paging stops once the page stops advancing")
+
+    def test_delta_paging_skips_page_behind_watermark(self):
+        service = MT5DealsSyncService()
+
+        async def fetch_page(account_number, params):
+            return [_trade(900, 1735725600)]
+        service._fetch_trades_page = fetch_page
+
+        trades = asyncio.run(service.fetch_account_trades(886557, after_ticket=900))
+
+        assert trades == []
+        print("✅ A page that does not pass the watermark is not ingested")
+
+
+class TestVikingMonitorWatermark:
+    """VIKING file monitor upload watermark unit tests"""
+
+    def test_failed_upload_keeps_last_ticket(self):
+        entries = [{'ticket': 11}, {'ticket': 12}]
+
+        new, synced, last = viking_file_monitor.upload_new_entries(None, entries, 10, lambda db, e: None)
+        assert new == entries
+        assert synced is None
+        assert last == 10
+
+        new, synced, last = viking_file_monitor.upload_new_entries(None, entries, 10, lambda db, e: len(e))
+        assert synced == 2
+        assert last == 12
+
+        new, synced, last = viking_file_monitor.upload_new_entries(None, entries, 12, lambda db, e: len(e))
+        assert new == []
+        assert last == 12
+        print("✅ last_trade_ticket only advances after a successful upload")
@@ -0,0 +1,96 @@
+"""
+Equity Curve Kernel Unit Tests
+Tests the NumPy equity-curve / drawdown kernel used by the risk engine
+
+Test Coverage:
+- deals_to_columns orders deals by time and nets swap/commission
+- equity_curve matches the reference running-peak loop
+- Drawdown episodes report peak/trough/recovery indices
+- 5,000-deal window runs in milliseconds
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.equity_curve import deals_to_columns, equity_curve
+
+
+def _reference_max_drawdown(pnls, initial):
+    """Original per-deal loop from calculate_max_drawdown"""
+    equity = peak = initial
+    max_dd_pct = 0.0
+    max_dd_amount = 0.0
+    for pnl in pnls:
+        equity += pnl
+        if equity > peak:
+            peak = equity
+        max_dd_amount = max(max_dd_amount, peak - equity)
+        dd_pct = ((peak - equity) / peak * 100) if peak > 0 else 0
+        max_dd_pct = max(max_dd_pct, dd_pct)
+    return max_dd_pct, max_dd_amount, peak, equity
+
+
+class TestEquityCurveKernel:
+    """Equity curve kernel unit tests"""
+
+    def _deals(self, pnls, start=datetime(2025, 1, 1, tzinfo=timezone.utc)):
+        return [
+            {"time": start + timedelta(minutes=i), "profit": p, "swap": 0, "commission": None,
+             "volume": 0.1, "symbol": "XAUUSD" if i % 2 else "EURUSD"}
+            for i, p in enumerate(pnls)
+        ]
+
+    def test_deals_to_columns_sorts_and_nets_costs(self):
+        t0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        deals = [
+            {"time": t0 + timedelta(hours=2), "profit": 10.0, "swap": -1.0, "commission": -2.0, "symbol": "XAUUSD"},
+            {"time": t0, "profit": -5.0, "symbol": "EURUSD"},
+        ]
+        columns = deals_to_columns(deals)
+
+        assert list(columns["index"]) == [1, 0]
+        assert list(columns["pnl"]) == [-5.0, 7.0]
+        assert columns["symbols"][columns["symbol_code"][0]] == "EURUSD"
+        print("✅ deals_to_columns orders by time and nets swap/commission")
+
+    def test_matches_reference_loop(self):
+        rng = random.Random(42)
+        pnls = [rng.uniform(-500, 480) for _ in range(2000)]
+        curve = equity_curve(deals_to_columns(self._deals(pnls))["pnl"], 100000)
+
+        ref_pct, ref_amount, ref_peak, ref_equity = _reference_max_drawdown(pnls, 100000)
+        assert abs(curve["max_drawdown"]["pct"] - ref_pct) < 1e-9
+        assert abs(curve["max_drawdown_amount"] - ref_amount) < 1e-6
+        assert abs(curve["final_peak"] - ref_peak) < 1e-6
+        assert abs(curve["final_equity"] - ref_equity) < 1e-6
+        print("✅ equity_curve matches the reference running-peak loop")
+
+    def test_drawdown_episodes(self):
+        # up, down, down, recover above peak, down (open episode)
+        curve = equity_curve([100, -50, -30, 200, -10], 1000)
+
+        episodes = curve["episodes"]
+        assert len(episodes) == 2
+        assert episodes[0]["peak_index"] == 0
+        assert episodes[0]["trough_index"] == 2
+        assert episodes[0]["recovery_index"] == 3
+        assert abs(episodes[0]["depth"] - 80) < 1e-9
+        assert episodes[1]["recovery_index"] is None
+        assert curve["max_drawdown"]["trough_index"] == 2
+        print("✅ Drawdown episodes report peak/trough/recovery indices")
+
+    def test_5000_deal_window_runs_in_milliseconds(self):
+        rng = random.Random(7)
+        deals = self._deals([rng.uniform(-300, 300) for _ in range(5000)])
+
+        started = time.perf_counter()
+        equity_curve(deals_to_columns(deals)["pnl"], 100000)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        assert elapsed_ms < 250, f"Kernel took {elapsed_ms:.1f}ms"
+        print(f"✅ 5,000-deal drawdown analysis in {elapsed_ms:.1f}ms")
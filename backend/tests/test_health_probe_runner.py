@@ -0,0 +1,111 @@
+"""
+Health Probe Runner Unit Tests
+Tests the concurrent health probes in health_service.check_all_components
+
+Test Coverage:
+- Probes run concurrently; total time is bounded by the slowest deadline
+- A probe that overruns its deadline is reported as "timeout"
+- A probe that raises is reported as "error" without failing the check
+- Alerts are checked for every component, concurrently
+- Latency histograms count every probe run
+"""
+
+import asyncio
+import os
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import health_service
+from health_service import ProbeLatencyHistograms
+
+
+def _probe(component, delay, status="healthy"):
+    async def probe(*args):
+        await asyncio.sleep(delay)
+        return {"component": component, "name": component, "status": status}
+    return probe
+
+
+def _failing_probe():
+    async def probe(*args):
+        raise RuntimeError("boom")
+    return probe
+
+
+class _FakeAlertService:
+    calls = []
+
+    def __init__(self, db):
+        pass
+
+    async def check_and_alert(self, component, name, status, data):
+        await asyncio.sleep(0.2)
+        _FakeAlertService.calls.append((component, status))
+
+
+class TestHealthProbeRunner:
+    """Concurrent health probe unit tests"""
+
+    def _patch(self, monkeypatch, slow_component=None, failing_component=None):
+        probes = {
+            "frontend": "check_frontend_health",
+            "backend": "check_backend_health",
+            "database": "check_database_health",
+            "mt5_bridge": "check_mt5_bridge_health",
+            "google_apis": "check_google_apis_health",
+            "github": "check_github_health",
+            "render_platform": "check_render_platform_health",
+        }
+        for component, func in probes.items():
+            if component == failing_component:
+                probe = _failing_probe()
+            else:
+                probe = _probe(component, 5.0 if component == slow_component else 0.2)
+            monkeypatch.setattr(health_service, func, probe)
+            monkeypatch.setenv(f"HEALTH_PROBE_DEADLINE_{component.upper()}", "0.5")
+
+        _FakeAlertService.calls = []
+        monkeypatch.setitem(sys.modules, "alert_service", types.SimpleNamespace(AlertService=_FakeAlertService))
+        monkeypatch.setattr(health_service, "probe_latency", ProbeLatencyHistograms())
+
+    def test_probes_run_concurrently_with_deadlines(self, monkeypatch):
+        self._patch(monkeypatch, slow_component="github", failing_component="database")
+
+        started = time.perf_counter()
+        result = asyncio.run(health_service.check_all_components(db=None))
+        elapsed = time.perf_counter() - started
+
+        statuses = {c["component"]: c["status"] for c in result["components"]}
+        assert statuses["github"] == "timeout"
+        assert statuses["database"] == "error"
+        assert statuses["frontend"] == "healthy"
+        assert [c["component"] for c in result["components"]][0] == "frontend"
+        assert result["overall_status"] == "critical"
+        # 7 probes x 0.2s + 7 alerts x 0.2s sequentially would be ~2.8s+
+        assert elapsed < 1.2, f"Health check took {elapsed:.2f}s"
+        print(f"✅ 7 probes + alerts completed in {elapsed:.2f}s with a 0.5s deadline")
+
+    def test_alerts_checked_for_every_component(self, monkeypatch):
+        self._patch(monkeypatch)
+
+        asyncio.run(health_service.check_all_components(db=None))
+
+        assert len(_FakeAlertService.calls) == 7
+        assert all(status == "healthy" for _, status in _FakeAlertService.calls)
+        print("✅ check_and_alert ran for all 7 components")
+
+    def test_latency_histograms(self, monkeypatch):
+        self._patch(monkeypatch, slow_component="github")
+
+        asyncio.run(health_service.check_all_components(db=None, trigger_alerts=False))
+        stats = health_service.probe_latency.snapshot()
+
+        assert stats["frontend"]["count"] == 1
+        assert stats["frontend"]["histogram"]["<=250ms"] == 1
+        assert stats["github"]["timeouts"] == 1
+        assert stats["github"]["histogram"]["<=500ms"] + stats["github"]["histogram"]["<=1000ms"] == 1
+        assert stats["github"]["deadline_seconds"] == 0.5
+        print("✅ Per-probe latency histograms recorded")
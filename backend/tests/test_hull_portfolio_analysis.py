@@ -0,0 +1,181 @@
+"""
+Hull Risk Engine Portfolio Analysis Unit Tests
+Tests the batch copy-ratio scoring behind /admin/risk-engine/copy-ratio-all
+
+Test Coverage:
+- analyze_portfolio returns the same payload as per-account analyze_copy_ratio
+- Accounts and risk policies are loaded with one bulk query each
+- get_risk_policies keeps account > global > default precedence
+- Missing accounts come back as per-account errors, in input order
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.hull_risk_engine import DEFAULT_RISK_POLICY, HullRiskEngine
+
+
+class _AsyncCursor:
+    def __init__(self, rows):
+        self._rows = list(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._rows:
+            raise StopAsyncIteration
+        return self._rows.pop(0)
+
+    async def to_list(self, length=None):
+        return self._rows[:length]
+
+
+class FakeAccounts:
+    def __init__(self, docs):
+        self.docs = {doc["account"]: doc for doc in docs}
+        self.find_calls = 0
+        self.find_one_calls = 0
+
+    def find(self, query, projection=None):
+        self.find_calls += 1
+        wanted = query["account"]["$in"]
+        return _AsyncCursor(dict(self.docs[a]) for a in wanted if a in self.docs)
+
+    async def find_one(self, query, projection=None):
+        self.find_one_calls += 1
+        doc = self.docs.get(query["account"])
+        return dict(doc) if doc else None
+
+
+class FakePolicies:
+    def __init__(self, docs):
+        self.docs = docs
+        self.find_calls = 0
+
+    def find(self, query):
+        self.find_calls += 1
+        accounts = set(query["$or"][0]["account"]["$in"])
+        return _AsyncCursor(
+            dict(d) for d in self.docs
+            if d.get("account") in accounts or (d.get("account") is None and d.get("is_global"))
+        )
+
+    async def find_one(self, query):
+        for doc in self.docs:
+            if query.get("account") is None:
+                if doc.get("account") is None and doc.get("is_global"):
+                    return dict(doc)
+            elif doc.get("account") == query["account"]:
+                return dict(doc)
+        return None
+
+
+class FakeSpecs:
+    def find(self, query):
+        return _AsyncCursor([])
+
+
+class FakeDealStore:
+    def __init__(self, deals_by_account):
+        self.deals_by_account = deals_by_account
+
+    async def get(self, db, account, start_date=None, max_deals=5000, account_doc=None):
+        return SimpleNamespace(deals=list(self.deals_by_account.get(account, [])), collection="mt5_deals")
+
+
+def _deals(volumes, symbol="XAUUSD"):
+    t0 = datetime.now(timezone.utc) - timedelta(days=5)
+    return [
+        {"ticket": i, "time": t0 + timedelta(hours=i), "symbol": symbol, "volume": v, "profit": 10.0}
+        for i, v in enumerate(volumes)
+    ]
+
+
+def _engine():
+    accounts = [
+        {"account": 1001, "manager_name": "Alpha", "equity": 10000, "initial_allocation": 10000,
+         "notes": "running at 0.5 ratio", "account_type": "real"},
+        {"account": 1002, "manager_name": "Beta", "equity": 50000, "initial_allocation": 50000,
+         "notes": "", "account_type": "live_demo"},
+        {"account": 1003, "manager_name": "Gamma", "equity": 20000, "initial_allocation": 20000,
+         "notes": "", "account_type": "real"},
+    ]
+    policies = [
+        {"account": None, "is_global": True, "max_risk_per_trade_pct": 2.0},
+        {"account": 1002, "is_global": False, "max_risk_per_trade_pct": 0.5, "leverage": None},
+    ]
+    db = SimpleNamespace(
+        mt5_accounts=FakeAccounts(accounts),
+        risk_policies=FakePolicies(policies),
+        instrument_specs=FakeSpecs(),
+    )
+    engine = HullRiskEngine(db)
+    engine.spec_cache.invalidate()
+    engine.deal_store = FakeDealStore({
+        1001: _deals([0.5, 3.0, 8.0, 0.2]),
+        1002: _deals([1.0, 2.5, 12.0], symbol="US30.ecn"),
+        1003: [],
+    })
+    return engine, db
+
+
+def _strip_timestamp(analysis):
+    return {k: v for k, v in analysis.items() if k != "analysis_timestamp"}
+
+
+class TestHullPortfolioAnalysis:
+    """Batch copy ratio analysis unit tests"""
+
+    def test_matches_per_account_analysis(self):
+        engine, db = _engine()
+
+        async def run():
+            single = [await engine.analyze_copy_ratio(a, 30, skip_risk_score=True) for a in (1001, 1002, 1003)]
+            batch = await engine.analyze_portfolio([1001, 1002, 1003], 30)
+            return single, batch
+
+        single, batch = asyncio.run(run())
+
+        assert [_strip_timestamp(a) for a in batch] == [_strip_timestamp(a) for a in single]
+        assert batch[0]["current_copy_ratio"] == 0.5
+        assert batch[0]["lot_analysis"]["trades_with_breaches"] > 0
+        assert batch[2]["action"] == "MAINTAIN"
+        print("✅ analyze_portfolio matches per-account analyze_copy_ratio")
+
+    def test_bulk_loads_accounts_and_policies(self):
+        engine, db = _engine()
+        docs = [dict(d) for d in db.mt5_accounts.docs.values()][:2]
+
+        results = asyncio.run(engine.analyze_portfolio(docs + [1003], 30))
+
+        assert [r["account"] for r in results] == [1001, 1002, 1003]
+        assert db.mt5_accounts.find_calls == 1  # only 1003 needed loading
+        assert db.mt5_accounts.find_one_calls == 0
+        assert db.risk_policies.find_calls == 1
+        print("✅ Accounts and risk policies loaded with one query each")
+
+    def test_risk_policy_precedence(self):
+        engine, db = _engine()
+
+        policies = asyncio.run(engine.get_risk_policies([1001, 1002]))
+
+        assert policies[1001]["max_risk_per_trade_pct"] == 2.0  # global
+        assert policies[1002]["max_risk_per_trade_pct"] == 0.5  # account
+        assert policies[1002]["leverage"] == DEFAULT_RISK_POLICY["leverage"]  # None never overrides
+        assert policies[1002] == asyncio.run(engine.get_risk_policy(1002))
+        print("✅ get_risk_policies keeps account > global > default precedence")
+
+    def test_missing_account_is_reported_in_place(self):
+        engine, db = _engine()
+
+        results = asyncio.run(engine.analyze_portfolio([9999, 1001], 30))
+
+        assert results[0] == {"error": "Account 9999 not found", "account": 9999}
+        assert results[1]["account"] == 1001
+        print("✅ Missing accounts are returned as per-account errors")
@@ -0,0 +1,265 @@
+"""
+Job Queue Unit Tests
+Tests the Mongo-backed background job queue for long-running admin operations
+
+Test Coverage:
+- Identical queued/running jobs are deduplicated; finished ones are not
+- Workers run jobs, record progress and store the result
+- Cancelling a queued job and cooperatively stopping a running one
+- Exceptions and success=False results mark the job failed
+- Two workers sharing the queue run each job exactly once
+"""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.job_queue import JobQueue
+
+
+def _matches(doc, query):
+    for field, cond in query.items():
+        value = doc.get(field)
+        if isinstance(cond, dict):
+            for op, arg in cond.items():
+                if op == '$in' and value not in arg:
+                    return False
+                if op == '$lt' and not (value is not None and value < arg):
+                    return False
+        elif value != cond:
+            return False
+    return True
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, field, direction=1):
+        self._docs.sort(key=lambda d: d.get(field), reverse=direction == -1)
+        return self
+
+    def limit(self, n):
+        self._docs = self._docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        return self._docs
+
+
+class FakeJobs:
+    """jobs collection with atomic updates and the unique active_key index"""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def create_index(self, keys, **kwargs):
+        pass
+
+    def _apply(self, doc, update):
+        doc.update(update.get('$set', {}))
+        for field in update.get('$unset', {}):
+            doc.pop(field, None)
+
+    def _first(self, query, sort=None):
+        docs = [d for d in self.docs.values() if _matches(d, query)]
+        if sort:
+            docs.sort(key=lambda d: d.get(sort[0][0]))
+        return docs[0] if docs else None
+
+    async def insert_one(self, doc):
+        await asyncio.sleep(0)
+        if any(d.get('active_key') == doc['active_key'] for d in self.docs.values()):
+            raise DuplicateKeyError('E11000 duplicate key error: active_key')
+        self.docs[doc['_id']] = dict(doc)
+
+    async def find_one(self, query, projection=None):
+        doc = self._first(query)
+        return dict(doc) if doc else None
+
+    async def find_one_and_update(self, query, update, sort=None, projection=None, return_document=None):
+        await asyncio.sleep(0)  # let other workers interleave
+        doc = self._first(query, sort)
+        if doc is None:
+            return None
+        self._apply(doc, update)
+        return dict(doc)
+
+    async def update_one(self, query, update):
+        doc = self._first(query)
+        if doc:
+            self._apply(doc, update)
+
+    async def update_many(self, query, update):
+        docs = [d for d in self.docs.values() if _matches(d, query)]
+        for doc in docs:
+            self._apply(doc, update)
+        return SimpleNamespace(modified_count=len(docs))
+
+    def find(self, query, projection=None):
+        return _Cursor([dict(d) for d in self.docs.values() if _matches(d, query)])
+
+
+class FakeDB(dict):
+    def __init__(self):
+        super().__init__(jobs=FakeJobs())
+
+
+async def _wait_finished(queue, job_id, timeout=2.0):
+    for _ in range(int(timeout / 0.01)):
+        job = await queue.get(job_id)
+        if job['status'] in ('completed', 'failed', 'cancelled'):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+class TestJobQueue:
+    """Job queue unit tests"""
+
+    def test_identical_jobs_deduplicated(self):
+        queue = JobQueue(FakeDB())
+
+        @queue.handler('rebates.calculate')
+        async def calculate(job, start_date, end_date):
+            return {'success': True}
+
+        async def run():
+            first = await queue.enqueue('rebates.calculate', {'start_date': '2025-10-01', 'end_date': '2025-10-31'})
+            again = await queue.enqueue('rebates.calculate', {'end_date': '2025-10-31', 'start_date': '2025-10-01'})
+            other = await queue.enqueue('rebates.calculate', {'start_date': '2025-11-01', 'end_date': '2025-11-30'})
+            with pytest.raises(ValueError):
+                await queue.enqueue('unknown.job')
+            return first, again, other
+
+        first, again, other = asyncio.run(run())
+
+        assert again['job_id'] == first['job_id'] and again['deduplicated']
+        assert other['job_id'] != first['job_id']
+        assert first['status'] == 'queued' and first['status_url'] == f"/api/jobs/{first['job_id']}"
+        assert queue.get_stats()['deduplicated'] == 1
+        print("✅ Identical queued jobs share one job id")
+
+    def test_worker_runs_job_with_progress(self):
+        queue = JobQueue(FakeDB(), poll_seconds=0.01)
+        seen_progress = []
+
+        @queue.handler('mt5_deals.sync')
+        async def sync(job, full=False):
+            for pct in (25, 50, 75):
+                await job.progress(pct, f"step {pct}")
+                seen_progress.append((await queue.get(job.job_id))['progress'])
+            return {'success': True, 'total_deals_synced': 12, 'full': full}
+
+        async def run():
+            await queue.start()
+            job = await queue.enqueue('mt5_deals.sync', {'full': True})
+            finished = await _wait_finished(queue, job['job_id'])
+            # Finished jobs release their dedupe slot
+            rerun = await queue.enqueue('mt5_deals.sync', {'full': True})
+            await _wait_finished(queue, rerun['job_id'])
+            await queue.stop()
+            return job, finished, rerun
+
+        job, finished, rerun = asyncio.run(run())
+
+        assert finished['status'] == 'completed' and finished['progress'] == 100
+        assert finished['result'] == {'success': True, 'total_deals_synced': 12, 'full': True}
+        assert seen_progress[:3] == [25, 50, 75]
+        assert finished['duration_seconds'] is not None
+        assert rerun['job_id'] != job['job_id'] and not rerun['deduplicated']
+        print("✅ Job ran in the background with progress and a stored result")
+
+    def test_cancel_queued_and_running(self):
+        queue = JobQueue(FakeDB(), poll_seconds=0.01)
+        steps = []
+
+        @queue.handler('viking.calculate_analytics')
+        async def analytics(job, strategy):
+            for step in range(100):
+                steps.append(step)
+                await job.progress(step)
+                await asyncio.sleep(0.01)
+            return {'success': True}
+
+        async def run():
+            queued = await queue.enqueue('viking.calculate_analytics', {'strategy': 'CORE'})
+            cancelled_queued = await queue.cancel(queued['job_id'])
+
+            await queue.start()
+            running = await queue.enqueue('viking.calculate_analytics', {'strategy': 'PRO'})
+            while not steps:
+                await asyncio.sleep(0.01)
+            requested = await queue.cancel(running['job_id'])
+            finished = await _wait_finished(queue, running['job_id'])
+            await queue.stop()
+            return cancelled_queued, requested, finished
+
+        cancelled_queued, requested, finished = asyncio.run(run())
+
+        assert cancelled_queued['status'] == 'cancelled'
+        assert requested['status'] == 'running' and requested['cancel_requested']
+        assert finished['status'] == 'cancelled'
+        assert len(steps) < 100
+        print(f"✅ Queued job cancelled outright, running job stopped after {len(steps)} steps")
+
+    def test_failures_recorded(self):
+        queue = JobQueue(FakeDB(), poll_seconds=0.01)
+
+        @queue.handler('performance_fees.finalize')
+        async def finalize(job, year, month):
+            raise RuntimeError("money_managers unavailable")
+
+        @queue.handler('rebates.calculate')
+        async def calculate(job):
+            return {'success': False, 'message': 'No accounts with rebate tracking enabled'}
+
+        async def run():
+            await queue.start()
+            crashed = await queue.enqueue('performance_fees.finalize', {'year': 2025, 'month': 10})
+            reported = await queue.enqueue('rebates.calculate')
+            results = (await _wait_finished(queue, crashed['job_id']),
+                       await _wait_finished(queue, reported['job_id']))
+            await queue.stop()
+            return results
+
+        crashed, reported = asyncio.run(run())
+
+        assert crashed['status'] == 'failed' and crashed['error'] == 'money_managers unavailable'
+        assert reported['status'] == 'failed' and reported['error'] == 'No accounts with rebate tracking enabled'
+        assert reported['result']['success'] is False
+        print("✅ Exceptions and success=False results mark the job failed")
+
+    def test_shared_queue_runs_each_job_once(self):
+        db = FakeDB()
+        runs = []
+        workers = [JobQueue(db, owner=f"worker-{i}", concurrency=2, poll_seconds=0.01) for i in range(2)]
+
+        for queue in workers:
+            @queue.handler('mt5_deals.sync')
+            async def sync(job, account_number, _owner=queue.owner):
+                runs.append((account_number, _owner))
+                await asyncio.sleep(0.02)
+                return {'success': True}
+
+        async def run():
+            for queue in workers:
+                await queue.start()
+            jobs = [await workers[i % 2].enqueue('mt5_deals.sync', {'account_number': n}) for i, n in enumerate(range(10))]
+            finished = [await _wait_finished(workers[0], j['job_id']) for j in jobs]
+            for queue in workers:
+                await queue.stop()
+            return finished
+
+        finished = asyncio.run(run())
+
+        assert all(job['status'] == 'completed' for job in finished)
+        assert sorted(n for n, _ in runs) == list(range(10))
+        assert {owner for _, owner in runs} == {'worker-0', 'worker-1'}
+        print("✅ 10 jobs ran exactly once across 2 workers")
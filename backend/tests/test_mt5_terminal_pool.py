@@ -0,0 +1,105 @@
+"""
+MT5 Terminal Pool Unit Tests
+Tests the multi-terminal bridge supervisor (vps-scripts/mt5_bridge_api_service_multi_terminal.py)
+against the fake MetaTrader5 module (vps-scripts/fake_mt5.py)
+
+Test Coverage:
+- One worker process per terminal; terminals sync in parallel
+- Snapshots from all terminals are merged into one bulk_write
+- A worker that crashes mid-sync is restarted and syncs on the next cycle
+- Per-terminal throughput metrics are recorded
+"""
+
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'vps-scripts'))
+
+from mt5_bridge_api_service_multi_terminal import MT5BridgeMultiTerminal
+
+TERMINALS = {
+    'Broker-A': {'path': '/fake/a/terminal64.exe', 'broker': 'Broker A', 'description': ''},
+    'Broker-B': {'path': '/fake/b/terminal64.exe', 'broker': 'Broker B', 'description': ''},
+}
+
+CONFIGS = [
+    {'account': 1001, 'server': 'Broker-A', 'password': 'x', 'is_active': True},
+    {'account': 1002, 'server': 'Broker-A', 'password': 'x', 'is_active': True},
+    {'account': 2001, 'server': 'Broker-B', 'password': 'x', 'is_active': True},
+    {'account': 2002, 'server': 'Broker-B', 'password': 'x', 'is_active': True},
+]
+
+
+class FakeCollection:
+    def __init__(self, rows=None):
+        self.rows = rows or []
+        self.bulk_calls = []
+
+    def find(self, query):
+        return [dict(r) for r in self.rows]
+
+    def bulk_write(self, operations, ordered=True):
+        self.bulk_calls.append(operations)
+        return SimpleNamespace(matched_count=len(operations))
+
+
+def _bridge():
+    db = SimpleNamespace(
+        mt5_account_config=FakeCollection(CONFIGS),
+        mt5_accounts=FakeCollection(),
+        mt5_terminal_pool_metrics=FakeCollection()
+    )
+    return MT5BridgeMultiTerminal(db=db, mt5_module='fake_mt5', terminals=TERMINALS), db
+
+
+class TestMT5TerminalPool:
+    """Multi-terminal process pool unit tests"""
+
+    def test_terminals_sync_in_parallel(self, monkeypatch):
+        monkeypatch.setenv('MT5_ACCOUNT_DELAY', '0')
+        monkeypatch.setenv('FAKE_MT5_LOGIN_LATENCY', '0.5')
+        bridge, db = _bridge()
+        try:
+            bridge.sync_all_accounts()  # warm-up: spawns the workers
+            started = time.perf_counter()
+            merged = bridge.sync_all_accounts()
+            elapsed = time.perf_counter() - started
+
+            assert sorted(merged) == [1001, 1002, 2001, 2002]
+            assert merged[2001]['server'] == 'Broker-B'
+            assert merged[1001]['balance'] == 2001.0
+            # 4 logins x 0.5s one terminal after another would take 2s+
+            assert elapsed < 1.7, f"Cycle took {elapsed:.2f}s"
+            assert len(db.mt5_accounts.bulk_calls) == 2 and len(db.mt5_accounts.bulk_calls[1]) == 4
+
+            pids = {m['pid'] for m in bridge.get_metrics()}
+            assert len(pids) == 2 and os.getpid() not in pids
+            metrics = {m['server']: m for m in bridge.get_metrics()}
+            assert metrics['Broker-A']['accounts_synced'] == 4
+            assert metrics['Broker-A']['accounts_per_second'] > 1
+            print(f"✅ 2 terminals x 2 accounts synced in parallel in {elapsed:.2f}s")
+        finally:
+            bridge.shutdown()
+
+    def test_crashed_worker_is_restarted(self, monkeypatch, tmp_path):
+        monkeypatch.setenv('MT5_ACCOUNT_DELAY', '0')
+        monkeypatch.setenv('FAKE_MT5_CRASH_ACCOUNT', '2002')
+        monkeypatch.setenv('FAKE_MT5_CRASH_MARKER', str(tmp_path / 'crashed'))
+        bridge, db = _bridge()
+        try:
+            first = bridge.sync_all_accounts()
+            assert sorted(first) == [1001, 1002]  # Broker-B died mid-sync
+
+            second = bridge.sync_all_accounts()
+            assert sorted(second) == [1001, 1002, 2001, 2002]
+
+            metrics = {m['server']: m for m in bridge.get_metrics()}
+            assert metrics['Broker-B']['restarts'] == 1
+            assert metrics['Broker-B']['accounts_failed'] == 2
+            assert metrics['Broker-A']['restarts'] == 0
+            assert len(db.mt5_terminal_pool_metrics.bulk_calls) == 2
+            print("✅ Crashed terminal worker restarted; next cycle synced every account")
+        finally:
+            bridge.shutdown()
@@ -0,0 +1,152 @@
+"""
+MT5 Terminal Worker Unit Tests
+Tests the session-aware job scheduling and the live snapshot store in
+vps/mt5_bridge_api_service.py against the fake MetaTrader5 module
+(vps-scripts/fake_mt5.py)
+
+Test Coverage:
+- Jobs for the logged-in account are batched under one login
+- MT5_WORKER_MAX_AFFINITY hands the session to a waiting account
+  (the logged-in account cannot starve the others)
+- The snapshot ETag only changes when account data changes
+- A refresh cycle keeps at most MT5_SNAPSHOT_CONCURRENCY jobs queued
+"""
+
+import asyncio
+import importlib
+import importlib.util
+import logging
+import os
+import sys
+from unittest import mock
+
+VPS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'vps')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'vps-scripts'))
+
+sys.modules.setdefault('MetaTrader5', importlib.import_module('fake_mt5'))
+os.environ.setdefault('MONGODB_URI', 'mongodb://127.0.0.1:1/fidus_test')
+
+
+class _NoMongo:
+    def __init__(self, *args, **kwargs):
+        raise ConnectionError("no MongoDB in unit tests")
+
+
+def _load_bridge():
+    spec = importlib.util.spec_from_file_location(
+        'mt5_bridge_api_service', os.path.join(VPS_DIR, 'mt5_bridge_api_service.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    with mock.patch('pymongo.MongoClient', _NoMongo), \
+            mock.patch('logging.FileHandler', lambda *args, **kwargs: logging.NullHandler()):
+        spec.loader.exec_module(module)
+    return module
+
+
+bridge = _load_bridge()
+
+
+def _worker(current_login=None):
+    worker = bridge.MT5TerminalWorker(path='/fake/terminal64.exe', server='Fake-Server')
+    worker._running = True
+    worker._initialize()
+    worker.current_login = current_login
+    return worker
+
+
+class TestMT5TerminalWorker:
+    """Terminal worker scheduling unit tests"""
+
+    def test_burst_runs_under_one_login(self):
+        worker = _worker()
+        futures = [worker.submit(lambda: 'ok', account=1001, password='x') for _ in range(5)]
+
+        account, jobs = worker._take_batch()
+        worker._run_batch(account, jobs)
+
+        assert account == 1001
+        assert [f.result() for f in futures] == ['ok'] * 5
+        assert worker.stats['logins'] == 1
+        assert worker.stats['logins_saved'] == 4
+        print("✅ A burst for one account runs under a single login")
+
+    def test_affinity_cap_prevents_starvation(self):
+        worker = _worker(current_login=1001)
+        for _ in range(bridge.MT5_WORKER_MAX_BATCH * (bridge.MT5_WORKER_MAX_AFFINITY + 5)):
+            worker.submit(lambda: None, account=1001)
+        worker.submit(lambda: None, account=1002)
+
+        order = []
+        while worker._pending:
+            account, _ = worker._take_batch()
+            order.append(account)
+            if account == 1002:
+                break
+
+        assert order[-1] == 1002
+        assert len(order) == bridge.MT5_WORKER_MAX_AFFINITY + 1
+        print(f"✅ Waiting account served after {len(order) - 1} affinity batches")
+
+    def test_current_login_keeps_session_when_alone(self):
+        worker = _worker(current_login=1001)
+        worker._affinity_streak = bridge.MT5_WORKER_MAX_AFFINITY
+        worker.submit(lambda: None, account=1001)
+
+        account, _ = worker._take_batch()
+
+        assert account == 1001
+        print("✅ The logged-in account keeps the session when nobody else is queued")
+
+
+class _FakeWorker:
+    """Terminal worker stand-in that records how many jobs are in flight"""
+
+    def __init__(self, equity=1000.0):
+        self.equity = equity
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.timeouts = []
+
+    async def run(self, func, account=None, password=None, timeout=None):
+        self.timeouts.append(timeout)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return {"balance": 1000.0, "equity": self.equity, "positions": [], "last_deal_ticket": 7, "new_deals": []}
+
+
+class TestAccountSnapshotStore:
+    """Live snapshot store unit tests"""
+
+    def _store(self, monkeypatch, worker, accounts=3):
+        configs = [{'account': 1000 + i, 'password': 'x'} for i in range(accounts)]
+        monkeypatch.setattr(bridge, 'mt5_worker', worker)
+        store = bridge.AccountSnapshotStore()
+        monkeypatch.setattr(store, '_load_accounts', lambda: configs)
+        return store
+
+    def test_etag_ignores_refreshed_at(self, monkeypatch):
+        worker = _FakeWorker()
+        store = self._store(monkeypatch, worker)
+
+        asyncio.run(store.refresh_all())
+        first = store.etag
+        asyncio.run(store.refresh_all())
+        assert store.etag == first
+
+        worker.equity = 1010.0
+        asyncio.run(store.refresh_all())
+        assert store.etag != first
+        print("✅ ETag only changes when account data changes")
+
+    def test_refresh_bounds_queued_jobs(self, monkeypatch):
+        worker = _FakeWorker()
+        store = self._store(monkeypatch, worker, accounts=10)
+
+        cycle = asyncio.run(store.refresh_all())
+
+        assert cycle['refreshed'] == 10
+        assert worker.max_in_flight <= bridge.MT5_SNAPSHOT_CONCURRENCY
+        assert set(worker.timeouts) == {bridge.MT5_SNAPSHOT_ACCOUNT_TIMEOUT}
+        print(f"✅ At most {worker.max_in_flight} account jobs queued per refresh cycle")
@@ -0,0 +1,379 @@
+"""
+Multi-Worker State Tests
+Simulates several Uvicorn workers sharing one database
+
+Each "worker" gets its own JobLeaseManager / SharedStateStore / cache
+instances (own owner id, own local cache) over the same collections, the way
+separate processes would see one MongoDB.
+
+Test Coverage:
+- A scheduled job fired in every worker runs exactly once per tick
+- A crashed lease holder is replaced once its lease expires
+- An on-demand run is skipped while the job runs in any worker, including
+  its own, and hands the lease back when it finishes
+- A finished scheduled run that shares the lease does not block on-demand runs
+- Monitoring loops only run in the lease holder
+- State written by one worker is visible to the others
+- Conditional updates and pop() let only one worker apply a transition
+- A response cache tag bumped in one worker invalidates the entries of another
+- Deals ingested in one worker drop the other worker's memoized deals
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+
+from pymongo.errors import DuplicateKeyError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.deal_store import DealStore
+from services.job_lease import JobLeaseManager
+from services.response_cache import ResponseCache
+from services.shared_state import SharedStateStore, SharedVersions
+
+
+def _aware(value):
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _get(doc, path):
+    value = doc
+    for part in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _matches(doc, query):
+    for field, cond in query.items():
+        if field == '$or':
+            if not any(_matches(doc, sub) for sub in cond):
+                return False
+            continue
+        value = _aware(_get(doc, field))
+        if isinstance(cond, dict):
+            for op, arg in cond.items():
+                if value is None:
+                    return False
+                if op == '$lte' and not value <= arg:
+                    return False
+                if op == '$gt' and not value > arg:
+                    return False
+        elif value != cond:
+            return False
+    return True
+
+
+def _set(doc, path, value):
+    parts = path.split('.')
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, *args):
+        return self
+
+    async def to_list(self, length=None):
+        return self._docs
+
+
+class _Result:
+    def __init__(self, deleted_count=0):
+        self.deleted_count = deleted_count
+
+
+class FakeCollection:
+    """Shared collection with MongoDB's atomic single-document semantics and unique _id"""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def create_index(self, keys, **kwargs):
+        pass
+
+    def _apply(self, doc, update, inserting):
+        for path, value in update.get('$set', {}).items():
+            _set(doc, path, value)
+        for path, value in update.get('$inc', {}).items():
+            _set(doc, path, (_get(doc, path) or 0) + value)
+        if inserting:
+            for path, value in update.get('$setOnInsert', {}).items():
+                _set(doc, path, value)
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        await asyncio.sleep(0)  # let other workers interleave
+        doc = next((d for d in self.docs.values() if _matches(d, query)), None)
+        if doc is None:
+            if not upsert:
+                return None
+            if query['_id'] in self.docs:
+                raise DuplicateKeyError('E11000 duplicate key error')
+            doc = self.docs[query['_id']] = {'_id': query['_id']}
+            self._apply(doc, update, inserting=True)
+        else:
+            self._apply(doc, update, inserting=False)
+        return dict(doc)
+
+    async def update_one(self, query, update, upsert=False):
+        await asyncio.sleep(0)
+        doc = next((d for d in self.docs.values() if _matches(d, query)), None)
+        if doc is None and upsert:
+            doc = self.docs[query['_id']] = {'_id': query['_id']}
+            self._apply(doc, update, inserting=True)
+        elif doc is not None:
+            self._apply(doc, update, inserting=False)
+
+    async def find_one(self, query, projection=None):
+        await asyncio.sleep(0)
+        doc = next((d for d in self.docs.values() if _matches(d, query)), None)
+        return dict(doc) if doc else None
+
+    async def find_one_and_delete(self, query):
+        await asyncio.sleep(0)
+        doc = next((d for d in self.docs.values() if _matches(d, query)), None)
+        if doc:
+            del self.docs[doc['_id']]
+        return doc
+
+    async def delete_one(self, query):
+        doc = next((d for d in self.docs.values() if _matches(d, query)), None)
+        if doc:
+            del self.docs[doc['_id']]
+        return _Result(1 if doc else 0)
+
+    def find(self, query, projection=None):
+        return _Cursor([dict(d) for d in self.docs.values() if _matches(d, query)])
+
+
+class FakeDB(dict):
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+
+class TestJobLeases:
+    """Scheduled jobs run in exactly one worker"""
+
+    def test_job_runs_once_across_workers(self):
+        db = FakeDB()
+        workers = [JobLeaseManager(db, owner=f"worker-{i}") for i in range(4)]
+        runs = []
+
+        async def vps_sync(worker):
+            runs.append(worker.owner)
+            await asyncio.sleep(0.02)
+            return worker.owner
+
+        async def run():
+            # The same cron tick fires in every worker at once
+            first = await asyncio.gather(*[
+                w.run_exclusive('auto_vps_sync', 60, vps_sync, w) for w in workers
+            ])
+            # A late duplicate of the same tick is skipped while the lease lasts
+            late = await workers[3].run_exclusive('auto_vps_sync', 60, vps_sync, workers[3])
+            return first, late
+
+        first, late = asyncio.run(run())
+
+        assert len(runs) == 1
+        assert [r for r in first if r is not None] == runs
+        assert late is None
+        assert db['scheduler_leases'].docs['auto_vps_sync']['runs'] == 1
+        assert sum(w.get_stats()['skipped'].get('auto_vps_sync', 0) for w in workers) == 4
+        print(f"✅ 4 workers fired the job, only {runs[0]} ran it")
+
+    def test_expired_lease_is_taken_over(self):
+        db = FakeDB()
+        crashed, standby = JobLeaseManager(db, owner='worker-a'), JobLeaseManager(db, owner='worker-b')
+
+        async def run():
+            assert await crashed.acquire('mt5_deals_sync', 0.05)
+            blocked = await standby.acquire('mt5_deals_sync', 0.05)
+            await asyncio.sleep(0.06)  # worker-a never renews
+            return blocked, await standby.acquire('mt5_deals_sync', 0.05)
+
+        blocked, taken = asyncio.run(run())
+
+        assert not blocked and taken
+        assert db['scheduler_leases'].docs['mt5_deals_sync']['owner'] == 'worker-b'
+        print("✅ Standby worker took over an expired lease")
+
+    def test_on_demand_run_skipped_while_job_runs(self):
+        db = FakeDB()
+        worker_a, worker_b = JobLeaseManager(db, owner='worker-a'), JobLeaseManager(db, owner='worker-b')
+        started = asyncio.Event()
+
+        async def scheduled_sync():
+            started.set()
+            await asyncio.sleep(0.05)
+            return 'scheduled'
+
+        async def admin_sync():
+            return 'admin'
+
+        async def run():
+            scheduled = asyncio.create_task(worker_a.run_exclusive('mt5_deals_sync', 60, scheduled_sync))
+            await started.wait()
+            same_worker = await worker_a.run_exclusive('mt5_deals_sync', 60, admin_sync, release=True)
+            other_worker = await worker_b.run_exclusive('mt5_deals_sync', 60, admin_sync, release=True)
+            await scheduled
+            await worker_a.release('mt5_deals_sync')
+            admin = await worker_b.run_exclusive('mt5_deals_sync', 60, admin_sync, release=True)
+            after_admin = await worker_a.acquire('mt5_deals_sync', 60)
+            return same_worker, other_worker, admin, after_admin
+
+        same_worker, other_worker, admin, after_admin = asyncio.run(run())
+
+        assert same_worker is None and other_worker is None
+        assert admin == 'admin'
+        assert after_admin  # released as soon as the on-demand run finished
+        print("✅ On-demand sync skipped while running, lease handed back afterwards")
+
+    def test_finished_scheduled_run_does_not_block_on_demand_run(self):
+        db = FakeDB()
+        worker_a, worker_b = JobLeaseManager(db, owner='worker-a'), JobLeaseManager(db, owner='worker-b')
+
+        @worker_a.exclusive('mt5_deals_sync', 60, release=True)
+        async def scheduled_sync():
+            return 'scheduled'
+
+        async def admin_sync():
+            return 'admin'
+
+        async def run():
+            scheduled = await scheduled_sync()
+            admin = await worker_b.run_exclusive('mt5_deals_sync', 60, admin_sync, release=True)
+            return scheduled, admin
+
+        assert asyncio.run(run()) == ('scheduled', 'admin')
+        print("✅ A finished scheduled sync hands the lease back")
+
+    def test_monitoring_loop_runs_in_one_worker(self):
+        from services.bridge_monitoring_service import BridgeMonitoringService
+
+        db = FakeDB()
+        checks = []
+
+        class Monitor(BridgeMonitoringService):
+            async def check_all_bridges(self):
+                checks.append(self.job_leases.owner)
+
+        monitors = [Monitor(db, JobLeaseManager(db, owner=f"worker-{i}")) for i in range(3)]
+        for monitor in monitors:
+            monitor.check_interval_seconds = 0.01
+
+        async def run():
+            tasks = [asyncio.create_task(m.start_monitoring()) for m in monitors]
+            await asyncio.sleep(0.1)
+            for m in monitors:
+                await m.stop_monitoring()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+
+        assert checks and len(set(checks)) == 1
+        print(f"✅ {len(checks)} bridge checks, all in {checks[0]}")
+
+
+class TestSharedState:
+    """Module-level state moved to shared stores"""
+
+    def test_state_visible_across_workers(self):
+        db = FakeDB()
+        worker_a = SharedStateStore(db, 'state_oauth', ttl_seconds=600, cache_seconds=0)
+        worker_b = SharedStateStore(db, 'state_oauth', ttl_seconds=600, cache_seconds=0)
+
+        async def run():
+            await worker_a.set('state-123', {'user_id': 'admin_001'})
+            seen = await worker_b.contains('state-123')
+            consumed = await asyncio.gather(worker_a.pop('state-123'), worker_b.pop('state-123'))
+            return seen, consumed
+
+        seen, consumed = asyncio.run(run())
+
+        assert seen
+        assert [c for c in consumed if c is not None] == [{'user_id': 'admin_001'}]
+        print("✅ OAuth state written by one worker was consumed exactly once")
+
+    def test_conditional_update_applies_once(self):
+        db = FakeDB()
+        workers = [SharedStateStore(db, 'state_redemption_requests') for _ in range(3)]
+
+        async def run():
+            await workers[0].set('red-1', {'id': 'red-1', 'status': 'pending', 'amount': 1000.0})
+            cached = await workers[1].get('red-1')  # worker 1 caches the pending request
+            approved = await asyncio.gather(*[
+                w.update('red-1', {'status': 'approved'}, expected={'status': 'pending'}) for w in workers
+            ])
+            return cached, approved, await workers[1].get('red-1')
+
+        cached, approved, after = asyncio.run(run())
+
+        assert cached['status'] == 'pending'
+        assert approved.count(True) == 1
+        assert after['status'] == 'approved' and after['amount'] == 1000.0
+        print("✅ Only one worker approved the redemption; caches saw the new status")
+
+
+class TestSharedInvalidation:
+    """Per-process caches are invalidated in every worker"""
+
+    def test_response_cache_bump_reaches_other_worker(self):
+        db = FakeDB()
+        worker_a, worker_b = ResponseCache(), ResponseCache()
+        versions_b = SharedVersions(db, 'state_response_cache_versions', cache_seconds=0)
+        worker_a.use_shared_versions(SharedVersions(db, 'state_response_cache_versions', cache_seconds=0))
+        worker_b.use_shared_versions(versions_b)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return {"success": True, "call": len(calls)}
+
+        async def run():
+            first = await worker_a.get_or_compute("fund-portfolio/overview", {}, ("mt5_accounts",), compute)
+            cached = await worker_a.get_or_compute("fund-portfolio/overview", {}, ("mt5_accounts",), compute)
+            worker_b.bump("mt5_accounts")  # a VPS sync lands in worker B
+            await versions_b.flush()
+            after = await worker_a.get_or_compute("fund-portfolio/overview", {}, ("mt5_accounts",), compute)
+            return first, cached, after
+
+        first, cached, after = asyncio.run(run())
+
+        assert first is cached
+        assert after["call"] == 2
+        assert worker_a.version("mt5_accounts") == 0  # worker A never bumped locally
+        print("✅ Worker A recomputed after worker B bumped mt5_accounts")
+
+    def test_deal_store_invalidation_reaches_other_worker(self):
+        db = FakeDB()
+        deals = db['mt5_deals']
+        deals.docs[1] = {'_id': 1, 'account': 886557, 'ticket': 1, 'symbol': 'XAUUSD', 'profit': 10.0}
+        account_doc = {'deals_collection': 'mt5_deals'}
+        worker_a, worker_b = DealStore(), DealStore()
+        versions_b = SharedVersions(db, 'state_deal_store_versions', cache_seconds=0)
+        worker_a.use_shared_versions(SharedVersions(db, 'state_deal_store_versions', cache_seconds=0))
+        worker_b.use_shared_versions(versions_b)
+
+        async def run():
+            before = await worker_a.get(db, 886557, account_doc=account_doc)
+            deals.docs[2] = {'_id': 2, 'account': 886557, 'ticket': 2, 'symbol': 'XAUUSD', 'profit': 5.0}
+            worker_b.invalidate([886557])  # worker B ingested the new deal
+            await versions_b.flush()
+            return before, await worker_a.get(db, 886557, account_doc=account_doc)
+
+        before, after = asyncio.run(run())
+
+        assert len(before) == 1
+        assert len(after) == 2
+        print("✅ Worker A reloaded deals ingested by worker B")
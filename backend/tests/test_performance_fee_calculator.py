@@ -0,0 +1,151 @@
+"""
+Performance Fee Calculator Unit Tests
+Tests the batched performance fee accrual run
+
+Test Coverage:
+- TRUE P&L for every manager is read with one $in query
+- Manager accruals and daily snapshots are written with one bulk_write each
+- Re-running on the same day upserts the same (manager, day) snapshots
+- Reads serve the latest accrual and only re-run it when stale
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.performance_fee_calculator import PerformanceFeeCalculator
+
+
+def _matches(doc, query):
+    for field, cond in query.items():
+        value = doc.get(field)
+        if isinstance(cond, dict) and '$in' in cond:
+            if value not in cond['$in']:
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self._rows = list(rows)
+
+    async def to_list(self, length=None):
+        return list(self._rows)
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = list(docs or [])
+        self.reads = 0
+        self.writes = 0
+
+    def find(self, query, projection=None):
+        self.reads += 1
+        return _Cursor(dict(doc) for doc in self.docs if _matches(doc, query))
+
+    async def find_one(self, query):
+        self.reads += 1
+        return next((dict(doc) for doc in self.docs if _matches(doc, query)), None)
+
+    async def create_index(self, keys, **kwargs):
+        pass
+
+    async def bulk_write(self, operations, ordered=True):
+        self.writes += 1
+        for op in operations:
+            doc = next((d for d in self.docs if _matches(d, op._filter)), None)
+            if doc is None:
+                if not op._upsert:
+                    continue
+                doc = {**op._filter, **op._doc.get('$setOnInsert', {})}
+                self.docs.append(doc)
+            doc.update(op._doc['$set'])
+        return SimpleNamespace()
+
+    async def replace_one(self, query, replacement, upsert=False):
+        self.writes += 1
+        self.docs = [doc for doc in self.docs if not _matches(doc, query)]
+        self.docs.append({**query, **replacement})
+
+
+def _db():
+    managers = [
+        {'_id': 'mm_1', 'manager_id': 'mm_1', 'name': 'TradingHub Gold', 'status': 'active',
+         'assigned_accounts': [886557], 'performance_fee_rate': 0.30},
+        {'_id': 'mm_2', 'manager_id': 'mm_2', 'name': 'GoldenTrade', 'status': 'active',
+         'assigned_accounts': [886066], 'performance_fee_rate': 0.10},
+        {'_id': 'mm_3', 'manager_id': 'mm_3', 'name': 'UNO14', 'status': 'active',
+         'assigned_accounts': [886602], 'performance_fee_rate': 0.15},
+        {'_id': 'mm_4', 'manager_id': 'mm_4', 'name': 'Unassigned', 'status': 'active', 'assigned_accounts': []},
+    ]
+    accounts = [
+        {'account': 886557, 'true_pnl': 2829.69},
+        {'account': 886066, 'true_pnl': -512.40},
+    ]
+    yesterday = (datetime.now(timezone.utc) - timedelta(days=1)).date().isoformat()
+    snapshots = [{'manager_id': 'mm_1', 'snapshot_date': yesterday, 'accrued_fee_today': 800.0}]
+    return SimpleNamespace(
+        money_managers=FakeCollection(managers),
+        mt5_accounts=FakeCollection(accounts),
+        performance_fee_transactions=FakeCollection(),
+        daily_performance_fee_snapshots=FakeCollection(snapshots),
+        performance_fee_accruals=FakeCollection(),
+    )
+
+
+class TestPerformanceFeeAccrual:
+    """Batched accrual run"""
+
+    def test_accrual_run_is_batched_and_idempotent(self):
+        db = _db()
+        calculator = PerformanceFeeCalculator(db)
+
+        result = asyncio.run(calculator.calculate_current_performance_fees())
+        asyncio.run(calculator.calculate_current_performance_fees())
+
+        by_manager = {m['manager_id']: m for m in result['managers']}
+        assert by_manager['mm_1']['performance_fee_amount'] == 848.91
+        assert by_manager['mm_2']['performance_fee_amount'] == 0 and by_manager['mm_2']['status'] == 'LOSS'
+        assert by_manager['mm_3']['true_pnl'] == 0          # account not found
+        assert result['totals']['managers_with_fees'] == 1
+
+        # Two runs: one TRUE P&L query and one bulk_write per collection each
+        assert db.mt5_accounts.reads == 2
+        assert db.money_managers.writes == 2 and db.daily_performance_fee_snapshots.writes == 2
+
+        today = datetime.now(timezone.utc).date().isoformat()
+        todays = [s for s in db.daily_performance_fee_snapshots.docs if s['snapshot_date'] == today]
+        assert len(todays) == 3
+        mm_1 = next(s for s in todays if s['manager_id'] == 'mm_1')
+        assert mm_1['accrued_fee_yesterday'] == 800.0 and round(mm_1['fee_change'], 2) == 48.91
+
+        manager = next(m for m in db.money_managers.docs if m['_id'] == 'mm_1')
+        assert round(manager['current_month_fee_accrued'], 2) == 848.91
+        print("✅ Accrual run batched; same-day snapshots upserted per manager")
+
+    def test_reads_serve_latest_accrual(self):
+        db = _db()
+        calculator = PerformanceFeeCalculator(db)
+
+        first = asyncio.run(calculator.get_latest_accrual())       # nothing stored yet -> runs
+        db.mt5_accounts.docs[0]['true_pnl'] = 5000.0
+        served = asyncio.run(calculator.get_latest_accrual())
+        cash_flow = asyncio.run(calculator.get_performance_fees_for_cash_flow())
+
+        assert db.money_managers.writes == 1
+        assert served['totals'] == first['totals'] and 'calculated_at' not in served
+        assert cash_flow['total_accrued'] == 848.91
+
+        # Stale accrual is recalculated on read
+        db.performance_fee_accruals.docs[0]['calculated_at'] -= timedelta(hours=2)
+        refreshed = asyncio.run(calculator.get_latest_accrual(max_age_minutes=30))
+
+        assert db.money_managers.writes == 2
+        assert refreshed['totals']['total_performance_fees'] == 1500.0
+        print("✅ GET serves the stored accrual; stale ones are recalculated")
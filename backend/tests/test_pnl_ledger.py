@@ -0,0 +1,272 @@
+"""
+P&L Ledger Unit Tests
+Tests the per-account TRUE P&L ledger
+
+Test Coverage:
+- Balance operations are classified once and stored on the deal
+- Deal ingestion does not touch the ledger
+- Applying deals moves the ledger by delta; re-synced deals are not counted twice
+- Two syncs applying the same deals at once count them once
+- rebuild() reproduces the incrementally maintained ledger
+- PnLCalculator batches its reads (one query per collection) with unchanged figures
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+from itertools import count
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.pnl_calculator import PnLCalculator
+from services.deal_ingestion_service import DealIngestionService, normalize_mt5_deal
+from services.pnl_ledger import PnLLedgerService, ledger_entry
+
+_object_ids = count(1)
+
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        value = doc.get(field)
+        if isinstance(condition, dict):
+            if '$in' in condition and value not in condition['$in']:
+                return False
+            if '$nin' in condition and value in condition['$nin']:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class _AsyncCursor:
+    def __init__(self, rows):
+        self._rows = list(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(0)  # a real cursor yields to other tasks between batches
+        if not self._rows:
+            raise StopAsyncIteration
+        return self._rows.pop(0)
+
+    async def to_list(self, length=None):
+        return self._rows
+
+
+class FakeCollection:
+    """Minimal in-memory stand-in for a Motor collection"""
+
+    def __init__(self):
+        self.docs = []
+        self.queries = 0
+
+    def find(self, query=None, projection=None):
+        self.queries += 1
+        return _AsyncCursor(dict(doc) for doc in self.docs if _matches(doc, query or {}))
+
+    async def find_one(self, query):
+        self.queries += 1
+        return next((dict(doc) for doc in self.docs if _matches(doc, query)), None)
+
+    async def bulk_write(self, operations, ordered=True):
+        upserted = modified = 0
+        for op in operations:
+            doc = next((doc for doc in self.docs if _matches(doc, op._filter)), None)
+            if doc is None:
+                if not op._upsert:
+                    continue
+                doc = {'_id': next(_object_ids), **op._filter}
+                self.docs.append(doc)
+                upserted += 1
+            else:
+                modified += 1
+            doc.update(op._doc.get('$set', {}))
+            for field, change in op._doc.get('$inc', {}).items():
+                doc[field] = doc.get(field, 0) + change
+            for field, value in op._doc.get('$max', {}).items():
+                if doc.get(field) is None or value > doc[field]:
+                    doc[field] = value
+        return SimpleNamespace(upserted_count=upserted, modified_count=modified)
+
+    async def replace_one(self, query, replacement, upsert=False):
+        self.docs = [doc for doc in self.docs if not _matches(doc, query)]
+        self.docs.append({**query, **replacement})
+
+    async def delete_many(self, query):
+        self.docs = [doc for doc in self.docs if not _matches(doc, query)]
+
+    async def delete_one(self, query):
+        await self.delete_many(query)
+
+
+class FakeDB(dict):
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+    def __getattr__(self, name):
+        return self[name]
+
+
+SYNC_TIME = datetime(2025, 10, 1, tzinfo=timezone.utc)
+
+
+def _deal(ticket, deal_type, profit, comment='', commission=None, day=1):
+    trade = {
+        'ticket': ticket,
+        'time': datetime(2025, 10, day, 12, tzinfo=timezone.utc).isoformat(),
+        'type': deal_type,
+        'profit': profit,
+        'comment': comment,
+        'commission': commission,
+    }
+    return normalize_mt5_deal(trade, 886557, SYNC_TIME, 'test')
+
+
+def _history(withdrawal=-15000.0):
+    return [
+        _deal(1, 2, 100000.0, 'Deposit'),
+        _deal(2, 0, 1200.0, commission=-20.0, day=2),
+        _deal(3, 1, -300.0, commission=-20.0, day=3),
+        _deal(4, 2, withdrawal, 'Transfer to #"886528"', day=4),
+        _deal(5, 2, -5000.0, 'Transfer to #"886066"', day=5),
+        _deal(6, 2, 2000.0, 'Transfer from #"886528"', day=6),
+    ]
+
+
+def _ingest(db, docs):
+    return asyncio.run(DealIngestionService(db, collection='mt5_deals').ingest(docs))
+
+
+def _ingest_and_apply(db, docs):
+    stats = _ingest(db, docs)
+    asyncio.run(PnLLedgerService(db).apply_deals(stats['written']))
+    return stats
+
+
+class TestLedgerEntry:
+    """Per-deal contributions"""
+
+    def test_classification(self):
+        withdrawal, classification = ledger_entry({'type': 2, 'profit': -15000.0, 'comment': 'Transfer to #"886528"'})
+        trade, none = ledger_entry({'type': 1, 'profit': 250.0, 'commission': -7.5, 'swap': -1.25, 'fee': None})
+        unknown, _ = ledger_entry({'type': 2, 'profit': -40.0, 'comment': 'P/L Share'})
+
+        assert classification['type'] == 'profit_withdrawal'
+        assert withdrawal == {
+            'balance_operations': 1, 'net_deposits': -15000.0,
+            'withdrawals': -15000.0, 'profit_withdrawals': 15000.0,
+        }
+        assert none is None and trade == {'trade_deals': 1, 'realized_pnl': 241.25}
+        assert unknown['unclassified_transfers'] == 40.0 and unknown['needs_review'] == 1
+        print("✅ Balance operations classified, trades contribute realized P&L")
+
+
+class TestPnLLedgerService:
+    """Incremental maintenance"""
+
+    def test_ingest_leaves_ledger_alone(self):
+        db = FakeDB()
+
+        _ingest(db, _history())
+
+        assert db['pnl_ledger'].docs == []
+        assert not any('ledger_entry' in doc for doc in db['mt5_deals'].docs)
+        print("✅ Deal ingestion pays nothing for the ledger")
+
+    def test_apply_updates_ledger_incrementally(self):
+        db = FakeDB()
+
+        _ingest_and_apply(db, _history())
+        ledger = asyncio.run(PnLLedgerService(db).get_ledger(886557))
+
+        assert ledger['net_deposits'] == 82000.0
+        assert ledger['profit_withdrawals'] == 15000.0
+        assert ledger['profit_returns'] == 2000.0
+        assert ledger['net_profit_withdrawals'] == 13000.0
+        assert ledger['inter_account_transfers_out'] == 5000.0
+        assert ledger['external_deposits'] == 100000.0
+        assert ledger['realized_pnl'] == 860.0
+        assert ledger['balance_operations'] == 4 and ledger['trade_deals'] == 2
+        assert ledger['last_deal_time'] == datetime(2025, 10, 6, 12, tzinfo=timezone.utc)
+
+        stored = next(doc for doc in db['mt5_deals'].docs if doc['ticket'] == 4)
+        assert stored['transfer_classification']['type'] == 'profit_withdrawal'
+        assert stored['ledger_entry']['profit_withdrawals'] == 15000.0
+
+        # Unchanged re-pull writes nothing; a corrected deal moves the ledger by the difference
+        _ingest_and_apply(db, _history())
+        _ingest_and_apply(db, _history(withdrawal=-12000.0))
+        ledger = asyncio.run(PnLLedgerService(db).get_ledger(886557))
+
+        assert ledger['profit_withdrawals'] == 12000.0
+        assert ledger['net_deposits'] == 85000.0
+        assert ledger['balance_operations'] == 4
+        print("✅ Ledger follows applied deals without double counting re-synced deals")
+
+    def test_concurrent_apply_counts_deals_once(self):
+        db = FakeDB()
+        db['mt5_deals'].docs = [dict(doc, _id=next(_object_ids)) for doc in _history()]
+        deals = _history()
+
+        async def run():
+            # VPS sync and bridge stream fold the same fresh deals in at once
+            await asyncio.gather(
+                PnLLedgerService(db).apply_deals([dict(d) for d in deals]),
+                PnLLedgerService(db).apply_deals([dict(d) for d in deals])
+            )
+            return await PnLLedgerService(db).get_ledger(886557)
+
+        ledger = asyncio.run(run())
+
+        assert ledger['net_deposits'] == 82000.0
+        assert ledger['balance_operations'] == 4 and ledger['trade_deals'] == 2
+        print("✅ Concurrent applies of the same deals are counted once")
+
+    def test_rebuild_matches_incremental(self):
+        db = FakeDB()
+        _ingest_and_apply(db, _history())
+        _ingest_and_apply(db, [_deal(7, 0, 55.0, day=7)])
+        incremental = asyncio.run(PnLLedgerService(db).get_ledger(886557))
+
+        db['pnl_ledger'].docs = [{'_id': 886557, 'account': 886557, 'net_deposits': -1.0}, {'_id': 999, 'account': 999}]
+        result = asyncio.run(PnLLedgerService(db).rebuild())
+        rebuilt = asyncio.run(PnLLedgerService(db).get_ledgers())
+
+        assert result == {'success': True, 'accounts': 1, 'deals': 7}
+        assert set(rebuilt) == {886557}
+        for field in ('net_deposits', 'net_profit_withdrawals', 'realized_pnl', 'trade_deals', 'last_deal_time'):
+            assert rebuilt[886557][field] == incremental[field], field
+        print("✅ rebuild() reproduces the incremental ledger and drops stale accounts")
+
+
+class TestPnLCalculatorBatched:
+    """TRUE P&L loads every account with one query per collection"""
+
+    def test_batched_reads_keep_figures(self):
+        db = FakeDB()
+        _ingest(db, _history())
+        accounts = [886557, 886066, 886602]
+        for number in accounts:
+            db['mt5_accounts'].docs.append({'account': number, 'equity': 90000.0, 'profit': 0.0})
+            db['mt5_account_config'].docs.append({
+                'account': number, 'fund_type': 'BALANCE', 'is_active': True, 'initial_allocation': 100000.0
+            })
+        db['mt5_corrected_data'].docs.append({'account_number': 886602, 'profit_withdrawals': 4000.0})
+
+        result = asyncio.run(PnLCalculator(db).calculate_all_accounts_pnl())
+        by_account = {account['account_number']: account for account in result['accounts']}
+
+        # Profit withdrawals still come from corrected data only
+        assert by_account[886557]['profit_withdrawals'] == 0
+        assert by_account[886557]['true_pnl'] == -10000.0
+        assert by_account[886602]['profit_withdrawals'] == 4000.0
+        assert by_account[886602]['true_pnl'] == -6000.0
+        # One query per collection, not per account
+        assert db['mt5_accounts'].queries == 1 and db['mt5_corrected_data'].queries == 1
+        print("✅ PnLCalculator batches its reads without changing the figures")
+
@@ -0,0 +1,124 @@
+"""
+Query Profiler Unit Tests
+Tests per-request MongoDB command attribution and N+1 detection
+
+Test Coverage:
+- Query shapes strip values but keep fields and operators
+- Commands are attributed to the tracked request, also from Motor's executor threads
+- Repeated identical shapes over the threshold are flagged
+- Handshake commands, infrastructure collections and untracked work are ignored
+"""
+
+import asyncio
+import os
+import sys
+from itertools import count
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.query_profiler import QueryProfiler, command_shape
+
+_request_ids = count(1)
+
+
+def run_command(profiler, command_name, command, duration_ms=1.0, failed=False):
+    """Publish started + succeeded/failed events the way PyMongo does"""
+    event = SimpleNamespace(
+        command_name=command_name,
+        command=command,
+        request_id=next(_request_ids),
+        connection_id=('localhost', 27017),
+        duration_micros=int(duration_ms * 1000),
+    )
+    profiler.started(event)
+    if failed:
+        profiler.failed(event)
+    else:
+        profiler.succeeded(event)
+
+
+class TestQueryShapes:
+    """Normalised query shapes"""
+
+    def test_values_stripped(self):
+        first = command_shape('find', {'find': 'mt5_deals_history', 'filter': {'account': 886557, 'time': {'$gte': '2025-10-01'}}})
+        second = command_shape('find', {'find': 'mt5_deals_history', 'filter': {'time': {'$gte': '2025-11-01'}, 'account': 891215}})
+        update = command_shape('update', {'update': 'money_managers', 'updates': [{'q': {'manager_id': 'mm_1'}, 'u': {'$set': {'fee': 10}}}]})
+        pipeline = command_shape('aggregate', {'aggregate': 'mt5_deals_history', 'pipeline': [
+            {'$match': {'account': {'$in': [886557, 891215]}}}, {'$group': {'_id': '$account'}}
+        ]})
+
+        assert first == second == 'find mt5_deals_history {"account": "?", "time": {"$gte": "?"}}'
+        assert update == 'update money_managers {"manager_id": "?"}'
+        assert pipeline == 'aggregate mt5_deals_history {"match": {"account": {"$in": "?"}}, "stages": ["$match", "$group"]}'
+        assert command_shape('update', {'update': 'jobs', 'updates': [{'q': {'_id': 'x'}}]}) is None
+        print("✅ Query shapes keep fields and operators, drop values")
+
+
+class TestQueryProfiler:
+    """Per-request attribution and N+1 flagging"""
+
+    def test_n_plus_one_flagged(self):
+        profiler = QueryProfiler(threshold=5, slow_db_ms=10_000)
+
+        with profiler.track('POST /api/admin/rebates/calculate') as stats:
+            run_command(profiler, 'find', {'find': 'mt5_account_config', 'filter': {}})
+            for account in (886557, 886066, 886602, 885822, 891215, 891234):
+                run_command(profiler, 'find', {'find': 'mt5_deals_history', 'filter': {'account': account}}, duration_ms=2)
+        with profiler.track('GET /api/fund-portfolio/overview'):
+            run_command(profiler, 'aggregate', {'aggregate': 'investments', 'pipeline': [{'$group': {'_id': '$fund_code'}}]})
+
+        metrics = profiler.get_stats()
+        rebates = next(e for e in metrics['endpoints'] if e['endpoint'] == 'POST /api/admin/rebates/calculate')
+
+        assert stats.count == 7 and stats.db_ms == 13.0
+        assert rebates['flagged_requests'] == 1
+        assert rebates['top_shapes'][0] == {'shape': 'find mt5_deals_history {"account": "?"}', 'count': 6}
+        assert metrics['endpoints'][0]['endpoint'] == 'POST /api/admin/rebates/calculate'  # most DB time first
+        assert len(metrics['recent_flagged']) == 1
+        assert metrics['recent_flagged'][0]['n_plus_one']['repeats'] == 6
+        print("✅ Per-account query loop flagged as N+1")
+
+    def test_executor_threads_attributed(self):
+        import motor.frameworks.asyncio as motor_asyncio
+
+        profiler = QueryProfiler(threshold=100)
+
+        def blocking_find(account):
+            # Motor runs PyMongo operations (and so the listener) on its executor
+            run_command(profiler, 'find', {'find': 'mt5_accounts', 'filter': {'account': account}})
+
+        async def handler():
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*[
+                motor_asyncio.run_on_executor(loop, blocking_find, account) for account in range(8)
+            ])
+
+        async def run():
+            with profiler.track('GET /api/mt5/accounts') as stats:
+                await handler()
+            # Work after the request finished is not attributed to it
+            await motor_asyncio.run_on_executor(asyncio.get_running_loop(), blocking_find, 99)
+            return stats
+
+        stats = asyncio.run(run())
+
+        assert stats.count == 8
+        assert profiler.get_stats()['endpoints'][0]['queries'] == 8
+        print("✅ Queries from Motor executor threads attributed to the request")
+
+    def test_ignored_commands(self):
+        profiler = QueryProfiler(threshold=2)
+
+        run_command(profiler, 'find', {'find': 'users', 'filter': {}})  # outside any request
+        with profiler.track('GET /api/health') as stats:
+            run_command(profiler, 'ping', {'ping': 1})
+            run_command(profiler, 'hello', {'hello': 1})
+            for _ in range(5):
+                run_command(profiler, 'update', {'update': 'jobs', 'updates': [{'q': {'_id': 'job'}}]})
+            run_command(profiler, 'insert', {'insert': 'activity_logs'}, failed=True)
+
+        assert stats.count == 1 and stats.failed == 1
+        assert profiler.get_stats()['recent_flagged'] == []
+        print("✅ Handshakes, job progress updates and untracked work ignored")
@@ -0,0 +1,214 @@
+"""
+Rebate Calculator Unit Tests
+Tests the single-pipeline rebate engine
+
+Test Coverage:
+- Volume is grouped per (account, period) in one aggregate, however many accounts/months
+- Broker configs resolve from the effective-dated table (historic months use historic rates)
+- Only periods before every config fall back to the earliest one; retired configs are never reused
+- Transactions are upserted in one bulk_write; recalculation keeps approval/payment status
+- Monthly periods for audit backfills
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.rebate_calculator import RebateCalculator, monthly_periods
+
+
+def _value(expr, doc):
+    """Evaluate the aggregation expressions used by the rebate pipeline"""
+    if isinstance(expr, str) and expr.startswith('$'):
+        return doc.get(expr[1:])
+    if isinstance(expr, dict):
+        (op, args), = expr.items()
+        if op == '$and':
+            return all(_value(arg, doc) for arg in args)
+        if op == '$gte':
+            return _value(args[0], doc) >= _value(args[1], doc)
+        if op == '$lte':
+            return _value(args[0], doc) <= _value(args[1], doc)
+        if op == '$switch':
+            for branch in args['branches']:
+                if _value(branch['case'], doc):
+                    return branch['then']
+            return args['default']
+    return expr
+
+
+def _matches(doc, query):
+    for field, cond in query.items():
+        value = doc.get(field)
+        if not isinstance(cond, dict):
+            if value != cond:
+                return False
+            continue
+        for op, arg in cond.items():
+            if op == '$in' and value not in arg:
+                return False
+            if op == '$gte' and not value >= arg:
+                return False
+            if op == '$lte' and not value <= arg:
+                return False
+    return True
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self._rows = list(rows)
+
+    def sort(self, key, direction):
+        self._rows.sort(key=lambda row: row.get(key), reverse=direction < 0)
+        return self
+
+    async def to_list(self, length=None):
+        return list(self._rows)
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = list(docs or [])
+        self.calls = 0
+
+    def find(self, query):
+        self.calls += 1
+        if '$or' in query:
+            query = {k: v for k, v in query.items() if k != '$or'}
+        return _Cursor(doc for doc in self.docs if _matches(doc, query))
+
+    def aggregate(self, pipeline):
+        self.calls += 1
+        rows = [dict(doc) for doc in self.docs]
+        for stage in pipeline:
+            (op, spec), = stage.items()
+            if op == '$match':
+                rows = [row for row in rows if _matches(row, spec)]
+            elif op == '$project':
+                rows = [{field: _value(expr if expr != 1 else f'${field}', row) for field, expr in spec.items()}
+                        for row in rows]
+            elif op == '$group':
+                groups = {}
+                for row in rows:
+                    key = {field: _value(expr, row) for field, expr in spec['_id'].items()}
+                    group = groups.setdefault(tuple(key.values()), {'_id': key, 'volume': 0, 'trades': 0})
+                    group['volume'] += row['volume'] if isinstance(row['volume'], (int, float)) else 0
+                    group['trades'] += 1
+                rows = list(groups.values())
+        return _Cursor(rows)
+
+    async def create_index(self, keys, **kwargs):
+        pass
+
+    async def bulk_write(self, operations, ordered=True):
+        self.calls += 1
+        upserted = modified = 0
+        for op in operations:
+            doc = next((d for d in self.docs if _matches(d, op._filter)), None)
+            if doc is None:
+                doc = {**op._filter, **op._doc['$setOnInsert']}
+                self.docs.append(doc)
+                upserted += 1
+            else:
+                modified += 1
+            doc.update(op._doc['$set'])
+        return SimpleNamespace(upserted_count=upserted, modified_count=modified)
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def _db(trades):
+    accounts = [
+        {'account': 886557, 'name': 'BALANCE', 'broker_code': 'MEX', 'track_rebates': True},
+        {'account': 886066, 'name': 'CORE', 'broker_code': 'MEX', 'track_rebates': True},
+        {'account': 885822, 'name': 'CORE', 'broker_code': 'LUCRUM', 'track_rebates': True},
+    ]
+    configs = [
+        {'broker_code': 'MEX', 'broker_name': 'MEX-Atlantic', 'rebate_per_lot': 4.0,
+         'effective_date': _utc(2025, 1, 1), 'end_date': _utc(2025, 7, 31), 'is_active': False},
+        {'broker_code': 'MEX', 'broker_name': 'MEX-Atlantic', 'rebate_per_lot': 5.05,
+         'effective_date': _utc(2025, 8, 1), 'end_date': None, 'is_active': True},
+    ]
+    return SimpleNamespace(
+        mt5_trades=FakeCollection(trades),
+        mt5_accounts=FakeCollection(accounts),
+        broker_rebate_config=FakeCollection(configs),
+        rebate_transactions=FakeCollection(),
+    )
+
+
+TRADES = [
+    {'account': 886557, 'close_time': _utc(2025, 7, 10), 'volume': 10.0},
+    {'account': 886557, 'close_time': _utc(2025, 8, 5), 'volume': 20.0},
+    {'account': 886557, 'close_time': _utc(2025, 8, 31, 23, 59), 'volume': 2.0},
+    {'account': 886066, 'close_time': _utc(2025, 8, 12), 'volume': 5.0},
+    {'account': 885822, 'close_time': _utc(2025, 8, 12), 'volume': 7.0},
+    {'account': 886066, 'close_time': _utc(2025, 9, 1), 'volume': 3.0},
+]
+
+
+class TestRebateCalculator:
+    """Single-pipeline rebate engine"""
+
+    def test_monthly_periods(self):
+        periods = monthly_periods('2024-11', '2025-02')
+
+        assert [start.month for start, _ in periods] == [11, 12, 1, 2]
+        assert periods[1][1] == _utc(2024, 12, 31, 23, 59, 59, 999000)
+        assert periods[1][1] + timedelta(milliseconds=1) == periods[2][0]
+        print("✅ Calendar months cover the range without gaps or overlap")
+
+    def test_backfill_many_months_in_one_pipeline(self):
+        db = _db(TRADES)
+        calculator = RebateCalculator(db)
+
+        result = asyncio.run(calculator.calculate_rebates_for_periods(monthly_periods('2025-07', '2025-09')))
+        july, august, september = result['periods']
+
+        # Constant number of queries whatever the number of accounts or months
+        assert db.mt5_trades.calls == 1 and db.broker_rebate_config.calls == 1
+        assert db.rebate_transactions.calls == 1
+
+        assert july['total_rebates'] == 40.0               # 10 lots at the July rate of $4
+        assert august['total_volume'] == 27.0 and august['total_rebates'] == 136.35
+        assert september['rebate_transactions'][0]['account_id'] == '886066'
+        assert result['transactions'] == 4                 # LUCRUM has no config
+        print("✅ Three months, three accounts: one aggregate, one bulk_write")
+
+    def test_recalculation_keeps_workflow_status(self):
+        db = _db(TRADES)
+        calculator = RebateCalculator(db)
+        august = (_utc(2025, 8, 1), _utc(2025, 8, 31, 23, 59, 59))
+
+        first = asyncio.run(calculator.calculate_rebates_for_period(*august))
+        paid = next(t for t in db.rebate_transactions.docs if t['account_id'] == '886557')
+        paid.update(verification_status='verified', payment_status='paid')
+
+        db.mt5_trades.docs.append({'account': 886557, 'close_time': _utc(2025, 8, 20), 'volume': 1.0})
+        second = asyncio.run(calculator.calculate_rebates_for_period(*august))
+        stored = next(t for t in db.rebate_transactions.docs if t['account_id'] == '886557')
+
+        assert first['accounts_processed'] == 2 and len(db.rebate_transactions.docs) == 2
+        assert second['total_volume'] == 28.0
+        assert stored['volume_lots'] == 23.0 and stored['rebate_earned'] == 116.15
+        assert stored['payment_status'] == 'paid' and stored['verification_status'] == 'verified'
+        print("✅ Recalculation updates figures in place and keeps payment status")
+
+    def test_resolve_config_never_reuses_retired_config(self):
+        retired = {'rebate_per_lot': 4.0, 'effective_date': _utc(2025, 1, 1), 'end_date': _utc(2025, 7, 31)}
+        later = {'rebate_per_lot': 5.05, 'effective_date': _utc(2025, 9, 1), 'end_date': None}
+        configs = [retired, later]
+        resolve = RebateCalculator.resolve_config
+
+        assert resolve(configs, _utc(2024, 11, 1), _utc(2024, 11, 30)) is retired   # before every config
+        assert resolve(configs, _utc(2025, 3, 1), _utc(2025, 3, 31)) is retired
+        assert resolve(configs, _utc(2025, 8, 1), _utc(2025, 8, 31)) is None       # gap after retirement
+        assert resolve(configs, _utc(2025, 9, 1), _utc(2025, 9, 30)) is later
+        assert resolve([retired], _utc(2025, 10, 1), _utc(2025, 10, 31)) is None
+        print("✅ Earliest-config fallback only applies before every config")
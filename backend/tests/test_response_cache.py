@@ -0,0 +1,155 @@
+"""
+Response Cache Unit Tests
+Tests the event-driven cache in front of the dashboard aggregate endpoints
+
+Test Coverage:
+- Responses are served from cache until a source tag is bumped
+- Concurrent identical requests share one computation (single-flight)
+- A bump during computation keeps the stale result out of the cache
+- Failed responses and exceptions are not cached
+- @invalidates bumps tags only after a successful write
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.response_cache import ResponseCache
+
+
+class TestResponseCache:
+    """Response cache unit tests"""
+
+    def test_cached_until_tag_bumped(self):
+        cache = ResponseCache()
+        calls = []
+
+        @cache.cached("fund-portfolio/overview", tags=("investments", "mt5_accounts"))
+        async def endpoint(days: int = 30, current_user: dict = None):
+            calls.append(days)
+            return {"success": True, "days": days, "call": len(calls)}
+
+        async def run():
+            first = await endpoint(days=30, current_user={"id": "a"})
+            second = await endpoint(days=30, current_user={"id": "b"})  # caller is not part of the key
+            other = await endpoint(days=7)
+            cache.bump("deals")                                         # unrelated tag
+            third = await endpoint(days=30)
+            cache.bump("mt5_accounts")
+            fourth = await endpoint(days=30)
+            return first, second, other, third, fourth
+
+        first, second, other, third, fourth = asyncio.run(run())
+
+        assert first is second is third
+        assert other["days"] == 7
+        assert fourth["call"] == 3 and calls == [30, 7, 30]
+        stats = cache.get_stats()
+        assert stats["hits"] == 2 and stats["misses"] == 3
+        assert stats["by_endpoint"]["fund-portfolio/overview"]["hits"] == 2
+        print("✅ Served from cache until its source tag was bumped")
+
+    def test_single_flight(self):
+        cache = ResponseCache()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"success": True}
+
+        async def run():
+            return await asyncio.gather(*[
+                cache.get_or_compute("admin/cashflow/complete", {"days": 30}, ("mt5_accounts",), compute)
+                for _ in range(10)
+            ])
+
+        results = asyncio.run(run())
+
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+        assert cache.get_stats()["coalesced"] == 9
+        print("✅ 10 concurrent requests collapsed into one computation")
+
+    def test_bump_during_compute_not_cached(self):
+        cache = ResponseCache()
+
+        async def compute():
+            cache.bump("mt5_accounts")  # a sync lands mid-computation
+            return {"success": True}
+
+        async def run():
+            await cache.get_or_compute("e", {}, ("mt5_accounts",), compute)
+            return cache.get_stats()["entries"]
+
+        assert asyncio.run(run()) == 0
+        print("✅ Result computed across a bump is not cached")
+
+    def test_failures_not_cached(self):
+        cache = ResponseCache()
+
+        async def failed():
+            return {"success": False, "error": "db down"}
+
+        async def broken():
+            raise RuntimeError("boom")
+
+        async def run():
+            await cache.get_or_compute("e", {}, ("a",), failed)
+            with pytest.raises(RuntimeError):
+                await cache.get_or_compute("e", {"x": 1}, ("a",), broken)
+            return cache.get_stats()
+
+        stats = asyncio.run(run())
+        assert stats["entries"] == 0 and stats["inflight"] == 0
+        print("✅ Failed responses and exceptions are not cached")
+
+    def test_invalidates_after_successful_write(self):
+        cache = ResponseCache()
+
+        @cache.invalidates("mt5_accounts")
+        async def write(ok: bool):
+            return {"success": ok}
+
+        asyncio.run(write(ok=False))
+        assert cache.version("mt5_accounts") == 0
+        asyncio.run(write(ok=True))
+        assert cache.version("mt5_accounts") == 1
+        print("✅ Write endpoints bump their tags on success")
+
+    def test_daily_entries_keyed_by_utc_day(self, monkeypatch):
+        from datetime import datetime, timezone
+
+        import services.response_cache as response_cache_module
+
+        cache = ResponseCache()
+        calls = []
+        today = {"value": datetime(2026, 3, 2, 23, 59, tzinfo=timezone.utc)}
+
+        class FrozenDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return today["value"]
+
+        monkeypatch.setattr(response_cache_module, "datetime", FrozenDatetime)
+
+        @cache.cached("rolling/managers", tags=(), ttl_seconds=86400, daily=True)
+        async def endpoint(days: int = 365):
+            calls.append(days)
+            return {"success": True, "call": len(calls)}
+
+        async def run():
+            first = await endpoint(days=365)
+            cache.bump("mt5_deals")                                     # not a source tag
+            same_day = await endpoint(days=365)
+            today["value"] = datetime(2026, 3, 3, 0, 1, tzinfo=timezone.utc)
+            next_day = await endpoint(days=365)
+            return first, same_day, next_day
+
+        first, same_day, next_day = asyncio.run(run())
+        assert first == same_day and next_day["call"] == 2
+        print("✅ Daily entries are recomputed once the UTC day rolls over")
@@ -0,0 +1,204 @@
+"""
+Return Metrics Unit Tests
+Tests the NumPy daily-return / risk-metrics library and the batched manager ranking
+
+Test Coverage:
+- Deals and equity snapshots become calendar-day return series
+- Matrix metrics match per-series reference calculations
+- Rolling windows (cumulative sums, block maxima) match brute-force windows
+- Rolling windows stay NaN until they hold a full window of observed days
+- get_managers_ranking reads accounts and trades with one query per collection
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services import return_metrics
+from services.return_metrics import (
+    daily_returns_from_deals,
+    daily_returns_from_equity,
+    rolling_max,
+    rolling_metrics,
+    summarize,
+)
+from services.trading_analytics_service import TradingAnalyticsService
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class TestDailySeries:
+    """Daily return series construction"""
+
+    def test_from_deals(self):
+        deals = [
+            {'time': _utc(2026, 3, 2, 9), 'profit': 1000.0, 'commission': -10.0},
+            {'time': _utc(2026, 3, 2, 15), 'profit': 10.0},
+            {'time': _utc(2026, 3, 4, 11).isoformat(), 'profit': -505.0},
+        ]
+        series = daily_returns_from_deals(deals, 100000.0, start=_utc(2026, 3, 1), end=_utc(2026, 3, 5))
+
+        assert len(series['days']) == 5
+        assert list(series['pnl']) == [0.0, 1000.0, 0.0, -505.0, 0.0]
+        assert series['returns'][1] == 0.01
+        assert series['returns'][3] == -0.005          # on 101,000 start-of-day equity
+        assert series['equity'][-1] == 100495.0
+        print("✅ Deals bucketed per calendar day, returns on start-of-day equity")
+
+    def test_from_equity_snapshots(self):
+        snapshots = [
+            {'timestamp': _utc(2026, 3, 1, 8), 'equity': 90000.0},
+            {'timestamp': _utc(2026, 3, 1, 22), 'equity': 100000.0},
+            {'timestamp': _utc(2026, 3, 3, 22), 'equity': 110000.0},
+            {'timestamp': _utc(2026, 3, 2, 22), 'equity': None},
+        ]
+        series = daily_returns_from_equity(snapshots)
+
+        assert list(series['equity']) == [100000.0, 100000.0, 110000.0]
+        assert list(np.round(series['returns'], 6)) == [0.0, 0.0, 0.1]
+        print("✅ Last snapshot per day, gaps carried forward")
+
+
+class TestMetrics:
+    """Point-in-time and rolling metrics"""
+
+    def test_matrix_matches_reference(self):
+        rng = np.random.default_rng(7)
+        returns = rng.normal(0.001, 0.01, (4, 300))
+        returns[3, :100] = np.nan                     # series starting later
+
+        summary = summarize(returns)
+
+        for row in range(4):
+            r = returns[row][np.isfinite(returns[row])]
+            equity = np.cumprod(1 + r)
+            peak = np.maximum.accumulate(np.maximum(equity, 1.0))
+            var = -np.quantile(r, 0.05)
+            assert summary['days'][row] == r.size
+            assert np.isclose(summary['sharpe_ratio'][row], r.mean() / r.std(ddof=1) * np.sqrt(365))
+            assert np.isclose(summary['volatility'][row], r.std(ddof=1) * np.sqrt(365))
+            downside = np.sqrt(np.mean(np.minimum(r, 0) ** 2))
+            assert np.isclose(summary['sortino_ratio'][row], r.mean() / downside * np.sqrt(365))
+            assert np.isclose(summary['max_drawdown'][row], np.max(1 - equity / peak))
+            assert np.isclose(summary['var'][row], var)
+            assert np.isclose(summary['cvar'][row], -r[r <= -var].mean())
+        print("✅ One summarize() call scores every row like the per-series formulas")
+
+    def test_degenerate_series(self):
+        flat = return_metrics.summarize(np.zeros((1, 10)))
+        gains = np.full(10, 0.01)
+
+        assert flat['sharpe_ratio'][0] == 0.0 and flat['calmar_ratio'][0] == 0.0
+        assert return_metrics.sortino_ratio(gains) == return_metrics.RATIO_CAP
+        assert return_metrics.calmar_ratio(gains) == return_metrics.RATIO_CAP
+        assert return_metrics.sharpe_ratio(gains) == 0.0
+        assert return_metrics.summarize(np.empty((2, 0)))['var'].tolist() == [0.0, 0.0]
+        print("✅ No-risk and empty series follow the 0 / 999.99 conventions")
+
+    def test_rolling_matches_brute_force(self):
+        rng = np.random.default_rng(3)
+        returns = rng.normal(0.0005, 0.012, (3, 120))
+
+        for window in (1, 7, 30, 90):
+            expected_max = np.array([[row[max(0, i - window + 1):i + 1].max() for i in range(120)] for row in returns])
+            assert np.allclose(rolling_max(returns, window), expected_max)
+
+        window = 30
+        rolling = rolling_metrics(returns, window)
+        equity = np.cumprod(1 + returns, axis=-1)
+        opening = np.concatenate([np.ones((3, 1)), equity[:, :-1]], axis=-1)
+        assert np.all(np.isnan(rolling['sharpe'][:, :window - 1]))
+        for i in range(window - 1, 120):
+            r = returns[:, i - window + 1:i + 1]
+            peak = np.maximum(equity[:, i - window + 1:i + 1].max(axis=-1), opening[:, i - window + 1])
+            assert np.allclose(rolling['return'][:, i], np.prod(1 + r, axis=-1) - 1)
+            assert np.allclose(rolling['sharpe'][:, i], r.mean(axis=-1) / r.std(axis=-1, ddof=1) * np.sqrt(365))
+            assert np.allclose(rolling['drawdown'][:, i], equity[:, i] / peak - 1)
+        print("✅ O(n) rolling windows agree with brute-force windows")
+
+    def test_rolling_waits_for_full_window_after_late_start(self):
+        rng = np.random.default_rng(5)
+        returns = rng.normal(0.0005, 0.012, 40)
+        returns[:10] = np.nan  # series starts on day 10
+
+        window = 7
+        rolling = rolling_metrics(returns, window)
+        first = 10 + window - 1
+        assert np.all(np.isnan(rolling['sharpe'][:first]))
+        assert np.all(np.isnan(rolling['return'][:first]))
+        r = returns[10:first + 1]
+        assert np.isclose(rolling['return'][first], np.prod(1 + r) - 1)
+        assert np.isclose(rolling['sharpe'][first], r.mean() / r.std(ddof=1) * np.sqrt(365))
+
+        partial = rolling_metrics(returns, window, min_periods=3)
+        assert np.isnan(partial['sharpe'][11])
+        assert np.isclose(partial['return'][12], np.prod(1 + returns[10:13]) - 1)
+        print("✅ Leading NaN days do not count towards a rolling window")
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self._rows = list(rows)
+
+    async def to_list(self, length=None):
+        return list(self._rows)
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = list(docs or [])
+        self.queries = 0
+
+    def find(self, query):
+        self.queries += 1
+        accounts = query['account']['$in']
+        return _Cursor(dict(doc) for doc in self.docs
+                       if doc['account'] in accounts and doc.get('type', 0) == query.get('type', doc.get('type', 0)))
+
+
+class TestBatchedRanking:
+    """get_managers_ranking as one batched computation"""
+
+    def test_ranking_is_batched(self):
+        now = datetime.now(timezone.utc)
+        start = now - timedelta(days=20)
+        accounts = [
+            {'account': 2206, 'initial_allocation': 100000.0, 'equity': 104000.0, 'balance': 104000.0,
+             'allocation_start_date': start},
+            {'account': 20043, 'initial_allocation': 100000.0, 'equity': 98000.0, 'balance': 98000.0,
+             'allocation_start_date': start.replace(tzinfo=None)},
+        ]
+        deals = []
+        for day in range(1, 15):
+            deals.append({'account': 2206, 'deal': day, 'type': 0, 'time': start + timedelta(days=day),
+                          'profit': 400.0 if day % 3 else -150.0})
+            deals.append({'account': 20043, 'deal': 100 + day, 'type': 0, 'time': start + timedelta(days=day),
+                          'profit': -250.0 if day % 2 else 100.0})
+        deals.append({'account': 2206, 'deal': 999, 'type': 0, 'time': start - timedelta(days=5), 'profit': 1e6})
+        db = SimpleNamespace(
+            mt5_accounts=FakeCollection(accounts),
+            mt5_deals=FakeCollection(deals),
+            mt5_deals_history=FakeCollection(deals[:4]),        # overlaps are deduplicated
+        )
+
+        ranking = asyncio.run(TradingAnalyticsService(db).get_managers_ranking(30))
+        by_account = {m['account']: m for m in ranking['managers']}
+
+        # 3 managers, one query per collection (2208 has no account document)
+        assert db.mt5_accounts.queries == 1 and db.mt5_deals.queries == 1 and db.mt5_deals_history.queries == 1
+        assert ranking['total_managers'] == 2 and ranking['managers'][0]['account'] == 2206
+        assert by_account[2206]['total_trades'] == 14
+        assert by_account[2206]['sharpe_ratio'] > 0 > by_account[20043]['sharpe_ratio']
+        assert by_account[20043]['var_95_pct'] > 0 and by_account[20043]['volatility_pct'] > 0
+
+        single = asyncio.run(TradingAnalyticsService(db).get_manager_analytics('manager_jc_provider', 2206, 30))
+        assert single['sharpe_ratio'] == by_account[2206]['sharpe_ratio']
+        print("✅ All managers ranked from one returns matrix")
@@ -0,0 +1,137 @@
+"""
+Risk Snapshot Service Unit Tests
+Tests the materialized risk-engine snapshots behind /admin/risk-engine
+
+Test Coverage:
+- serve() computes live once, then serves the stored snapshot
+- fresh=True recomputes and stores a new version
+- Old versions are pruned to RISK_SNAPSHOT_HISTORY
+- Old snapshots are flagged stale; errors are never stored
+- NumPy scalars and non-string keys are made storable
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services import risk_snapshot_service
+from services.risk_snapshot_service import RiskSnapshotService, _to_bson
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def sort(self, field, direction):
+        self._rows.sort(key=lambda r: r[field], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self._rows = self._rows[:n]
+        return self
+
+    async def to_list(self, length=None):
+        return [dict(r) for r in self._rows[:length]]
+
+
+class FakeSnapshots:
+    def __init__(self):
+        self.rows = []
+
+    def _match(self, row, query):
+        for key, value in query.items():
+            if isinstance(value, dict) and "$lte" in value:
+                if not row.get(key) <= value["$lte"]:
+                    return False
+            elif row.get(key) != value:
+                return False
+        return True
+
+    def find(self, query, projection=None):
+        return _Cursor([r for r in self.rows if self._match(r, query)])
+
+    async def insert_one(self, doc):
+        self.rows.append(dict(doc))
+
+    async def delete_many(self, query):
+        self.rows = [r for r in self.rows if not self._match(r, query)]
+
+
+def _service(payloads):
+    service = RiskSnapshotService(SimpleNamespace(risk_snapshots=FakeSnapshots()))
+    calls = []
+
+    async def compute(kind, account, period_days):
+        calls.append((kind, account, period_days))
+        return payloads[min(len(calls), len(payloads)) - 1]
+
+    service.compute = compute
+    return service, calls
+
+
+class TestRiskSnapshotService:
+    """Risk snapshot unit tests"""
+
+    def test_serves_snapshot_after_first_live_compute(self):
+        service, calls = _service([{"composite_score": 82}])
+
+        async def run():
+            first = await service.serve("risk_control_score", 1001, 30)
+            second = await service.serve("risk_control_score", 1001, 30)
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert len(calls) == 1
+        assert first["snapshot"]["source"] == "live"
+        assert second["snapshot"]["source"] == "snapshot"
+        assert second["composite_score"] == 82
+        assert second["snapshot"]["stale"] is False
+        print("✅ Live compute once, then served from the snapshot")
+
+    def test_fresh_recomputes_and_prunes_versions(self, monkeypatch):
+        monkeypatch.setattr(risk_snapshot_service, "RISK_SNAPSHOT_HISTORY", 2)
+        service, calls = _service([{"composite_score": s} for s in (70, 75, 80, 85)])
+
+        async def run():
+            for _ in range(4):
+                result = await service.serve("risk_control_score", 1001, 30, fresh=True)
+            return result
+
+        result = asyncio.run(run())
+
+        assert len(calls) == 4
+        assert result["composite_score"] == 85
+        assert result["snapshot"]["version"] == 4
+        assert sorted(r["version"] for r in service.collection.rows) == [3, 4]
+        print("✅ fresh=True recomputes; only the newest versions are kept")
+
+    def test_stale_flag_and_errors_not_stored(self, monkeypatch):
+        service, _ = _service([{"success": False, "error": "Account not found"}])
+
+        result = asyncio.run(service.serve("drawdown_analysis", 9999, 90))
+        assert result == {"success": False, "error": "Account not found"}
+        assert service.collection.rows == []
+
+        service.collection.rows.append({
+            "kind": "drawdown_analysis", "account": 1001, "period_days": 90, "version": 1,
+            "computed_at": datetime.now(timezone.utc) - timedelta(hours=5),
+            "duration_ms": 12.0, "payload": {"success": True}
+        })
+        result = asyncio.run(service.serve("drawdown_analysis", 1001, 90))
+        assert result["snapshot"]["stale"] is True
+        assert result["snapshot"]["age_seconds"] >= 5 * 3600 - 1
+        print("✅ Old snapshots are flagged stale; errors are not stored")
+
+    def test_to_bson(self):
+        payload = {"score": np.float64(1.5), "hours": {13: np.int64(2)}, "curve": np.array([1.0, 2.0])}
+
+        assert _to_bson(payload) == {"score": 1.5, "hours": {"13": 2}, "curve": [1.0, 2.0]}
+        assert type(_to_bson(payload)["score"]) is float
+        print("✅ Payloads are made BSON-storable")
@@ -0,0 +1,167 @@
+"""
+Rolling Performance Service Unit Tests
+Tests the rolling 7/30/90-day series built from the daily deal rollups
+
+Test Coverage:
+- Series include a warm-up so the first returned day has every window filled
+- Rolling return / Sharpe / drawdown match brute-force windows over the daily returns
+- All managers are served from one rollup query and one account query
+- Unknown managers fall back to account numbers; unknown funds return None
+"""
+
+import asyncio
+import os
+import sys
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.rolling_performance_service import (
+    MAX_HISTORY_DAYS,
+    RollingPerformanceService,
+    build_series,
+    last_complete_day,
+    series_range,
+)
+
+
+def _matches(doc, query):
+    for field, cond in query.items():
+        value = doc.get(field)
+        if isinstance(cond, dict):
+            if '$in' in cond and value not in cond['$in']:
+                return False
+            if '$gte' in cond and not value >= cond['$gte']:
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self._rows = list(rows)
+
+    async def to_list(self, length=None):
+        return list(self._rows)
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = list(docs or [])
+        self.queries = 0
+
+    def find(self, query, projection=None):
+        self.queries += 1
+        return _Cursor(dict(doc) for doc in self.docs if _matches(doc, query))
+
+    async def find_one(self, query, projection=None):
+        self.queries += 1
+        return next((dict(doc) for doc in self.docs if _matches(doc, query)), None)
+
+
+class FakeDB(dict):
+    def __getattr__(self, name):
+        return self[name]
+
+
+def _rollup(account, day, profit, symbol='XAUUSD'):
+    return {'account': account, 'symbol': symbol, 'day': day.isoformat(),
+            'trade_profit': profit, 'trade_commission': -5.0, 'trade_swap': 0.0}
+
+
+class TestBuildSeries:
+    """Pure series construction"""
+
+    def test_series_range_has_warm_up(self):
+        first, end, days = series_range(30, end_day=date(2026, 3, 31))
+
+        assert days == 30 and end == date(2026, 3, 31)
+        assert (end - first).days + 1 == 30 + 89
+        assert series_range(10_000)[2] == MAX_HISTORY_DAYS
+        assert last_complete_day() < date.today() + timedelta(days=1)
+        print("✅ 90-day warm-up ahead of the returned range")
+
+    def test_matches_brute_force_windows(self):
+        rng = np.random.default_rng(11)
+        pnl = rng.normal(150, 900, (2, 150))
+        capital = [100000.0, 50000.0]
+
+        built = build_series(pnl, capital, date(2026, 1, 1), history_days=40)
+        series = built['series'][0]
+
+        equity = capital[0] + np.cumsum(pnl[0])
+        returns = pnl[0] / np.concatenate(([capital[0]], equity[:-1]))
+        assert len(built['dates']) == 40 and built['dates'][-1] == (date(2026, 1, 1) + timedelta(days=149)).isoformat()
+        for i, day in enumerate(range(110, 150)):
+            window = returns[day - 29:day + 1]
+            peak = max(equity[day - 29:day + 1].max(), equity[day - 30])
+            assert np.isclose(series['windows']['30d']['return_pct'][i], (np.prod(1 + window) - 1) * 100, atol=1e-4)
+            assert np.isclose(series['windows']['30d']['sharpe'][i],
+                              window.mean() / window.std(ddof=1) * np.sqrt(365), atol=1e-3)
+            assert np.isclose(series['windows']['30d']['drawdown_pct'][i], (equity[day] / peak - 1) * 100, atol=1e-4)
+        assert series['equity'][-1] == round(equity[-1], 2)
+
+        short = build_series(pnl[:, :20], capital, date(2026, 1, 1), history_days=20)['series'][1]
+        assert short['windows']['30d']['sharpe'] == [None] * 20
+        assert short['windows']['7d']['sharpe'][6] is not None
+        print("✅ Rolling series agree with brute-force windows; short history is null")
+
+
+class TestRollingPerformanceService:
+    """Rollup-backed entities"""
+
+    def _db(self):
+        end = last_complete_day()
+        rollups = []
+        for offset in range(200):
+            day = end - timedelta(days=offset)
+            rollups.append(_rollup(2206, day, 300.0 if offset % 4 else -500.0))
+            rollups.append(_rollup(20043, day, -100.0 if offset % 2 else 150.0))
+            if offset % 5 == 0:
+                rollups.append(_rollup(20043, day, 25.0, symbol='EURUSD'))
+        rollups.append(_rollup(2206, end + timedelta(days=1), 1e6))          # today's partial day
+        return FakeDB(
+            deal_rollups_daily=FakeCollection(rollups),
+            mt5_deals=FakeCollection(),
+            mt5_accounts=FakeCollection([
+                {'account': 2206, 'initial_allocation': 100000.0},
+                {'account': 20043, 'initial_allocation': 50000.0},
+            ]),
+            money_managers=FakeCollection([
+                {'manager_id': 'mm_jc', 'name': 'JC PROVIDER', 'status': 'active', 'assigned_accounts': [2206]},
+                {'manager_id': 'mm_jared', 'name': 'JARED COPIA', 'status': 'active', 'assigned_accounts': [20043]},
+                {'manager_id': 'mm_old', 'name': 'Old', 'status': 'inactive', 'assigned_accounts': [2199]},
+            ]),
+        )
+
+    def test_all_managers_one_query(self):
+        db = self._db()
+
+        data = asyncio.run(RollingPerformanceService(db).managers(60))
+        by_id = {item['manager_id']: item for item in data['items']}
+
+        assert db.deal_rollups_daily.queries == 1 and db.mt5_accounts.queries == 1
+        assert set(by_id) == {'mm_jc', 'mm_jared'}
+        assert data['as_of'] == last_complete_day().isoformat() and len(data['dates']) == 60
+        jc = by_id['mm_jc']
+        assert jc['capital'] == 100000.0
+        assert max(jc['daily_pnl']) == 295.0                      # partial day excluded
+        assert all(value is not None for value in jc['windows']['90d']['sharpe'])
+        assert by_id['mm_jared']['daily_pnl'][-1] == 165.0        # both symbols of the day
+        print("✅ Every manager from one rollup query; today excluded")
+
+    def test_account_and_fund_lookup(self):
+        db = self._db()
+        service = RollingPerformanceService(db)
+
+        demo = asyncio.run(service.manager('20043', 30))
+        fund = asyncio.run(service.fund('CORE', 30))
+
+        assert demo['items'][0]['accounts'] == [20043] and demo['items'][0]['capital'] == 50000.0
+        assert fund['items'][0]['capital'] == 179316.36                  # fund AUM
+        assert asyncio.run(service.manager('nobody', 30)) is None
+        assert asyncio.run(service.fund('NOPE', 30)) is None
+        print("✅ Account numbers and funds resolve; unknown ids return None")
@@ -0,0 +1,157 @@
+"""
+Startup Profiling and Readiness Tests
+Tests lazy imports and the readiness gate used by server.py startup
+
+Test Coverage:
+- Lazy imports only load the module on first attribute access / call
+- Attribute assignment is forwarded to the real object
+- Import sections and lazy loads are reported by the profiler
+- Startup waits at most the budget for critical initializers
+- Non-critical failures are reported without blocking readiness
+"""
+
+import asyncio
+import os
+import sys
+import textwrap
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.startup import ReadinessGate, StartupProfiler, lazy_import, lazy_object, startup_profiler
+
+
+class TestLazyImports:
+    """Heavy dependencies load on first use"""
+
+    def test_module_loaded_on_first_use(self, tmp_path, monkeypatch):
+        (tmp_path / 'fidus_heavy_sdk.py').write_text(textwrap.dedent('''
+            LOADS = 1
+
+            class Client:
+                def __init__(self, region):
+                    self.region = region
+
+            def build(name, version):
+                return f"{name}:{version}"
+        '''))
+        monkeypatch.syspath_prepend(str(tmp_path))
+        sys.modules.pop('fidus_heavy_sdk', None)
+
+        sdk = lazy_import('fidus_heavy_sdk')
+        build = lazy_import('fidus_heavy_sdk', 'build')
+        Client = lazy_import('fidus_heavy_sdk', 'Client')
+
+        assert 'fidus_heavy_sdk' not in sys.modules
+        assert not build.is_loaded
+
+        assert build('gmail', 'v1') == 'gmail:v1'
+        assert 'fidus_heavy_sdk' in sys.modules
+        assert Client('eu').region == 'eu'
+        assert sdk.LOADS == 1
+        assert 'fidus_heavy_sdk.build' in startup_profiler.get_stats()['lazy_imports_ms']
+        print("✅ Module imported on first call, not at definition")
+
+    def test_lazy_service_forwards_attributes(self):
+        built = []
+
+        class GmailService:
+            def __init__(self):
+                built.append(self)
+                self.service = None
+
+            def is_connected(self):
+                return self.service is not None
+
+        gmail_service = lazy_object('gmail_service', GmailService)
+
+        assert built == []
+        gmail_service.service = 'gmail-v1'
+        assert gmail_service.is_connected()
+        assert len(built) == 1 and built[0].service == 'gmail-v1'
+        print("✅ Lazy service built once, attribute writes reach the instance")
+
+
+class TestStartupProfiler:
+    """Import-time breakdown"""
+
+    def test_checkpoints_accumulate(self):
+        profiler = StartupProfiler()
+        profiler.checkpoint('framework')
+        profiler.checkpoint('google_oauth')
+        profiler.checkpoint('framework')
+        profiler.finish_imports()
+
+        stats = profiler.get_stats()
+
+        assert set(stats['sections_ms']) == {'framework', 'google_oauth', 'router_includes'}
+        assert stats['import_ms'] >= sum(stats['sections_ms'].values()) - 0.5
+        profiler.report()
+        print(f"✅ Import breakdown: {stats['sections_ms']}")
+
+
+class TestReadinessGate:
+    """Initializers run in the background behind the readiness gate"""
+
+    def test_startup_waits_only_for_budget(self):
+        gate = ReadinessGate()
+        release = None
+
+        async def default_users():
+            await release.wait()
+
+        async def mt5_service():
+            await asyncio.sleep(10)
+
+        async def run():
+            nonlocal release
+            release = asyncio.Event()
+            gate.start('default_users', default_users(), critical=True)
+            gate.start('mt5_service', mt5_service())
+
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            ready = await gate.wait(0.05)
+            waited = loop.time() - started
+            before = gate.get_status()
+
+            release.set()
+            await asyncio.sleep(0.01)
+            after = gate.get_status()
+            await gate.cancel()
+            return ready, waited, before, after, gate.get_status()
+
+        ready, waited, before, after, cancelled = asyncio.run(run())
+
+        assert not ready and waited < 1
+        assert not before['ready'] and before['initializers']['default_users']['status'] == 'running'
+        assert after['ready'] and after['ready_at']
+        # Non-critical initializers never block readiness
+        assert after['initializers']['mt5_service']['status'] == 'running'
+        assert cancelled['initializers']['mt5_service']['status'] == 'cancelled'
+        print(f"✅ Startup returned after {waited * 1000:.0f}ms, ready once default users finished")
+
+    def test_failures_reported_not_blocking(self):
+        gate = ReadinessGate()
+
+        async def job_queue():
+            pass
+
+        async def bridge_monitoring():
+            raise ConnectionError("bridge unreachable")
+
+        async def run():
+            gate.start('job_queue', job_queue(), critical=True)
+            gate.start('bridge_monitoring', bridge_monitoring())
+            ready = await gate.wait(1)
+            await asyncio.sleep(0)
+            return ready, gate.get_status()
+
+        ready, status = asyncio.run(run())
+
+        assert ready and status['ready']
+        assert status['degraded']
+        assert status['initializers']['bridge_monitoring'] == {
+            'status': 'failed', 'critical': False, 'error': 'bridge unreachable',
+            'duration_ms': status['initializers']['bridge_monitoring']['duration_ms']
+        }
+        print("✅ Failed non-critical initializer reported as degraded")
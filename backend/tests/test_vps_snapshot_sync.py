@@ -0,0 +1,122 @@
+"""
+VPS Snapshot Sync Unit Tests
+Tests VPSSyncService syncing every account from the bridge's bulk snapshot
+
+Test Coverage:
+- One snapshot GET + one bulk_write replaces 1 + N bridge calls
+- The ETag is sent back and a 304 skips all writes
+- Bridges without the snapshot endpoint fall back to summary + per-account info
+"""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from vps_sync_service import VPSSyncService
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self._rows = rows
+
+    async def to_list(self, length=None):
+        return list(self._rows)
+
+
+class FakeConfigs:
+    def find(self, query):
+        return _Cursor([{'account': a, 'fund_type': 'CORE', 'name': f'Acct {a}'} for a in query['account']['$in']])
+
+
+class FakeAccounts:
+    def __init__(self):
+        self.bulk_calls = []
+
+    async def bulk_write(self, operations, ordered=True):
+        self.bulk_calls.append(operations)
+
+
+SNAPSHOT = {
+    "success": True,
+    "accounts": [
+        {"account": 1001, "balance": 10000.0, "equity": 10250.0, "profit": 250.0, "margin": 100.0,
+         "positions": [{"ticket": 1}], "last_deal_ticket": 555,
+         "refreshed_at": "2025-06-01T12:00:00+00:00", "stale": False, "error": None},
+        {"account": 1002, "balance": 5000.0, "equity": 5000.0, "profit": 0.0,
+         "positions": [], "last_deal_ticket": None,
+         "refreshed_at": "2025-06-01T12:00:05+00:00", "stale": False, "error": None},
+        {"account": 1003, "error": "MT5 login failed", "stale": True},
+    ]
+}
+
+
+def _service(handler):
+    requests = []
+
+    def record(request):
+        requests.append(request)
+        return handler(request)
+
+    accounts = FakeAccounts()
+    service = VPSSyncService(SimpleNamespace(mt5_account_config=FakeConfigs(), mt5_accounts=accounts))
+    service.lucrum_only_mode = False
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(record))
+    return service, accounts, requests
+
+
+class TestVPSSnapshotSync:
+    """Bulk snapshot sync unit tests"""
+
+    def test_snapshot_sync_single_request(self):
+        def handler(request):
+            if request.headers.get('if-none-match') == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json=SNAPSHOT, headers={'ETag': '"v1"'})
+
+        service, accounts, requests = _service(handler)
+
+        async def run():
+            first = await service.sync_all_accounts()
+            second = await service.sync_all_accounts()
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert first['source'] == 'snapshot'
+        assert first['accounts_synced'] == 2
+        assert first['failed_accounts'] == [1003]
+        assert len(accounts.bulk_calls) == 1
+        update = accounts.bulk_calls[0][0]._doc['$set']
+        assert update['equity'] == 10250.0 and update['open_positions'] == 1
+        assert update['last_deal_ticket'] == 555 and update['fund_type'] == 'CORE'
+        assert update['updated_at'].isoformat() == "2025-06-01T12:00:00+00:00"
+
+        assert second['not_modified'] is True and second['accounts_synced'] == 0
+        assert len(accounts.bulk_calls) == 1
+        assert [r.url.path for r in requests] == ['/api/mt5/accounts/snapshot'] * 2
+        print("✅ One snapshot GET per sync; 304 skips all writes")
+
+    def test_falls_back_without_snapshot_endpoint(self):
+        def handler(request):
+            path = request.url.path
+            if path == '/api/mt5/accounts/snapshot':
+                return httpx.Response(404, json={"detail": "Not Found"})
+            if path == '/api/mt5/accounts/summary':
+                return httpx.Response(200, json={"accounts": [{"account": 1001}]})
+            return httpx.Response(200, json={"live_data": {"balance": 7.0, "equity": 8.0, "profit": 1.0}})
+
+        service, accounts, requests = _service(handler)
+
+        result = asyncio.run(service.sync_all_accounts())
+
+        assert 'source' not in result
+        assert result['accounts_synced'] == 1
+        assert [r.url.path for r in requests] == [
+            '/api/mt5/accounts/snapshot', '/api/mt5/accounts/summary', '/api/mt5/account/1001/info'
+        ]
+        print("✅ Older bridges fall back to summary + per-account info")
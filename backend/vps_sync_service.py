@@ -11,16 +11,25 @@ UPDATED: Feb 24, 2026 - LUCRUM-Only Mode
 
 import asyncio
 import logging
+import time
 from datetime import datetime, timezone
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import httpx
 import os
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from services.deal_ingestion_service import DealIngestionService, normalize_mt5_deal
+from services.response_cache import TAG_MT5_ACCOUNTS, response_cache
 
 logger = logging.getLogger(__name__)
 
 # LUCRUM-ONLY MODE: Disable VPS sync since MEXAtlantic is no longer active
 LUCRUM_ONLY_MODE = False
 
+# mt5_account_config fields copied onto mt5_accounts during sync
+CONFIG_FIELDS = ('fund_type', 'name', 'money_manager_url', 'server', 'broker_name')
+
 class VPSSyncService:
     """Service to sync MT5 data from VPS Bridge to MongoDB"""
     
@@ -28,6 +37,9 @@ class VPSSyncService:
         self.db = db
         self.bridge_url = os.getenv('MT5_BRIDGE_URL', 'http://92.118.45.135:8000')
         self.timeout = int(os.getenv('MT5_BRIDGE_TIMEOUT', '30'))
+        self.max_concurrency = max(1, int(os.getenv('MT5_BRIDGE_SYNC_CONCURRENCY', '5')))
+        self._client: Optional[httpx.AsyncClient] = None
+        self._snapshot_etag: Optional[str] = None
         self.lucrum_only_mode = LUCRUM_ONLY_MODE
         
         if self.lucrum_only_mode:
@@ -36,6 +48,29 @@ class VPSSyncService:
         else:
             logger.info(f"🔗 VPS Sync Service initialized with URL: {self.bridge_url}")
     
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Shared, pooled HTTP client for all bridge calls
+
+        Re-created lazily if it was closed, so the singleton survives
+        a shutdown/startup cycle.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                )
+            )
+        return self._client
+    
+    async def close(self):
+        """Close the pooled HTTP client"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+    
     async def fetch_from_vps(self, endpoint: str) -> Dict[str, Any]:
         """
         Fetch data from VPS MT5 Bridge API
@@ -49,25 +84,239 @@ class VPSSyncService:
         url = f"{self.bridge_url}{endpoint}"
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url)
-                
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    logger.error(f"❌ VPS API error {response.status_code}: {response.text}")
-                    return {"error": f"HTTP {response.status_code}"}
+            response = await self._get_client().get(url)
+            
+            if response.status_code == 200:
+                return response.json()
+            else:
+                logger.error(f"❌ VPS API error {response.status_code}: {response.text}")
+                return {"error": f"HTTP {response.status_code}"}
         
         except Exception as e:
             logger.error(f"❌ Error calling VPS Bridge: {str(e)}")
             return {"error": str(e)}
     
-    async def sync_all_accounts(self) -> Dict[str, Any]:
+    async def _load_account_configs(self, account_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Load mt5_account_config for all accounts with a single $in query"""
+        cursor = self.db.mt5_account_config.find({'account': {'$in': account_ids}})
+        configs = await cursor.to_list(length=None)
+        return {config['account']: config for config in configs if config.get('account') is not None}
+    
+    async def _fetch_account_update(
+        self,
+        account_info: Dict[str, Any],
+        account_config: Optional[Dict[str, Any]],
+        sync_time: datetime,
+        semaphore: asyncio.Semaphore
+    ) -> Dict[str, Any]:
+        """
+        Fetch live data for one account and build its mt5_accounts $set document
+        
+        Returns a dict with account, latency_seconds and either 'update' or 'error'.
+        The write itself is left to the caller so all accounts go out in one bulk_write.
+        """
+        account_id = account_info.get('account')
+        
+        async with semaphore:
+            fetch_start = time.perf_counter()
+            account_result = await self.fetch_from_vps(f'/api/mt5/account/{account_id}/info')
+            latency = round(time.perf_counter() - fetch_start, 3)
+        
+        if 'error' in account_result:
+            logger.error(f"❌ Failed to fetch account {account_id}: {account_result['error']}")
+            return {'account': account_id, 'latency_seconds': latency, 'error': account_result['error']}
+        
+        # Get live data (not cached MongoDB data)
+        live_data = account_result.get('live_data', {})
+        
+        if not live_data:
+            logger.warning(f"⚠️  No live data for account {account_id}, using stored data")
+        
+        update_data = self._build_account_update(
+            account_id, live_data, account_result.get('stored_data', {}), account_info, account_config, sync_time
+        )
+        
+        return {
+            'account': account_id,
+            'latency_seconds': latency,
+            'live': bool(live_data),
+            'balance': update_data['balance'],
+            'update': update_data
+        }
+    
+    def _build_account_update(
+        self,
+        account_id: int,
+        live_data: Optional[Dict[str, Any]],
+        stored_data: Dict[str, Any],
+        account_info: Dict[str, Any],
+        account_config: Optional[Dict[str, Any]],
+        sync_time: datetime
+    ) -> Dict[str, Any]:
+        """Build the mt5_accounts $set document from live (or stored) bridge data plus config"""
+        live_data = live_data or {}
+        if not live_data:
+            # Fallback to stored data if live data not available
+            balance = stored_data.get('balance', account_info.get('balance', 0))
+            equity = stored_data.get('equity', account_info.get('equity', 0))
+            profit = stored_data.get('profit', account_info.get('profit', 0))
+        else:
+            # Use LIVE data from MT5
+            balance = live_data.get('balance', 0)
+            equity = live_data.get('equity', 0)
+            profit = live_data.get('profit', 0)
+        
+        # Prepare update data with live MT5 data
+        update_data = {
+            'account': account_id,  # Ensure account number is set
+            'balance': balance,
+            'equity': equity,
+            'profit': profit,
+            'margin': live_data.get('margin'),
+            'margin_free': live_data.get('margin_free'),
+            'margin_level': live_data.get('margin_level'),
+            'leverage': live_data.get('leverage'),
+            'currency': live_data.get('currency', 'USD'),
+            'trade_allowed': live_data.get('trade_allowed'),
+            'updated_at': sync_time,
+            'synced_from_vps': True,
+            'vps_sync_timestamp': sync_time,
+            'data_source': 'VPS_LIVE_MT5' if live_data else 'VPS_STORED'
+        }
+        
+        # Add configuration fields from mt5_account_config if they exist
+        if account_config:
+            logger.info(f"📋 Config found for {account_id}: fund_type={account_config.get('fund_type')}, manager={account_config.get('money_manager_url', 'N/A')[:20]}")
+            for field in CONFIG_FIELDS:
+                if field in account_config:
+                    update_data[field] = account_config[field]
+        else:
+            logger.warning(f"⚠️  No config found for account {account_id} in mt5_account_config")
+        
+        return update_data
+    
+    async def fetch_snapshot(self) -> Dict[str, Any]:
+        """
+        Fetch the bridge's bulk live snapshot (/api/mt5/accounts/snapshot)
+        
+        Sends the last seen ETag; returns {"not_modified": True} on 304.
+        The ETag is only remembered once the caller has written the data
+        (see _sync_from_snapshot), so a failed write is retried next time.
+        """
+        headers = {'If-None-Match': self._snapshot_etag} if self._snapshot_etag else {}
+        try:
+            response = await self._get_client().get(f"{self.bridge_url}/api/mt5/accounts/snapshot", headers=headers)
+        except Exception as e:
+            return {"error": str(e)}
+        
+        if response.status_code == 304:
+            return {"not_modified": True, "etag": self._snapshot_etag}
+        if response.status_code != 200:
+            return {"error": f"HTTP {response.status_code}", "status_code": response.status_code}
+        body = response.json()
+        body['etag'] = response.headers.get('ETag') or body.get('etag')
+        return body
+    
+    async def _sync_from_snapshot(
+        self, start_time: datetime, accounts: Optional[List[int]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Sync every account (or only `accounts`) from one snapshot GET
+        
+        Returns None when the bridge has no usable snapshot (older bridge
+        without the endpoint, snapshot still warming up, bridge error) so
+        the caller falls back to the summary + per-account info path.
+        """
+        snapshot = await self.fetch_snapshot()
+        
+        if snapshot.get('error'):
+            logger.info(f"ℹ️  Bridge snapshot unavailable ({snapshot['error']}), using per-account sync")
+            return None
+        
+        if snapshot.get('not_modified'):
+            logger.info("✅ VPS snapshot unchanged since last sync (304)")
+            return {
+                "success": True,
+                "source": "snapshot",
+                "not_modified": True,
+                "accounts_synced": 0,
+                "timestamp": start_time.isoformat(),
+                "vps_url": self.bridge_url
+            }
+        
+        entries = [
+            e for e in snapshot.get('accounts', [])
+            if e.get('account') and (accounts is None or e['account'] in accounts)
+        ]
+        configs = await self._load_account_configs([e['account'] for e in entries])
+        
+        operations = []
+        failed_accounts = []
+        stale_accounts = []
+        for entry in entries:
+            account_id = entry['account']
+            if not entry.get('refreshed_at'):
+                # Never refreshed on the bridge: nothing live to write
+                failed_accounts.append(account_id)
+                continue
+            if entry.get('stale') or entry.get('error'):
+                stale_accounts.append(account_id)
+            
+            refreshed_at = datetime.fromisoformat(entry['refreshed_at'])
+            update = self._build_account_update(account_id, entry, {}, entry, configs.get(account_id), refreshed_at)
+            update['vps_sync_timestamp'] = start_time
+            update['open_positions'] = len(entry.get('positions') or [])
+            update['last_deal_ticket'] = entry.get('last_deal_ticket')
+            operations.append(UpdateOne({'account': account_id}, {'$set': update}, upsert=True))
+        
+        accounts_synced = 0
+        if operations:
+            try:
+                await self.db.mt5_accounts.bulk_write(operations, ordered=False)
+                accounts_synced = len(operations)
+            except BulkWriteError as e:
+                write_errors = e.details.get('writeErrors', [])
+                accounts_synced = len(operations) - len(write_errors)
+                logger.error(f"❌ Bulk snapshot write had {len(write_errors)} errors")
+            response_cache.bump(TAG_MT5_ACCOUNTS)
+        
+        # A filtered pass did not write every account, so it must not earn a 304 next time
+        if accounts_synced == len(operations) and accounts is None:
+            self._snapshot_etag = snapshot.get('etag')
+        
+        duration = (datetime.now(timezone.utc) - start_time).total_seconds()
+        logger.info(f"✅ VPS snapshot sync complete: {accounts_synced}/{len(entries)} accounts in {duration:.2f}s")
+        if stale_accounts:
+            logger.warning(f"⚠️  Stale snapshot accounts: {stale_accounts}")
+        
+        return {
+            "success": True,
+            "source": "snapshot",
+            "accounts_synced": accounts_synced,
+            "total_accounts": len(entries),
+            "failed_accounts": failed_accounts,
+            "stale_accounts": stale_accounts,
+            "duration_seconds": duration,
+            "timestamp": start_time.isoformat(),
+            "vps_url": self.bridge_url
+        }
+    
+    async def sync_all_accounts(self, accounts: Optional[List[int]] = None) -> Dict[str, Any]:
         """
         Sync all MT5 accounts from VPS to MongoDB
         
+        Prefers the bridge's bulk snapshot: one ETag-conditional GET for
+        every account. On bridges without it, account info calls are fanned
+        out concurrently (bounded by MT5_BRIDGE_SYNC_CONCURRENCY) over a
+        pooled HTTP client, configs are loaded with one $in query and all
+        writes go out as one bulk_write, so a full sync takes roughly as
+        long as the slowest account.
+        
         In LUCRUM-ONLY mode, returns success without connecting to VPS
         LUCRUM accounts are synced via GitHub Actions workflow instead
+        
+        Args:
+            accounts: Only sync these account numbers (default: every account)
         """
         try:
             if self.lucrum_only_mode:
@@ -83,6 +332,11 @@ class VPSSyncService:
             logger.info("🔄 Starting VPS→MongoDB sync for all accounts")
             start_time = datetime.now(timezone.utc)
             
+            # One GET for every account when the bridge serves a live snapshot
+            snapshot_result = await self._sync_from_snapshot(start_time, accounts)
+            if snapshot_result is not None:
+                return snapshot_result
+            
             # First, get the list of accounts from summary (just to know which accounts exist)
             summary_result = await self.fetch_from_vps('/api/mt5/accounts/summary')
             
@@ -106,100 +360,73 @@ class VPSSyncService:
                     "timestamp": start_time.isoformat()
                 }
             
-            # Fetch LIVE data for each account individually
-            accounts_synced = 0
-            failed_accounts = []
-            
+            valid_accounts = []
             for account_info in accounts_list:
-                account_id = account_info.get('account')
-                
-                if not account_id:
+                if not account_info.get('account'):
                     logger.warning(f"⚠️  Skipping account with no ID: {account_info}")
                     continue
+                if accounts is not None and account_info['account'] not in accounts:
+                    continue
+                valid_accounts.append(account_info)
+            
+            # Load all account configs in one round-trip
+            configs = await self._load_account_configs([a['account'] for a in valid_accounts])
+            
+            # Fetch LIVE data for every account concurrently
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            results = await asyncio.gather(
+                *[
+                    self._fetch_account_update(a, configs.get(a['account']), start_time, semaphore)
+                    for a in valid_accounts
+                ],
+                return_exceptions=True
+            )
+            
+            failed_accounts = []
+            account_latencies = {}
+            operations = []
+            synced_results = []
+            
+            for account_info, result in zip(valid_accounts, results):
+                account_id = account_info['account']
+                if isinstance(result, Exception):
+                    logger.error(f"❌ Error syncing account {account_id}: {str(result)}")
+                    failed_accounts.append(account_id)
+                    continue
                 
-                try:
-                    # Fetch live data from VPS for this specific account
-                    account_result = await self.fetch_from_vps(f'/api/mt5/account/{account_id}/info')
-                    
-                    if 'error' in account_result:
-                        logger.error(f"❌ Failed to fetch account {account_id}: {account_result['error']}")
-                        failed_accounts.append(account_id)
-                        continue
-                    
-                    # Get live data (not cached MongoDB data)
-                    live_data = account_result.get('live_data', {})
-                    
-                    if not live_data:
-                        logger.warning(f"⚠️  No live data for account {account_id}, using stored data")
-                        # Fallback to stored data if live data not available
-                        stored_data = account_result.get('stored_data', {})
-                        balance = stored_data.get('balance', account_info.get('balance', 0))
-                        equity = stored_data.get('equity', account_info.get('equity', 0))
-                        profit = stored_data.get('profit', account_info.get('profit', 0))
-                    else:
-                        # Use LIVE data from MT5
-                        balance = live_data.get('balance', 0)
-                        equity = live_data.get('equity', 0)
-                        profit = live_data.get('profit', 0)
-                    
-                    # Fetch account configuration from mt5_account_config to get fund_type, name, etc.
-                    account_config = await self.db.mt5_account_config.find_one({'account': account_id})
-                    
-                    # Prepare update data with live MT5 data
-                    update_data = {
-                        'account': account_id,  # Ensure account number is set
-                        'balance': balance,
-                        'equity': equity,
-                        'profit': profit,
-                        'margin': live_data.get('margin'),
-                        'margin_free': live_data.get('margin_free'),
-                        'margin_level': live_data.get('margin_level'),
-                        'leverage': live_data.get('leverage'),
-                        'currency': live_data.get('currency', 'USD'),
-                        'trade_allowed': live_data.get('trade_allowed'),
-                        'updated_at': start_time,
-                        'synced_from_vps': True,
-                        'vps_sync_timestamp': start_time,
-                        'data_source': 'VPS_LIVE_MT5' if live_data else 'VPS_STORED'
-                    }
-                    
-                    # Add configuration fields from mt5_account_config if they exist
-                    if account_config:
-                        logger.info(f"📋 Config found for {account_id}: fund_type={account_config.get('fund_type')}, manager={account_config.get('money_manager_url', 'N/A')[:20]}")
-                        if 'fund_type' in account_config:
-                            update_data['fund_type'] = account_config['fund_type']
-                        if 'name' in account_config:
-                            update_data['name'] = account_config['name']
-                        if 'money_manager_url' in account_config:
-                            update_data['money_manager_url'] = account_config['money_manager_url']
-                        if 'server' in account_config:
-                            update_data['server'] = account_config['server']
-                        if 'broker_name' in account_config:
-                            update_data['broker_name'] = account_config['broker_name']
-                    else:
-                        logger.warning(f"⚠️  No config found for account {account_id} in mt5_account_config")
-                    
-                    # Update MongoDB with LIVE data + config
-                    update_result = await self.db.mt5_accounts.update_one(
-                        {'account': account_id},
-                        {'$set': update_data},
-                        upsert=True  # Changed to True to create accounts from config if they don't exist
-                    )
-                    
-                    if update_result.modified_count > 0 or update_result.matched_count > 0:
-                        accounts_synced += 1
-                        logger.info(f"✅ Synced account {account_id}: ${balance:,.2f} (live: {bool(live_data)}) - Modified: {update_result.modified_count}, Matched: {update_result.matched_count}")
-                    else:
-                        logger.warning(f"⚠️  Account {account_id} update failed - Modified: {update_result.modified_count}, Matched: {update_result.matched_count}, Upserted: {update_result.upserted_id}")
-                        failed_accounts.append(account_id)
-                
-                except Exception as e:
-                    logger.error(f"❌ Error syncing account {account_id}: {str(e)}")
+                account_latencies[str(account_id)] = result['latency_seconds']
+                if 'error' in result:
                     failed_accounts.append(account_id)
+                    continue
+                
+                # Upsert creates accounts from config if they don't exist yet
+                operations.append(UpdateOne({'account': account_id}, {'$set': result['update']}, upsert=True))
+                synced_results.append(result)
+            
+            # Update MongoDB with LIVE data + config in a single round-trip
+            accounts_synced = 0
+            if operations:
+                try:
+                    await self.db.mt5_accounts.bulk_write(operations, ordered=False)
+                    accounts_synced = len(operations)
+                    for result in synced_results:
+                        logger.info(f"✅ Synced account {result['account']}: ${result['balance']:,.2f} (live: {result['live']}) in {result['latency_seconds']:.2f}s")
+                except BulkWriteError as e:
+                    write_errors = e.details.get('writeErrors', [])
+                    failed_indexes = {err['index'] for err in write_errors}
+                    for index, result in enumerate(synced_results):
+                        if index in failed_indexes:
+                            failed_accounts.append(result['account'])
+                    accounts_synced = len(operations) - len(failed_indexes)
+                    logger.error(f"❌ Bulk account write had {len(write_errors)} errors")
+                response_cache.bump(TAG_MT5_ACCOUNTS)
             
             duration = (datetime.now(timezone.utc) - start_time).total_seconds()
+            slowest = max(account_latencies.items(), key=lambda item: item[1]) if account_latencies else None
             
-            logger.info(f"✅ VPS sync complete: {accounts_synced}/{len(accounts_list)} accounts synced in {duration:.2f}s")
+            logger.info(f"✅ VPS sync complete: {accounts_synced}/{len(accounts_list)} accounts synced in {duration:.2f}s (concurrency={self.max_concurrency})")
+            if slowest:
+                logger.info(f"🐢 Slowest account: {slowest[0]} ({slowest[1]:.2f}s)")
             if failed_accounts:
                 logger.warning(f"⚠️  Failed accounts: {failed_accounts}")
             
@@ -209,6 +436,9 @@ class VPSSyncService:
                 "total_accounts": len(accounts_list),
                 "failed_accounts": failed_accounts,
                 "duration_seconds": duration,
+                "account_latencies": account_latencies,
+                "slowest_account": slowest[0] if slowest else None,
+                "max_concurrency": self.max_concurrency,
                 "timestamp": start_time.isoformat(),
                 "vps_url": self.bridge_url
             }
@@ -280,6 +510,7 @@ class VPSSyncService:
             )
             
             if update_result.modified_count > 0 or update_result.matched_count > 0:
+                response_cache.bump(TAG_MT5_ACCOUNTS)
                 logger.info(f"✅ Synced account {account_id}: ${live_data.get('balance', 0):,.2f}")
                 return {
                     "success": True,
@@ -349,78 +580,27 @@ class VPSSyncService:
                 }
             
             # Store trades in mt5_deals collection (CORRECTED from mt5_deals_history)
-            trades_synced = 0
+            # Normalized once and bulk upserted; unchanged deals are skipped by hash
             sync_time = datetime.now(timezone.utc)
-            
-            for trade in trades:
-                try:
-                    # Convert Unix timestamp to datetime
-                    trade_time = trade.get('time')
-                    if isinstance(trade_time, int):
-                        trade_time = datetime.fromtimestamp(trade_time, tz=timezone.utc)
-                    elif isinstance(trade_time, str):
-                        try:
-                            trade_time = datetime.fromisoformat(trade_time.replace('Z', '+00:00'))
-                        except:
-                            trade_time = sync_time
-                    else:
-                        trade_time = sync_time
-                    
-                    # Prepare trade document with EXACT MT5 Python API field names
-                    # Following MT5 Field Standardization Mandate
-                    trade_doc = {
-                        # Core MT5 deal fields (from VPS API)
-                        'ticket': trade.get('ticket'),
-                        'order': trade.get('order'),
-                        'time': trade_time,
-                        'type': trade.get('type'),
-                        'entry': trade.get('entry'),
-                        'symbol': trade.get('symbol'),
-                        'volume': trade.get('volume'),
-                        'price': trade.get('price'),
-                        'profit': trade.get('profit'),
-                        'comment': trade.get('comment', ''),
-                        
-                        # MT5 fields not provided by VPS API (set to None for honesty)
-                        'time_msc': None,      # VPS doesn't provide milliseconds
-                        'commission': None,    # VPS doesn't provide commission
-                        'swap': None,          # VPS doesn't provide swap
-                        'fee': None,           # VPS doesn't provide fee
-                        'external_id': None,   # VPS doesn't provide external_id
-                        'position_id': None,   # VPS doesn't provide position_id
-                        'magic': None,         # VPS doesn't provide magic number
-                        'reason': None,        # VPS doesn't provide reason
-                        
-                        # FIDUS-specific metadata (added AFTER MT5 fields)
-                        'account': account_id,           # MT5 account login number
-                        'synced_at': sync_time,          # When synced
-                        'synced_from_vps': True,         # Data source flag
-                        'synced_by': 'vps_bridge_service'  # Service identifier
-                    }
-                    
-                    # Upsert trade (update if exists, insert if new)
-                    # Use ticket+account as unique identifier
-                    await self.db.mt5_deals.update_one(
-                        {
-                            'ticket': trade_doc['ticket'],
-                            'account': account_id
-                        },
-                        {'$set': trade_doc},
-                        upsert=True
-                    )
-                    
-                    trades_synced += 1
-                
-                except Exception as e:
-                    logger.error(f"❌ Error storing trade {trade.get('ticket')}: {str(e)}")
-                    continue
-            
-            logger.info(f"✅ Synced {trades_synced}/{len(trades)} deals to mt5_deals collection for account {account_id}")
+            deal_docs = [
+                normalize_mt5_deal(
+                    trade, account_id, sync_time, 'vps_bridge_service',
+                    {'synced_from_vps': True}  # Data source flag
+                )
+                for trade in trades
+            ]
+            stats = await DealIngestionService(self.db, collection='mt5_deals').ingest(deal_docs)
+            trades_synced = stats['inserted'] + stats['updated']
+            
+            logger.info(f"✅ Synced {trades_synced}/{len(trades)} deals to mt5_deals collection for account {account_id} ({stats['unchanged']} unchanged)")
             
             return {
                 "success": True,
                 "account_id": account_id,
                 "trades_synced": trades_synced,
+                "trades_inserted": stats['inserted'],
+                "trades_updated": stats['updated'],
+                "trades_unchanged": stats['unchanged'],
                 "total_trades": len(trades),
                 "sync_time": sync_time.isoformat()
             }
@@ -434,12 +614,13 @@ class VPSSyncService:
                 "trades_synced": 0
             }
     
-    async def sync_all_trades(self, limit_per_account: int = 100) -> Dict[str, Any]:
+    async def sync_all_trades(self, limit_per_account: int = 100, accounts: Optional[List[int]] = None) -> Dict[str, Any]:
         """
         Sync trades for all accounts from VPS
         
         Args:
             limit_per_account: Number of recent trades to fetch per account
+            accounts: Only sync these account numbers (default: every account)
         
         Returns:
             Sync results with statistics
@@ -449,7 +630,8 @@ class VPSSyncService:
             start_time = datetime.now(timezone.utc)
             
             # Get list of all accounts
-            accounts_cursor = self.db.mt5_accounts.find({}, {'account': 1})
+            query = {} if accounts is None else {'account': {'$in': list(accounts)}}
+            accounts_cursor = self.db.mt5_accounts.find(query, {'account': 1})
             accounts = await accounts_cursor.to_list(length=None)
             
             if not accounts:
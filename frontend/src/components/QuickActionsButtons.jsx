@@ -1,4 +1,5 @@
 import React, { useState, useEffect } from 'react';
+import { resolveJobResponse } from '../utils/jobs';
 
 const QuickActionsButtons = () => {
   const [bridgeStatus, setBridgeStatus] = useState('checking');
@@ -71,7 +72,10 @@ const QuickActionsButtons = () => {
       console.log('📡 API Response status:', response.status);
 
       if (response.ok) {
-        const data = await response.json();
+        // The sync runs as a background job; show its progress until it finishes
+        const data = await resolveJobResponse(await response.json(), {
+          onProgress: (job) => setSyncMessage(`Syncing deals... ${Math.round(job.progress || 0)}%`)
+        });
         console.log('✅ Sync successful:', data);
         setSyncStatus('success');
         const dealsCount = data.total_deals_synced || 0;
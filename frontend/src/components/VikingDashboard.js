@@ -55,6 +55,7 @@ import {
   Pie,
   Cell
 } from 'recharts';
+import { resolveJobResponse } from '../utils/jobs';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 
@@ -160,14 +161,15 @@ const VikingDashboard = ({ onAccountChange }) => {
       setCalculating(true);
       
       // Calculate for CORE
+      // Analytics are calculated by background jobs; wait for their results
       const coreRes = await fetch(`${BACKEND_URL}/api/viking/calculate-analytics/CORE`, { method: 'POST' });
-      const coreData = await coreRes.json();
+      const coreData = await resolveJobResponse(await coreRes.json());
       if (coreData.success) setCoreAnalytics(coreData.analytics);
       
       // Calculate for PRO if it exists
       try {
         const proRes = await fetch(`${BACKEND_URL}/api/viking/calculate-analytics/PRO`, { method: 'POST' });
-        const proData = await proRes.json();
+        const proData = await resolveJobResponse(await proRes.json());
         if (proData.success) setProAnalytics(proData.analytics);
       } catch (e) {
         console.log("BALANCE account not yet available");
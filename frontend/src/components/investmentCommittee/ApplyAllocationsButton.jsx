@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { getAuthHeaders } from '../../utils/auth';
+import { resolveJobResponse } from '../../utils/jobs';
 import './ApplyAllocations.css';
 
 const API_BASE_URL = process.env.REACT_APP_BACKEND_URL || '';
@@ -80,7 +81,8 @@ export default function ApplyAllocationsButton({ onSuccess }) {
         throw new Error(errorData.detail || 'Failed to apply allocations');
       }
       
-      const result = await response.json();
+      // Applied by a background job; wait for its result
+      const result = await resolveJobResponse(await response.json());
       
       // Show success message
       alert(
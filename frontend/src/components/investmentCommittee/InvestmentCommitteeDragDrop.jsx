@@ -8,6 +8,7 @@ import BrokerPlatformZones from './BrokerPlatformZones';
 import ReassignmentDialog from './ReassignmentDialog';
 import ApplyAllocationsDialog from './ApplyAllocationsDialog';
 import { getAuthHeaders } from '../../utils/auth';
+import { resolveJobResponse } from '../../utils/jobs';
 import './InvestmentCommittee.css';
 
 const API_BASE_URL = process.env.REACT_APP_BACKEND_URL || '';
@@ -277,7 +278,8 @@ export default function InvestmentCommitteeDragDrop() {
         throw new Error(errorData.detail || 'Failed to apply allocations');
       }
 
-      const result = await response.json();
+      // Applied by a background job; wait for its result
+      const result = await resolveJobResponse(await response.json());
       
       if (result.success) {
         // Show success message
@@ -0,0 +1,63 @@
+/**
+ * Background job helpers for FIDUS Investment Management Platform
+ *
+ * Long-running admin actions (apply allocations, deals sync, rebate
+ * calculation, VIKING analytics) answer with a queued job instead of the
+ * result. waitForJob polls GET /api/jobs/{job_id} until it finishes.
+ */
+
+import { getAuthHeaders } from './auth';
+
+const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || '';
+
+const FINISHED_STATUSES = ['completed', 'failed', 'cancelled'];
+
+/**
+ * Poll a job until it completes and return its result.
+ * Throws with the job's error if it fails or is cancelled.
+ *
+ * @param {string} jobId - job_id from the enqueue response
+ * @param {object} options - { onProgress(job), intervalMs, timeoutMs }
+ */
+export const waitForJob = async (jobId, { onProgress, intervalMs = 1500, timeoutMs = 15 * 60 * 1000 } = {}) => {
+  const deadline = Date.now() + timeoutMs;
+
+  while (Date.now() < deadline) {
+    const response = await fetch(`${BACKEND_URL}/api/jobs/${jobId}`, { headers: getAuthHeaders() });
+    if (!response.ok) {
+      const errorData = await response.json().catch(() => ({}));
+      throw new Error(errorData.detail || `Job status request failed (${response.status})`);
+    }
+
+    const job = await response.json();
+    if (onProgress) onProgress(job);
+
+    if (FINISHED_STATUSES.includes(job.status)) {
+      if (job.status === 'completed') return job.result;
+      throw new Error(job.error || `Job ${job.status}`);
+    }
+
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+
+  throw new Error('Timed out waiting for background job');
+};
+
+/**
+ * Resolve an endpoint response that may be a queued job.
+ * Returns the job result for job responses, the payload itself otherwise.
+ */
+export const resolveJobResponse = async (payload, options) => {
+  if (payload && payload.job_id && payload.status_url) {
+    return waitForJob(payload.job_id, options);
+  }
+  return payload;
+};
+
+export const cancelJob = async (jobId) => {
+  const response = await fetch(`${BACKEND_URL}/api/jobs/${jobId}/cancel`, {
+    method: 'POST',
+    headers: getAuthHeaders()
+  });
+  return response.json();
+};
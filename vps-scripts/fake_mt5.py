@@ -0,0 +1,110 @@
+"""
+Fake MetaTrader5 module for running the bridge without a terminal
+
+Implements the subset of the MetaTrader5 API the bridges use
+(initialize/login/account_info/positions_get/history_deals_get/...), with
+deterministic account figures, so the multi-terminal pool can run and be
+tested on Linux:
+
+    MT5_MODULE=fake_mt5 python mt5_bridge_api_service_multi_terminal.py
+
+Like the real module, it holds one initialized terminal and one logged-in
+account per process. Behaviour can be shaped with environment variables:
+- FAKE_MT5_LOGIN_LATENCY: seconds each login() takes (default 0)
+- FAKE_MT5_FAIL_ACCOUNTS: comma-separated accounts whose login fails
+- FAKE_MT5_CRASH_ACCOUNT: login to this account kills the process (once
+  per FAKE_MT5_CRASH_MARKER file, if set)
+- FAKE_MT5_HANG_ACCOUNT: login to this account never returns
+"""
+
+import os
+import time
+from collections import namedtuple
+
+AccountInfo = namedtuple('AccountInfo', [
+    'login', 'server', 'balance', 'equity', 'profit', 'margin', 'margin_free',
+    'margin_level', 'leverage', 'currency', 'trade_allowed'
+])
+TerminalInfo = namedtuple('TerminalInfo', ['connected', 'trade_allowed', 'name', 'company', 'build', 'path'])
+
+_state = {'path': None, 'login': None, 'server': None, 'error': (1, 'Success')}
+
+
+def _accounts_from_env(name):
+    return {int(a) for a in os.environ.get(name, '').split(',') if a.strip()}
+
+
+def initialize(path=None, **kwargs):
+    _state['path'] = path
+    _state['error'] = (1, 'Success')
+    return True
+
+
+def shutdown():
+    _state['path'] = None
+    _state['login'] = None
+    return True
+
+
+def version():
+    return (500, 4508, 'fake')
+
+
+def last_error():
+    return _state['error']
+
+
+def terminal_info():
+    if _state['path'] is None:
+        return None
+    return TerminalInfo(True, True, 'Fake MT5', 'FIDUS', 4508, _state['path'])
+
+
+def login(login, password=None, server=None, timeout=60000):
+    if _state['path'] is None:
+        _state['error'] = (-10004, 'No IPC connection')
+        return False
+
+    if login == int(os.environ.get('FAKE_MT5_HANG_ACCOUNT', '0') or 0):
+        while True:
+            time.sleep(60)
+
+    if login == int(os.environ.get('FAKE_MT5_CRASH_ACCOUNT', '0') or 0):
+        marker = os.environ.get('FAKE_MT5_CRASH_MARKER')
+        if not marker or not os.path.exists(marker):
+            if marker:
+                open(marker, 'w').close()
+            os._exit(3)
+
+    time.sleep(float(os.environ.get('FAKE_MT5_LOGIN_LATENCY', '0')))
+    if login in _accounts_from_env('FAKE_MT5_FAIL_ACCOUNTS'):
+        _state['error'] = (-6, 'Authorization failed')
+        return False
+
+    _state['login'] = login
+    _state['server'] = server
+    return True
+
+
+def account_info():
+    account = _state['login']
+    if account is None:
+        return None
+    # Deterministic figures derived from the account number
+    balance = float(account % 100000) + 1000.0
+    profit = round((account % 97) - 48.0, 2)
+    margin = 100.0
+    return AccountInfo(
+        login=account, server=_state['server'], balance=balance, equity=balance + profit,
+        profit=profit, margin=margin, margin_free=balance + profit - margin,
+        margin_level=round((balance + profit) / margin * 100, 2), leverage=100,
+        currency='USD', trade_allowed=True
+    )
+
+
+def positions_get(*args, **kwargs):
+    return ()
+
+
+def history_deals_get(*args, **kwargs):
+    return ()
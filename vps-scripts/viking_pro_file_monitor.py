@@ -19,6 +19,7 @@ ACCOUNT_NUMBER = "1309411"
 STRATEGY = "PRO"
 BROKER = "Traders Trust"
 POLL_INTERVAL = 30  # Check every 30 seconds
+FULL_RESYNC_INTERVAL = 3600  # Re-upload the whole file once an hour (reconciliation)
 
 def find_account_data_file():
     """Search for viking_account_1309411_data.json in common MT4 locations"""
@@ -200,7 +201,7 @@ def upload_closed_trades(db, closed_trades):
         return 0
     except Exception as e:
         print(f"❌ Closed trades upload error: {e}")
-        return 0
+        return None  # Failed upload: callers must not advance their watermark
 
 
 def upload_balance_operations(db, balance_operations):
@@ -254,8 +255,46 @@ def upload_balance_operations(db, balance_operations):
         return 0
     except Exception as e:
         print(f"❌ Balance operations upload error: {e}")
+        return None  # Failed upload: callers must not advance their watermark
+
+def _ticket_number(entry):
+    try:
+        return int(entry.get("ticket") or 0)
+    except (TypeError, ValueError):
         return 0
 
+
+def select_new_entries(entries, last_ticket):
+    """Only entries with a ticket above the last uploaded one (MT4 tickets are monotonic)"""
+    if last_ticket is None:
+        return entries
+    return [e for e in entries if _ticket_number(e) > last_ticket]
+
+
+def max_ticket(entries, current=None):
+    tickets = [_ticket_number(e) for e in entries]
+    tickets = [t for t in tickets if t > 0]
+    if current is not None:
+        tickets.append(current)
+    return max(tickets) if tickets else current
+
+
+def upload_new_entries(db, entries, last_ticket, upload):
+    """
+    Upload entries above last_ticket and return (new_entries, synced, last_ticket)
+
+    The returned ticket only moves past the new entries when the upload
+    succeeded, so a failed upload is retried on the next poll.
+    """
+    new_entries = select_new_entries(entries, last_ticket)
+    if not new_entries:
+        return new_entries, 0, last_ticket
+    synced = upload(db, new_entries)
+    if synced is None:
+        return new_entries, None, last_ticket
+    return new_entries, synced, max_ticket(new_entries, last_ticket)
+
+
 def main():
     """Main service loop"""
     print("=" * 70)
@@ -301,6 +340,11 @@ def main():
     last_modified = None
     error_count = 0
     
+    # Upload watermarks: only deltas are sent between periodic full passes
+    last_trade_ticket = None
+    last_balance_ticket = None
+    last_full_sync = 0
+    
     while True:
         try:
             if not os.path.exists(file_path):
@@ -321,22 +365,42 @@ def main():
                     if upload_account_data(db, account_data):
                         print(f"✅ PRO Account: Balance=${account_data.get('balance', 0):,.2f}, Equity=${account_data.get('equity', 0):,.2f}")
                     
-                    # Upload closed trades
+                    full_sync = time.time() - last_full_sync >= FULL_RESYNC_INTERVAL
+                    if full_sync:
+                        last_trade_ticket = None
+                        last_balance_ticket = None
+                    
+                    # Upload closed trades (only tickets newer than the last upload)
                     closed_trades = account_data.get("closed_trades", [])
-                    if closed_trades:
-                        trades_synced = upload_closed_trades(db, closed_trades)
-                        print(f"✅ PRO Closed trades synced: {trades_synced} (from {len(closed_trades)} in file)")
+                    new_trades, trades_synced, last_trade_ticket = upload_new_entries(
+                        db, closed_trades, last_trade_ticket, upload_closed_trades
+                    )
+                    if new_trades and trades_synced is None:
+                        print(f"⚠️  PRO Closed trades upload failed; retrying {len(new_trades)} trades next poll")
+                    elif new_trades:
+                        print(f"✅ PRO Closed trades synced: {trades_synced} (from {len(new_trades)} new, {len(closed_trades)} in file)")
+                    elif closed_trades:
+                        print("ℹ️  No new closed trades since last upload")
                     else:
                         print("ℹ️  No closed trades in file")
                     
                     # Upload balance operations (deposits/withdrawals)
                     balance_ops = account_data.get("balance_operations", [])
-                    if balance_ops:
-                        ops_synced = upload_balance_operations(db, balance_ops)
-                        print(f"✅ PRO Balance operations synced: {ops_synced} (from {len(balance_ops)} in file)")
+                    new_ops, ops_synced, last_balance_ticket = upload_new_entries(
+                        db, balance_ops, last_balance_ticket, upload_balance_operations
+                    )
+                    if new_ops and ops_synced is None:
+                        print(f"⚠️  PRO Balance operations upload failed; retrying {len(new_ops)} operations next poll")
+                    elif new_ops:
+                        print(f"✅ PRO Balance operations synced: {ops_synced} (from {len(new_ops)} new, {len(balance_ops)} in file)")
+                    elif balance_ops:
+                        print("ℹ️  No new balance operations since last upload")
                     else:
                         print("ℹ️  No balance operations in file")
                     
+                    if full_sync:
+                        last_full_sync = time.time()
+                    
                     last_modified = current_modified
                     error_count = 0
                 else:
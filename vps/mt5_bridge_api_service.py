@@ -9,19 +9,35 @@ Python Version: 3.12
 FastAPI Version: 0.115.0+
 
 Last Updated: 2025-01-19 - Production deployment with automated GitHub Actions
+
+Concurrency model:
+- The MT5 terminal session is owned by a single MT5TerminalWorker thread.
+  Handlers never call mt5.* directly; they queue jobs on the worker, which
+  groups pending jobs by account so each burst runs under one mt5.login().
+- Blocking pymongo calls run on a small thread pool via run_mongo(), so the
+  event loop keeps serving requests while the terminal or MongoDB is busy.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 import MetaTrader5 as mt5
 from pymongo import MongoClient
 from datetime import datetime, timezone, timedelta
 import os
 from dotenv import load_dotenv
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 from pydantic import BaseModel
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import asyncio
+import functools
+import hashlib
+import httpx
+import json
 import logging
 import sys
+import threading
+import time
 
 # Force UTF-8 encoding for Windows console compatibility
 if sys.platform == 'win32':
@@ -59,6 +75,30 @@ if not MONGODB_URI:
 MT5_PATH = os.getenv('MT5_PATH', 'C:\\Program Files\\MEX Atlantic MT5 Terminal\\terminal64.exe')
 MT5_SERVER = os.getenv('MT5_SERVER', 'MEXAtlantic-Real')
 
+# Terminal worker / executor configuration
+MT5_JOB_TIMEOUT = float(os.getenv('MT5_JOB_TIMEOUT', '30'))
+MT5_WORKER_MAX_BATCH = int(os.getenv('MT5_WORKER_MAX_BATCH', '50'))
+MT5_WORKER_MAX_AFFINITY = int(os.getenv('MT5_WORKER_MAX_AFFINITY', '3'))
+MONGO_EXECUTOR_THREADS = int(os.getenv('MONGO_EXECUTOR_THREADS', '8'))
+
+# Rolling account snapshot configuration
+MT5_SNAPSHOT_INTERVAL = float(os.getenv('MT5_SNAPSHOT_INTERVAL', '15'))
+MT5_SNAPSHOT_DEALS_LOOKBACK_DAYS = int(os.getenv('MT5_SNAPSHOT_DEALS_LOOKBACK_DAYS', '7'))
+# Accounts queued on the terminal worker at once during a refresh cycle, and
+# the deadline for each one (measured from when its job is queued)
+MT5_SNAPSHOT_CONCURRENCY = int(os.getenv('MT5_SNAPSHOT_CONCURRENCY', '2'))
+MT5_SNAPSHOT_ACCOUNT_TIMEOUT = float(os.getenv('MT5_SNAPSHOT_ACCOUNT_TIMEOUT', '20'))
+
+# Push event stream to the backend (disabled unless MT5_EVENTS_PUSH_URL is set)
+MT5_EVENTS_PUSH_URL = os.getenv('MT5_EVENTS_PUSH_URL')
+MT5_BRIDGE_PUSH_TOKEN = os.getenv('MT5_BRIDGE_PUSH_TOKEN', '')
+MT5_BRIDGE_ID = os.getenv('MT5_BRIDGE_ID', MT5_SERVER)
+MT5_EVENT_SPOOL_DIR = os.getenv('MT5_EVENT_SPOOL_DIR', 'C:\\mt5_bridge_service\\spool')
+MT5_EVENT_SPOOL_MAX = int(os.getenv('MT5_EVENT_SPOOL_MAX', '50000'))
+MT5_PUSH_BATCH = int(os.getenv('MT5_PUSH_BATCH', '500'))
+MT5_PUSH_MAX_BACKOFF = float(os.getenv('MT5_PUSH_MAX_BACKOFF', '60'))
+MT5_EQUITY_EPSILON = float(os.getenv('MT5_EQUITY_EPSILON', '0.01'))
+
 # FastAPI App
 app = FastAPI(
     title="FIDUS MT5 Bridge Service",
@@ -85,27 +125,722 @@ except Exception as e:
     logger.error(f"[ERROR] MongoDB connection error: {e}")
     db = None
 
-# Initialize MT5 on startup
+
+# ============================================
+# MONGODB EXECUTOR
+# ============================================
+mongo_executor = ThreadPoolExecutor(max_workers=MONGO_EXECUTOR_THREADS, thread_name_prefix='mongo')
+
+
+async def run_mongo(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking pymongo call on the executor instead of the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(mongo_executor, functools.partial(func, *args, **kwargs))
+
+
+# ============================================
+# MT5 TERMINAL WORKER
+# ============================================
+class MT5LoginError(Exception):
+    """Raised for every job in a batch whose account login failed"""
+
+
+class MT5TerminalWorker:
+    """
+    Single thread that owns the MT5 terminal session
+
+    The MetaTrader5 module drives one terminal with one logged-in account,
+    so every mt5.* call goes through this thread. Handlers queue jobs with
+    run(); pending jobs are grouped by account so a burst of requests for
+    the same account executes under a single mt5.login(), and an account
+    that is already logged in is not logged in again.
+
+    Scheduling order: session-independent jobs (account=None) first, then
+    the currently logged-in account (at most MT5_WORKER_MAX_AFFINITY batches
+    in a row), then the account that has been waiting longest.
+    """
+
+    def __init__(self, path: str, server: str):
+        self.path = path
+        self.server = server
+        self.current_login: Optional[int] = None
+        self._pending: "OrderedDict[Optional[int], List[tuple]]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._affinity_streak = 0
+        self.stats = {
+            "jobs_submitted": 0,
+            "jobs_completed": 0,
+            "jobs_failed": 0,
+            "jobs_cancelled": 0,
+            "batches": 0,
+            "logins": 0,
+            "login_failures": 0,
+            "logins_saved": 0,
+            "busy_seconds": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name='mt5-terminal', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _initialize(self) -> bool:
+        try:
+            if not mt5.initialize(path=self.path):
+                logger.error(f"[ERROR] MT5 initialize() failed, error code: {mt5.last_error()}")
+                return False
+            logger.info(f"[OK] MT5 Terminal initialized: v{mt5.version()}")
+            return True
+        except Exception as e:
+            logger.error(f"[ERROR] MT5 initialization error: {e}")
+            return False
+
+    def reinitialize(self) -> Dict:
+        """Restart the terminal session (submit as a job, runs on the worker thread)"""
+        try:
+            mt5.shutdown()
+            logger.info("[RESTART] MT5 shutdown complete")
+        except Exception as e:
+            logger.warning(f"[RESTART] MT5 shutdown error: {e}")
+        self.current_login = None
+        initialized = self._initialize()
+        return {
+            "initialized": initialized,
+            "version": mt5.version() if initialized else None,
+            "error_code": None if initialized else mt5.last_error()
+        }
+
+    # ------------------------------------------------------------------
+    # Job submission
+    # ------------------------------------------------------------------
+
+    def submit(self, func: Callable[[], Any], account: Optional[int] = None,
+               password: Optional[str] = None) -> Future:
+        """
+        Queue func() to run on the terminal thread
+
+        With an account, func runs while that account is logged in; jobs
+        without one only need an initialized terminal.
+        """
+        future = Future()
+        with self._cond:
+            if not self._running:
+                future.set_exception(RuntimeError("MT5 terminal worker is not running"))
+                return future
+            self._pending.setdefault(account, []).append((func, password, future))
+            self.stats["jobs_submitted"] += 1
+            self._cond.notify()
+        return future
+
+    async def run(self, func: Callable[[], Any], account: Optional[int] = None,
+                  password: Optional[str] = None, timeout: float = MT5_JOB_TIMEOUT) -> Any:
+        """Await a terminal job; a timed-out job is cancelled if it has not started"""
+        return await asyncio.wait_for(asyncio.wrap_future(self.submit(func, account, password)), timeout)
+
+    # ------------------------------------------------------------------
+    # Worker thread
+    # ------------------------------------------------------------------
+
+    def _take_batch(self):
+        """Pick the next account group (caller holds the lock)"""
+        if None in self._pending:
+            account = None
+        elif self.current_login in self._pending and self._affinity_streak < MT5_WORKER_MAX_AFFINITY:
+            account = self.current_login
+        else:
+            # Affinity cap reached: hand the session to the longest-waiting other
+            # account; the logged-in one only keeps it when nobody else is queued
+            account = next((a for a in self._pending if a != self.current_login), self.current_login)
+
+        jobs = self._pending[account]
+        batch, rest = jobs[:MT5_WORKER_MAX_BATCH], jobs[MT5_WORKER_MAX_BATCH:]
+        if rest:
+            self._pending[account] = rest
+        else:
+            del self._pending[account]
+
+        if account is not None:
+            self._affinity_streak = self._affinity_streak + 1 if account == self.current_login else 0
+        return account, batch
+
+    def _login(self, account: int, jobs: List[tuple]) -> Optional[str]:
+        """Log in to account unless it is already the session; returns an error or None"""
+        if account == self.current_login:
+            self.stats["logins_saved"] += 1
+            return None
+
+        password = next((p for _, p, _ in jobs if p), None)
+        self.stats["logins"] += 1
+        try:
+            if password:
+                authorized = mt5.login(account, password=password, server=self.server)
+            else:
+                authorized = mt5.login(account, server=self.server)
+            error = None if authorized else f"error code {mt5.last_error()}"
+        except Exception as e:
+            error = str(e)
+
+        if error:
+            self.stats["login_failures"] += 1
+            self.current_login = None
+            return error
+        self.current_login = account
+        self.stats["logins_saved"] += len(jobs) - 1
+        return None
+
+    def _run_batch(self, account: Optional[int], jobs: List[tuple]):
+        started = time.perf_counter()
+        queued = len(jobs)
+        jobs = [job for job in jobs if job[2].set_running_or_notify_cancel()]
+        self.stats["jobs_cancelled"] += queued - len(jobs)
+        if jobs:
+            error = self._login(account, jobs) if account is not None else None
+            for func, _, future in jobs:
+                if error:
+                    future.set_exception(MT5LoginError(f"MT5 login failed for {account}: {error}"))
+                    self.stats["jobs_failed"] += 1
+                    continue
+                try:
+                    future.set_result(func())
+                    self.stats["jobs_completed"] += 1
+                except Exception as e:
+                    future.set_exception(e)
+                    self.stats["jobs_failed"] += 1
+        self.stats["batches"] += 1
+        self.stats["busy_seconds"] += time.perf_counter() - started
+
+    def _loop(self):
+        self._initialize()
+        while True:
+            with self._cond:
+                while self._running and not self._pending:
+                    self._cond.wait()
+                if not self._running:
+                    leftover = [job for jobs in self._pending.values() for job in jobs]
+                    self._pending.clear()
+                    break
+                account, jobs = self._take_batch()
+            self._run_batch(account, jobs)
+
+        for _, _, future in leftover:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError("MT5 terminal worker stopped"))
+        try:
+            mt5.shutdown()
+            logger.info("[OK] MT5 Terminal shutdown complete")
+        except Exception as e:
+            logger.error(f"[ERROR] MT5 shutdown error: {e}")
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            queue_depth = sum(len(jobs) for jobs in self._pending.values())
+            queued_accounts = len([a for a in self._pending if a is not None])
+        stats = dict(self.stats)
+        stats["busy_seconds"] = round(stats["busy_seconds"], 3)
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "current_login": self.current_login,
+            "queue_depth": queue_depth,
+            "queued_accounts": queued_accounts,
+            "avg_jobs_per_batch": round(
+                (stats["jobs_completed"] + stats["jobs_failed"]) / stats["batches"], 2
+            ) if stats["batches"] else 0.0,
+            **stats
+        }
+
+
+mt5_worker = MT5TerminalWorker(MT5_PATH, MT5_SERVER)
+
+
+def _terminal_info() -> Optional[Dict]:
+    """Terminal status snapshot (runs on the terminal worker)"""
+    terminal_info = mt5.terminal_info()
+    if terminal_info is None:
+        return None
+    return {
+        "connected": terminal_info.connected,
+        "trade_allowed": terminal_info.trade_allowed,
+        "name": terminal_info.name,
+        "company": terminal_info.company,
+        "build": terminal_info.build
+    }
+
+
+# ============================================
+# ROLLING ACCOUNT SNAPSHOT
+# ============================================
+def _deal_to_dict(deal) -> Dict:
+    return {
+        "ticket": deal.ticket,
+        "order": deal.order,
+        "time": deal.time,
+        "time_msc": deal.time_msc,
+        "type": deal.type,
+        "entry": deal.entry,
+        "symbol": deal.symbol,
+        "volume": deal.volume,
+        "price": deal.price,
+        "profit": deal.profit,
+        "commission": deal.commission,
+        "swap": deal.swap,
+        "fee": deal.fee,
+        "comment": deal.comment,
+        "external_id": deal.external_id,
+        "position_id": deal.position_id,
+        "magic": deal.magic,
+        "reason": deal.reason
+    }
+
+
+def _snapshot_account_data(after_ticket: Optional[int] = None) -> Optional[Dict]:
+    """
+    Balance, margin, open positions and last deal ticket of the logged-in account (runs on the terminal worker)
+
+    With after_ticket, deals newer than it are returned under new_deals.
+    """
+    account_info = mt5.account_info()
+    if not account_info:
+        return None
+
+    positions = mt5.positions_get() or ()
+    now = datetime.now()
+    deals = mt5.history_deals_get(now - timedelta(days=MT5_SNAPSHOT_DEALS_LOOKBACK_DAYS), now + timedelta(days=1)) or ()
+
+    return {
+        "balance": account_info.balance,
+        "equity": account_info.equity,
+        "profit": account_info.profit,
+        "margin": account_info.margin,
+        "margin_free": account_info.margin_free,
+        "margin_level": account_info.margin_level,
+        "leverage": account_info.leverage,
+        "currency": account_info.currency,
+        "trade_allowed": account_info.trade_allowed,
+        "positions": [
+            {
+                "ticket": p.ticket,
+                "symbol": p.symbol,
+                "type": "buy" if p.type == 0 else "sell",
+                "volume": p.volume,
+                "price_open": p.price_open,
+                "price_current": p.price_current,
+                "profit": p.profit,
+                "swap": p.swap
+            }
+            for p in positions
+        ],
+        "last_deal_ticket": max((d.ticket for d in deals), default=None),
+        "new_deals": [_deal_to_dict(d) for d in deals if after_ticket is not None and d.ticket > after_ticket]
+    }
+
+
+def _diff_events(account: int, previous: Dict, current: Dict, new_deals: List[Dict]) -> List[Dict]:
+    """Change events between two snapshots of one account (seq is assigned by the spool)"""
+    now = datetime.now(timezone.utc).isoformat()
+    events = []
+
+    def event(event_type: str, data: Dict) -> Dict:
+        return {"type": event_type, "account": account, "time": now, "data": data}
+
+    figures = ('balance', 'equity', 'profit', 'margin', 'margin_free', 'margin_level')
+    if not previous.get('refreshed_at') or any(
+        abs((current.get(k) or 0) - (previous.get(k) or 0)) >= MT5_EQUITY_EPSILON for k in figures
+    ):
+        events.append(event('account_update', {
+            **{k: current.get(k) for k in figures},
+            "open_positions": len(current['positions'])
+        }))
+
+    for deal in sorted(new_deals, key=lambda d: d['ticket']):
+        events.append(event('deal_closed', deal))
+
+    # Positions are only diffed against an earlier snapshot, never on first sight
+    if previous.get('refreshed_at'):
+        before = {p['ticket']: p for p in previous.get('positions') or []}
+        after = {p['ticket']: p for p in current['positions']}
+        for ticket in sorted(after.keys() - before.keys()):
+            events.append(event('position_opened', {**after[ticket], "open_positions": len(after)}))
+        for ticket in sorted(before.keys() - after.keys()):
+            events.append(event('position_closed', {**before[ticket], "open_positions": len(after)}))
+    return events
+
+
+class AccountSnapshotStore:
+    """
+    In-memory live snapshot of every configured account
+
+    A background loop walks all active accounts of this terminal's server
+    (round-robin, like refresh_all_accounts in the account-switching
+    bridge), keeping at most MT5_SNAPSHOT_CONCURRENCY account jobs queued
+    on the terminal worker so each one gets its own timeout instead of
+    waiting behind the whole cycle. The snapshot endpoint then answers from
+    memory; its ETag is a hash of the account data only (not refreshed_at),
+    so a poller that sends If-None-Match gets a 304 until a figure changes.
+    """
+
+    def __init__(self):
+        self.accounts: Dict[int, Dict] = {}
+        self.etag: Optional[str] = None
+        self.last_cycle: Dict = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _load_accounts(self) -> List[Dict]:
+        return list(db['mt5_account_config'].find(
+            {'is_active': True, '$or': [{'server': MT5_SERVER}, {'server': {'$in': [None, '']}}]},
+            {'_id': 0, 'account': 1, 'password': 1, 'name': 1, 'fund_type': 1}
+        ))
+
+    async def _refresh_account(self, config: Dict) -> bool:
+        account = config['account']
+        previous = self.accounts.get(account, {})
+        job = functools.partial(_snapshot_account_data, previous.get("last_deal_ticket"))
+        try:
+            data = await mt5_worker.run(
+                job, account=account, password=config.get('password'), timeout=MT5_SNAPSHOT_ACCOUNT_TIMEOUT
+            )
+            error = None if data else "No account info"
+        except Exception as e:
+            data, error = None, str(e) or type(e).__name__
+
+        if data is None:
+            # Keep the last good figures; refreshed_at shows how old they are
+            self.accounts[account] = {**previous, "account": account, "error": error}
+            return False
+
+        new_deals = data.pop("new_deals")
+        if data["last_deal_ticket"] is None:
+            data["last_deal_ticket"] = previous.get("last_deal_ticket")
+        current = {
+            "account": account,
+            "name": config.get('name'),
+            "fund_type": config.get('fund_type'),
+            **data,
+            "refreshed_at": datetime.now(timezone.utc).isoformat(),
+            "error": None
+        }
+        self.accounts[account] = current
+
+        if event_pusher.enabled:
+            events = _diff_events(account, previous, current, new_deals)
+            if events:
+                event_pusher.publish(events)
+        return True
+
+    async def refresh_all(self) -> Dict:
+        """One round-robin pass over every configured account"""
+        started = time.perf_counter()
+        configs = [c for c in await run_mongo(self._load_accounts) if c.get('account')]
+        slots = asyncio.Semaphore(max(1, MT5_SNAPSHOT_CONCURRENCY))
+
+        async def refresh(config: Dict) -> bool:
+            async with slots:
+                return await self._refresh_account(config)
+
+        results = await asyncio.gather(*(refresh(c) for c in configs))
+
+        configured = {c['account'] for c in configs}
+        for account in list(self.accounts):
+            if account not in configured:
+                del self.accounts[account]
+
+        self.etag = self._compute_etag()
+        self.last_cycle = {
+            "completed_at": datetime.now(timezone.utc).isoformat(),
+            "duration_seconds": round(time.perf_counter() - started, 2),
+            "accounts": len(configs),
+            "refreshed": sum(1 for ok in results if ok),
+            "failed": sum(1 for ok in results if not ok)
+        }
+        logger.info(f"[SNAPSHOT] Refreshed {self.last_cycle['refreshed']}/{len(configs)} accounts "
+                    f"in {self.last_cycle['duration_seconds']}s")
+        return self.last_cycle
+
+    def _compute_etag(self) -> str:
+        """Hash of the account data; refreshed_at is left out so an unchanged cycle keeps the ETag"""
+        payload = [
+            {k: v for k, v in self.accounts[a].items() if k != 'refreshed_at'}
+            for a in sorted(self.accounts)
+        ]
+        body = json.dumps(payload, sort_keys=True, default=str)
+        return '"' + hashlib.sha1(body.encode('utf-8')).hexdigest() + '"'
+
+    async def _loop(self):
+        while True:
+            try:
+                if db is not None:
+                    await self.refresh_all()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[SNAPSHOT] Refresh cycle error: {e}")
+            await asyncio.sleep(MT5_SNAPSHOT_INTERVAL)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def to_response(self) -> Dict:
+        now = datetime.now(timezone.utc)
+        stale_after = MT5_SNAPSHOT_INTERVAL * 3
+        accounts = []
+        for account in sorted(self.accounts):
+            entry = dict(self.accounts[account])
+            refreshed_at = entry.get("refreshed_at")
+            age = (now - datetime.fromisoformat(refreshed_at)).total_seconds() if refreshed_at else None
+            entry["age_seconds"] = round(age, 1) if age is not None else None
+            entry["stale"] = age is None or age > stale_after
+            accounts.append(entry)
+        return {
+            "success": True,
+            "generated_at": now.isoformat(),
+            "etag": self.etag,
+            "server": MT5_SERVER,
+            "refresh_interval_seconds": MT5_SNAPSHOT_INTERVAL,
+            "last_cycle": self.last_cycle,
+            "count": len(accounts),
+            "accounts": accounts
+        }
+
+
+# ============================================
+# PUSH EVENT STREAM
+# ============================================
+class EventSpool:
+    """
+    Local, file-backed queue of change events awaiting acknowledgement
+
+    Events get a per-bridge sequence number and are appended to
+    events.jsonl before they are sent, so nothing is lost if the backend
+    is unreachable or the service restarts. Acknowledged events are
+    compacted away; seq continues from state.json across restarts.
+    """
+
+    def __init__(self, directory: str, max_events: int = MT5_EVENT_SPOOL_MAX):
+        self.directory = directory
+        self.max_events = max_events
+        self.events_path = os.path.join(directory, 'events.jsonl')
+        self.state_path = os.path.join(directory, 'state.json')
+        self.pending: List[Dict] = []
+        self.last_seq = 0
+        self.acked_seq = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.last_seq = state.get('last_seq', 0)
+            self.acked_seq = state.get('acked_seq', 0)
+        if os.path.exists(self.events_path):
+            with open(self.events_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue  # torn write from a crash
+                    if event['seq'] > self.acked_seq:
+                        self.pending.append(event)
+        if self.pending:
+            self.last_seq = max(self.last_seq, self.pending[-1]['seq'])
+            logger.info(f"[STREAM] Loaded {len(self.pending)} unacknowledged events from spool")
+
+    def _write_state(self):
+        tmp = self.state_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"last_seq": self.last_seq, "acked_seq": self.acked_seq}, f)
+        os.replace(tmp, self.state_path)
+
+    def _rewrite(self):
+        tmp = self.events_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for event in self.pending:
+                f.write(json.dumps(event, default=str) + '\n')
+        os.replace(tmp, self.events_path)
+
+    def append(self, events: List[Dict]) -> List[Dict]:
+        with self._lock:
+            with open(self.events_path, 'a', encoding='utf-8') as f:
+                for event in events:
+                    self.last_seq += 1
+                    event = {"seq": self.last_seq, **event}
+                    self.pending.append(event)
+                    f.write(json.dumps(event, default=str) + '\n')
+            self._write_state()
+
+            overflow = len(self.pending) - self.max_events
+            if overflow > 0:
+                # Polling reconciliation covers what is dropped here
+                self.pending = self.pending[overflow:]
+                self.dropped += overflow
+                logger.warning(f"[STREAM] Spool full, dropped {overflow} oldest events")
+                self._rewrite()
+        return events
+
+    def batch(self, limit: int) -> List[Dict]:
+        with self._lock:
+            return list(self.pending[:limit])
+
+    def ack(self, seq: int):
+        with self._lock:
+            if seq <= self.acked_seq:
+                return
+            self.acked_seq = seq
+            self.pending = [e for e in self.pending if e['seq'] > seq]
+            self._write_state()
+            self._rewrite()
+
+
+class EventPusher:
+    """
+    Pushes spooled change events to the backend ingest endpoint
+
+    At-least-once: a batch is only dropped from the spool once the
+    backend returns its acked_seq; failures back off exponentially (up to
+    MT5_PUSH_MAX_BACKOFF seconds) and the same events are re-sent. The
+    backend dedupes on (bridge_id, seq).
+    """
+
+    def __init__(self, url: Optional[str], token: str, bridge_id: str):
+        self.url = url
+        self.token = token
+        self.bridge_id = bridge_id
+        self.spool: Optional[EventSpool] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"pushed": 0, "push_failures": 0, "last_push_at": None, "last_error": None}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url) and self.spool is not None
+
+    def publish(self, events: List[Dict]):
+        self.spool.append(events)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _push_once(self, client: httpx.AsyncClient) -> bool:
+        """Send one batch; returns True when the spool may have more to send"""
+        loop = asyncio.get_running_loop()
+        batch = self.spool.batch(MT5_PUSH_BATCH)
+        if not batch:
+            return False
+        response = await client.post(
+            self.url,
+            json={"bridge_id": self.bridge_id, "events": batch},
+            headers={"X-Bridge-Token": self.token}
+        )
+        response.raise_for_status()
+        acked_seq = response.json().get('acked_seq')
+        if acked_seq is not None:
+            await loop.run_in_executor(None, self.spool.ack, acked_seq)
+        self.stats["pushed"] += len(batch)
+        self.stats["last_push_at"] = datetime.now(timezone.utc).isoformat()
+        return len(batch) == MT5_PUSH_BATCH
+
+    async def _loop(self):
+        backoff = 1.0
+        async with httpx.AsyncClient(timeout=15) as client:
+            while True:
+                self._wakeup.clear()
+                try:
+                    while await self._push_once(client):
+                        pass
+                    backoff = 1.0
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.stats["push_failures"] += 1
+                    self.stats["last_error"] = str(e)
+                    logger.warning(f"[STREAM] Push failed ({e}), retrying in {backoff:.0f}s")
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, MT5_PUSH_MAX_BACKOFF)
+                    continue
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=MT5_SNAPSHOT_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self):
+        if not self.url:
+            logger.info("[STREAM] MT5_EVENTS_PUSH_URL not set - event push disabled")
+            return
+        if self.spool is None:
+            self.spool = EventSpool(MT5_EVENT_SPOOL_DIR)
+        self._wakeup = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+            logger.info(f"[STREAM] Pushing events as '{self.bridge_id}' to {self.url}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "bridge_id": self.bridge_id,
+            "last_seq": self.spool.last_seq if self.spool else None,
+            "acked_seq": self.spool.acked_seq if self.spool else None,
+            "spooled": len(self.spool.pending) if self.spool else 0,
+            "dropped": self.spool.dropped if self.spool else 0,
+            **self.stats
+        }
+
+
+event_pusher = EventPusher(MT5_EVENTS_PUSH_URL, MT5_BRIDGE_PUSH_TOKEN, MT5_BRIDGE_ID)
+snapshot_store = AccountSnapshotStore()
+
+
+# Start the terminal worker on startup (it initializes MT5 on its own thread)
 @app.on_event("startup")
 async def startup_event():
     """Initialize MT5 terminal on service startup"""
-    try:
-        if not mt5.initialize(path=MT5_PATH):
-            logger.error(f"[ERROR] MT5 initialize() failed, error code: {mt5.last_error()}")
-        else:
-            version = mt5.version()
-            logger.info(f"[OK] MT5 Terminal initialized: v{version}")
-    except Exception as e:
-        logger.error(f"[ERROR] MT5 initialization error: {e}")
+    mt5_worker.start()
+    event_pusher.start()
+    snapshot_store.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Shutdown MT5 terminal on service shutdown"""
-    try:
-        mt5.shutdown()
-        logger.info("[OK] MT5 Terminal shutdown complete")
-    except Exception as e:
-        logger.error(f"[ERROR] MT5 shutdown error: {e}")
+    await snapshot_store.stop()
+    await event_pusher.stop()
+    await asyncio.get_running_loop().run_in_executor(None, mt5_worker.stop)
+    mongo_executor.shutdown(wait=False)
 
 
 # ============================================
@@ -126,6 +861,7 @@ async def root():
             "account_balance": "/api/mt5/account/{id}/balance",
             "account_trades": "/api/mt5/account/{id}/trades",
             "accounts_summary": "/api/mt5/accounts/summary",
+            "accounts_snapshot": "/api/mt5/accounts/snapshot",
             "system_status": "/api/mt5/admin/system-status"
         }
     }
@@ -141,26 +877,19 @@ async def bridge_health():
     Returns service status, MT5 connection, and MongoDB connection
     """
     try:
-        # Check MT5 connection
-        mt5_initialized = mt5.terminal_info() is not None
+        # Check MT5 connection (via the terminal worker)
         mt5_terminal_info = None
-        
-        if mt5_initialized:
-            terminal_info = mt5.terminal_info()
-            if terminal_info:
-                mt5_terminal_info = {
-                    "connected": terminal_info.connected,
-                    "trade_allowed": terminal_info.trade_allowed,
-                    "name": terminal_info.name,
-                    "company": terminal_info.company,
-                    "build": terminal_info.build
-                }
+        try:
+            mt5_terminal_info = await mt5_worker.run(_terminal_info)
+        except Exception as e:
+            logger.warning(f"[WARNING] Terminal info unavailable: {e}")
+        mt5_initialized = mt5_terminal_info is not None
         
         # Check MongoDB connection
         mongo_connected = False
         try:
             if db is not None:
-                mongo_client.admin.command('ping')
+                await run_mongo(mongo_client.admin.command, 'ping')
                 mongo_connected = True
         except Exception:
             mongo_connected = False
@@ -173,8 +902,10 @@ async def bridge_health():
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "mt5": {
                 "available": mt5_initialized,
-                "terminal_info": mt5_terminal_info
+                "terminal_info": mt5_terminal_info,
+                "worker": mt5_worker.get_stats()
             },
+            "event_stream": event_pusher.get_stats(),
             "mongodb": {
                 "connected": mongo_connected
             },
@@ -220,22 +951,21 @@ async def admin_emergency_restart(token: str = None):
         
         logger.info("[ADMIN] Emergency restart triggered via API")
         
-        # Reinitialize MT5 connection
+        # Reinitialize MT5 connection (queued behind in-flight terminal jobs)
         try:
-            mt5.shutdown()
-            logger.info("[RESTART] MT5 shutdown complete")
+            mt5_worker.start()
+            restart = await mt5_worker.run(mt5_worker.reinitialize)
             
-            if not mt5.initialize(path=MT5_PATH):
-                logger.error(f"[RESTART] MT5 initialize() failed, error code: {mt5.last_error()}")
+            if not restart["initialized"]:
+                logger.error(f"[RESTART] MT5 initialize() failed, error code: {restart['error_code']}")
                 return {
                     "success": False,
                     "message": "MT5 reinitialization failed",
-                    "error_code": mt5.last_error(),
+                    "error_code": restart["error_code"],
                     "timestamp": datetime.now(timezone.utc).isoformat()
                 }
             
-            version = mt5.version()
-            logger.info(f"[RESTART] MT5 reinitialized: v{version}")
+            logger.info(f"[RESTART] MT5 reinitialized: v{restart['version']}")
             
         except Exception as e:
             logger.error(f"[RESTART] MT5 restart error: {e}")
@@ -250,7 +980,7 @@ async def admin_emergency_restart(token: str = None):
         mongo_ok = False
         try:
             if db is not None:
-                mongo_client.admin.command('ping')
+                await run_mongo(mongo_client.admin.command, 'ping')
                 mongo_ok = True
                 logger.info("[RESTART] MongoDB connection verified")
         except Exception as e:
@@ -281,7 +1011,7 @@ async def mt5_status():
     """
     try:
         # Check MT5 initialization
-        terminal_info = mt5.terminal_info()
+        terminal_info = await mt5_worker.run(_terminal_info)
         if terminal_info is None:
             return {
                 "status": "offline",
@@ -294,7 +1024,7 @@ async def mt5_status():
             raise HTTPException(status_code=503, detail="MongoDB not available")
         
         accounts_collection = db['mt5_accounts']
-        accounts = list(accounts_collection.find({}, {
+        accounts = await run_mongo(lambda: list(accounts_collection.find({}, {
             'account': 1,
             'name': 1,
             'fund_type': 1,
@@ -303,7 +1033,7 @@ async def mt5_status():
             'profit': 1,
             'updated_at': 1,
             '_id': 0
-        }))
+        })))
         
         # Get account count by status
         total_accounts = len(accounts)
@@ -320,9 +1050,10 @@ async def mt5_status():
             },
             "server": MT5_SERVER,
             "terminal": {
-                "connected": terminal_info.connected if terminal_info else False,
-                "trade_allowed": terminal_info.trade_allowed if terminal_info else False
-            }
+                "connected": terminal_info["connected"],
+                "trade_allowed": terminal_info["trade_allowed"]
+            },
+            "worker": mt5_worker.get_stats()
         }
         
     except HTTPException:
@@ -339,6 +1070,26 @@ async def mt5_status():
 # ============================================
 # ACCOUNT INFO BY ID
 # ============================================
+def _live_account_data() -> Optional[Dict]:
+    """Live figures for the logged-in account (runs on the terminal worker)"""
+    if mt5.terminal_info() is None:
+        return None
+    account_info = mt5.account_info()
+    if not account_info:
+        return None
+    return {
+        "balance": account_info.balance,
+        "equity": account_info.equity,
+        "profit": account_info.profit,
+        "margin": account_info.margin,
+        "margin_free": account_info.margin_free,
+        "margin_level": account_info.margin_level,
+        "leverage": account_info.leverage,
+        "currency": account_info.currency,
+        "trade_allowed": account_info.trade_allowed
+    }
+
+
 @app.get("/api/mt5/account/{account_id}/info")
 async def get_account_info(account_id: int):
     """
@@ -351,11 +1102,11 @@ async def get_account_info(account_id: int):
         
         # Get account from MongoDB
         accounts_collection = db['mt5_accounts']
-        account_doc = accounts_collection.find_one({'account': account_id})
+        account_doc = await run_mongo(accounts_collection.find_one, {'account': account_id})
         
         if not account_doc:
             # Try mt5_account_config collection as fallback
-            account_doc = db['mt5_account_config'].find_one({'account': account_id})
+            account_doc = await run_mongo(db['mt5_account_config'].find_one, {'account': account_id})
             
         if not account_doc:
             raise HTTPException(status_code=404, detail=f"Account {account_id} not found")
@@ -363,30 +1114,14 @@ async def get_account_info(account_id: int):
         # Try to get live MT5 data for this account
         live_data = None
         
-        # Check if MT5 is initialized
-        if mt5.terminal_info() is not None:
-            password = account_doc.get('password', '')
-            
-            if password:
-                try:
-                    authorized = mt5.login(account_id, password=password, server=MT5_SERVER)
-                    
-                    if authorized:
-                        account_info = mt5.account_info()
-                        if account_info:
-                            live_data = {
-                                "balance": account_info.balance,
-                                "equity": account_info.equity,
-                                "profit": account_info.profit,
-                                "margin": account_info.margin,
-                                "margin_free": account_info.margin_free,
-                                "margin_level": account_info.margin_level,
-                                "leverage": account_info.leverage,
-                                "currency": account_info.currency,
-                                "trade_allowed": account_info.trade_allowed
-                            }
-                except Exception as e:
-                    logger.warning(f"[WARNING] Could not get live data for {account_id}: {e}")
+        # The terminal worker logs in once for every queued request on this account
+        password = account_doc.get('password', '')
+        
+        if password:
+            try:
+                live_data = await mt5_worker.run(_live_account_data, account=account_id, password=password)
+            except Exception as e:
+                logger.warning(f"[WARNING] Could not get live data for {account_id}: {e}")
         
         # Combine MongoDB data with live data
         result = {
@@ -426,7 +1161,8 @@ async def get_account_balance(account_id: int):
             raise HTTPException(status_code=503, detail="MongoDB not available")
         
         accounts_collection = db['mt5_accounts']
-        account = accounts_collection.find_one(
+        account = await run_mongo(
+            accounts_collection.find_one,
             {'account': account_id},
             {'balance': 1, 'equity': 1, 'profit': 1, 'updated_at': 1, '_id': 0}
         )
@@ -453,36 +1189,74 @@ async def get_account_balance(account_id: int):
 # ACCOUNT TRADES
 # ============================================
 @app.get("/api/mt5/account/{account_id}/trades")
-async def get_account_trades(account_id: int, limit: int = 100):
+async def get_account_trades(
+    account_id: int,
+    limit: int = 100,
+    since: Optional[str] = None,
+    after_ticket: Optional[int] = None
+):
     """
     Get recent trades/deals for a specific account
+    
+    Without a cursor: the latest `limit` trades, newest first.
+    With `since` (ISO time) and/or `after_ticket`: only deals newer than the
+    cursor, oldest first, so the backend can page forward with next_cursor.
     """
     try:
         if db is None:
             raise HTTPException(status_code=503, detail="MongoDB not available")
         
+        cursor_mode = since is not None or after_ticket is not None
+        since_dt = None
+        if since is not None:
+            try:
+                since_dt = datetime.fromisoformat(since.replace('Z', '+00:00'))
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid 'since' timestamp: {since}")
+        
+        def build_query(account_field: str, time_field: str) -> Dict:
+            query = {account_field: account_id}
+            if since_dt is not None:
+                query[time_field] = {'$gte': since_dt}
+            if after_ticket is not None:
+                query['ticket'] = {'$gt': after_ticket}
+            return query
+        
+        sort_direction = 1 if cursor_mode else -1
+        
         # Try mt5_deals_history collection first
         trades_collection = db['mt5_deals_history']
         
-        trades = list(trades_collection.find(
-            {'account_number': account_id},
+        trades = await run_mongo(lambda: list(trades_collection.find(
+            build_query('account_number', 'time'),
             {'_id': 0}
-        ).sort('time', -1).limit(limit))
+        ).sort([('time', sort_direction), ('ticket', sort_direction)]).limit(limit)))
         
         # If no trades found, try trades collection
         if len(trades) == 0:
             trades_collection = db['trades']
-            trades = list(trades_collection.find(
-                {'account_id': account_id},
+            trades = await run_mongo(lambda: list(trades_collection.find(
+                build_query('account_id', 'close_time'),
                 {'_id': 0}
-            ).sort('close_time', -1).limit(limit))
+            ).sort([('close_time', sort_direction), ('ticket', sort_direction)]).limit(limit)))
+        
+        next_cursor = None
+        if cursor_mode and trades:
+            next_cursor = {
+                "after_ticket": max(t.get('ticket') or 0 for t in trades)
+            }
         
         return {
+            "success": True,
             "account_id": account_id,
             "count": len(trades),
+            "has_more": cursor_mode and len(trades) == limit,
+            "next_cursor": next_cursor,
             "trades": trades
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"[ERROR] Get account trades error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -504,7 +1278,7 @@ async def get_all_accounts():
         accounts_collection = db['mt5_accounts']
         
         # Get all accounts
-        accounts = list(accounts_collection.find({}, {'_id': 0}).sort('account', 1))
+        accounts = await run_mongo(lambda: list(accounts_collection.find({}, {'_id': 0}).sort('account', 1)))
         
         return accounts
         
@@ -513,6 +1287,27 @@ async def get_all_accounts():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ============================================
+# LIVE SNAPSHOT OF ALL ACCOUNTS
+# ============================================
+@app.get("/api/mt5/accounts/snapshot")
+async def get_accounts_snapshot(request: Request, response: Response):
+    """
+    Live balance/equity/margin/positions/last deal ticket for every account
+
+    Served from the in-memory snapshot (no MT5 login per call). Send the
+    previous ETag as If-None-Match to get a 304 when nothing has changed.
+    """
+    if snapshot_store.etag is None:
+        raise HTTPException(status_code=503, detail="Snapshot not ready yet")
+
+    if request.headers.get('if-none-match') == snapshot_store.etag:
+        return Response(status_code=304, headers={"ETag": snapshot_store.etag})
+
+    response.headers["ETag"] = snapshot_store.etag
+    return snapshot_store.to_response()
+
+
 # ============================================
 # ALL ACCOUNTS SUMMARY
 # ============================================
@@ -528,7 +1323,7 @@ async def get_accounts_summary():
         accounts_collection = db['mt5_accounts']
         
         # Get all accounts
-        accounts = list(accounts_collection.find({}, {'_id': 0}))
+        accounts = await run_mongo(lambda: list(accounts_collection.find({}, {'_id': 0})))
         
         # Calculate totals
         total_balance = sum(acc.get('balance', 0) for acc in accounts)
@@ -587,11 +1382,16 @@ async def get_system_status():
     """
     try:
         # MT5 Status
-        terminal_info = mt5.terminal_info()
+        try:
+            terminal_info = await mt5_worker.run(_terminal_info)
+        except Exception as e:
+            logger.warning(f"[WARNING] Terminal info unavailable: {e}")
+            terminal_info = None
         mt5_status = {
             "initialized": terminal_info is not None,
-            "connected": terminal_info.connected if terminal_info else False,
-            "trade_allowed": terminal_info.trade_allowed if terminal_info else False
+            "connected": terminal_info["connected"] if terminal_info else False,
+            "trade_allowed": terminal_info["trade_allowed"] if terminal_info else False,
+            "worker": mt5_worker.get_stats()
         }
         
         # MongoDB Status
@@ -601,15 +1401,13 @@ async def get_system_status():
         
         if db is not None:
             try:
-                mongo_client.admin.command('ping')
+                await run_mongo(mongo_client.admin.command, 'ping')
                 mongo_status["ping"] = "success"
                 
                 # Get collection stats
-                mongo_status["collections"] = {
-                    "mt5_accounts": db['mt5_accounts'].count_documents({}),
-                    "mt5_deals_history": db['mt5_deals_history'].count_documents({}),
-                    "mt5_account_config": db['mt5_account_config'].count_documents({})
-                }
+                names = ['mt5_accounts', 'mt5_deals_history', 'mt5_account_config']
+                counts = await asyncio.gather(*(run_mongo(db[name].count_documents, {}) for name in names))
+                mongo_status["collections"] = dict(zip(names, counts))
             except Exception as e:
                 mongo_status["error"] = str(e)
         